@@ -0,0 +1,78 @@
+# bench_fake_discord.py
+# DM scroll-back through the real DiscordBridge.load_older against the fake (needs
+# PySide6 and discord.py, like the bridge)
+#
+#   python bench/bench_fake_discord.py                  # 10 scroll-ups of 10, 80 ms REST
+#   python bench/bench_fake_discord.py --latency-ms 150 --rate 5
+
+import os, sys, time
+from collections import Counter
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from fake_discord import FakeWorld
+
+def _scroll_back(world: FakeWorld, tmp: str, batch: int, steps: int) -> Dict[str, Any]:
+    import threading
+    import ben_discord_app as app
+    app.MESSAGE_DB_PATH = os.path.join(tmp, f"messages-{batch}.db")
+    app.NAME_CACHE_PATH = os.path.join(tmp, "name_cache.json")
+    bridge = app.DiscordBridge("fake-token", world.guild.id, world.main.id, 0, hub_port=0,
+                               client_factory=world.client)
+    bridge.dm_index_path = os.path.join(tmp, "dm_index.json")
+    warm, landed = threading.Event(), threading.Event()
+    bridge.warm_complete.connect(warm.set, app.Qt.DirectConnection)
+    bridge.history_extended.connect(lambda _tid: landed.set(), app.Qt.DirectConnection)
+    tid = f"dm:{world.peers[0].id}"
+    pages: List[float] = []
+    bridge.start()
+    try:
+        if not warm.wait(60):
+            raise RuntimeError("warm-load did not complete")
+        before = Counter(world.rest.calls)
+        for _ in range(steps):
+            landed.clear()
+            t0 = time.perf_counter()
+            bridge.load_older(tid, batch)
+            if not landed.wait(60):
+                break
+            pages.append(time.perf_counter() - t0)
+        calls = world.rest.calls - before
+    finally:
+        bridge.stop()
+    pages.sort()
+    return {"held": len(bridge.ui_messages.get(tid, [])), "history": calls["history"], "rest": sum(calls.values()),
+            "p50": pages[len(pages) // 2] if pages else 0.0, "max": pages[-1] if pages else 0.0,
+            "rate_limited": world.rest.rate_limited}
+
+def bench(batch: int = 10, steps: int = 10, latency_ms: float = 80.0, rate: float = 50.0, history: int = 2000):
+    """Scroll-back in one DM through DiscordBridge.load_older (before= cursor paging)."""
+    try:
+        import ben_discord_app  # needs PySide6 and discord.py
+    except Exception as e:
+        print(f"[bench] needs PySide6 and discord.py to run the bridge ({e})")
+        return
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        for b, n in ((batch, steps), (100, 10)):
+            world = FakeWorld.synthetic(dms=1, dm_history=history, main_history=50,
+                                        latency=latency_ms / 1000.0, rate=rate, burst=int(rate))
+            res = _scroll_back(world, tmp, b, n)
+            print(f"[bench] load_older batch={b:3d} x{n:2d}  held={res['held']:5d}  history calls={res['history']:3d}  "
+                  f"rest calls={res['rest']:3d}  rate-limit waits={res['rate_limited']:3d}  "
+                  f"page p50 {1000 * res['p50']:7.1f} ms  max {1000 * res['max']:7.1f} ms")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="DM scroll-back through DiscordBridge.load_older")
+    ap.add_argument("--batch", type=int, default=10)
+    ap.add_argument("--steps", type=int, default=10)
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--rate", type=float, default=50.0, help="REST requests per second before waits")
+    args = ap.parse_args()
+    bench(args.batch, args.steps, args.latency_ms, args.rate)
+
+if __name__ == "__main__":
+    main()
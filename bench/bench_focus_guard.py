@@ -0,0 +1,86 @@
+# bench_focus_guard.py
+# Wakeups and time-to-refocus, 250 ms poll vs foreground events, over a simulated hour
+#
+#   python bench/bench_focus_guard.py                   # 1 h idle, 12 focus steals
+#   python bench/bench_focus_guard.py --steals 60 --refused 0.5
+
+import os, sys, random
+from typing import Callable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from focus_guard import FOCUS_POLL_MS, FakeEventSource, FocusGuard, foreground_action
+
+class _SimDesktop:
+    OWN = 1
+
+    def __init__(self, refused: float, seed: int = 1):
+        self.rnd = random.Random(seed)
+        self.refused = refused
+        self.fg = self.OWN
+        self.lost_at = 0.0
+        self.recovered: List[float] = []
+        self.now = 0.0
+
+    def check(self, hwnd: Optional[int]) -> bool:
+        if self.fg == self.OWN:
+            return True
+        foreground_action("Windows.UI.Core.CoreWindow", "Start")
+        if self.rnd.random() >= self.refused:   # the foreground lock lets us back in
+            self.fg = self.OWN
+            self.recovered.append(self.now - self.lost_at)
+            return True
+        return False
+
+def _simulate(seconds: float, steals: int, refused: float, poll: bool) -> Tuple[int, List[float]]:
+    import heapq
+    desk = _SimDesktop(refused)
+    rnd = random.Random(7)
+    times = sorted(rnd.uniform(0, seconds) for _ in range(steals))
+    timers: List[Tuple[float, int, Callable[[], None]]] = []
+    seq = [0]
+
+    def schedule(ms: int, fn: Callable[[], None]):
+        seq[0] += 1
+        heapq.heappush(timers, (desk.now + ms / 1000.0, seq[0], fn))
+
+    src = FakeEventSource()
+    wakeups = [0]
+    if poll:
+        def _tick():
+            wakeups[0] += 1
+            desk.check(None)
+            schedule(FOCUS_POLL_MS, _tick)
+        schedule(FOCUS_POLL_MS, _tick)
+    else:
+        guard = FocusGuard(src, desk.check, schedule)
+        guard.start()
+    for t in times + [seconds]:
+        while timers and timers[0][0] <= t:
+            desk.now, _s, fn = heapq.heappop(timers)
+            fn()
+        desk.now = t
+        if t < seconds:
+            desk.fg, desk.lost_at = 2, t
+            src.emit(2)
+    return (wakeups[0] if poll else guard.wakeups), desk.recovered
+
+def bench(seconds: float = 3600.0, steals: int = 12, refused: float = 0.3):
+    for label, poll in (("250 ms poll", True), ("foreground events", False)):
+        wake, rec = _simulate(seconds, steals, refused, poll)
+        avg = 1000 * sum(rec) / len(rec) if rec else 0.0
+        print(f"[bench] {label:18} wakeups={wake:6d} in {int(seconds)} s   refocused {len(rec)}/{steals}   "
+              f"mean time to refocus {avg:6.1f} ms")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="poll vs foreground events (simulated)")
+    ap.add_argument("--seconds", type=float, default=3600.0)
+    ap.add_argument("--steals", type=int, default=12)
+    ap.add_argument("--refused", type=float, default=0.3, help="chance a refocus attempt is refused")
+    args = ap.parse_args()
+    bench(args.seconds, args.steals, args.refused)
+
+if __name__ == "__main__":
+    main()
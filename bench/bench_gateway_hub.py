@@ -0,0 +1,89 @@
+# bench_gateway_hub.py
+# Attach/detach detection and publish fan-out latency over real sockets
+#
+#   python bench/bench_gateway_hub.py                   # 3 clients, 500 events
+#   python bench/bench_gateway_hub.py --clients 8 --events 2000
+
+import os, sys, asyncio, time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from gateway_hub import GATEWAY_PORT, GatewayHub, HubClient, hub_key
+
+async def _wait_for(pred: Callable[[], bool], timeout: float = 5.0) -> float:
+    t0 = time.perf_counter()
+    while not pred():
+        if time.perf_counter() - t0 > timeout:
+            break
+        await asyncio.sleep(0.0005)
+    return time.perf_counter() - t0
+
+async def _bench(n_clients: int, n_events: int, port: int) -> Dict[str, float]:
+    key = hub_key("bench-token")
+    hub = GatewayHub(port=port, key=key)
+    await hub.start()
+    res: Dict[str, float] = {}
+
+    # Attach / detach detection: how long until the hub's TTS policy sees the UI
+    c = HubClient(lambda ev: None, port=port, key=key)
+    t0 = time.perf_counter()
+    await c.connect()
+    await _wait_for(lambda: hub.attached("ui"))
+    res["attach_ms"] = 1000 * (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    c.close()
+    await _wait_for(lambda: not hub.attached("ui"))
+    res["detach_ms"] = 1000 * (time.perf_counter() - t0)
+
+    # Fan-out: every client receives every event; latency is publish -> on_event
+    lat: List[float] = []
+    got = [0]
+
+    def _on(ev):
+        if ev.get("op") == "message":
+            lat.append(time.perf_counter() - ev["t"])
+            got[0] += 1
+
+    clients = [HubClient(_on, port=port, key=key) for _ in range(n_clients)]
+    for cl in clients:
+        await cl.connect()
+    runs = [asyncio.ensure_future(cl.run()) for cl in clients]
+    await _wait_for(lambda: len(hub._clients) == n_clients)
+    row = {"id": 0, "author": "someone", "content": "hello " * 8, "ts": 0.0, "from_me": False, "attachments": []}
+    for i in range(n_events):
+        hub.publish({"op": "message", "thread": "dm:1", "row": dict(row, id=i), "reactions": [], "t": time.perf_counter()})
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+    await _wait_for(lambda: got[0] >= n_clients * n_events, timeout=30.0)
+    for cl in clients:
+        cl.close()
+    for r in runs:
+        r.cancel()
+    await asyncio.gather(*runs, return_exceptions=True)
+    await hub.close()
+    s = sorted(lat)
+    res["delivered"] = float(len(s))
+    res["p50_ms"] = 1000 * s[len(s) // 2] if s else 0.0
+    res["p95_ms"] = 1000 * s[int(0.95 * (len(s) - 1))] if s else 0.0
+    return res
+
+def bench(clients: int = 3, events: int = 500, port: int = GATEWAY_PORT + 1):
+    res = asyncio.run(_bench(clients, events, port))
+    print(f"[bench] UI attach seen in {res['attach_ms']:.2f} ms, detach seen in {res['detach_ms']:.2f} ms "
+          f"(heartbeat file: 2 s write + 2 s poll + 5 s stale window)")
+    print(f"[bench] fan-out {events} events x {clients} clients: delivered={int(res['delivered'])} "
+          f"p50 {res['p50_ms']:.2f} ms  p95 {res['p95_ms']:.2f} ms")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="attach/detach and fan-out latency over loopback")
+    ap.add_argument("--clients", type=int, default=3)
+    ap.add_argument("--events", type=int, default=500)
+    ap.add_argument("--port", type=int, default=GATEWAY_PORT + 1, help="bench port (not the daemon's)")
+    args = ap.parse_args()
+    bench(args.clients, args.events, args.port)
+
+if __name__ == "__main__":
+    main()
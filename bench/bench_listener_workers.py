@@ -0,0 +1,139 @@
+# bench_listener_workers.py
+# Loop lag under a burst of DMs through simple_dm_listener's own on_message against
+# fake_discord, with speech and writes inline (old) vs on the workers
+#
+#   python bench/bench_listener_workers.py                  # 50 DMs from 12 users, 300 ms speech
+#   python bench/bench_listener_workers.py --dms 200 --speech-ms 800 --latency-ms 120
+
+import os, sys, asyncio, json, tempfile, time
+from typing import Callable, Dict, Hashable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from listener_workers import BackgroundWriter, SpeechExecutor
+
+class _Inline:
+    """The old listener: speech and writes run on the gateway loop inside on_message."""
+
+    def __init__(self, speak: Callable[[str], None]):
+        self._speak = speak
+        self.coalesced = 0
+
+    def submit(self, _key: Hashable, x):
+        try:
+            x() if callable(x) else self._speak(x)
+        except Exception:
+            pass
+
+    def pending(self) -> int:
+        return 0
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return True
+
+    def stop(self):
+        pass
+
+def _listener(world, data_dir: str):
+    """Import simple_dm_listener on a throwaway config and point its client at `world`."""
+    with open(os.path.join(data_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"DISCORD_TOKEN": "fake-token", "GUILD_ID": str(world.guild.id),
+                   "CHANNEL_ID": str(world.main.id)}, f)
+    os.environ["DM_LISTENER_DIR"] = data_dir
+    sys.modules.pop("simple_dm_listener", None)
+    import simple_dm_listener as sdl
+    from name_cache import NameCache
+    sdl._names = NameCache(os.path.join(data_dir, "name_cache.json"))
+    sdl.client = world.client()
+    return sdl
+
+async def _lag_probe(samples: List[float], stop: asyncio.Event, tick: float = 0.005):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(tick)
+        samples.append(max(0.0, time.perf_counter() - t0 - tick) * 1000.0)
+
+async def _burst(dms: int, users: int, speech_s: float, latency: float, workers: bool) -> Dict[str, float]:
+    from fake_discord import FakeWorld
+    world = FakeWorld.synthetic(dms=users, dm_history=0, main_history=0, latency=latency)
+    with tempfile.TemporaryDirectory() as data_dir:
+        sdl = _listener(world, data_dir)
+        old_speech, old_writer = sdl._speech, sdl._writer
+        old_speech.stop(); old_writer.stop()
+        spoken: List[str] = []
+
+        def say(line: str):
+            time.sleep(speech_s)           # engine.say + runAndWait
+            spoken.append(line)
+        sdl._speech = SpeechExecutor(say) if workers else _Inline(say)
+        sdl._writer = BackgroundWriter() if workers else _Inline(say)
+
+        handled: List[float] = []
+
+        async def on_message(message):
+            await sdl.on_message(message)
+            handled.append(time.perf_counter())
+        client = sdl.client
+        client.event(on_message)
+        gateway = asyncio.ensure_future(client.start("fake-token"))
+        while not client._ready:
+            await asyncio.sleep(0.005)
+
+        samples: List[float] = []
+        stop = asyncio.Event()
+        probe = asyncio.ensure_future(_lag_probe(samples, stop))
+        await asyncio.sleep(0.02)
+        t0 = time.perf_counter()
+        # The gateway hands events over one by one; a few ms apart in a burst
+        for i in range(dms):
+            peer = world.peers[i % users]
+            await world.post(world.dms[peer.id], peer, f"message {i} from {peer.name}")
+            await asyncio.sleep(0.002)
+        while len(handled) < dms and time.perf_counter() - t0 < 120:
+            await asyncio.sleep(0.005)
+        t_handled = (handled[-1] if handled else time.perf_counter()) - t0
+        stop.set()
+        await probe
+        while sdl._speech.pending() and time.perf_counter() - t0 < 120:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(speech_s + 0.05)   # the line being spoken when the queue emptied
+        sdl._writer.flush()
+        stored = sum(len(sdl._store.load_messages(f"dm:{p.id}", dms)) for p in world.peers) if sdl._store else 0
+        await client.close()
+        await gateway
+        sdl._speech.stop(); sdl._writer.stop()
+        if sdl._store:
+            sdl._store.close()
+    s = sorted(samples)
+    return {"handled": t_handled, "p95": s[int(0.95 * (len(s) - 1))] if s else 0.0, "max": s[-1] if s else 0.0,
+            "spoken": float(len(spoken)), "coalesced": float(sdl._speech.coalesced), "stored": float(stored),
+            "rest": float(world.rest.total)}
+
+def bench(dms: int = 50, users: int = 12, speech_ms: float = 300.0, latency_ms: float = 80.0, inline: bool = True):
+    try:
+        import discord  # the listener's handler needs discord.py
+    except Exception:
+        print("[bench] needs discord.py (simple_dm_listener's handler runs against fake_discord)")
+        return
+    modes = ([("inline (old)", False)] if inline else []) + [("workers", True)]
+    for label, workers in modes:
+        res = asyncio.run(_burst(dms, users, speech_ms / 1000.0, latency_ms / 1000.0, workers))
+        print(f"[bench] {label:13} {dms} DMs handled in {1000 * res['handled']:9.1f} ms   "
+              f"loop lag p95 {res['p95']:8.2f} ms  max {res['max']:8.2f} ms   "
+              f"spoken={int(res['spoken'])} coalesced={int(res['coalesced'])} "
+              f"stored={int(res['stored'])} rest calls={int(res['rest'])}")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="event-loop lag under a DM burst (fake_discord)")
+    ap.add_argument("--dms", type=int, default=50)
+    ap.add_argument("--users", type=int, default=12)
+    ap.add_argument("--speech-ms", type=float, default=300.0)
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--skip-inline", action="store_true", help="only run the worker path")
+    args = ap.parse_args()
+    bench(args.dms, args.users, args.speech_ms, args.latency_ms, inline=not args.skip_inline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench_media_cache.py
+# Render-time lookups for a thread with images and emoji chips, cold vs warm cache,
+# against a fake CDN with injected latency
+#
+#   python bench/bench_media_cache.py                    # 40 images + 20 emoji, 150 ms CDN
+#   python bench/bench_media_cache.py --images 200 --latency-ms 300
+
+import os, sys, threading, time
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from media_cache import MediaCache, MediaPrefetcher
+
+def bench(images: int = 40, emoji: int = 20, latency_ms: float = 150.0, renders: int = 5):
+    import tempfile
+    lat = latency_ms / 1000.0
+    calls = [0]
+
+    def _cdn(_url: str) -> bytes:
+        calls[0] += 1
+        time.sleep(lat)
+        return os.urandom(48 * 1024)
+
+    urls: List[Tuple[str, str]] = [(f"https://cdn.discordapp.com/attachments/1/{i}/img.png?ex=1&hm={i}", "orig")
+                                   for i in range(images)]
+    urls += [(f"https://cdn.discordapp.com/emojis/{i}.png", "orig") for i in range(emoji)]
+    with tempfile.TemporaryDirectory() as d:
+        # Old path: every render resolves every remote media reference again
+        t_old = renders * len(urls) * lat
+
+        cache = MediaCache(d, get=_cdn)
+        ready = threading.Event()
+        done = [0]
+
+        def _ready(_u, _k):
+            done[0] += 1
+            if done[0] == len(urls):
+                ready.set()
+        pf = MediaPrefetcher(cache, _ready)
+        t0 = time.perf_counter()
+        pf.request_many(urls)
+        ready.wait(60)
+        t_fill = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(renders):
+            for u, k in urls:
+                cache.lookup(u, k)
+        t_warm = (time.perf_counter() - t0) / renders
+        # Re-signed CDN links still hit
+        resigned = sum(cache.lookup(u.replace("ex=1", "ex=2"), k) is not None for u, k in urls)
+        pf.shutdown()
+        reopened = MediaCache(d, get=_cdn)
+        print(f"[bench] {len(urls)} media x {renders} renders  old: {renders * len(urls)} fetches "
+              f"(~{1000 * t_old:.0f} ms on the wire)   cache: {calls[0]} fetches, prefetched in {1000 * t_fill:.0f} ms")
+        print(f"[bench] warm render lookups: {1000 * t_warm:.3f} ms per render   re-signed urls hit: "
+              f"{resigned}/{len(urls)}   entries after restart: {len(reopened._entries)}")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="cold vs warm media lookups (fake CDN)")
+    ap.add_argument("--images", type=int, default=40)
+    ap.add_argument("--emoji", type=int, default=20)
+    ap.add_argument("--latency-ms", type=float, default=150.0)
+    args = ap.parse_args()
+    bench(args.images, args.emoji, args.latency_ms)
+
+if __name__ == "__main__":
+    main()
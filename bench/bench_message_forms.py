@@ -0,0 +1,86 @@
+# bench_message_forms.py
+# 10k synthetic messages, each rendered and read aloud a few times, formatting per use
+# (old) vs precomputed forms, plus per-record memory
+#
+#   python bench/bench_message_forms.py                 # 10k messages, 3 renders + 2 reads each
+#   python bench/bench_message_forms.py --messages 50000
+
+import os, sys, re, time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from message_forms import MessageForms, ingest
+
+def _synthetic(n: int) -> List[Dict[str, Any]]:
+    words = ["hey", "ok", "see", "you", "later", "lol", "<3", "check", "this", "out", "tomorrow"]
+    out = []
+    for i in range(n):
+        body = " ".join(words[(i * 7 + k) % len(words)] for k in range(3 + i % 12))
+        if i % 5 == 0:
+            body += f" https://example.com/clip/{i}?t=42"
+        if i % 9 == 0:
+            body += "\nsecond line"
+        atts = [{"type": "image", "url": f"https://cdn.example/{i}.png"}] if i % 11 == 0 else []
+        out.append({"author": f"user{i % 40}", "content": body, "attachments": atts})
+    return out
+
+def _old_render(m: Dict[str, Any]) -> str:
+    a = (m["author"] or "").replace("<", "&lt;").replace(">", "&gt;")
+    b = (m["content"] or "").replace("<", "&lt;").replace(">", "&gt;").replace("\n", "<br>")
+    return a + (b if b.strip() else "[no text]")
+
+def _old_speak(text: str) -> str:
+    # The app compiled the URL pattern inside _sanitize_tts on every call
+    s = re.compile(r'(https?://\S+|www\.\S+|\b[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\S*)').sub(" link ", text)
+    return re.sub(r'\s+', ' ', s).strip()
+
+def bench(messages: int = 10000, renders: int = 3, reads: int = 2):
+    rows = _synthetic(messages)
+    t0 = time.perf_counter()
+    for m in rows:
+        for _ in range(renders):
+            _old_render(m)
+        for _ in range(reads):
+            has_img = any(a.get("type") == "image" for a in m["attachments"])
+            _old_speak(f"Message from {m['author']} at 3:04 PM{' with embedded image' if has_img else ''}")
+            _old_speak(m["content"])
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    forms = [ingest(m["author"], m["content"], m["attachments"]) for m in rows]
+    t_ingest = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for f in forms:
+        for _ in range(renders):
+            f.author_html + f.body_html
+        for _ in range(reads):
+            f"Message from {f.author_tts} at 3:04 PM{f.media}"
+            f.tts
+    t_use = time.perf_counter() - t0
+    same = all(_old_render(m) == f.author_html + f.body_html and _old_speak(m["content"]) == f.tts
+               for m, f in zip(rows, forms))
+
+    class _DictForms:   # the same fields without __slots__
+        def __init__(self, f: MessageForms):
+            for k in MessageForms.__slots__:
+                setattr(self, k, getattr(f, k))
+    d = _DictForms(forms[0])
+    size_slots = sys.getsizeof(forms[0])
+    size_dict = sys.getsizeof(d) + sys.getsizeof(d.__dict__)
+    print(f"[bench] {messages} messages x ({renders} renders + {reads} reads)  per use: {1000 * t_old:8.1f} ms   "
+          f"precomputed: ingest {1000 * t_ingest:6.1f} ms + use {1000 * t_use:6.1f} ms   same output={same}")
+    print(f"[bench] record overhead: __slots__ {size_slots} B vs __dict__ {size_dict} B per message")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="format-per-use vs precomputed forms")
+    ap.add_argument("--messages", type=int, default=10000)
+    ap.add_argument("--renders", type=int, default=3)
+    ap.add_argument("--reads", type=int, default=2)
+    args = ap.parse_args()
+    bench(args.messages, args.renders, args.reads)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_narbe_http_search.py
+# Latency / memory of a live query over the direct HTTP backend; --browser also times the
+# QWebEngineView path narbe_scan_browser.py falls back to
+#
+#   python bench/bench_narbe_http_search.py "cute dogs" --kind images --browser
+
+import os, sys, json, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "search"))
+
+from narbe_http_search import _q, search_images, search_videos
+
+def _rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return float("nan")
+
+def _bench_http(query: str, kind: str, runs: int):
+    rss0 = _rss_mb()
+    times, n = [], 0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        res = search_images(query) if kind == "images" else search_videos(query)
+        times.append(time.perf_counter() - t0)
+        n = len(res)
+    return times, n, _rss_mb() - rss0
+
+def _bench_browser(query: str, kind: str, runs: int):
+    # Loads the same first-choice page in a bare QWebEngineView and polls the
+    # INJECT_* collector, like the hidden browser in narbe_scan_browser.py
+    from PySide6 import QtCore, QtWidgets
+    from PySide6.QtWebEngineWidgets import QWebEngineView
+    from narbe_scan_browser import INJECT_IMAGES, INJECT_VIDEOS
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    rss0 = _rss_mb()
+    view = QWebEngineView()
+    js = INJECT_IMAGES if kind == "images" else INJECT_VIDEOS
+    want = 1
+    if kind == "images":
+        url = f"https://www.google.com/search?tbm=isch&hl=en&safe=off&udm=2&q={_q(query)}"
+    else:
+        url = f"https://www.youtube.com/results?search_query={_q(query)}&hl=en"
+
+    times, n = [], 0
+    for _ in range(runs):
+        loop = QtCore.QEventLoop()
+        state = {"n": 0}
+        def poll():
+            def got(s):
+                try:
+                    state["n"] = len(json.loads(s or "[]"))
+                except Exception:
+                    state["n"] = 0
+                if state["n"] >= want:
+                    loop.quit()
+            view.page().runJavaScript(js, got)
+        timer = QtCore.QTimer(interval=550, timeout=poll)
+        QtCore.QTimer.singleShot(25000, loop.quit)
+        t0 = time.perf_counter()
+        view.setUrl(QtCore.QUrl(url))
+        timer.start()
+        loop.exec()
+        timer.stop()
+        times.append(time.perf_counter() - t0)
+        n = state["n"]
+    # Chromium renders in child processes; count them too
+    rss = _rss_mb() - rss0
+    try:
+        import psutil
+        rss += sum(c.memory_info().rss for c in psutil.Process().children(recursive=True)) / (1024 * 1024)
+    except Exception:
+        pass
+    view.deleteLater()
+    return times, n, rss
+
+def _report(label, times, n, rss):
+    if not times:
+        return
+    times = sorted(times)
+    print(f"{label:8s} items={n:3d}  median={times[len(times)//2]*1000:7.0f} ms  "
+          f"max={times[-1]*1000:7.0f} ms  +rss={rss:7.1f} MB")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="time a live query over HTTP (and optionally the browser path)")
+    ap.add_argument("query")
+    ap.add_argument("--kind", choices=["images", "videos"], default="images")
+    ap.add_argument("--browser", action="store_true", help="also time the QWebEngineView path")
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+    _report("http", *_bench_http(args.query, args.kind, args.runs))
+    if args.browser:
+        _report("browser", *_bench_browser(args.query, args.kind, args.runs))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# bench_ngram_lm.py
+# Load time + completion query latency of an n-gram model, optionally on a synthetic one:
+#
+#   python utils/ngram_lm.py --synthetic /tmp/synth.arpa --vocab 60000
+#   python bench/bench_ngram_lm.py /tmp/synth.arpa
+
+import os, sys, time, random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "utils"))
+
+from ngram_lm import NgramLM
+
+def bench(path: str, queries: int = 2000):
+    t0 = time.perf_counter()
+    if not path.endswith(".nglm"):
+        base = os.path.splitext(path[:-3] if path.endswith(".gz") else path)[0]
+        NgramLM.open(path).close()  # compile once if needed
+        print(f"[bench] compile/check   {time.perf_counter() - t0:8.3f} s")
+        path = base + ".nglm"
+    t0 = time.perf_counter()
+    lm = NgramLM(path)
+    print(f"[bench] load (mmap)     {1000 * (time.perf_counter() - t0):8.2f} ms  order={lm.order} vocab={lm.V}")
+    rnd = random.Random(1)
+    words = [lm.word(rnd.randrange(lm.V)) for _ in range(512)]
+    cases = []
+    for _ in range(queries):
+        ctx = [rnd.choice(words) for _ in range(rnd.randint(0, 3))]
+        w = rnd.choice(words)
+        cases.append((ctx, w[:rnd.randint(0, min(3, len(w)))]))
+    times = []
+    for ctx, pfx in cases:
+        t = time.perf_counter()
+        lm.complete(ctx, pfx, 6)
+        times.append(1000 * (time.perf_counter() - t))
+    times.sort()
+    pct = lambda p: times[min(len(times) - 1, int(p * len(times)))]
+    print(f"[bench] query  n={len(times)}  median={pct(0.5):.3f} ms  p95={pct(0.95):.3f} ms  "
+          f"p99={pct(0.99):.3f} ms  max={times[-1]:.3f} ms")
+    lm.close()
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="time load + completion queries")
+    ap.add_argument("model", help="ARPA (.arpa / .arpa.gz, compiled once) or compiled .nglm")
+    ap.add_argument("--queries", type=int, default=2000)
+    args = ap.parse_args()
+    bench(args.model, args.queries)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench_outbound.py
+# Time until Ben sees his message (old: user lookup + create_dm + send + two name
+# lookups, all awaited first) vs the local echo, and delivery under injected failures
+#
+#   python bench/bench_outbound.py                     # 120 ms REST, 30% transient failures
+#   python bench/bench_outbound.py --latency-ms 300 --fail 0.5
+
+import os, sys, asyncio, random, time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from outbound import Outbound, OutboundQueue, local_snowflake
+
+class _Transient(Exception):
+    status = 503
+
+async def _bench(latency: float, fail: float, messages: int, seed: int = 1) -> Dict[str, float]:
+    rnd = random.Random(seed)
+    rest = [0]
+
+    async def _rest():
+        rest[0] += 1
+        await asyncio.sleep(latency)
+
+    # Old path: fetch_user, create_dm, send, _resolve_member_display, _author_display_async
+    t0 = time.perf_counter()
+    for _ in range(5):
+        await _rest()
+    old_visible = time.perf_counter() - t0
+
+    sent: List[float] = []
+    failed = [0]
+    t_submit: Dict[int, float] = {}
+
+    async def _send(item: Outbound):
+        await _rest()
+        if rnd.random() < fail:
+            raise _Transient("503 Service Unavailable")
+        return item.local_id
+
+    q = OutboundQueue(_send, lambda it, _r: sent.append(time.perf_counter() - t_submit[it.local_id]),
+                      lambda it, _e: failed.__setitem__(0, failed[0] + 1), backoff=latency, backoff_max=8 * latency)
+    t0 = time.perf_counter()
+    last = 0
+    for i in range(messages):
+        item = Outbound("dm:1", f"message {i}", local_snowflake(last))
+        last = item.local_id
+        t_submit[item.local_id] = time.perf_counter()
+        q.submit(item)          # the echo is on screen here
+    echo_visible = (time.perf_counter() - t0) / messages
+    while q.pending():
+        await asyncio.sleep(latency / 4)
+    return {"old_visible": old_visible, "echo_visible": echo_visible, "sent": float(len(sent)),
+            "failed": float(failed[0]), "p95_sent": sorted(sent)[int(0.95 * (len(sent) - 1))] if sent else 0.0}
+
+def bench(latency_ms: float = 120.0, fail: float = 0.3, messages: int = 20):
+    res = asyncio.run(_bench(latency_ms / 1000.0, fail, messages))
+    print(f"[bench] message visible after: old path {1000 * res['old_visible']:7.1f} ms   "
+          f"local echo {1000 * res['echo_visible']:6.3f} ms")
+    print(f"[bench] {messages} sends at {int(100 * fail)}% transient failures: delivered={int(res['sent'])} "
+          f"failed={int(res['failed'])} (old path: ~{int(fail * messages)} dropped silently)   "
+          f"p95 until sent {1000 * res['p95_sent']:.0f} ms")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="echo latency and retry delivery (fake client)")
+    ap.add_argument("--latency-ms", type=float, default=120.0)
+    ap.add_argument("--fail", type=float, default=0.3, help="fraction of sends failing transiently")
+    ap.add_argument("--messages", type=int, default=20)
+    args = ap.parse_args()
+    bench(args.latency_ms, args.fail, args.messages)
+
+if __name__ == "__main__":
+    main()
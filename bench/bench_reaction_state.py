@@ -0,0 +1,92 @@
+# bench_reaction_state.py
+# Old path (refetch per event, both raw and cached handlers) vs local deltas, against
+# a fake client with injected REST latency
+#
+#   python bench/bench_reaction_state.py                     # 20 messages x 15 reactions, 120 ms REST
+#   python bench/bench_reaction_state.py --messages 50 --per-message 40 --latency-ms 200
+
+import os, sys, asyncio, random, time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from gateway_hub import reaction_row
+from reaction_state import REACTION_COALESCE_SEC, ReactionCoalescer, ReactionState, _row_key
+
+class _FakeRest:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.counts: Dict[int, Dict[str, int]] = {}
+
+    async def fetch_message(self, mid: int) -> List[Dict[str, Any]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [reaction_row(e, n) for e, n in self.counts.get(mid, {}).items() if n > 0]
+
+def _events(messages: int, per_message: int, seed: int = 1):
+    rnd = random.Random(seed)
+    emojis = ["👍", "❤️", "😂", "👎"]
+    out = []
+    for mid in range(1, messages + 1):
+        for _ in range(per_message):
+            out.append((mid, rnd.choice(emojis), 1 if rnd.random() < 0.8 else -1))
+    rnd.shuffle(out)
+    return out
+
+async def _run(messages: int, per_message: int, latency: float, local: bool) -> Dict[str, float]:
+    rest = _FakeRest(latency)
+    updates = [0]
+    state = ReactionState()
+    for mid in range(1, messages + 1):
+        rest.counts[mid] = {}
+        if mid % 4:   # most messages were seen live or in history; every 4th is unknown
+            state.seed(mid, [])
+    co = ReactionCoalescer(lambda _mid, _info: updates.__setitem__(0, updates[0] + 1))
+    t0 = time.perf_counter()
+    tasks = []
+    for mid, e, d in _events(messages, per_message):
+        c = rest.counts[mid]
+        if d < 0 and not c.get(e):
+            continue
+        c[e] = c.get(e, 0) + d
+        # discord.py dispatches every event handler as its own task
+        if local:
+            async def _new(mid=mid, e=e, d=d):
+                if not state.apply(mid, e, d):
+                    state.seed(mid, await rest.fetch_message(mid))
+                co.touch(mid)
+            tasks.append(asyncio.ensure_future(_new()))
+        else:
+            # on_reaction_add and on_raw_reaction_add both refetch and both re-render
+            async def _old(mid=mid):
+                for _ in range(2):
+                    await rest.fetch_message(mid)
+                    updates[0] += 1
+            tasks.append(asyncio.ensure_future(_old()))
+        await asyncio.sleep(0.002)   # events a couple of ms apart
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(REACTION_COALESCE_SEC + 0.05)
+    ok = all(sorted((_row_key(r), r["count"]) for r in state.get(mid) or []) ==
+             sorted((e, n) for e, n in rest.counts[mid].items() if n > 0) for mid in rest.counts) if local else True
+    return {"time": time.perf_counter() - t0, "rest": float(rest.calls), "updates": float(updates[0]), "ok": float(ok)}
+
+def bench(messages: int = 20, per_message: int = 15, latency_ms: float = 120.0):
+    lat = latency_ms / 1000.0
+    for label, local in (("refetch per event", False), ("local deltas", True)):
+        res = asyncio.run(_run(messages, per_message, lat, local))
+        print(f"[bench] {label:18} rest calls={int(res['rest']):5d}  ui updates={int(res['updates']):5d}  "
+              f"settled in {1000 * res['time']:8.1f} ms" + ("" if not local else f"  counts match={bool(res['ok'])}"))
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="refetch-per-event vs local deltas (fake client)")
+    ap.add_argument("--messages", type=int, default=20)
+    ap.add_argument("--per-message", type=int, default=15)
+    ap.add_argument("--latency-ms", type=float, default=120.0)
+    args = ap.parse_args()
+    bench(args.messages, args.per_message, args.latency_ms)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_read_state.py
+# Old sorted-id-list save vs watermark save as history grows
+#
+#   python bench/bench_read_state.py                     # 1k / 10k / 100k read messages
+#   python bench/bench_read_state.py --sizes 1000 500000
+
+import os, sys, json, time
+from typing import Iterable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from read_state import ReadState
+
+def _old_save(path: str, read_ids: Iterable[int], last_seen_ts: float):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"read_ids": sorted(read_ids), "last_seen_ts": last_seen_ts}, f)
+    os.replace(tmp, path)
+
+def bench(sizes=(1000, 10000, 100000), threads: int = 20):
+    import tempfile
+    base = 1_100_000_000_000_000_000   # snowflake-sized ids
+    with tempfile.TemporaryDirectory() as d:
+        old_path = os.path.join(d, "old.json")
+        new_path = os.path.join(d, "new.json")
+        for n in sizes:
+            ids = [base + i * 4096 for i in range(n)]
+            t0 = time.perf_counter()
+            _old_save(old_path, set(ids), time.time())
+            t_old = time.perf_counter() - t0
+
+            if os.path.exists(new_path):
+                os.remove(new_path)
+            st = ReadState(new_path)
+            for i, mid in enumerate(ids):
+                st.mark(f"dm:{i % threads}", mid)   # read in order, nothing left unread
+            st.mark("dm:0", ids[-1] + 4096 * 3, oldest_unread=ids[-1] + 4096)   # one out-of-order read
+            st.set_last_seen(time.time())
+            t0 = time.perf_counter()
+            st.save()
+            t_new = time.perf_counter() - t0
+            print(f"[bench] {n:7d} read  old: {os.path.getsize(old_path):9d} B {1000 * t_old:7.2f} ms   "
+                  f"watermarks: {os.path.getsize(new_path):6d} B {1000 * t_new:6.2f} ms")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="old id-list save vs watermark save")
+    ap.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    args = ap.parse_args()
+    bench(args.sizes)
+
+if __name__ == "__main__":
+    main()
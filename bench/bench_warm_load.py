@@ -0,0 +1,80 @@
+# bench_warm_load.py
+# DiscordBridge warm-load against fake_discord with injected REST latency, one call at
+# a time vs WARM_CONCURRENCY in flight: warm_complete, first and last DM history landed
+#
+#   python bench/bench_warm_load.py                      # 20 DMs, 120 ms per REST call
+#   python bench/bench_warm_load.py --threads 40 --latency-ms 250 --limit 6
+
+import os, sys, time
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "messenger"))
+
+from warm_load import WARM_CONCURRENCY
+
+def _warm_bridge(threads: int, latency: float, limit: int) -> Dict[str, float]:
+    # Start the real bridge, then queue every DM's recent history the way the UI does after
+    # warm_complete; time until the first / last DM history lands
+    import tempfile, threading
+    import ben_discord_app as app
+    from fake_discord import FakeWorld
+
+    tmp = tempfile.mkdtemp(prefix="warm_bench_")
+    app.MESSAGE_DB_PATH = os.path.join(tmp, "messages.db")
+    app.NAME_CACHE_PATH = os.path.join(tmp, "name_cache.json")
+    app.SETTINGS["WARM_CONCURRENCY"] = limit
+    world = FakeWorld.synthetic(dms=threads, dm_history=30, main_history=30, latency=latency, rate=1000.0, burst=1000)
+    bridge = app.DiscordBridge("fake-token", world.guild.id, world.main.id, 0, hub_port=0, client_factory=world.client)
+    bridge.dm_index_path = os.path.join(tmp, "dm_index.json")
+    marks: Dict[str, float] = {}
+    landed: set = set()
+    done = threading.Event()
+    t0 = time.perf_counter()
+
+    def _warm():
+        marks["warm"] = time.perf_counter() - t0
+        for uid in list(bridge.dm_threads):
+            bridge.fetch_recent_dm(f"dm:{uid}", recent=10)
+
+    def _extended(tid: str):
+        if tid.startswith("dm:") and tid not in landed:
+            landed.add(tid)
+            marks.setdefault("first_dm", time.perf_counter() - t0)
+            if len(landed) >= threads:
+                marks["all_dms"] = time.perf_counter() - t0
+                done.set()
+
+    direct = app.Qt.DirectConnection
+    bridge.warm_complete.connect(_warm, direct)
+    bridge.history_extended.connect(_extended, direct)
+    bridge.start()
+    done.wait(60)
+    bridge.stop()
+    marks["rest"] = float(world.rest.total)
+    marks["peak"] = float(world.rest.peak)
+    return marks
+
+def bench(threads: int = 20, latency_ms: float = 120.0, limit: int = WARM_CONCURRENCY):
+    try:
+        import ben_discord_app  # needs PySide6 and discord.py
+    except Exception as e:
+        print(f"warm_load bench needs PySide6 and discord.py ({e})")
+        return
+    for lim in (1, limit):
+        res = _warm_bridge(threads, latency_ms / 1000.0, lim)
+        print(f"[bench] WARM_CONCURRENCY={lim:<2d} warm_complete {1000 * res.get('warm', 0):7.1f} ms   "
+              f"first DM history {1000 * res.get('first_dm', 0):7.1f} ms   all {threads} DMs "
+              f"{1000 * res.get('all_dms', 0):7.1f} ms   rest calls={int(res['rest'])} peak in-flight={int(res['peak'])}")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="time DiscordBridge warm-load against fake_discord")
+    ap.add_argument("--threads", type=int, default=20)
+    ap.add_argument("--latency-ms", type=float, default=120.0)
+    ap.add_argument("--limit", type=int, default=WARM_CONCURRENCY)
+    args = ap.parse_args()
+    bench(args.threads, args.latency_ms, args.limit)
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,18 @@
 #
 # Notes:
 # - Bots cannot read a human user's private inbox. For DM access, people DM the bot.
-#   The bot forwards those DMs into DM_BRIDGE_CHANNEL_ID, and we also show them directly in the UI.
+# - When the gateway daemon (simple_dm_listener.py) is running, its events arrive over a local
+#   socket and this app only logs in for REST calls (one gateway session per machine); without
+#   it the app opens its own gateway session. DM_BRIDGE_CHANNEL_ID is only read for old mirrors.
 # - Enable "Message Content Intent" in your bot settings.
 # - Space = move highlight, Enter = select / read / open reply box
 # - Long-hold Enter (~2.5s) toggles focus pane (channel list <-> message view)
 
-import os, sys, asyncio, threading, tempfile, json, base64, subprocess, traceback, time, re
+import os, sys, asyncio, threading, tempfile, json, base64, subprocess, traceback, time, re, bisect
+from collections import OrderedDict
 import discord
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Set, Tuple, Any
 from datetime import datetime
 import re
 import html  # for HTML escaping in message rendering
@@ -52,9 +55,34 @@ try:
 except ImportError:
     _WIN32_AVAILABLE = False
 
-# --- Heartbeat for pausing the background listener ---
+# Shared scan keyboard (utils/scan_keyboard.py), shown in-process for replies
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+from scan_keyboard import ScanKeyboard, PredictionBackend, EDIT_CONTROLS, LARGE_KEYS_STYLE, fixed_row_heights
+# Local SQLite message store (sibling module)
+from message_store import MessageStore, KEEP_PER_THREAD
+# Bounded-concurrency warm-load helpers (sibling module)
+from warm_load import WarmLimiter, WARM_CONCURRENCY, NOT_MEMBER_TTL_SEC
+# Display-name cache shared with simple_dm_listener.py (sibling module)
+from name_cache import NameCache, NAME_CACHE_PATH, NAME_TTL_SEC
+# Local socket to the gateway daemon, and the message rows both processes build (sibling module)
+from gateway_hub import HubClient, GATEWAY_PORT, hub_key, attachment_rows, reaction_rows, emoji_spoken_name
+# Reaction counts kept from gateway deltas, one UI update per burst (sibling module)
+from reaction_state import ReactionState, ReactionCoalescer
+# Per-thread read watermarks, saved debounced (sibling module)
+from read_state import ReadState, READ_STATE_SAVE_MS
+# Optimistic sends with a retrying per-thread queue (sibling module)
+from outbound import OutboundQueue, Outbound, local_snowflake
+# On-disk thumbnail / custom-emoji cache with a background prefetcher (sibling module)
+from media_cache import MediaCache, MediaPrefetcher, media_key, MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_MB, THUMB_MAX_PX
+# Foreground-change driven focus guard (sibling module)
+from focus_guard import FocusGuard, WinEventSource, foreground_action, FOCUS_POLL_MS
+# Escaped HTML / TTS forms of a message, built once at ingest (sibling module)
+from message_forms import MessageForms, ingest, sanitize_tts
+
+# --- Paths ---
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
-HEARTBEAT_PATH = os.path.join(APP_DIR, "ben_app_heartbeat.lock")
+MESSAGE_DB_PATH = os.path.join(APP_DIR, "messages.db")
+CATCHUP_PAGE = 100   # messages per history request (Discord's maximum)
 
 
 # --- Messenger settings (limits & feature toggles) ---
@@ -67,8 +95,12 @@ SETTINGS = {
     "CHANNEL_BACKFILL_BATCH": 20,
     "DM_BACKFILL_BATCH": 10,
     "ENABLE_SCROLL_BACKFILL": True,
-    "ENABLE_RENDER_DM_BACKFILL": False,   # avoid auto-pulling 500 on every render
-    "FOCUS_ANCHOR_RATIO": 0.5            # keep highlight around mid-pane
+    "ENABLE_RENDER_DM_BACKFILL": False,   # fetch one older page whenever a DM is opened
+    "BACKFILL_PREFETCH_ROWS": 5,         # scanning within this many rows of the top loads the next page
+    "FOCUS_ANCHOR_RATIO": 0.5,           # keep highlight around mid-pane
+    "WARM_CONCURRENCY": WARM_CONCURRENCY,  # in-flight Discord REST calls during warm-load
+    "NOT_MEMBER_TTL_SEC": NOT_MEMBER_TTL_SEC,  # retry fetch_member for a miss older than this
+    "NAME_CACHE_TTL_SEC": NAME_TTL_SEC     # refresh cached display names older than this
 }
 try:
     with open(SETTINGS_PATH, "r", encoding="utf-8") as _sf:
@@ -120,6 +152,9 @@ class TTSWorker(QtCore.QObject):
         if not self._engine:
             return
         # overwrite any pending text
+        # Engine health check on demand (was a 5 s timer); re-inits a driver gone stale while idle
+        if not self._speaking:
+            self._keepalive()
         self._latest_text = text
         self._last_use = time.time()
         if self._speaking:
@@ -231,6 +266,110 @@ class UiMessage:
     ts: float
     from_me: bool = False
     attachments: Optional[List[Dict[str, Any]]] = field(default_factory=list)
+    state: str = ""   # "sending" / "failed" for a local echo of our own message, else ""
+
+    @property
+    def forms(self) -> MessageForms:
+        # Built when the message enters a thread; rebuilt only if author/content/attachments changed
+        f = self.__dict__.get("_forms")
+        if (f is None or f.content != self.content or f.author != self.author
+                or f.attachments is not self.attachments):
+            f = self.__dict__["_forms"] = ingest(self.author, self.content, self.attachments)
+        return f
+
+class ThreadMessages(list):
+    """One thread's UiMessages in snowflake-id (= time) order with an id index.
+    append() does an ordered insert (bisect; new messages land at the tail) and ignores ids
+    already present, so callers never re-sort or scan for duplicates."""
+
+    def __init__(self, items=()):
+        super().__init__()
+        self._ids: List[int] = []
+        self._by_id: Dict[int, UiMessage] = {}
+        for ui in items:
+            self.append(ui)
+
+    def append(self, ui: UiMessage) -> bool:
+        mid = ui.id
+        if mid in self._by_id:
+            return False
+        ids = self._ids
+        at = len(ids) if (not ids or mid > ids[-1]) else bisect.bisect_left(ids, mid)
+        ids.insert(at, mid)
+        super().insert(at, ui)
+        self._by_id[mid] = ui
+        ui.forms   # ingest: render/speech forms once, off the paint and speech paths
+        return True
+
+    def extend(self, items):
+        for ui in items:
+            self.append(ui)
+
+    def has(self, message_id: int) -> bool:
+        return message_id in self._by_id
+
+    def get(self, message_id: int) -> Optional[UiMessage]:
+        return self._by_id.get(message_id)
+
+    def rank(self, message_id: int) -> int:
+        """Number of held messages with a smaller id."""
+        return bisect.bisect_left(self._ids, message_id)
+
+    def older_than(self, message_id: int, limit: int) -> List[UiMessage]:
+        """Up to `limit` messages just before `message_id`, oldest first (O(limit))."""
+        at = self.rank(message_id)
+        return list(self[max(0, at - limit):at])
+
+    def newer_than(self, message_id: int) -> List[UiMessage]:
+        return list(self[bisect.bisect_right(self._ids, message_id):])
+
+    def remove(self, message_id: int) -> Optional[UiMessage]:
+        ui = self._by_id.pop(message_id, None)
+        if ui is not None:
+            at = bisect.bisect_left(self._ids, message_id)
+            del self._ids[at]
+            super().pop(at)
+        return ui
+
+    def rekey(self, old_id: int, new_id: int) -> Optional[UiMessage]:
+        """Give a message a new id (local echo -> server id), keeping id order."""
+        ui = self._by_id.pop(old_id, None)
+        if ui is None:
+            return None
+        at = bisect.bisect_left(self._ids, old_id)
+        del self._ids[at]
+        super().pop(at)
+        ui.id = new_id
+        self.append(ui)
+        return ui
+
+# Ids still held by a ThreadMessages are de-duplicated there; the global seen-set only has to
+# cover what lives outside the retained window (bridge echoes, pruned history)
+SEEN_IDS_CAP = 4 * KEEP_PER_THREAD
+
+class SeenIds:
+    """Bounded set of message ids; the oldest insertions are evicted first."""
+
+    def __init__(self, cap: int = SEEN_IDS_CAP):
+        self.cap = max(1, int(cap))
+        self._d: "OrderedDict[int, None]" = OrderedDict()
+
+    def __contains__(self, message_id) -> bool:
+        return message_id in self._d
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def add(self, message_id: int):
+        if message_id in self._d:
+            return
+        self._d[message_id] = None
+        if len(self._d) > self.cap:
+            self._d.popitem(last=False)
+
+    def update(self, ids):
+        for mid in ids:
+            self.add(mid)
 
 class DiscordBridge(QtCore.QObject):
     # signals for UI thread
@@ -242,22 +381,36 @@ class DiscordBridge(QtCore.QObject):
     reactions_updated = QtCore.Signal(str, object)     # thread_id, message_id (avoid 32-bit int overflow)
     reaction_tts = QtCore.Signal(str)               # speak this line
     history_extended = QtCore.Signal(str)  # NEW: emitted after older DM history is fetched
+    message_reconciled = QtCore.Signal(str, object, object)  # thread_id, local echo id, server id
+    message_changed = QtCore.Signal(str, object)             # thread_id, message_id (e.g. send failed)
+    message_removed = QtCore.Signal(str, object)             # thread_id, message_id (a superseded local echo)
 
-    def __init__(self, token: str, guild_id: int, chan_id: int, dm_bridge_chan_id: int):
+    def __init__(self, token: str, guild_id: int, chan_id: int, dm_bridge_chan_id: int, hub_port: int = GATEWAY_PORT,
+                 client_factory: Optional[Callable[..., Any]] = None, hub_secret: str = ""):
         super().__init__()
         self.token = token
         self.guild_id = guild_id
         self.chan_id = chan_id
         self.dm_bridge_chan_id = dm_bridge_chan_id
+        self.hub_port = hub_port            # 0: never attach to the gateway daemon
+        self.hub_secret = hub_secret        # config GATEWAY_SECRET; empty: derived from the token
+        # discord.Client unless replaying against fake_discord (bridge_replay.py)
+        self._client_factory = client_factory or discord.Client
         self.client = None
         self.loop = None
         self.thread = None
+        # Attachment to the gateway daemon; while _via_hub the client is REST-only and live
+        # events come from the hub instead of this process's own gateway session
+        self.hub: Optional[HubClient] = None
+        self._hub_lost: Optional[asyncio.Event] = None
+        self._hub_back: Optional[asyncio.Event] = None   # set when the daemon is attached again
+        self._via_hub = False
 
         # internal stores
         self.main_channel: Optional[discord.TextChannel] = None
         # threads: "main" for the server channel, "dm:<user_id>" for DMs
         self.dm_threads: Dict[str, discord.User] = {}
-        self.ui_messages: Dict[str, List[UiMessage]] = {"main": []}
+        self.ui_messages: Dict[str, ThreadMessages] = {"main": ThreadMessages()}
         # flag to stop retries and shutdown loop cleanly
         self._stopping = False
         # whether Message Content intent is available
@@ -267,13 +420,40 @@ class DiscordBridge(QtCore.QObject):
         self._dm_index: dict[str, str] = {}  # str(user_id) -> display name
         # cache for guild display names (nicknames)
         self.guild: Optional[discord.Guild] = None
-        self._name_cache: Dict[int, str] = {}
-        # reactions store: message_id -> list of dicts {emoji, name, url, count}
+        # uid -> display name, loaded from disk so the first render never waits on fetch_member
+        self._name_cache: NameCache = NameCache(NAME_CACHE_PATH, ttl=float(S("NAME_CACHE_TTL_SEC", NAME_TTL_SEC)))
+        # reactions store: message_id -> list of dicts {emoji, name, url, count, me}
         self.ui_reactions: Dict[int, List[Dict[str, Any]]] = {}
+        # Raw reaction events update ui_reactions in place; a burst on one message is one UI update
+        self._reaction_state = ReactionState(self.ui_reactions)
+        self._reaction_updates = ReactionCoalescer(self._flush_reactions)
         # NEW: track DM history loading states to avoid duplicate fetches
-        self._dm_history_loading: set[str] = set()
+        # Scroll backfill: threads with an older page in flight / whose first message is held
+        self._older_loading: set[str] = set()
+        self._history_start: set[str] = set()
         # NEW: global de-duplication for all messages we accept into ui_messages
-        self._seen_ids: set[int] = set()
+        self._seen_ids = SeenIds()
+        # Local store: the UI renders from it at startup, then only messages after each
+        # thread's high-water mark are fetched. A thread is "caught up" once that fetch ran;
+        # live messages only move its stored high-water mark after that (no gaps).
+        self.store: Optional[MessageStore] = None
+        self._high_water: Dict[str, int] = {}
+        self._caught_up: set[str] = set()
+        # Warm-load REST calls share one bounded, de-duplicating limiter; users known not to be
+        # guild members are not re-fetched for every message they wrote
+        self._limiter = WarmLimiter(int(S("WARM_CONCURRENCY", WARM_CONCURRENCY)))
+        self._not_member: Dict[int, float] = {}   # uid -> monotonic time of the fetch_member miss
+        # user id -> DM channel (one create_dm per peer per session)
+        self._dm_channels: Dict[int, Any] = {}
+        # Our own messages: shown at once as a local echo, sent in order per thread with retries;
+        # local echo id -> queued item until the send result or its gateway echo reconciles it
+        self._outbox = OutboundQueue(self._send_outbound, self._on_outbound_sent, self._on_outbound_failed)
+        self._outbound: Dict[int, Outbound] = {}
+        try:
+            self.store = MessageStore(MESSAGE_DB_PATH)
+        except Exception:
+            self.store = None
+        self._load_from_store()
 
     # ----- public calls from UI thread -----
     def start(self):
@@ -283,6 +463,11 @@ class DiscordBridge(QtCore.QObject):
     def stop(self):
         # Gracefully close discord client and loop, then join thread
         self._stopping = True
+        try:
+            if self.loop and self.hub:
+                self.loop.call_soon_threadsafe(self.hub.close)
+        except Exception:
+            pass
         try:
             if self.loop:
                 # Close client on its loop and wait, then stop the loop
@@ -307,163 +492,148 @@ class DiscordBridge(QtCore.QObject):
                 self.thread.join(timeout=5)
         except Exception:
             pass
+        try:
+            if self.store:
+                self.store.close()
+        except Exception:
+            pass
+        try:
+            self._name_cache.save()
+        except Exception:
+            pass
 
-    # Attach event handlers to current self.client
-    def _setup_handlers(self):
-        @self.client.event
-        async def on_ready():
-            self.status.emit(f"Logged in as {self.client.user}")
-            guild = self.client.get_guild(self.guild_id)
-            self.guild = guild
-            if not guild:
-                self.status.emit("Guild not found (continuing — DMs can still load)")
-
-            # Main channel warm load -> cap to a reasonable window
-            if guild:
-                ch = guild.get_channel(self.chan_id)
-                if isinstance(ch, discord.TextChannel):
-                    # NEW: warm-load main channel messages and capture reactions
-                    self.main_channel = ch
-                    try:
-                        limit = int(S("CHANNEL_INITIAL_LIMIT", 25))
-                    except Exception:
-                        limit = 25
-                    self.ui_messages["main"] = []
-                    try:
-                        msgs = [m async for m in ch.history(limit=limit, oldest_first=False)]
-                        msgs.reverse()
-                    except Exception:
-                        msgs = []
-                    for m in msgs:
-                        if m.id in self._seen_ids:
-                            continue
-                        try:
-                            author_name = await self._author_display_async(m, "main")
-                        except Exception:
-                            author_name = getattr(getattr(m, "author", None), "name", "user")
-                        ui = UiMessage(
-                            id=m.id,
-                            author=author_name,
-                            content=self._format_message_content(m),
-                            ts=m.created_at.timestamp(),
-                            from_me=bool(self.client.user and m.author.id == self.client.user.id),
-                            attachments=self._extract_attachments(m),
-                        )
-                        self.ui_messages["main"].append(ui)
-                        self._seen_ids.add(m.id)
-                        # NEW: persist reactions for this message
-                        try:
-                            self.ui_reactions[m.id] = self._build_ui_reactions(m)
-                        except Exception:
-                            self.ui_reactions[m.id] = []
-                    try:
-                        self.channel_ready.emit(ch)
-                    except Exception:
-                        pass
-                else:
-                    self.status.emit("Main channel not found or invalid")
+    def _thread(self, thread_id: str) -> ThreadMessages:
+        log = self.ui_messages.get(thread_id)
+        if log is None:
+            log = self.ui_messages[thread_id] = ThreadMessages()
+        return log
 
-            # DM bridge warm load -> index only (small window), no UI message creation
-            bridge = None
+    # ----- local message store -----
+    def _load_from_store(self):
+        if not self.store:
+            return
+        try:
+            threads = self.store.load_threads()
+        except Exception:
+            return
+        for tid, (hw, name) in threads.items():
+            self._high_water[tid] = hw
+            if tid != "main" and not tid.startswith("dm:"):
+                continue
             try:
-                if self.dm_bridge_chan_id:
-                    bridge = self.client.get_channel(self.dm_bridge_chan_id)
-                    if not isinstance(bridge, discord.TextChannel):
-                        try:
-                            bridge = await self.client.fetch_channel(self.dm_bridge_chan_id)
-                        except Exception:
-                            bridge = None
+                msgs = ThreadMessages(UiMessage(**row) for row in self.store.load_messages(tid))
+                self.ui_messages[tid] = msgs
+                self._seen_ids.update(m.id for m in msgs)
+                self.ui_reactions.update(self.store.load_reactions(m.id for m in msgs))
             except Exception:
-                bridge = None
-            if isinstance(bridge, discord.TextChannel):
-                try:
-                    async for m in bridge.history(limit=200, oldest_first=True):
-                        self._maybe_index_dm_from_bridge(m)
-                    # Mark as seen globally
-                    self._seen_ids.add(m.id)
-                except Exception:
-                    pass
+                continue
+            if tid.startswith("dm:"):
+                uid_str = tid.split(":", 1)[1]
+                if uid_str not in self.dm_threads:
+                    class _Stub: pass
+                    st = _Stub(); st.name = name or "user"; st.id = int(uid_str)
+                    self.dm_threads[uid_str] = st  # type: ignore
+
+    def _history_after(self, thread_id: str):
+        # discord.py `after=` bound for this thread's first fetch (None = no stored history)
+        hw = self._high_water.get(thread_id, 0)
+        return discord.Object(id=hw) if hw else None
+
+    def _persist(self, thread_id: str, uis: List[UiMessage], from_history: bool = False, complete: bool = True):
+        # from_history: `uis` continue the stored history without a gap; complete: and they reach
+        # the newest message, so live messages may move the high-water mark from now on
+        if from_history and complete:
+            self._caught_up.add(thread_id)
+        if not self.store or not uis:
+            return
+        try:
+            advance = from_history or thread_id in self._caught_up
+            self.store.put_messages(thread_id, [asdict(u) for u in uis], advance=advance)
+            self.store.put_reactions({u.id: self.ui_reactions.get(u.id, []) for u in uis})
+            if advance:
+                self._high_water[thread_id] = max(self._high_water.get(thread_id, 0), max(u.id for u in uis))
+        except Exception:
+            pass
 
-            # Existing open DM channels: index only, no history yet (fast warm-load)
-            try:
-                for dm in list(getattr(self.client, "private_channels", []) or []):
-                    try:
-                        if isinstance(dm, discord.DMChannel):
-                            u = getattr(dm, "recipient", None)
-                            if not u:
-                                continue
-                            self.dm_threads[str(u.id)] = u
-                            # NEW: resolve and cache server nickname for list label
-                            try:
-                                disp = await self._resolve_member_display(int(u.id))
-                                if disp:
-                                    self._name_cache[int(u.id)] = disp
-                            except Exception:
-                                pass
-                    except Exception:
-                        pass
-                self.dm_threads_changed.emit()
-            except Exception:
-                pass
+    def _set_high_water(self, thread_id: str, message_id: int):
+        self._high_water[thread_id] = max(self._high_water.get(thread_id, 0), int(message_id))
+        if self.store:
+            self.store.set_high_water(thread_id, int(message_id))
+
+    async def _since_mark(self, chan, thread_id: str, limit: int):
+        """Startup fetch for a thread: (contiguous, newest, complete), both oldest first.
+        Without stored history `contiguous` is the newest `limit` messages. Otherwise it is what
+        follows the high-water mark, paged oldest first: a newest-first page would skip whatever
+        lies between the mark and its oldest message, and load_older only pages below what is
+        held. Past KEEP_PER_THREAD messages the newest `limit` come back in `newest` for display
+        and _catch_up fills in between."""
+        after = self._history_after(thread_id)
+        if after is None:
+            msgs = await self._limiter.run(lambda: self._history_list(chan, limit=limit, oldest_first=False))
+            msgs.reverse()
+            return msgs, [], True
+        msgs = await self._limiter.run(lambda: self._history_list(
+            chan, limit=KEEP_PER_THREAD, after=after, oldest_first=True))
+        if len(msgs) < KEEP_PER_THREAD:
+            return msgs, [], True
+        newest = await self._limiter.run(lambda: self._history_list(chan, limit=limit, oldest_first=False))
+        newest.reverse()
+        return msgs, newest, False
+
+    def _take_history(self, thread_id: str, contiguous, newest, complete: bool, names: Dict[int, str]):
+        # Ingest a _since_mark result; only the contiguous part moves the high-water mark
+        self._persist(thread_id, self._ingest_history(thread_id, contiguous, names),
+                      from_history=True, complete=complete)
+        if contiguous:
+            self._set_high_water(thread_id, max(m.id for m in contiguous))
+        self._persist(thread_id, self._ingest_history(thread_id, newest, names))
+
+    async def _catch_up(self, chan, thread_id: str):
+        """Keep paging oldest first from the high-water mark until a short page reaches the
+        newest message; until then live messages do not move the mark."""
+        try:
+            while not self._stopping:
+                after = self._history_after(thread_id)
+                if after is None:
+                    break
+                page = await self._limiter.run(lambda: self._history_list(
+                    chan, limit=CATCHUP_PAGE, after=after, oldest_first=True))
+                names = await self._author_names(page, thread_id)
+                done = len(page) < CATCHUP_PAGE
+                self._persist(thread_id, self._ingest_history(thread_id, page, names),
+                              from_history=True, complete=done)
+                if page:
+                    self._set_high_water(thread_id, max(m.id for m in page))
+                if done:
+                    break
+        except Exception:
+            pass
+        try:
+            self.history_extended.emit(thread_id)
+        except Exception:
+            pass
 
-            # Persisted DM index (stubs only; resolve nickname now for first render)
-            try:
-                self._load_dm_index()
-                for uid_str, disp in list(self._dm_index.items()):
-                    try:
-                        uid = int(uid_str)
-                    except Exception:
-                        continue
-                    # Ensure a stub thread entry without network
-                    if str(uid) not in self.dm_threads:
-                        class _Stub: pass
-                        s = _Stub(); s.name = disp; s.id = uid
-                        self.dm_threads[str(uid)] = s  # type: ignore
-                    # NEW: resolve and cache nickname so list shows it immediately
-                    try:
-                        name = await self._resolve_member_display(uid)
-                        if name:
-                            self._name_cache[uid] = name
-                    except Exception:
-                        pass
-                self.dm_threads_changed.emit()
-            except Exception:
-                pass
+    def _persist_reactions(self, message_id: int):
+        if not self.store:
+            return
+        try:
+            self.store.put_reactions({int(message_id): self.ui_reactions.get(message_id, [])})
+        except Exception:
+            pass
 
-            # Also discover DMs from cached messages (index only)
-            try:
-                cached = list(getattr(self.client, "cached_messages", []) or [])
-                for m in cached:
-                    try:
-                        if isinstance(getattr(m, "channel", None), discord.DMChannel):
-                            other = getattr(m.channel, "recipient", None)
-                            if not other:
-                                me = getattr(getattr(self, "client", None), "user", None)
-                                if me and getattr(m, "author", None) and m.author.id != me.id:
-                                    other = m.author
-                            if not other:
-                                continue
-                            uid = int(getattr(other, "id", 0) or 0)
-                            if not uid:
-                                continue
-                            self.dm_threads[str(uid)] = other
-                            # NEW: resolve and cache nickname for first list render
-                            try:
-                                disp = await self._resolve_member_display(uid)
-                                if disp:
-                                    self._name_cache[uid] = disp
-                            except Exception:
-                                pass
-                    except Exception:
-                        pass
-                self.dm_threads_changed.emit()
-            except Exception:
-                pass
+    def _persist_thread_name(self, thread_id: str, name: str):
+        if not self.store:
+            return
+        try:
+            self.store.set_thread_name(thread_id, name)
+        except Exception:
+            pass
 
-            try:
-                self.warm_complete.emit()
-            except Exception:
-                pass
+    # Attach event handlers to current self.client
+    def _setup_handlers(self):
+        @self.client.event
+        async def on_ready():
+            await self._warm_load()
 
         @self.client.event
         async def on_message(message: discord.Message):
@@ -493,12 +663,14 @@ class DiscordBridge(QtCore.QObject):
                     if not uid:
                         return
                     tid = f"dm:{uid}"
+                    self._dm_channels[uid] = message.channel
 
                     # Ensure the DM thread is indexed and persisted
                     self.dm_threads[str(uid)] = other
                     try:
                         base = getattr(other, "global_name", None) or getattr(other, "name", None) or "user"
                         self._remember_dm_user(uid, base)
+                        self._persist_thread_name(tid, self._name_cache.get(uid, base))
                     except Exception:
                         pass
                     try:
@@ -513,77 +685,174 @@ class DiscordBridge(QtCore.QObject):
                     pass
                 return
 
+        # Raw events only (they fire for uncached messages too); the cached on_reaction_* variants
+        # would report the same change a second time
         @self.client.event
-        async def on_reaction_add(reaction, user):
-            await self._handle_reaction_change(reaction.message, added=True, reactor=user)
-
-        @self.client.event
-        async def on_reaction_remove(reaction, user):
-            await self._handle_reaction_change(reaction.message, added=False, reactor=user)
+        async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+            await self._handle_raw_reaction(payload, added=True)
 
         @self.client.event
-        async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+        async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+            await self._handle_raw_reaction(payload, added=False)
+
+    async def _warm_load(self):
+        # on_ready of our own gateway session, or run directly after a REST-only login
+        self.status.emit(f"Logged in as {self.client.user}")
+        guild = self.client.get_guild(self.guild_id)
+        if guild is None and self._via_hub:
+            # REST-only login has no guild cache
             try:
-                ch = self.client.get_channel(payload.channel_id) or await self.client.fetch_channel(payload.channel_id)
-                m = await ch.fetch_message(payload.message_id)
-                u = self.client.get_user(payload.user_id) or await self.client.fetch_user(payload.user_id)
-                await self._handle_reaction_change(m, added=True, reactor=u)
+                guild = await self.client.fetch_guild(self.guild_id)
             except Exception:
-                pass
+                guild = None
+        self.guild = guild
+        if not guild:
+            self.status.emit("Guild not found (continuing — DMs can still load)")
+
+        # Main channel warm load -> cap to a reasonable window
+        if guild:
+            ch = guild.get_channel(self.chan_id)
+            if ch is None and self._via_hub:
+                try:
+                    ch = await self.client.fetch_channel(self.chan_id)
+                except Exception:
+                    ch = None
+            if isinstance(ch, discord.TextChannel):
+                # NEW: warm-load main channel messages and capture reactions
+                self.main_channel = ch
+                try:
+                    limit = int(S("CHANNEL_INITIAL_LIMIT", 25))
+                except Exception:
+                    limit = 25
+                # Only messages newer than what the local store already has
+                self._thread("main")
+                try:
+                    msgs, newest, complete = await self._since_mark(ch, "main", limit)
+                except Exception:
+                    msgs, newest, complete = [], [], False
+                names = await self._author_names(msgs + newest, "main")
+                self._take_history("main", msgs, newest, complete, names)
+                if not complete and msgs:
+                    self.loop.create_task(self._catch_up(ch, "main"))
+                self._persist_thread_name("main", f"#{ch.name}")
+                try:
+                    self.channel_ready.emit(ch)
+                except Exception:
+                    pass
+            else:
+                self.status.emit("Main channel not found or invalid")
 
-        @self.client.event
-        async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+        # DM bridge warm load -> index only (small window), no UI message creation.
+        # The daemon no longer mirrors DMs there (it keeps dm_index.json instead), so this only
+        # picks up old mirrors and is skipped when attached to the daemon.
+        bridge = None
+        try:
+            if self.dm_bridge_chan_id and not self._via_hub:
+                bridge = self.client.get_channel(self.dm_bridge_chan_id)
+                if not isinstance(bridge, discord.TextChannel):
+                    try:
+                        bridge = await self.client.fetch_channel(self.dm_bridge_chan_id)
+                    except Exception:
+                        bridge = None
+        except Exception:
+            bridge = None
+        if isinstance(bridge, discord.TextChannel):
             try:
-                ch = self.client.get_channel(payload.channel_id) or await self.client.fetch_channel(payload.channel_id)
-                m = await ch.fetch_message(payload.message_id)
-                u = self.client.get_user(payload.user_id) or await self.client.fetch_user(payload.user_id)
-                await self._handle_reaction_change(m, added=False, reactor=u)
+                newest = 0
+                async for m in bridge.history(limit=200, after=self._history_after("bridge"), oldest_first=True):
+                    self._maybe_index_dm_from_bridge(m)
+                    newest = max(newest, int(m.id))
+                if newest and self.store:
+                    self._high_water["bridge"] = newest
+                    self.store.set_high_water("bridge", newest)
             except Exception:
                 pass
 
-    async def _fetch_recent_dm(self, uid: int, recent: int = 75):
-        """Fetch only the most recent N messages for a DM (fast path, no TTS/unread spam)."""
+        # Index DM threads without network (open DM channels, persisted index, cached messages),
+        # render the list, then resolve nicknames concurrently while DM history loads
+        pending: List[int] = []
         try:
-            user = await self.client.fetch_user(uid)
-            await user.create_dm()
-            chan = user.dm_channel
-            if not chan:
-                return
-            tid = f"dm:{uid}"
-            self.ui_messages.setdefault(tid, [])
-            have = {m.id for m in self.ui_messages[tid]}
-            # newest first, then reverse for chronological append
-            msgs = [m async for m in chan.history(limit=recent, oldest_first=False)]
-            msgs.reverse()
-            for msg in msgs:
-                # Skip duplicates across all sources
-                if msg.id in self._seen_ids:
-                    continue
-                if msg.id in have:
-                    continue
+            for dm in list(getattr(self.client, "private_channels", []) or []):
                 try:
-                    author_name = await self._author_display_async(msg, tid)
+                    if isinstance(dm, discord.DMChannel):
+                        u = getattr(dm, "recipient", None)
+                        if not u:
+                            continue
+                        self.dm_threads[str(u.id)] = u
+                        pending.append(int(u.id))
                 except Exception:
-                    author_name = getattr(getattr(msg, "author", None), "name", "user")
-                atts = self._extract_attachments(msg)
-                ui = UiMessage(
-                    id=msg.id,
-                    author=author_name,
-                    content=self._format_message_content(msg),
-                    ts=msg.created_at.timestamp(),
-                    from_me=bool(self.client.user and msg.author.id == self.client.user.id),
-                    attachments=atts,
-                )
-                self.ui_messages[tid].append(ui)
-                # Mark as seen globally
-                self._seen_ids.add(msg.id)
-                # NEW: capture reactions so they render after restart
+                    pass
+        except Exception:
+            pass
+
+        # Persisted DM index (stubs only)
+        try:
+            self._load_dm_index()
+            for uid_str, disp in list(self._dm_index.items()):
+                try:
+                    uid = int(uid_str)
+                except Exception:
+                    continue
+                # Ensure a stub thread entry without network
+                if str(uid) not in self.dm_threads:
+                    class _Stub: pass
+                    s = _Stub(); s.name = disp; s.id = uid
+                    self.dm_threads[str(uid)] = s  # type: ignore
+                pending.append(uid)
+        except Exception:
+            pass
+
+        # Also discover DMs from cached messages (index only)
+        try:
+            cached = list(getattr(self.client, "cached_messages", []) or [])
+            for m in cached:
                 try:
-                    self.ui_reactions[msg.id] = self._build_ui_reactions(msg)
+                    if isinstance(getattr(m, "channel", None), discord.DMChannel):
+                        other = getattr(m.channel, "recipient", None)
+                        if not other:
+                            me = getattr(getattr(self, "client", None), "user", None)
+                            if me and getattr(m, "author", None) and m.author.id != me.id:
+                                other = m.author
+                        if not other:
+                            continue
+                        uid = int(getattr(other, "id", 0) or 0)
+                        if not uid:
+                            continue
+                        self.dm_threads[str(uid)] = other
+                        pending.append(uid)
                 except Exception:
-                    self.ui_reactions[msg.id] = []
-            # keep chronological just in case
-            self.ui_messages[tid].sort(key=lambda m: m.ts)
+                    pass
+        except Exception:
+            pass
+
+        try:
+            self.dm_threads_changed.emit()
+            self.loop.create_task(self._warm_names(pending))
+        except Exception:
+            pass
+
+        try:
+            self.warm_complete.emit()
+        except Exception:
+            pass
+
+    async def _fetch_recent_dm(self, uid: int, recent: int = 75):
+        """Fetch a DM's messages since the stored high-water mark, or its most recent N on first
+        sight (fast path, no TTS/unread spam)."""
+        try:
+            chan = await self._dm_channel(uid)
+            if not chan:
+                return
+            tid = f"dm:{uid}"
+            log = self._thread(tid)
+            msgs, newest, complete = await self._since_mark(chan, tid, recent)
+            names = await self._author_names(
+                [m for m in msgs + newest if m.id not in self._seen_ids and not log.has(m.id)], tid)
+            self._take_history(tid, msgs, newest, complete, names)
+            if not complete and msgs:
+                self.loop.create_task(self._catch_up(chan, tid))
+            if self.store:
+                self.store.prune(tid)
             # NEW: notify UI so it can recompute unread and refresh the list
             try:
                 self.history_extended.emit(tid)
@@ -592,6 +861,86 @@ class DiscordBridge(QtCore.QObject):
         except Exception:
             pass
 
+    async def _dm_channel(self, uid: int):
+        # Cached per peer; concurrent callers share one lookup, which holds a single limiter slot
+        chan = self._dm_channels.get(uid)
+        if chan is None:
+            async def _open():
+                user = self.client.get_user(uid) or await self.client.fetch_user(uid)
+                return user.dm_channel or await user.create_dm()
+            chan = await self._limiter.once(("dm", uid), _open)
+            if chan:
+                self._dm_channels[uid] = chan
+        return chan
+
+    async def _history_list(self, chan, **kw) -> List[discord.Message]:
+        return [m async for m in chan.history(**kw)]
+
+    def _ingest_history(self, thread_id: str, msgs, names: Dict[int, str]) -> List[UiMessage]:
+        # Append fetched messages not held yet (a live on_message may have delivered one while
+        # names were resolving); returns the new UiMessages
+        log = self._thread(thread_id)
+        fresh = []
+        for msg in msgs:
+            if msg.id in self._seen_ids or log.has(msg.id):
+                continue
+            ui = self._history_ui(msg, names)
+            log.append(ui)
+            fresh.append(ui)
+            self._seen_ids.add(msg.id)
+        return fresh
+
+    def _history_ui(self, msg: discord.Message, names: Dict[int, str]) -> UiMessage:
+        # UiMessage for a fetched history message (names from _author_names); keeps its reactions
+        # so they render after restart
+        try:
+            self.ui_reactions[msg.id] = self._build_ui_reactions(msg)
+        except Exception:
+            self.ui_reactions[msg.id] = []
+        return UiMessage(
+            id=msg.id,
+            author=names.get(getattr(msg.author, "id", 0)) or getattr(getattr(msg, "author", None), "name", "user"),
+            content=self._format_message_content(msg),
+            ts=msg.created_at.timestamp(),
+            from_me=bool(self.client.user and msg.author.id == self.client.user.id),
+            attachments=self._extract_attachments(msg),
+        )
+
+    async def _author_names(self, msgs: List[discord.Message], thread_id: str) -> Dict[int, str]:
+        """Resolve each distinct author of a history page once, concurrently."""
+        firsts: Dict[int, discord.Message] = {}
+        for m in msgs:
+            a = getattr(m, "author", None)
+            if a is not None:
+                firsts.setdefault(int(a.id), m)
+        names = await asyncio.gather(*(self._author_display_async(m, thread_id) for m in firsts.values()),
+                                     return_exceptions=True)
+        return {aid: n for aid, n in zip(firsts.keys(), names) if isinstance(n, str)}
+
+    async def _warm_names(self, uids: List[int]):
+        """Resolve missing or stale DM list labels concurrently (bounded + de-duplicated by the
+        limiter); cached names already rendered, the list is refreshed as fresh ones land."""
+        todo = self._name_cache.needs_fetch(uids)
+        if not todo:
+            return
+        last_emit = [time.monotonic()]
+
+        async def _one(uid: int):
+            try:
+                disp = await self._resolve_member_display(uid, refresh=True)
+            except Exception:
+                disp = None
+            if disp:
+                self._persist_thread_name(f"dm:{uid}", disp)
+                now = time.monotonic()
+                if now - last_emit[0] >= 0.25:
+                    last_emit[0] = now
+                    self.dm_threads_changed.emit()
+
+        await asyncio.gather(*(_one(u) for u in todo))
+        self._name_cache.save()
+        self.dm_threads_changed.emit()
+
     def fetch_recent_dm(self, thread_id: str, recent: int = 10):
         if not thread_id.startswith("dm:") or not self.loop:
             return
@@ -623,9 +972,7 @@ class DiscordBridge(QtCore.QObject):
                         uid = 0
                     if uid:
                         try:
-                            user = await self.client.fetch_user(uid)
-                            await user.create_dm()
-                            chan = user.dm_channel
+                            chan = await self._dm_channel(uid)
                             if chan:
                                 msg = await chan.fetch_message(int(message_id))
                         except Exception:
@@ -633,16 +980,8 @@ class DiscordBridge(QtCore.QObject):
                 if not msg:
                     return
                 me = self.client.user
-                already = False
-                for r in getattr(msg, "reactions", []) or []:
-                    if r.emoji == emoji and me:
-                        try:
-                            async for u in r.users():
-                                if u.id == me.id:
-                                    already = True
-                                    break
-                        except Exception:
-                            pass
+                already = any(r.emoji == emoji and r.me for r in getattr(msg, "reactions", []) or [])
+                # The new counts arrive as a reaction event (own gateway session or the daemon)
                 if already:
                     try:
                         await msg.remove_reaction(emoji, me)
@@ -653,13 +992,6 @@ class DiscordBridge(QtCore.QObject):
                         await msg.add_reaction(emoji)
                     except Exception:
                         pass
-                try:
-                    msg = await msg.channel.fetch_message(msg.id)
-                except Exception:
-                    pass
-                self.ui_reactions[msg.id] = self._build_ui_reactions(msg)
-                tid = self._thread_id_for_message(msg) or thread_id
-                self.reactions_updated.emit(tid, msg.id)
             except Exception:
                 pass
         try:
@@ -667,78 +999,57 @@ class DiscordBridge(QtCore.QObject):
         except Exception:
             pass
 
-    def ensure_dm_history(self, thread_id: str, desired: int = 500):
-        if not thread_id.startswith("dm:") or not self.loop:
-            return
-        if thread_id in self._dm_history_loading:
+    def read_cap(self, thread_id: str) -> Optional[int]:
+        """Newest id a read watermark may cover: above the high-water mark a catch-up may still
+        be filling in offline messages. None once the thread is caught up."""
+        return None if thread_id in self._caught_up else self._high_water.get(thread_id, 0)
+
+    def has_older(self, thread_id: str) -> bool:
+        """False once a page came back short (the thread's first message is held)."""
+        return thread_id not in self._history_start
+
+    def load_older(self, thread_id: str, batch: int):
+        """Fetch one page (`batch` messages) before the oldest message held for the thread and
+        emit history_extended when it lands. The `before=` cursor keeps every page O(batch)."""
+        if not self.loop or not (thread_id == "main" or thread_id.startswith("dm:")):
             return
-        existing = self.ui_messages.get(thread_id, [])
-        if len(existing) >= desired:
-            return
-        try:
-            uid = int(thread_id.split(":", 1)[1])
-        except Exception:
+        if thread_id in self._older_loading or thread_id in self._history_start:
             return
-
-        self._dm_history_loading.add(thread_id)
+        self._older_loading.add(thread_id)
 
         async def _load():
             try:
-                user = await self.client.fetch_user(uid)
-                await user.create_dm()
-                chan = user.dm_channel
+                if thread_id == "main":
+                    chan = self.main_channel
+                else:
+                    chan = await self._dm_channel(int(thread_id.split(":", 1)[1]))
                 if not chan:
                     return
-
-                have_ids = {m.id for m in self.ui_messages.get(thread_id, [])}
-                need = max(0, desired - len(have_ids))
-                if need <= 0:
-                    return
-
-                # Fetch newest first, then reverse so we append in chronological order
-                msgs = [m async for m in chan.history(limit=need, oldest_first=False)]
+                log = self._thread(thread_id)
+                cursor = discord.Object(id=log[0].id) if log else None
+                msgs = await self._limiter.run(lambda: self._history_list(
+                    chan, limit=batch, before=cursor, oldest_first=False))
+                if len(msgs) < batch:
+                    self._history_start.add(thread_id)
                 msgs.reverse()
-
-                for msg in msgs:
-                    # Skip if already present or globally seen
-                    if msg.id in have_ids or msg.id in self._seen_ids:
-                        continue
-                    try:
-                        author_name = await self._author_display_async(msg, thread_id)
-                    except Exception:
-                        author_name = getattr(getattr(msg, "author", None), "name", "user")
-                    ui = UiMessage(
-                        id=msg.id,
-                        author=author_name,
-                        content=self._format_message_content(msg),
-                        ts=msg.created_at.timestamp(),
-                        from_me=bool(self.client.user and msg.author.id == self.client.user.id),
-                        attachments=self._extract_attachments(msg),
-                    )
-                    self.ui_messages.setdefault(thread_id, []).append(ui)
-                    # Update local/global seen to prevent duplicates within same batch
-                    have_ids.add(msg.id)
-                    self._seen_ids.add(msg.id)
-                    # NEW: persist reactions for older history too
-                    try:
-                        self.ui_reactions[msg.id] = self._build_ui_reactions(msg)
-                    except Exception:
-                        self.ui_reactions[msg.id] = []
-
-                self.ui_messages[thread_id].sort(key=lambda m: m.ts)
+                msgs = [m for m in msgs if m.id not in self._seen_ids and not log.has(m.id)]
+                names = await self._author_names(msgs, thread_id)
+                fresh = self._ingest_history(thread_id, msgs, names)
+                # Only a cursor-less page reaches the live edge (and so catches the thread up)
+                self._persist(thread_id, fresh, from_history=cursor is None)
             except Exception:
                 pass
             finally:
+                self._older_loading.discard(thread_id)
                 try:
                     self.history_extended.emit(thread_id)
                 except Exception:
                     pass
-                self._dm_history_loading.discard(thread_id)
 
         try:
             self.loop.call_soon_threadsafe(lambda: asyncio.create_task(_load()))
         except Exception:
-            self._dm_history_loading.discard(thread_id)
+            self._older_loading.discard(thread_id)
 
     # ----- internals -----
     def _runner(self):
@@ -771,9 +1082,8 @@ class DiscordBridge(QtCore.QObject):
             try:
                 # assume available when trying with message_content=True
                 self.message_content_available = current_intents_box[0].message_content
-                self.client = discord.Client(intents=current_intents_box[0])
-                self._setup_handlers()
-                task = self.loop.create_task(self.client.start(self.token))
+                self._new_client(current_intents_box[0])
+                task = self.loop.create_task(self._connect())
 
                 def on_task_done(fut: asyncio.Future):
                     if self._stopping:
@@ -884,7 +1194,8 @@ class DiscordBridge(QtCore.QObject):
                 s = _Stub(); s.name = name; s.id = uid
                 self.dm_threads[str(uid)] = s  # type: ignore
                 self.dm_threads_changed.emit()
-            self.ui_messages.setdefault(tid, [])
+            self._persist_thread_name(tid, name)
+            self._thread(tid)
             # NOTE: Intentionally skip creating UiMessage for bridge echoes
             return
         except Exception:
@@ -1003,15 +1314,12 @@ class DiscordBridge(QtCore.QObject):
             a = getattr(m, "author", None)
             if not a:
                 return "user"
+            if a.id in self._name_cache:
+                return self._name_cache[a.id]
             # Main guild context
             g = self.guild or (self.main_channel.guild if self.main_channel else None)
             if g:
-                mem = g.get_member(a.id)
-                if not mem:
-                    try:
-                        mem = await g.fetch_member(a.id)
-                    except Exception:
-                        mem = None
+                mem = await self._guild_member(g, a.id)
                 if mem and getattr(mem, "display_name", None):
                     self._name_cache[a.id] = mem.display_name
                     return mem.display_name
@@ -1031,22 +1339,37 @@ class DiscordBridge(QtCore.QObject):
             except Exception:
                 return "user"
 
-    async def _resolve_member_display(self, uid: int) -> Optional[str]:
+    async def _guild_member(self, g: discord.Guild, uid: int, refresh: bool = False) -> Optional[discord.Member]:
+        # Cached member, else one shared fetch_member per uid (misses are remembered)
+        mem = g.get_member(uid)
+        if mem:
+            return mem
+        missed = self._not_member.get(uid)
+        if missed is not None and not refresh and \
+                time.monotonic() - missed < float(S("NOT_MEMBER_TTL_SEC", NOT_MEMBER_TTL_SEC)):
+            return None
+        try:
+            mem = await self._limiter.once(("member", uid), lambda: g.fetch_member(uid))
+        except Exception:
+            mem = None
+        if mem:
+            self._not_member.pop(uid, None)
+        else:
+            self._not_member[uid] = time.monotonic()
+        return mem
+
+    async def _resolve_member_display(self, uid: int, refresh: bool = False) -> Optional[str]:
         """
         Resolve a user's display name, preferring the guild nickname (Member.display_name),
-        then global_name, then name. Caches results in _name_cache.
+        then global_name, then name. Caches results in _name_cache; refresh=True re-fetches
+        a cached (stale) entry.
         """
         try:
-            if uid in self._name_cache:
+            if uid in self._name_cache and not refresh:
                 return self._name_cache[uid]
             g = self.guild or (self.main_channel.guild if self.main_channel else None)
             if g:
-                mem = g.get_member(uid)
-                if not mem:
-                    try:
-                        mem = await g.fetch_member(uid)
-                    except Exception:
-                        mem = None
+                mem = await self._guild_member(g, uid, refresh)
                 if mem and getattr(mem, "display_name", None):
                     self._name_cache[uid] = mem.display_name
                     return mem.display_name
@@ -1054,7 +1377,7 @@ class DiscordBridge(QtCore.QObject):
             u = self.client.get_user(uid)
             if not u:
                 try:
-                    u = await self.client.fetch_user(uid)
+                    u = await self._limiter.once(("user", uid), lambda: self.client.fetch_user(uid))
                 except Exception:
                     u = None
             if u:
@@ -1066,234 +1389,279 @@ class DiscordBridge(QtCore.QObject):
             pass
         return None
 
+    def get_message(self, thread_id: str, message_id: int) -> Optional[UiMessage]:
+        # Sync helper for the UI (id index lookup)
+        log = self.ui_messages.get(thread_id)
+        return log.get(message_id) if log is not None else None
+
     def display_for_user_id(self, uid: int, fallback: str = "user") -> str:
         # Sync helper for UI lists/headers
         return self._name_cache.get(uid, fallback)
 
     def _push_ui_message(self, thread_id: str, m: discord.Message):
-        # Global de-dup: skip if we've ever seen this message ID
-        try:
-            if m.id in self._seen_ids:
-                return
-        except Exception:
-            pass
-        # De-dup within thread list
-        try:
-            lst = self.ui_messages.setdefault(thread_id, [])
-            if any(mm.id == m.id for mm in lst):
-                return  # NEW: prevent duplicates
-        except Exception:
-            pass
-        from_me = False
-        try:
-            u = self.client.user if self.client else None
-            from_me = bool(u and getattr(m, "author", None) and m.author.id == u.id)
-        except Exception:
-            pass
-        atts = self._extract_attachments(m)
-        ui = UiMessage(
-            id=m.id,
-            author=self._author_display(m, thread_id),
-            content=self._format_message_content(m),
-            ts=m.created_at.timestamp(),
-            from_me=from_me,
-            attachments=atts,
-        )
-        self.ui_messages.setdefault(thread_id, []).append(ui)
-        # Mark as seen globally
-        try:
-            self._seen_ids.add(m.id)
-        except Exception:
-            pass
-        try:
-            self.ui_reactions[m.id] = self._build_ui_reactions(m)
-        except Exception:
-            self.ui_reactions[m.id] = []
-        self.message_added.emit(thread_id, ui)
+        self._push_ui_message_with_author(thread_id, m, self._author_display(m, thread_id))
 
     def _push_ui_message_with_author(self, thread_id: str, m: discord.Message, author_name: str):
-        # Global de-dup: skip if we've ever seen this message ID
-        try:
-            if m.id in self._seen_ids:
-                return
-        except Exception:
-            pass
-        # De-dup within thread list
-        try:
-            lst = self.ui_messages.setdefault(thread_id, [])
-            if any(mm.id == m.id for mm in lst):
-                return  # NEW: prevent duplicates
-        except Exception:
-            pass
+        # Global de-dup: skip if we've ever seen this message ID (or it is already in the thread)
+        if m.id in self._seen_ids or self._thread(thread_id).has(m.id):
+            return
         from_me = False
         try:
             u = self.client.user if self.client else None
             from_me = bool(u and getattr(m, "author", None) and m.author.id == u.id)
         except Exception:
             pass
-        atts = self._extract_attachments(m)
         ui = UiMessage(
             id=m.id,
             author=author_name,
             content=self._format_message_content(m),
             ts=m.created_at.timestamp(),
             from_me=from_me,
-            attachments=atts,
+            attachments=self._extract_attachments(m),
         )
-        self.ui_messages.setdefault(thread_id, []).append(ui)
-        # Mark as seen globally
-        try:
-            self._seen_ids.add(m.id)
-        except Exception:
-            pass
-        try:
-            self.ui_reactions[m.id] = self._build_ui_reactions(m)
-        except Exception:
-            self.ui_reactions[m.id] = []
+        self._accept_ui(thread_id, ui, self._build_ui_reactions(m))
+
+    def _accept_ui(self, thread_id: str, ui: UiMessage, reactions: List[Dict[str, Any]]):
+        if ui.id in self._seen_ids or self._thread(thread_id).has(ui.id):
+            return
+        if ui.from_me and self._outbound:
+            local_id = self._match_outbound(thread_id, ui.content)
+            if local_id is not None:
+                self._reconcile_outbound(thread_id, local_id, ui, reactions)
+                return
+        self._thread(thread_id).append(ui)
+        self._seen_ids.add(ui.id)
+        self.ui_reactions[ui.id] = reactions
+        self._persist(thread_id, [ui])
         self.message_added.emit(thread_id, ui)
 
-    def send_text(self, thread_id: str, text: str):
-        if not text or not self.loop:
+    # ----- gateway daemon (hub) -----
+    def _new_client(self, intents):
+        # A fresh client: lookups still in flight and DM channels belong to the old one
+        self._limiter.reset()
+        self._dm_channels.clear()
+        self.client = self._client_factory(intents=intents)
+        self._setup_handlers()
+
+    async def _connect(self):
+        # One gateway session per machine: with the daemon attached, log in for REST only and take
+        # live events from its hub; while it is away open our own gateway session, and hand live
+        # events back to the daemon (closing that session) as soon as it is attached again
+        if self.hub is None and self.hub_port:
+            self.hub = HubClient(self._on_hub_event, port=self.hub_port, key=hub_key(self.token, self.hub_secret))
+            self._hub_lost, self._hub_back = asyncio.Event(), asyncio.Event()
+            if not await self.hub.connect():
+                self._hub_lost.set()
+            # Keeps (re-)attaching for the app's lifetime, so the daemon always knows the UI is open
+            self.loop.create_task(self.hub.run(self._on_hub_closed, self._on_hub_reattached))
+        if self.hub is None:
+            await self.client.start(self.token)
             return
-        async def _send():
+        await self.client.login(self.token)
+        while not self._stopping:
+            if not self._hub_lost.is_set():
+                # Warm-load is incremental (since the stored marks); after a switch back it also
+                # re-resolves the channels against the new client
+                self._via_hub = True
+                self.status.emit("Attached to the gateway daemon")
+                await self._warm_load()
+                await self._hub_lost.wait()
+                self._via_hub = False
+                if self._stopping:
+                    return
+                self.status.emit("Gateway daemon went away — connecting directly")
+            # Own gateway session (on_ready warm-loads) until it ends or the daemon is back
+            session = self.loop.create_task(self.client.connect())
+            back = self.loop.create_task(self._hub_back.wait())
+            done, _ = await asyncio.wait({session, back}, return_when=asyncio.FIRST_COMPLETED)
+            if session in done:
+                back.cancel()
+                session.result()
+                return
+            # The hub delivers from here on (duplicates from the overlap are dropped by id); a new
+            # REST-only client replaces the one whose gateway session is closed below
+            self._via_hub = True
+            old = self.client
+            self._new_client(getattr(old, "intents", None))
             try:
-                if thread_id == "main" and self.main_channel:
-                    msg = await self.main_channel.send(text)
-                    # Push our own message to UI
-                    try:
-                        name = await self._author_display_async(msg, "main")
-                    except Exception:
-                        name = getattr(getattr(self.client, "user", None), "name", "me")
-                    self._push_ui_message_with_author("main", msg, name)
-                elif thread_id.startswith("dm:"):
-                    uid = None
-                    try:
-                        uid = int(thread_id.split(":", 1)[1])
-                    except Exception:
-                        uid = None
-                    if uid is None:
-                        return
-                    # Ensure user and channel
-                    user = self.client.get_user(uid)
-                    if not user:
-                        try:
-                            user = await self.client.fetch_user(uid)
-                        except Exception:
-                            user = None
-                    if not user:
-                        return
-                    await user.create_dm()
-                    # Send and get the created message
-                    msg = await user.dm_channel.send(text)
-                    # Index the DM thread and notify list
-                    try:
-                        self.dm_threads[str(uid)] = user
-                        base = getattr(user, "global_name", None) or getattr(user, "name", None) or "user"
-                        self._remember_dm_user(uid, base)
-                        # NEW: resolve and cache nickname for immediate list update
-                        try:
-                            disp = await self._resolve_member_display(uid)
-                            if disp:
-                                self._name_cache[uid] = disp
-                        except Exception:
-                            pass
-                        self.dm_threads_changed.emit()
-                    except Exception:
-                        pass
-                    # Push our own message to UI
-                    tid = f"dm:{uid}"
-                    try:
-                        name = await self._author_display_async(msg, tid)
-                    except Exception:
-                        name = getattr(getattr(self.client, "user", None), "name", "me")
-                    self._push_ui_message_with_author(tid, msg, name)
+                await old.close()
             except Exception:
                 pass
+            await asyncio.gather(session, return_exceptions=True)
+            await self.client.login(self.token)
+
+    async def _on_hub_closed(self):
+        self._hub_back.clear()
+        self._hub_lost.set()
+
+    async def _on_hub_reattached(self):
+        self._hub_lost.clear()
+        self._hub_back.set()
+
+    def _on_hub_event(self, ev: Dict[str, Any]):
+        # Runs on the bridge loop
+        if not self._via_hub:
+            return   # our own gateway session delivers these
+        op = ev.get("op")
         try:
-            self.loop.call_soon_threadsafe(lambda: asyncio.create_task(_send()))
+            if op == "message":
+                tid = str(ev.get("thread") or "")
+                peer = ev.get("peer")
+                if peer:
+                    uid = int(peer.get("id") or 0)
+                    name = str(peer.get("name") or "user")
+                    if str(uid) not in self.dm_threads:
+                        class _Stub: pass
+                        st = _Stub(); st.name = name; st.id = uid
+                        self.dm_threads[str(uid)] = st  # type: ignore
+                    self._persist_thread_name(tid, self._name_cache.get(uid, name))
+                    self.dm_threads_changed.emit()
+                # The daemon stored the row already; _persist here only moves our high-water mark
+                self._accept_ui(tid, UiMessage(**ev["row"]), list(ev.get("reactions") or []))
+            elif op == "reactions":
+                tid = str(ev.get("thread") or "")
+                mid = int(ev.get("id") or 0)
+                self.ui_reactions[mid] = list(ev.get("reactions") or [])
+                self.reactions_updated.emit(tid, mid)
+                # TTS only on add, and only if we have this message in UI
+                if ev.get("spoken") and self._thread(tid).has(mid):
+                    self.reaction_tts.emit(str(ev["spoken"]))
         except Exception:
             pass
 
+    def send_text(self, thread_id: str, text: str):
+        self._send_out(thread_id, text)
+
     def send_reply(self, thread_id: str, message_id: int, text: str):
-        if not text or not self.loop:
+        if not text:
             return
-        async def _send():
+        # Resolve the display name we are replying to (id index lookup)
+        reply_to = None
+        ui = self.get_message(thread_id, int(message_id))
+        if ui and ui.author:
+            reply_to = ui.author
+        if not reply_to and thread_id.startswith("dm:"):
             try:
-                # Resolve the display name we are replying to
+                # Replying in a DM: the peer's name
+                reply_to = self.display_for_user_id(int(thread_id.split(":", 1)[1]), "user")
+            except Exception:
                 reply_to = None
-                try:
-                    ui = next((m for m in self.ui_messages.get(thread_id, []) if m.id == int(message_id)), None)
-                    if ui and ui.author:
-                        reply_to = ui.author
-                except Exception:
-                    reply_to = None
-                if not reply_to and thread_id.startswith("dm:"):
-                    try:
-                        uid = int(thread_id.split(":", 1)[1])
-                        # Replying in a DM: the peer's name
-                        reply_to = self.display_for_user_id(uid, "user")
-                    except Exception:
-                        reply_to = None
-                if not reply_to:
-                    reply_to = "user"
+        # Requested format for the DM content itself (no reply reference in this UI)
+        self._send_out(thread_id, f"(reply to {reply_to or 'user'}) {text}")
 
-                # Requested format for the DM content itself
-                content = f"(reply to {reply_to}) {text}"
+    def _send_out(self, thread_id: str, text: str):
+        text = (text or "").strip()
+        if not text or not self.loop or not (thread_id == "main" or thread_id.startswith("dm:")):
+            return
+        def _queue():
+            # Local echo first, so the message is on screen before any REST call
+            log = self._thread(thread_id)
+            ui = UiMessage(
+                id=local_snowflake(log[-1].id if log else 0),
+                author=self._my_display_name(),
+                content=text,
+                ts=time.time(),
+                from_me=True,
+                state="sending",
+            )
+            log.append(ui)
+            item = Outbound(thread_id, text, ui.id)
+            self._outbound[ui.id] = item
+            self.message_added.emit(thread_id, ui)
+            self._outbox.submit(item)
+        try:
+            self.loop.call_soon_threadsafe(_queue)
+        except Exception:
+            pass
 
-                if thread_id == "main" and self.main_channel:
-                    # Send reply to main thread as a plain message (no reply reference in this UI)
-                    msg = await self.main_channel.send(content)
-                    try:
-                        name = await self._author_display_async(msg, "main")
-                    except Exception:
-                        name = getattr(getattr(self.client, "user", None), "name", "me")
-                    self._push_ui_message_with_author("main", msg, name)
-                elif thread_id.startswith("dm:"):
-                    uid = None
-                    try:
-                        uid = int(thread_id.split(":", 1)[1])
-                    except Exception:
-                        uid = None
-                    if uid is None:
-                        return
-                    user = self.client.get_user(uid)
-                    if not user:
-                        try:
-                            user = await self.client.fetch_user(uid)
-                        except Exception:
-                            user = None
-                    if not user:
-                        return
-                    await user.create_dm()
-                    msg = await user.dm_channel.send(content)
-                    # Index the DM thread and notify list
-                    try:
-                        self.dm_threads[str(uid)] = user
-                        base = getattr(user, "global_name", None) or getattr(user, "name", None) or "user"
-                        self._remember_dm_user(uid, base)
-                        # NEW: resolve and cache nickname for immediate list update
-                        try:
-                            disp = await self._resolve_member_display(uid)
-                            if disp:
-                                self._name_cache[uid] = disp
-                        except Exception:
-                            pass
-                        self.dm_threads_changed.emit()
-                    except Exception:
-                        pass
-                    # Push our own message to UI
-                    tid = f"dm:{uid}"
-                    try:
-                        name = await self._author_display_async(msg, tid)
-                    except Exception:
-                        name = getattr(getattr(self.client, "user", None), "name", "me")
-                    self._push_ui_message_with_author(tid, msg, name)
-            except Exception:
-                pass
+    def _my_display_name(self) -> str:
+        me = self.client.user if self.client else None
+        if not me:
+            return "me"
+        return self._name_cache.get(me.id) or getattr(me, "display_name", None) or getattr(me, "name", "me")
+
+    async def _send_outbound(self, item: Outbound):
+        if item.local_id not in self._outbound:
+            return None   # its gateway echo already arrived (an earlier attempt got through)
+        if item.thread == "main":
+            if not self.main_channel:
+                raise RuntimeError("main channel not ready")   # transient: retried
+            return await self.main_channel.send(item.content)
+        uid = int(item.thread.split(":", 1)[1])
+        chan = await self._dm_channel(uid)
+        if not chan:
+            raise RuntimeError("DM channel not available")
+        msg = await chan.send(item.content)
         try:
-            self.loop.call_soon_threadsafe(lambda: asyncio.create_task(_send()))
+            # First message to this peer: list the DM thread
+            user = getattr(chan, "recipient", None)
+            if user and str(uid) not in self.dm_threads:
+                self.dm_threads[str(uid)] = user
+                base = getattr(user, "global_name", None) or getattr(user, "name", None) or "user"
+                self._remember_dm_user(uid, base)
+                disp = await self._resolve_member_display(uid)
+                if disp:
+                    self._name_cache[uid] = disp
+                self.dm_threads_changed.emit()
         except Exception:
             pass
+        return msg
+
+    def _on_outbound_sent(self, item: Outbound, msg):
+        if msg is None:
+            return
+        ui = UiMessage(
+            id=msg.id,
+            author=self._my_display_name(),
+            content=self._format_message_content(msg),
+            ts=msg.created_at.timestamp(),
+            from_me=True,
+            attachments=self._extract_attachments(msg),
+        )
+        if not self._reconcile_outbound(item.thread, item.local_id, ui, []):
+            # Echo no longer on screen; keep the sent message like any other
+            self._accept_ui(item.thread, ui, [])
+
+    def _on_outbound_failed(self, item: Outbound, exc: BaseException):
+        self._outbound.pop(item.local_id, None)
+        ui = self.get_message(item.thread, item.local_id)
+        if ui:
+            ui.state = "failed"
+            self.message_changed.emit(item.thread, item.local_id)
+        self.status.emit(f"Message not sent: {item.error}")
+
+    def _outbound_text(self, text: str) -> str:
+        # Compare sent text with its server copy the way _format_message_content shows it:
+        # trimmed, <@id> mentions as @DisplayName, whitespace runs collapsed
+        return " ".join(self._replace_user_mentions((text or "").strip()).split())
+
+    def _match_outbound(self, thread_id: str, content: str) -> Optional[int]:
+        # Oldest in-flight echo in this thread with the same text
+        key = self._outbound_text(content)
+        for lid, item in self._outbound.items():
+            if item.thread == thread_id and self._outbound_text(item.content) == key:
+                return lid
+        return None
+
+    def _reconcile_outbound(self, thread_id: str, local_id: int, real: UiMessage,
+                            reactions: List[Dict[str, Any]]) -> bool:
+        """Swap a local echo for the server message (send result or gateway echo, whichever is first)."""
+        self._outbound.pop(local_id, None)
+        log = self._thread(thread_id)
+        if log.has(real.id) or real.id in self._seen_ids:
+            # The server copy is already held (its gateway echo did not match): drop the echo
+            if log.remove(local_id) is not None:
+                self.message_removed.emit(thread_id, local_id)
+            return True
+        if not log.has(local_id):
+            return False
+        ui = log.rekey(local_id, real.id)
+        ui.content, ui.ts, ui.attachments, ui.state = real.content, real.ts, real.attachments, ""
+        self._seen_ids.add(real.id)
+        self.ui_reactions[real.id] = reactions
+        self._persist(thread_id, [ui])
+        self.message_reconciled.emit(thread_id, local_id, real.id)
+        return True
 
     # DM index persistence helpers
     def _load_dm_index(self):
@@ -1315,154 +1683,58 @@ class DiscordBridge(QtCore.QObject):
         # Read-only mode: do not mutate dm_index from the UI app
         return
 
-    # Rebuild UI-friendly reactions list from a discord.Message
+    # Rebuild UI-friendly reactions list from a discord.Message (same rows the daemon sends)
     def _build_ui_reactions(self, m: discord.Message) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
-        try:
-            for r in getattr(m, "reactions", []) or []:
-                e = r.emoji
-                cnt = int(getattr(r, "count", 1) or 1)
-                if isinstance(e, str):
-                    out.append({
-                        "emoji": e,
-                        "name": self._emoji_spoken_name(e),
-                        "url": None,
-                        "count": cnt
-                    })
-                else:
-                    # custom emoji
-                    try:
-                        name = (getattr(e, "name", None) or "emoji").replace("_", " ")
-                    except Exception:
-                        name = "emoji"
-                    try:
-                        url = str(getattr(e, "url", None) or "") or None
-                    except Exception:
-                        url = None
-                    out.append({
-                        "emoji": None,
-                        "name": name,
-                        "url": url,
-                        "count": cnt
-                    })
-        except Exception:
-            pass
-        return out
+        return reaction_rows(m)
 
-    def _thread_id_for_message(self, m: discord.Message) -> Optional[str]:
-        try:
-            if self.main_channel and getattr(m.channel, "id", None) == self.main_channel.id:
-                return "main"
-            if isinstance(m.channel, discord.DMChannel):
-                other = getattr(m.channel, "recipient", None)
-                if other and getattr(other, "id", None):
-                    return f"dm:{int(other.id)}"
-        except Exception:
-            pass
-        return None
+    async def _thread_id_for_channel_id(self, channel_id: int, guild_id: Optional[int]) -> Optional[str]:
+        if self.main_channel and channel_id == self.main_channel.id:
+            return "main"
+        if guild_id:
+            return None
+        ch = self.client.get_channel(channel_id)
+        if ch is None:
+            try:
+                ch = await self.client.fetch_channel(channel_id)
+            except Exception:
+                return None
+        other = getattr(ch, "recipient", None)
+        return f"dm:{int(other.id)}" if other and getattr(other, "id", None) else None
 
     def _emoji_spoken_name(self, emoji_obj) -> str:
-        try:
-            # unicode emoji
-            if isinstance(emoji_obj, str):
-                map_ = {"👍": "thumbs up", "👎": "thumbs down", "❤️": "heart", "😂": "laughing face"}
-                return map_.get(emoji_obj, "emoji")
-            # custom emoji
-            nm = getattr(emoji_obj, "name", None)
-            return (nm or "emoji").replace("_", " ")
-        except Exception:
-            return "emoji"
+        return emoji_spoken_name(emoji_obj)
 
-    async def _handle_reaction_change(self, m: discord.Message, added: bool, reactor):
+    async def _handle_raw_reaction(self, payload: discord.RawReactionActionEvent, added: bool):
+        # Counts are applied from the event; the message is only refetched when they don't fit
         try:
-            tid = self._thread_id_for_message(m)
-            if not tid:
-                return
-            # refresh message to get accurate counts
-            full = None
-            try:
-                full = await m.channel.fetch_message(m.id)
-            except Exception:
-                full = m
-            self.ui_reactions[m.id] = self._build_ui_reactions(full)
-            # notify UI
-            self.reactions_updated.emit(tid, m.id)
-            # TTS only on add, and only if we have this message in UI
-            if added:
-                msgs = self.ui_messages.get(tid, [])
-                if any(mm.id == m.id for mm in msgs):
-                    # resolve reactor display name
-                    disp = None
-                    try:
-                        uid = getattr(reactor, "id", None)
-                        if uid:
-                            disp = await self._resolve_member_display(uid)
-                    except Exception:
-                        disp = None
-                    name = disp or getattr(reactor, "global_name", None) or getattr(reactor, "name", "user")
-                    # reaction spoken name
-                    spoken = "reaction"
-                    try:
-                        # find matching reaction entry by emoji
-                        for r in getattr(full, "reactions", []) or []:
-                            if getattr(reactor, "bot", False):
-                                pass
-                        # fallback to emoji param on payload is complex; use generic
-                    except Exception:
-                        pass
-                    # Use last added/any for spoken; best-effort using first entry if unknown
-                    try:
-                        if getattr(full, "reactions", None):
-                            r0 = full.reactions[-1]
-                            spoken = self._emoji_spoken_name(getattr(r0, "emoji", None))
-                    except Exception:
-                        spoken = "reaction"
-                    self.reaction_tts.emit(f"{name} reacted {spoken}")
+            tid = await self._thread_id_for_channel_id(payload.channel_id, payload.guild_id)
+            if not tid or not self.get_message(tid, payload.message_id):
+                return   # not loaded in the UI; its counts come with the message
+            me = self.client.user
+            mine = bool(me and payload.user_id == me.id)
+            if not self._reaction_state.apply(payload.message_id, payload.emoji, 1 if added else -1, me=mine):
+                ch = self.client.get_channel(payload.channel_id) or await self.client.fetch_channel(payload.channel_id)
+                full = await ch.fetch_message(payload.message_id)
+                self._reaction_state.seed(full.id, self._build_ui_reactions(full))
+            spoken = None
+            if added and not mine:
+                name = getattr(getattr(payload, "member", None), "display_name", None)
+                if not name:
+                    name = await self._resolve_member_display(payload.user_id) or "user"
+                e = payload.emoji
+                spoken = f"{name} reacted {self._emoji_spoken_name(e.name if e.is_unicode_emoji() else e)}"
+            self._reaction_updates.touch(payload.message_id, thread=tid, spoken=spoken)
         except Exception:
             pass
 
+    def _flush_reactions(self, message_id: int, info: Dict[str, Any]):
+        self._persist_reactions(message_id)
+        self.reactions_updated.emit(info.get("thread") or "", message_id)
+        if info.get("spoken"):
+            self.reaction_tts.emit(info["spoken"])
+
     def _extract_attachments(self, m: discord.Message) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
-        try:
-            for a in getattr(m, "attachments", []) or []:
-                url = getattr(a, "url", None) or getattr(a, "proxy_url", None) or ""
-                fn = getattr(a, "filename", "") or ""
-                ctype = (getattr(a, "content_type", None) or "").lower()
-                typ = "other"
-                if ctype.startswith("image/") or fn.lower().endswith((".png",".jpg",".jpeg",".gif",".bmp",".webp",".avif",".tif",".tiff")):
-                    typ = "image"
-                elif ctype.startswith("video/") or fn.lower().endswith((".mp4",".mov",".m4v",".webm",".avi",".mkv",".3gp",".mpg",".mpeg")):
-                    typ = "video"
-                out.append({"type": typ, "url": url, "filename": fn})
-        except Exception:
-            pass
-        try:
-            # embeds -> treat image/video rich media as pseudo-attachments
-            for emb in getattr(m, "embeds", []) or []:
-                et = getattr(emb, "type", "") or ""
-                # Image
-                img_url = None
-                try:
-                    if getattr(emb, "image", None):
-                        img_url = getattr(getattr(emb, "image"), "url", None)
-                    if not img_url and getattr(emb, "thumbnail", None):
-                        img_url = getattr(getattr(emb, "thumbnail"), "url", None)
-                except Exception:
-                    img_url = None
-                if img_url:
-                    out.append({"type": "image", "url": img_url, "filename": "embedded-image"})
-                # Video
-                vid_url = None
-                try:
-                    if getattr(emb, "video", None):
-                        vid_url = getattr(getattr(emb, "video"), "url", None)
-                except Exception:
-                    vid_url = None
-                if vid_url:
-                    out.append({"type": "video", "url": vid_url, "filename": "embedded-video"})
-        except Exception:
-            pass
-        return out
+        return attachment_rows(m)
 
 # ---------- UI ----------
 class ThreadListDelegate(QtWidgets.QStyledItemDelegate):
@@ -1500,15 +1772,344 @@ class ThreadListDelegate(QtWidgets.QStyledItemDelegate):
         finally:
             painter.restore()
 
-    def sizeHint(self, option, index):
-        # provide taller rows so larger text isn't clipped
-        f = QtGui.QFont(option.font)
-        f.setPixelSize(72)
-        fm = QtGui.QFontMetrics(f)
-        h = fm.height() + 40
-        return QtCore.QSize(option.rect.width(), h)
+    def sizeHint(self, option, index):
+        # provide taller rows so larger text isn't clipped
+        f = QtGui.QFont(option.font)
+        f.setPixelSize(72)
+        fm = QtGui.QFontMetrics(f)
+        h = fm.height() + 40
+        return QtCore.QSize(option.rect.width(), h)
+
+class ThreadListModel(QtCore.QAbstractListModel):
+    """Channels & DMs rows: unread first, then first-seen order (main channel first).
+    Changes are row-level (insert/remove/move/dataChanged); the list is never rebuilt."""
+    UnreadRole = Qt.UserRole + 1  # 1/0, read by ThreadListDelegate
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[List[str]] = []   # [tid, label], kept in _key order
+        self._seq: Dict[str, int] = {"main": 0}
+        self._unread: Dict[str, int] = {}  # tid -> unread count (may precede the row)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        tid, label = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return label
+        if role == Qt.UserRole:
+            return tid
+        if role == self.UnreadRole:
+            return 1 if self._unread.get(tid, 0) > 0 else 0
+        return None
+
+    def _key(self, tid: str):
+        return (0 if self._unread.get(tid, 0) > 0 else 1, self._seq.get(tid, 0))
+
+    def _target_row(self, tid: str, skip: int = -1) -> int:
+        key = self._key(tid)
+        at = 0
+        for i, r in enumerate(self._rows):
+            if i != skip and self._key(r[0]) < key:
+                at += 1
+        return at
+
+    def row_of(self, tid: str) -> int:
+        for i, r in enumerate(self._rows):
+            if r[0] == tid:
+                return i
+        return -1
+
+    def tids(self) -> List[str]:
+        return [r[0] for r in self._rows]
+
+    def tid_at(self, row: int) -> Optional[str]:
+        return self._rows[row][0] if 0 <= row < len(self._rows) else None
+
+    def label_at(self, row: int) -> Optional[str]:
+        return self._rows[row][1] if 0 <= row < len(self._rows) else None
+
+    def upsert(self, tid: str, label: str):
+        if tid not in self._seq:
+            self._seq[tid] = len(self._seq)
+        row = self.row_of(tid)
+        if row < 0:
+            at = self._target_row(tid)
+            self.beginInsertRows(QtCore.QModelIndex(), at, at)
+            self._rows.insert(at, [tid, label])
+            self.endInsertRows()
+        elif self._rows[row][1] != label:
+            self._rows[row][1] = label
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [Qt.DisplayRole])
+
+    def remove(self, tid: str):
+        row = self.row_of(tid)
+        if row >= 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+
+    def set_unread(self, tid: str, count: int):
+        was = self._unread.get(tid, 0) > 0
+        self._unread[tid] = max(0, int(count))
+        if (count > 0) == was:
+            return
+        row = self.row_of(tid)
+        if row < 0:
+            return
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [self.UnreadRole])
+        to = self._target_row(tid, skip=row)
+        if to != row:
+            # Qt's destination row counts the moved row still in place
+            self.beginMoveRows(QtCore.QModelIndex(), row, row, QtCore.QModelIndex(), to + 1 if to > row else to)
+            self._rows.insert(to, self._rows.pop(row))
+            self.endMoveRows()
+
+class MessageListModel(QtCore.QAbstractListModel):
+    """Messages of the open thread in view order (row == message scan index)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._uis: List[UiMessage] = []
+        self.ids: List[int] = []          # same list object for the model's lifetime
+        self._rows: Dict[int, int] = {}
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._uis)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._uis)):
+            return None
+        if role == Qt.DisplayRole:
+            ui = self._uis[index.row()]
+            return f"{ui.author}: {ui.content}"
+        return None
+
+    def ui_at(self, row: int) -> Optional[UiMessage]:
+        return self._uis[row] if 0 <= row < len(self._uis) else None
+
+    def row_of(self, message_id: int) -> int:
+        return self._rows.get(message_id, -1)
+
+    def _reindex(self):
+        self.ids[:] = [u.id for u in self._uis]
+        self._rows = {mid: i for i, mid in enumerate(self.ids)}
+
+    def set_messages(self, uis: List[UiMessage]):
+        self.beginResetModel()
+        self._uis = list(uis)
+        self._reindex()
+        self.endResetModel()
+
+    def append(self, ui: UiMessage):
+        n = len(self._uis)
+        self.beginInsertRows(QtCore.QModelIndex(), n, n)
+        self._uis.append(ui)
+        self.ids.append(ui.id)
+        self._rows[ui.id] = n
+        self.endInsertRows()
+
+    def prepend(self, uis: List[UiMessage]):
+        if not uis:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), 0, len(uis) - 1)
+        self._uis[:0] = uis
+        self._reindex()
+        self.endInsertRows()
+
+    def refresh(self, row: int):
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx)
+
+    def remove(self, message_id: int) -> int:
+        """Drop a message's row; returns the row it had (-1 if not shown)."""
+        row = self._rows.get(message_id, -1)
+        if row >= 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self._uis[row]
+            self._reindex()
+            self.endRemoveRows()
+        return row
+
+    def rekey(self, old_id: int, new_id: int) -> bool:
+        """Swap a row's message id; False (nothing changed) if the row is missing or would move."""
+        row = self._rows.get(old_id, -1)
+        if row < 0:
+            return False
+        ids = self.ids
+        if (row > 0 and ids[row - 1] > new_id) or (row + 1 < len(ids) and ids[row + 1] < new_id):
+            return False
+        ids[row] = new_id
+        del self._rows[old_id]
+        self._rows[new_id] = row
+        return True
+
+class MessageDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints one message card from its cached inline HTML. The laid-out QTextDocument (and so
+    the row height) is cached per message until its HTML or the view width changes; rows that
+    have not been painted yet get an estimated height, corrected when they first are."""
+    MARGIN_V = 14
+    PAD_H, PAD_V = 26, 22
+    RADIUS = 14
+    CARD_BG = "#0f1521"
+    FONT_PX = 48
+    LINE_PX = 72          # FONT_PX at line-height 150%
+    CHAR_PX = 26          # average glyph width at FONT_PX, for the estimate
+
+    def __init__(self, html_for, view: QtWidgets.QListView):
+        super().__init__(view)
+        self._html_for = html_for   # ui -> inner html (cached by the window)
+        self._view = view
+        self._docs: Dict[int, Tuple[str, int, QtGui.QTextDocument]] = {}
+        self._hinted: Dict[int, int] = {}   # message id -> height last given to the view
+
+    def clear(self):
+        self._docs.clear()
+        self._hinted.clear()
+
+    def forget(self, message_id: int):
+        self._docs.pop(message_id, None)
+
+    def _text_width(self, width: int) -> int:
+        return max(50, width - 2 * self.PAD_H)
+
+    def _laid_out(self, ui, width: int) -> Optional[QtGui.QTextDocument]:
+        hit = self._docs.get(ui.id)
+        if hit and hit[1] == self._text_width(width) and hit[0] == self._html_for(ui):
+            return hit[2]
+        return None
+
+    def _doc(self, ui, width: int) -> QtGui.QTextDocument:
+        doc = self._laid_out(ui, width)
+        if doc is not None:
+            return doc
+        html = self._html_for(ui)
+        w = self._text_width(width)
+        doc = QtGui.QTextDocument()
+        doc.setDocumentMargin(0)
+        doc.setDefaultFont(self._view.font())
+        doc.setHtml(f"<div style='font-size: {self.FONT_PX}px; line-height: 150%;'>" + html + "</div>")
+        doc.setTextWidth(w)
+        self._docs[ui.id] = (html, w, doc)
+        return doc
+
+    def row_height(self, ui, width: int) -> int:
+        return int(self._doc(ui, width).size().height()) + 2 * (self.PAD_V + self.MARGIN_V)
+
+    def estimated_height(self, ui, width: int) -> int:
+        """Header line + wrapped text lines + rows of image thumbnails, without laying anything out."""
+        w = self._text_width(width)
+        per_line = max(1, w // self.CHAR_PX)
+        lines = 1 + sum(max(1, -(-len(part) // per_line)) for part in (ui.content or "").split("\n"))
+        images = sum(1 for a in ui.attachments or [] if a.get("type") == "image")
+        thumb_rows = -(-images // max(1, w // THUMB_MAX_PX))
+        return lines * self.LINE_PX + thumb_rows * THUMB_MAX_PX + 2 * (self.PAD_V + self.MARGIN_V)
+
+    def sizeHint(self, option, index):
+        ui = index.model().ui_at(index.row())
+        width = self._view.viewport().width()
+        if ui is None:
+            return QtCore.QSize(width, 0)
+        if self._laid_out(ui, width) is not None:
+            h = self.row_height(ui, width)
+        else:
+            h = self.estimated_height(ui, width)
+        self._hinted[ui.id] = h
+        return QtCore.QSize(width, h)
+
+    def lay_out_tail(self, model, width: int, height: int) -> bool:
+        """Lay out the last rows that fill `height`, so scrolling to the bottom lands on their real
+        heights. True when some of them had only an estimate."""
+        changed, used = False, 0
+        for row in range(model.rowCount() - 1, -1, -1):
+            ui = model.ui_at(row)
+            if ui is None:
+                continue
+            h = self.row_height(ui, width)
+            changed = changed or self._hinted.get(ui.id) != h
+            used += h
+            if used >= height:
+                break
+        return changed
+
+    def paint(self, painter, option, index):
+        ui = index.model().ui_at(index.row())
+        if ui is None:
+            return
+        card = QtCore.QRectF(option.rect).adjusted(0, self.MARGIN_V, 0, -self.MARGIN_V)
+        doc = self._doc(ui, option.rect.width())
+        h = int(doc.size().height()) + 2 * (self.PAD_V + self.MARGIN_V)
+        if self._hinted.get(ui.id) != h:
+            # First paint of an estimated row: hand the view its real height
+            self._hinted[ui.id] = h
+            self.sizeHintChanged.emit(index)
+        painter.save()
+        try:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QtGui.QColor(self.CARD_BG))
+            painter.drawRoundedRect(card, self.RADIUS, self.RADIUS)
+            painter.translate(card.left() + self.PAD_H, card.top() + self.PAD_V)
+            doc.drawContents(painter)
+        finally:
+            painter.restore()
+
+class ReplyKeyboardPage(QtWidgets.QWidget):
+    """Scan keyboard built once at startup and shown as a page of the main window."""
+    finished = QtCore.Signal(str)  # typed text, "" when closed without sending
+
+    def __init__(self, speak, parent=None):
+        super().__init__(parent)
+        self._speak = speak
+        self.setStyleSheet(LARGE_KEYS_STYLE)
+        v = QtWidgets.QVBoxLayout(self)
+        v.setContentsMargins(4, 4, 4, 4)
+        v.setSpacing(4)
+
+        top = QtWidgets.QHBoxLayout()
+        top.setContentsMargins(0, 0, 0, 0)
+        self.title = QtWidgets.QLabel("<b>NARBE</b> Reply"); self.title.setStyleSheet("font-size:16px;")
+        status = QtWidgets.QLabel("Mode: Rows • Space=next • Enter=select"); status.setStyleSheet("color:#9fb6c9; font-size:10px;")
+        top.addWidget(self.title); top.addStretch(1); top.addWidget(status)
+        v.addLayout(top)
+
+        # 9 rows (text + controls + 6 alpha + predictive) sized to the screen
+        row_height, text_row_height = fixed_row_heights(9)
+        self.kb = ScanKeyboard(
+            speak=speak,
+            backend=PredictionBackend(ngrams_path=os.path.join(APP_DIR, "predictive_ngrams.json")),
+            controls=EDIT_CONTROLS + (("SEND", "send", "primary"), ("CLOSE", "close_keyboard", "")),
+            handlers={"send": self._send, "close_keyboard": self._cancel},
+            text_mode="fit", row_height=row_height, text_row_height=text_row_height,
+            row_style="background:#0f1521; border-radius:12px;",
+        )
+        v.addWidget(self.kb, 1)
+
+    def open(self, title: str):
+        self.title.setText(f"<b>NARBE</b> {title}")
+        self.kb.reset()
+
+    def _send(self):
+        txt = self.kb.text().strip()
+        if not txt:
+            self._speak("type something first")
+            return
+        self.finished.emit(txt)
+
+    def _cancel(self):
+        self.finished.emit("")
+
+    def shutdown(self):
+        self.kb.shutdown()
 
 class BenDiscordUI(QtWidgets.QMainWindow):
+    media_ready = QtCore.Signal(str, str)   # url, kind (from a media worker thread)
+
     def __init__(self, bridge: DiscordBridge):
         super().__init__()
         self.bridge = bridge
@@ -1521,11 +2122,12 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self._keyboard_active = False  # Track when keyboard is open
         self._hwnd = None
         
-        # Setup focus timer to maintain priority
+        # Focus is re-checked when the foreground window changes (_setup_window_focus);
+        # the timer is only the fallback when the foreground hook cannot be installed
+        self._focus_guard: Optional[FocusGuard] = None
         self._focus_timer = QTimer(self)
-        self._focus_timer.setInterval(250)  # Check every 250ms
+        self._focus_timer.setInterval(FOCUS_POLL_MS)
         self._focus_timer.timeout.connect(self._maintain_focus)
-        self._focus_timer.start()
         
         # Get window handle after show
         QtCore.QTimer.singleShot(100, self._setup_window_focus)
@@ -1536,20 +2138,20 @@ class BenDiscordUI(QtWidgets.QMainWindow):
             QMainWindow { background:#0b0f14; color:#e9eef5; }
             QLabel#big { font-size: 48px; font-weight: 800; text-align: center; }
             QLabel#info { font-size: 24px; color:#9fb6c9; text-align: center; }
-            QListWidget { background:#0f1521; border:1px solid rgba(255,255,255,0.1); }
-            QListWidget::item { padding: 30px; font-size: 60px; }  /* was 48px -> ~50% larger */
-            QListWidget::item:hover { background: rgba(255,255,255,0.05); }  /* mouse hover */
-            QTextBrowser { background:#0f1521; border:1px solid rgba(255,255,255,0.1); font-size: 28px; }
+            QListView { background:#0f1521; border:1px solid rgba(255,255,255,0.1); }
+            QListView::item { padding: 30px; font-size: 60px; }  /* was 48px -> ~50% larger */
+            QListView::item:hover { background: rgba(255,255,255,0.05); }  /* mouse hover */
+            QListView#messages { font-size: 28px; }
             QPushButton { padding: 30px 40px; font-size: 36px; border-radius: 16px; background:#152033; color:#e9eef5; }
             QPushButton:hover { background:#1a2a44; }  /* mouse hover */
             QPushButton[primary="true"] { background:#79c0ff; color:#001; font-weight: 800; }
             QPushButton[primary="true"]:hover { background:#90d0ff; }
-            QPushButton[focused="true"], QListWidget::item:selected { border:3px solid #FFD64D; background: rgba(255,214,77,0.10); }
+            QPushButton[focused="true"], QListView::item:selected { border:3px solid #FFD64D; background: rgba(255,214,77,0.10); }
             /* Ensure selection looks the same whether the list has focus or not */
-            QListWidget::item:selected:active { border:3px solid #FFD64D; background: rgba(255,214,77,0.10); }
-            QListWidget::item:selected:!active { border:3px solid #FFD64D; background: rgba(255,214,77,0.10); }
+            QListView::item:selected:active { border:3px solid #FFD64D; background: rgba(255,214,77,0.10); }
+            QListView::item:selected:!active { border:3px solid #FFD64D; background: rgba(255,214,77,0.10); }
             /* block-level scan focus highlight */
-            QListWidget[scanFocus="true"], QTextBrowser[scanFocus="true"], QPushButton[scanFocus="true"] {
+            QListView[scanFocus="true"], QPushButton[scanFocus="true"] {
                 border:3px solid #FFD64D; background: rgba(255,214,77,0.10);
             }
             /* Close button style */
@@ -1574,6 +2176,7 @@ class BenDiscordUI(QtWidgets.QMainWindow):
 
         # state
         self.current_thread_id = "main"
+        self._backfill_wanted: Set[str] = set()   # threads whose scroll-to-top is waiting on load_older
         # scanning state
         self.scan_mode = "idle"            # idle | blocks | channels | messages
         self.scan_block_index = -1         # varies by UI mode
@@ -1585,17 +2188,26 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self._scan_anchor_y = None  # viewport Y (int)
         
         # Initialize missing attributes before using them
-        self.block_msg_ids = []
+        # msg id -> (render key, inner html); reused until content/unread/reactions change
+        self._msg_html: Dict[int, Tuple[tuple, str]] = {}
+        # Thumbnails / custom emoji come from the local cache only; a miss queues a download and
+        # the messages waiting on it are re-rendered when it lands
+        self.media = MediaCache(MEDIA_CACHE_DIR, int(float(S("MEDIA_CACHE_MAX_MB", MEDIA_CACHE_MAX_MB)) * 1024 * 1024))
+        self._media_fetch = MediaPrefetcher(self.media, self.media_ready.emit)
+        self._media_waiting: Dict[Tuple[str, str], set] = {}   # (media key, kind) -> message ids
+        self.media_ready.connect(self._on_media_ready)
         self.unread_ids = set()
-        self.read_ids = set()
+        # Per-thread unread counters, kept as messages arrive / are read (msg id -> thread id)
+        self._unread_tid: Dict[int, str] = {}
+        self._unread_count: Dict[str, int] = {}
         
         # Initialize state tracking
         self._react_tap_armed = False
         self._last_tts_msg_id = None
         
-        # Initialize keyboard process tracking
-        self._kb_process = None
-        self._keyboard_pid = None
+        # Reply keyboard callback and the page to return to
+        self._kb_on_done = None
+        self._kb_return_page = None
 
         # Spacebar debounce timer (prevent rapid fire)
         self._space_debounce_ms = 1000
@@ -1632,11 +2244,12 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self._enter_hold_arm.setInterval(self.ENTER_HOLD_MS)
         self._enter_hold_arm.timeout.connect(self._arm_enter_hold)
 
-        # Persistent read memory
-        self._read_state_path = os.path.join(os.path.dirname(__file__), "read_state.json")
-        # NEW: persisted last seen timestamp (epoch seconds)
-        self._last_seen_ts = 0.0
-        self._load_read_state()
+        # Persistent read memory: per-thread watermarks plus last seen time (epoch seconds)
+        self.read_state = ReadState(os.path.join(os.path.dirname(__file__), "read_state.json"))
+        self._read_save_timer = QTimer(self)
+        self._read_save_timer.setSingleShot(True)
+        self._read_save_timer.setInterval(READ_STATE_SAVE_MS)
+        self._read_save_timer.timeout.connect(self.read_state.save)
 
         # Suppress DM TTS until warm load completes
         self._suppress_incoming_dm_tts = True
@@ -1649,14 +2262,6 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self._react_tap_timer.setInterval(4000)
         self._react_tap_timer.timeout.connect(lambda: setattr(self, "_react_tap_armed", False))
 
-        # Heartbeat: let the listener know we are active
-        self._hb_timer = QTimer(self)
-        self._hb_timer.setInterval(2000)  # every 2s
-        self._hb_timer.timeout.connect(self._write_heartbeat)
-        self._hb_timer.start()
-        # Write immediately so the listener pauses right away
-        self._write_heartbeat()
-
         # Initialize overlays after message view is created
         self._setup_overlays()
 
@@ -1666,19 +2271,16 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self._tts_worker.moveToThread(self._tts_thread)
         self._tts_thread.start()
 
-        # NEW: TTS keepalive watchdog (engine auto-recovery)
-        try:
-            self._tts_keepalive = QtCore.QTimer(self)
-            self._tts_keepalive.setInterval(5000)  # every 5s
-            self._tts_keepalive.timeout.connect(lambda: self._tts_worker.keepalive.emit())
-            self._tts_keepalive.start()
-        except Exception:
-            pass
-
         # Install event filter
         QtWidgets.QApplication.instance().installEventFilter(self)
         self.view_msgs.viewport().installEventFilter(self)
 
+        # Reply keyboard: built once here and shown as a page, so opening it costs a page switch.
+        # Its key filter is installed after ours and sees space/enter first while it is visible.
+        self.reply_kb_page = ReplyKeyboardPage(self._speak)
+        self.reply_kb_page.finished.connect(self._on_keyboard_finished)
+        self.stacked_widget.addWidget(self.reply_kb_page)
+
         # Connect bridge signals
         self.bridge.channel_ready.connect(self._on_channel_ready)
         self.bridge.dm_threads_changed.connect(self._refresh_threads)
@@ -1688,6 +2290,10 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self.bridge.reactions_updated.connect(self._on_reactions_updated)
         self.bridge.reaction_tts.connect(lambda txt: self._speak(txt))
         self.bridge.history_extended.connect(self._on_history_extended)
+        self.bridge.message_reconciled.connect(self._on_message_reconciled)
+        self.bridge.message_removed.connect(self._on_message_removed)
+        # A send that failed only changes that message's card (same single-block patch)
+        self.bridge.message_changed.connect(self._on_reactions_updated)
 
         # initial fill without auto-selection
         self._refresh_threads()
@@ -1714,8 +2320,12 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self.label_info.setObjectName("info")
         layout.addWidget(self.label_info)
         
-        # Channel/DM list (takes most space)
-        self.list_threads = QtWidgets.QListWidget()
+        # Channel/DM list (takes most space); rows come from an incrementally updated model
+        self.thread_model = ThreadListModel(self)
+        self.list_threads = QtWidgets.QListView()
+        self.list_threads.setModel(self.thread_model)
+        self.list_threads.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.list_threads.setUniformItemSizes(True)  # one size hint for every row
         self.list_threads.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
         # Prevent blue focus/indicator lines and any drop indicator
         self.list_threads.setFocusPolicy(Qt.NoFocus)
@@ -1727,7 +2337,10 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self.list_threads.setItemDelegate(ThreadListDelegate(self.list_threads))
         
         # Mouse click support
-        self.list_threads.itemClicked.connect(self._on_thread_clicked)
+        self.list_threads.clicked.connect(self._on_thread_clicked)
+        # Keep the channel scan row on its thread when rows move/insert/remove
+        for sig in (self.thread_model.rowsMoved, self.thread_model.rowsInserted, self.thread_model.rowsRemoved):
+            sig.connect(self._sync_channel_scan_row)
         
         # Exit button at bottom
         self.btn_exit_main = QtWidgets.QPushButton("EXIT")
@@ -1749,8 +2362,22 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self.label_thread_title.setObjectName("big")
         layout.addWidget(self.label_thread_title)
 
-        # Messages pane acts as the "Messages" block
-        self.view_msgs = QtWidgets.QTextBrowser()
+        # Messages pane acts as the "Messages" block: a list view with one row per message.
+        # Rows are painted from cached documents and only visible rows are painted; scan
+        # positions come from visualRect(row) instead of walking a text document.
+        self.msg_model = MessageListModel(self)
+        self.view_msgs = QtWidgets.QListView()
+        self.view_msgs.setObjectName("messages")
+        self.view_msgs.setModel(self.msg_model)
+        self._msg_delegate = MessageDelegate(self._message_inner_html, self.view_msgs)
+        self.view_msgs.setItemDelegate(self._msg_delegate)
+        self.view_msgs.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.view_msgs.verticalScrollBar().setSingleStep(24)
+        self.view_msgs.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.view_msgs.setResizeMode(QtWidgets.QListView.Adjust)
+        self.view_msgs.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.view_msgs.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.view_msgs.setFocusPolicy(Qt.NoFocus)
         layout.addWidget(self.view_msgs, 1)
 
         # Message outline overlay
@@ -1761,8 +2388,7 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self._overlay_idx = -1
 
         self.view_msgs.verticalScrollBar().valueChanged.connect(self._reposition_message_outline)
-        self.view_msgs.horizontalScrollBar().valueChanged.connect(self._reposition_message_outline)
-        self.view_msgs.document().contentsChanged.connect(self._reposition_message_outline)
+        self.view_msgs.verticalScrollBar().rangeChanged.connect(lambda *_: self._reposition_message_outline())
 
         # Bottom buttons: Send and Back
         button_layout = QtWidgets.QHBoxLayout()
@@ -1801,68 +2427,64 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 self._force_focus()
             except Exception as e:
                 print(f"Failed to setup window focus: {e}")
+            try:
+                guard = FocusGuard(WinEventSource(), self._maintain_focus, QtCore.QTimer.singleShot)
+                if not guard.source.available:
+                    raise OSError("no foreground hook on this platform")
+                guard.start()
+                self._focus_guard = guard
+            except Exception as e:
+                print(f"Focus hook unavailable, polling instead: {e}")
+                self._focus_timer.start()
     
-    def _maintain_focus(self):
-        """Maintain window focus and close interfering windows"""
+    def _maintain_focus(self, fg_hwnd: Optional[int] = None) -> bool:
+        """Take the foreground back from an interfering window; True when we hold it (or should
+        leave it alone), False when a refocus was attempted and is worth re-checking."""
         if not _WIN32_AVAILABLE or not self._hwnd:
-            return
-        
-        # If keyboard is active, don't steal focus - stay minimized
-        if self._keyboard_active:
-            return
-            
+            return True
+
         try:
-            # Get current foreground window
-            fg_hwnd = win32gui.GetForegroundWindow()
-            
+            # Current foreground window (the hook passes the new one)
+            fg_hwnd = fg_hwnd or win32gui.GetForegroundWindow()
+
             # If we have focus, we're good
             if fg_hwnd == self._hwnd:
-                return
-                
-            # Get window class name to identify the window
+                return True
+
+            # Don't steal focus if we're minimized
+            if self.isMinimized():
+                return True
+
+            # Get window class / title to identify the window
             try:
                 class_name = win32gui.GetClassName(fg_hwnd)
             except:
                 class_name = ""
-            
-            # Don't steal focus if we're minimized (keyboard is active)
-            if self.isMinimized():
-                return
-            
-            # Check for Start Menu or other system windows
-            if class_name in ["Windows.UI.Core.CoreWindow", "Shell_TrayWnd", "DV2ControlHost", "Windows.UI.Core.CoreComponentInputSource"]:
-                # Close the Start Menu or system overlay
+            try:
+                window_title = win32gui.GetWindowText(fg_hwnd)
+            except:
+                window_title = ""
+
+            action = foreground_action(class_name, window_title)
+            if action == "dismiss":
+                # Start Menu or system overlay: send ESC to close it
                 try:
-                    # Send ESC to close Start Menu
                     win32api.keybd_event(0x1B, 0, 0, 0)  # ESC key down
                     win32api.keybd_event(0x1B, 0, win32con.KEYEVENTF_KEYUP, 0)  # ESC key up
                 except:
                     pass
-                # Force focus back to us
-                self._force_focus()
-                return
-            
-            # Check window title for other interfering windows
-            try:
-                window_title = win32gui.GetWindowText(fg_hwnd).lower()
-                if "start" in window_title or "search" in window_title or "cortana" in window_title:
-                    # Close it and take focus back
-                    try:
-                        win32gui.PostMessage(fg_hwnd, win32con.WM_CLOSE, 0, 0)
-                    except:
-                        pass
-                    self._force_focus()
-                    return
-            except:
-                pass
-            
-            # If we're not minimized and don't have focus, take it back
-            if not self.isMinimized():
-                self._force_focus()
-                
+            elif action == "close":
+                try:
+                    win32gui.PostMessage(fg_hwnd, win32con.WM_CLOSE, 0, 0)
+                except:
+                    pass
+            # Take focus back
+            self._force_focus()
+            return win32gui.GetForegroundWindow() == self._hwnd
+
         except Exception as e:
             # Silently continue on errors
-            pass
+            return True
 
     def _force_focus(self):
         """Force window to foreground"""
@@ -1908,49 +2530,6 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         except Exception:
             pass
 
-    def _focus_pid_window(self, pid: int, timeout_ms: int = 3000):
-        """Try to bring the top-level window of a given PID to the foreground.""" 
-        if not _WIN32_AVAILABLE:
-            return
-        start = time.time()
-        target = None
-
-        def _enum_cb(hwnd, out):
-            try:
-                if not win32gui.IsWindowVisible(hwnd):
-                    return
-                _, wpid = win32process.GetWindowThreadProcessId(hwnd)
-                if int(wpid) != int(pid):
-                    return
-                # skip tool windows with no title if possible
-                title = win32gui.GetWindowText(hwnd) or ""
-                if title.strip() == "":
-                    return
-                out.append(hwnd)
-            except Exception:
-                pass
-
-        while (time.time() - start) * 1000 < timeout_ms and not target:
-            found = []
-            try:
-                win32gui.EnumWindows(_enum_cb, found)
-            except Exception:
-                found = []
-            if found:
-                target = found[0]
-                break
-            time.sleep(0.1)
-
-        if not target:
-            return
-        try:
-            win32gui.ShowWindow(target, win32con.SW_SHOW)
-            win32gui.SetForegroundWindow(target)
-            win32gui.BringWindowToTop(target)
-            win32gui.SetActiveWindow(target)
-        except Exception:
-            pass
-
     def _go_back_to_channel_list(self):
         """Switch back to channel list menu"""
         self.current_ui_mode = "channel_list"
@@ -1962,16 +2541,16 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         # Clear any row selection/current in the list; wait for Space to start scanning
         try:
             self.list_threads.clearSelection()
-            self.list_threads.setCurrentItem(None)
+            self.list_threads.setCurrentIndex(QtCore.QModelIndex())
         except Exception:
             pass
         # No TTS cue here; Space will announce the first block
 
-    def _on_thread_clicked(self, item):
+    def _on_thread_clicked(self, index):
         """Handle mouse click on thread list - go to message view"""
-        if not item:
+        if not index.isValid():
             return
-        tid = item.data(Qt.UserRole)
+        tid = index.data(Qt.UserRole)
         if tid:
             self._select_thread_and_switch(tid)
 
@@ -1989,6 +2568,7 @@ class BenDiscordUI(QtWidgets.QMainWindow):
             pass
 
         self.current_thread_id = tid
+        self._backfill_wanted.clear()
         self._render_thread(tid)
         
         # Switch to message view
@@ -2067,16 +2647,16 @@ class BenDiscordUI(QtWidgets.QMainWindow):
             return
 
         if self.scan_mode == "channels":
-            c = self.list_threads.count()
+            c = self.thread_model.rowCount()
             if c == 0:
                 self._speak("No channels")
                 return
             self.channel_scan_row = (self.channel_scan_row + 1) % c
             # Ensure visible selection, not only "current" (prevents thin blue line)
             self._select_list_row(self.channel_scan_row)
-            item = self.list_threads.item(self.channel_scan_row)
-            if item:
-                self._speak(item.text())
+            label = self.thread_model.label_at(self.channel_scan_row)
+            if label:
+                self._speak(label)
             return
 
         if self.scan_mode == "messages":
@@ -2142,16 +2722,16 @@ class BenDiscordUI(QtWidgets.QMainWindow):
             return
 
         if self.scan_mode == "channels":
-            c = self.list_threads.count()
+            c = self.thread_model.rowCount()
             if c == 0:
                 self._speak("No channels")
                 return
             self.channel_scan_row = (self.channel_scan_row - 1) % c if self.channel_scan_row >= 0 else (c - 1)
             # Ensure visible selection, not only "current"
             self._select_list_row(self.channel_scan_row)
-            item = self.list_threads.item(self.channel_scan_row)
-            if item:
-                self._speak(item.text())
+            label = self.thread_model.label_at(self.channel_scan_row)
+            if label:
+                self._speak(label)
             return
 
         if self.scan_mode == "messages":
@@ -2253,15 +2833,14 @@ class BenDiscordUI(QtWidgets.QMainWindow):
 
     def _select_current_channel(self):
         # Select channel and switch to message view
-        item = self.list_threads.currentItem()
-        if not item:
+        tid = self.thread_model.tid_at(self.list_threads.currentIndex().row())
+        if not tid:
             self._speak("No channel")
             return
-        tid = item.data(Qt.UserRole)
         self._select_thread_and_switch(tid)
 
     def _start_channel_scan(self):
-        c = self.list_threads.count()
+        c = self.thread_model.rowCount()
         if c == 0:
             self._speak("No channels")
             return
@@ -2275,9 +2854,9 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         self.channel_scan_row = 0 if self.channel_scan_row < 0 else self.channel_scan_row
         # Ensure row is selected (not just current) so highlight doesn't disappear
         self._select_list_row(self.channel_scan_row)
-        item = self.list_threads.item(self.channel_scan_row)
-        if item:
-            self._speak(item.text())
+        label = self.thread_model.label_at(self.channel_scan_row)
+        if label:
+            self._speak(label)
 
     def _start_message_scan(self):
         total = len(self.block_msg_ids)
@@ -2321,57 +2900,51 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         else:
             self._set_block_focus(idx)
 
+    @property
+    def block_msg_ids(self) -> List[int]:
+        # Message ids of the open thread in row order (row == scan index)
+        return self.msg_model.ids
+
     def _highlight_message_scan(self, idx: int):
-        # Outline the message block via an overlay (no fill)
+        # Outline the message row via an overlay (no fill)
         self._overlay_idx = idx
-        self._position_message_outline(idx)
-        # move caret to block for SR alignment
-        doc = self.view_msgs.document()
-        b = doc.begin(); bi = 0
-        while b.isValid():
-            if bi == idx:
-                cur = self.view_msgs.textCursor()
-                cur.setPosition(b.position())
-                self.view_msgs.setTextCursor(cur)
-                # Avoid Qt auto-scroll fighting the anchor: only auto-center if not anchored
-                try:
-                    if not self._scan_anchor_active:
-                        # Ensure the highlighted block is visible so anchor can activate at midpoint
-                        self.view_msgs.ensureCursorVisible()
-                except Exception:
-                    pass
+        # Scanning up toward the oldest shown rows: load the next page before the top is reached
+        if 0 <= idx < int(S("BACKFILL_PREFETCH_ROWS", 5)):
+            try:
+                self._backfill_older()
+                idx = self._overlay_idx   # rows prepended above shift the index
+            except Exception:
+                pass
+        index = self.msg_model.index(idx)
+        if index.isValid():
+            # Avoid fighting the anchor: only scroll the row into view if not anchored
+            try:
+                if not self._scan_anchor_active:
+                    self.view_msgs.scrollTo(index, QtWidgets.QAbstractItemView.EnsureVisible)
+            except Exception:
+                pass
+            self._position_message_outline(idx)
 
-                # Activate and/or enforce anchored position
-                try:
-                    self._maybe_activate_message_anchor(idx)
-                    self._enforce_anchor_position(idx)
-                    # After enforcing scroll, reposition the outline to match
+            # Activate and/or enforce anchored position
+            try:
+                self._maybe_activate_message_anchor(idx)
+                self._enforce_anchor_position(idx)
+                # After enforcing scroll, reposition the outline to match
+                self._position_message_outline(idx)
+                # Enforce once more after any pending layout
+                QtCore.QTimer.singleShot(0, lambda: (
+                    self._enforce_anchor_position(idx),
                     self._position_message_outline(idx)
-                    # Enforce once more after any deferred internal scrolling
-                    QtCore.QTimer.singleShot(0, lambda: (
-                        self._enforce_anchor_position(idx),
-                        self._position_message_outline(idx)
-                    ))
-                except Exception:
-                    pass
-                break
-            bi += 1; b = b.next()
+                ))
+            except Exception:
+                pass
         # Announce header: "Message from {author} at {time}"
         try:
-            mid = self.block_msg_ids[idx]
-            ui = next((m for m in self.bridge.ui_messages.get(self.current_thread_id, []) if m.id == mid), None)
+            ui = self.msg_model.ui_at(idx)
             if ui:
-                # Detect embedded media presence
-                has_img = any(a.get("type") == "image" for a in (ui.attachments or []))
-                has_vid = any(a.get("type") == "video" for a in (ui.attachments or []))
-                extra = ""
-                if has_img and has_vid:
-                    extra = " with embedded media"
-                elif has_vid:
-                    extra = " with embedded video"
-                elif has_img:
-                    extra = " with embedded image"
-                self._speak(f"Message from {ui.author} at {self._fmt_12h(ui.ts)}{extra}")
+                # forms.media: " with embedded image/video/media" when it has any
+                f = ui.forms
+                self._speak(f"Message from {f.author_tts} at {self._fmt_12h(ui.ts)}{f.media}", sanitized=True)
         except Exception:
             pass
 
@@ -2381,26 +2954,17 @@ class BenDiscordUI(QtWidgets.QMainWindow):
 
     def _position_message_outline(self, idx: int):
         try:
-            doc = self.view_msgs.document()
-            dl = doc.documentLayout()
-            if not dl:
+            index = self.msg_model.index(idx)
+            if not index.isValid():
                 self._msg_outline.hide(); return
-            # Find target block
-            b = doc.begin(); bi = 0
-            while b.isValid() and bi < idx:
-                b = b.next(); bi += 1
-            if not b.isValid():
+            # Card rect of the row in viewport coords
+            r = self.view_msgs.visualRect(index)
+            if r.isEmpty():
                 self._msg_outline.hide(); return
-            br = dl.blockBoundingRect(b)  # QRectF in document coords
-            # Map to viewport coords using scroll offsets
-            vx = -self.view_msgs.horizontalScrollBar().value()
-            vy = -self.view_msgs.verticalScrollBar().value()
-            x = int(br.left() + vx)
-            y = int(br.top() + vy)
-            w = int(br.width())
-            h = int(br.height())
-
-            # Expand outline slightly OUTSIDE the block so it doesn't intersect text
+            m = MessageDelegate.MARGIN_V
+            x, y, w, h = r.x(), r.y() + m, r.width(), r.height() - 2 * m
+
+            # Expand outline slightly OUTSIDE the card so it doesn't intersect text
             expand = 8  # px outside
             x -= expand; y -= expand; w += expand*2; h += expand*2
 
@@ -2419,22 +2983,12 @@ class BenDiscordUI(QtWidgets.QMainWindow):
             self._msg_outline.hide()
 
     def _current_block_viewport_top(self, idx: int) -> Optional[int]:
-        """Return the top Y of the given text block in viewport coordinates."""
+        """Return the top Y of the given message row in viewport coordinates."""
         try:
-            doc = self.view_msgs.document()
-            dl = doc.documentLayout()
-            if not dl:
-                return None
-            # Find target block
-            b = doc.begin(); bi = 0
-            while b.isValid() and bi < idx:
-                b = b.next(); bi += 1
-            if not b.isValid():
+            index = self.msg_model.index(idx)
+            if not index.isValid():
                 return None
-            br = dl.blockBoundingRect(b)  # QRectF in document coords
-            # Map to viewport Y using scroll offset
-            vy = -self.view_msgs.verticalScrollBar().value()
-            return int(br.top() + vy)
+            return self.view_msgs.visualRect(index).top()
         except Exception:
             return None
 
@@ -2492,14 +3046,10 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         # keep the actions overlay anchored as well
         if hasattr(self, "_act_overlay") and self._act_overlay.isVisible():
             self._reposition_actions_overlay()
-        # NEW: extend DM history when user scrolls to top
+        # Extend history when the user scrolls to the top
         try:
-            if self.current_thread_id.startswith("dm:"):
-                sb = self.view_msgs.verticalScrollBar()
-                if sb.value() <= sb.minimum() + 24:
-                    have = len(self.bridge.ui_messages.get(self.current_thread_id, []) or [])
-                    batch = int(S("DM_BACKFILL_BATCH", 10))
-                    self.bridge.ensure_dm_history(self.current_thread_id, desired=have + batch)
+            if self._at_top():
+                self._backfill_older()
         except Exception:
             pass
 
@@ -2786,7 +3336,7 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         from_me = False
         try:
             mid = self._act_for_msg_id
-            ui = next((m for m in self.bridge.ui_messages.get(self.current_thread_id, []) if m.id == mid), None)
+            ui = self.bridge.get_message(self.current_thread_id, mid)
             from_me = bool(ui and ui.from_me)
         except Exception:
             pass
@@ -2895,6 +3445,9 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 pass
 
     def eventFilter(self, obj, ev):
+        # The reply keyboard does its own scanning while it is open
+        if self._keyboard_active:
+            return super().eventFilter(obj, ev)
         try:
             if ev.type() == QtCore.QEvent.KeyPress and isinstance(ev, QtGui.QKeyEvent):
                 if ev.isAutoRepeat():
@@ -2979,16 +3532,12 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         return f"{h}:{dt.minute:02d} {'AM' if dt.hour < 12 else 'PM'}"
 
     def _sanitize_tts(self, text: str) -> str:
-        if not text:
-            return ""
-        url_pat = re.compile(r'(https?://\S+|www\.\S+|\b[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\S*)')
-        s = url_pat.sub(" link ", text)
-        s = re.sub(r'\s+', ' ', s).strip()
-        return s
+        return sanitize_tts(text)
 
-    def _speak(self, text: str):
+    def _speak(self, text: str, sanitized: bool = False):
+        # sanitized=True: text is built from precomputed MessageForms TTS fields
         if hasattr(self, '_tts_worker'):
-            self._tts_worker.say.emit(self._sanitize_tts(text))
+            self._tts_worker.say.emit(text if sanitized else self._sanitize_tts(text))
 
     def _tts_stop(self):
         try:
@@ -2997,37 +3546,38 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         except Exception:
             pass
 
-    def _load_read_state(self):
-        try:
-            with open(self._read_state_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            ids = data.get("read_ids", [])
-            self.read_ids = {int(i) for i in ids if isinstance(i, (int, str))}
-            # NEW: load last seen timestamp (default 0.0 for first run)
-            try:
-                self._last_seen_ts = float(data.get("last_seen_ts", 0.0) or 0.0)
-            except Exception:
-                self._last_seen_ts = 0.0
-        except Exception:
-            self.read_ids = set()
-            # keep default last_seen_ts=0.0
-
     def _save_read_state(self):
-        try:
-            tmp = self._read_state_path + ".tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                # NEW: persist last_seen_ts alongside read_ids
-                json.dump({"read_ids": sorted(self.read_ids), "last_seen_ts": self._last_seen_ts}, f)
-            os.replace(tmp, self._read_state_path)
-        except Exception:
-            pass
-
-    def _mark_read(self, msg_id: int):
-        if msg_id not in self.read_ids:
-            self.read_ids.add(msg_id)
-            self.unread_ids.discard(msg_id)
+        # Debounced: a run of reads becomes one small write
+        if not self._read_save_timer.isActive():
+            self._read_save_timer.start()
+
+    def _mark_read(self, tid: str, msg_id: int):
+        self._clear_unread(msg_id)
+        # The watermark may only pass messages that are no longer unread, and none that are not
+        # fetched yet
+        oldest = min((m for m, t in self._unread_tid.items() if t == tid), default=None)
+        if self.read_state.mark(tid, msg_id, oldest, self.bridge.read_cap(tid)):
             self._save_read_state()
-            self._refresh_threads()
+
+    # ----- per-thread unread counters (feed ThreadListModel row updates) -----
+    def _add_unread(self, tid: str, msg_id: int) -> bool:
+        if msg_id in self.unread_ids:
+            return False
+        self.unread_ids.add(msg_id)
+        self._unread_tid[msg_id] = tid
+        n = self._unread_count.get(tid, 0) + 1
+        self._unread_count[tid] = n
+        self.thread_model.set_unread(tid, n)
+        return True
+
+    def _clear_unread(self, msg_id: int):
+        self.unread_ids.discard(msg_id)
+        tid = self._unread_tid.pop(msg_id, None)
+        if tid is None:
+            return
+        n = max(0, self._unread_count.get(tid, 0) - 1)
+        self._unread_count[tid] = n
+        self.thread_model.set_unread(tid, n)
 
     def _on_channel_ready(self, ch):
         self._refresh_threads()
@@ -3050,42 +3600,60 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         # Fast path: fetch only the most recent DM messages so the list turns green quickly
         try:
             recent = int(S("DM_INITIAL_LIMIT", 10))
-            for uid_str in list((self.bridge.dm_threads or {}).keys()):
+            # Fetches run concurrently behind the bridge's limiter; queue the most recently
+            # active threads first so their unread markers land first
+            def _last_ts(uid_str):
+                msgs = self.bridge.ui_messages.get(f"dm:{uid_str}") or []
+                return msgs[-1].ts if msgs else 0.0
+            for uid_str in sorted((self.bridge.dm_threads or {}).keys(), key=_last_ts, reverse=True):
                 tid = f"dm:{uid_str}"
                 self.bridge.fetch_recent_dm(tid, recent=recent)
         except Exception:
             pass
 
     # NEW: compute unread for messages received while app was not running
-    def _label_offline_unreads(self):
+    def _label_offline_unreads(self, only_tid: Optional[str] = None):
         try:
-            if self._last_seen_ts <= 0:
+            last_seen = self.read_state.last_seen_ts
+            if last_seen <= 0:
                 # First run or no prior session recorded; don't mark everything unread
                 return
-            for tid, msgs in (self.bridge.ui_messages or {}).items():
-                for ui in msgs:
-                    if (not ui.from_me) and (ui.id not in self.read_ids) and (ui.ts > self._last_seen_ts):
-                        self.unread_ids.add(ui.id)
-            # Refresh list and current thread to apply green coloring
-            self._refresh_threads()
-            try:
-                self._render_thread(self.current_thread_id)
-            except Exception:
-                pass
+            patch: List[int] = []
+            items = (self.bridge.ui_messages or {}).items()
+            if only_tid is not None:
+                items = [(only_tid, self.bridge.ui_messages.get(only_tid, []))]
+            for tid, msgs in items:
+                # newest first: stop at the first message older than the last session
+                for ui in reversed(msgs):
+                    if ui.ts <= last_seen:
+                        break
+                    if (not ui.from_me) and (not self.read_state.is_read(tid, ui.id)) and self._add_unread(tid, ui.id):
+                        if tid == self.current_thread_id:
+                            patch.append(ui.id)
+            # List rows were updated by the counters; recolour the visible blocks that turned unread
+            for mid in patch:
+                self._patch_message_block(mid)
         except Exception:
             pass
 
     def closeEvent(self, e):
         # NEW: record last seen time for next session before shutting down
         try:
-            self._last_seen_ts = time.time()
-            self._save_read_state()
+            self._read_save_timer.stop()
+            self.read_state.set_last_seen(time.time())
+            self.read_state.save()
         except Exception:
             pass
         try:
             self._focus_timer.stop()
+            if self._focus_guard:
+                self._focus_guard.stop()
         except:
             pass
+        try:
+            self._media_fetch.shutdown()
+        except Exception:
+            pass
         try:
             self.bridge.stop()
         except Exception:
@@ -3101,12 +3669,8 @@ class BenDiscordUI(QtWidgets.QMainWindow):
             QtWidgets.QApplication.instance().removeEventFilter(self)
         except Exception:
             pass
-
-        # Stop heartbeat and clear the lock before closing
         try:
-            if hasattr(self, "_hb_timer"):
-                self._hb_timer.stop()
-            self._clear_heartbeat()
+            self.reply_kb_page.shutdown()
         except Exception:
             pass
 
@@ -3116,34 +3680,37 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         """Speak only the message content, ignoring username/time and URLs.""" 
         try:
             mid = self._act_for_msg_id
-            ui = next((m for m in self.bridge.ui_messages.get(self.current_thread_id, []) if m.id == mid), None)
+            ui = self.bridge.get_message(self.current_thread_id, mid)
             if not ui:
                 return
-            body = self._sanitize_tts(ui.content or "")
-            self._speak(body if body else "No text")
-            self._mark_read(ui.id)
+            body = ui.forms.tts
+            self._speak(body if body else "No text", sanitized=True)
+            self._mark_read(self.current_thread_id, ui.id)
         except Exception:
             pass
 
     def _open_keyboard_and_reply(self, message_id: int):
-        txt = self._keyboard_exec_and_get_text("Reply")
-        if not txt:
-            self._speak("Canceled")
-            return
-        try:
-            self.bridge.send_reply(self.current_thread_id, int(message_id), txt)
-            self._speak("Replied")
-        except Exception:
-            self._speak("Failed to send")
+        tid = self.current_thread_id
+
+        def done(txt: Optional[str]):
+            if not txt:
+                self._speak("Canceled")
+                return
+            try:
+                self.bridge.send_reply(tid, int(message_id), txt)
+                self._speak("Replied")
+            except Exception:
+                self._speak("Failed to send")
+        self._open_keyboard("Reply", done)
 
     def _scroll_messages_to_bottom(self):
         """Reliably scroll the messages view all the way to the bottom.""" 
         try:
-            # Move cursor to end and ensure visible
-            cur = self.view_msgs.textCursor()
-            cur.movePosition(QtGui.QTextCursor.End)
-            self.view_msgs.setTextCursor(cur)
-            self.view_msgs.ensureCursorVisible()
+            # Rows only have estimated heights until painted; lay out the ones that will be on screen
+            vp = self.view_msgs.viewport()
+            if self._msg_delegate.lay_out_tail(self.msg_model, vp.width(), vp.height()):
+                self.view_msgs.doItemsLayout()
+            self.view_msgs.scrollToBottom()
             # Also force the scrollbar to its maximum (with a deferred pass)
             sb = self.view_msgs.verticalScrollBar()
             sb.setValue(sb.maximum())
@@ -3151,52 +3718,151 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         except Exception:
             pass
 
+    # One row per message; the inline HTML of each card is cached per message
+    def _message_inner_html(self, ui) -> str:
+        is_unread = ui.id in self.unread_ids
+        reacts = self.bridge.ui_reactions.get(ui.id) or []
+        key = (ui.author, ui.content, ui.ts, is_unread, ui.state,
+               tuple((r.get("emoji"), r.get("name"), r.get("url"), r.get("count")) for r in reacts))
+        hit = self._msg_html.get(ui.id)
+        if hit and hit[0] == key:
+            return hit[1]
+        forms = ui.forms
+        tm = self._fmt_12h(ui.ts)
+
+        # unread green, read white
+        text_color = "#00ff1a" if is_unread else "#e9eef5"
+
+        # Inline reactions under the message (same card)
+        reactions_html = self._reaction_badges_html(ui.id)
+        media_html = self._media_thumbs_html(ui)
+
+        # Local echo of our own message until the server has it
+        status = ""
+        if ui.state == "sending":
+            status = " <span style='color:#9aa6b8; font-weight:600;'>sending…</span>"
+        elif ui.state == "failed":
+            status = " <span style='color:#ff5c5c; font-weight:800;'>not sent</span>"
+
+        inner = (
+            f"<span style='font-weight:800; color:#e9eef5;'>{forms.author_html}</span> "
+            f"<span style='color:#cfd7e3; font-weight:600;'>({tm})</span>{status}"
+            f"<br><span style='color:{text_color};'>{forms.body_html}</span>"
+            f"{media_html}{reactions_html}"
+        )
+        self._msg_html[ui.id] = (key, inner)
+        return inner
+
     def _append_message(self, ui):
-        """Append one message as a single large block; unread text in green.""" 
+        """Append one message as a single large row; unread text in green.""" 
         # Prevent duplicate rendering of the same message in the current view
+        if self.msg_model.row_of(ui.id) >= 0:
+            return
         try:
-            if ui.id in self.block_msg_ids:
-                return
-        except Exception:
-            pass
-        try:
-            esc_author = (ui.author or "").replace("<","&lt;").replace(">","&gt;")
-            body_raw = (ui.content or "")
-            esc_body = body_raw.replace("<","&lt;").replace(">","&gt;").replace("\n","<br>")
-            if not esc_body.strip():
-                esc_body = "[no text]"
-            tm = self._fmt_12h(ui.ts)
-
-            # unread green, read white
-            is_unread = ui.id in self.unread_ids
-            text_color = "#00ff1a" if is_unread else "#e9eef5"
-
-            # Inline reactions under the message (same paragraph/block)
-            reactions_html = self._reaction_badges_html(ui.id)
-
-            html_block = (
-                "<p style='margin: 14px 0; padding: 22px 26px; border-radius: 14px; "
-                "background:#0f1521; font-size: 48px; line-height: 1.5;'>"
-                f"<span style='font-weight:800; color:#e9eef5;'>{esc_author}</span> "
-                f"<span style='color:#cfd7e3; font-weight:600;'>({tm})</span>"
-                f"<br><span style='color:{text_color};'>{esc_body}</span>"
-                f"{reactions_html}"
-                "</p>"
-            )
-            self.view_msgs.append(html_block)
-            self.block_msg_ids.append(ui.id)
+            self.msg_model.append(ui)
 
             # keep scrolled to latest only when not actively scanning messages
             try:
                 sb = self.view_msgs.verticalScrollBar()
                 if self.scan_mode != "messages":
                     if sb.value() >= sb.maximum() - 10:
+                        self.view_msgs.doItemsLayout()
                         sb.setValue(sb.maximum())
             except Exception:
                 pass
         except Exception:
             pass
 
+    def _patch_message_block(self, message_id: int) -> bool:
+        """Re-measure and repaint one message row; other rows and the scroll position stay put."""
+        row = self.msg_model.row_of(message_id)
+        if row < 0:
+            return False
+        try:
+            index = self.msg_model.index(row)
+            sb = self.view_msgs.verticalScrollBar()
+            rect = self.view_msgs.visualRect(index)
+            above = rect.bottom() < 0
+            old_val = sb.value()
+            self._msg_delegate.forget(message_id)
+            self.msg_model.refresh(row)
+            self.view_msgs.doItemsLayout()
+            # A row above the viewport that changed height would shift everything under it
+            delta = (self.view_msgs.visualRect(index).height() - rect.height()) if above else 0
+            sb.setValue(old_val + delta)
+            if self._overlay_idx >= 0:
+                self._position_message_outline(self._overlay_idx)
+            return True
+        except Exception:
+            return False
+
+    def _prepend_messages(self, uis: List["UiMessage"]):
+        """Insert older messages (chronological) above the first row; newer rows are untouched."""
+        uis = [u for u in uis if self.msg_model.row_of(u.id) < 0]
+        if not uis:
+            return
+        try:
+            sb = self.view_msgs.verticalScrollBar()
+            old_val, old_max = sb.value(), sb.maximum()
+            self.msg_model.prepend(uis)
+            self.view_msgs.doItemsLayout()
+            k = len(uis)
+            if self.msg_scan_index >= 0:
+                self.msg_scan_index += k
+            if self._overlay_idx >= 0:
+                self._overlay_idx += k
+            # Keep the same messages on screen
+            sb.setValue(old_val + (sb.maximum() - old_max))
+            if self._overlay_idx >= 0:
+                self._position_message_outline(self._overlay_idx)
+        except Exception:
+            self._render_thread(self.current_thread_id)
+
+    def _cached_media_src(self, url: str, kind: str, message_id: int) -> Optional[Tuple[str, int, int]]:
+        """(local file url, w, h) from the media cache; on a miss queue the download and remember
+        which message to re-render. Never touches the network on the UI thread."""
+        if not url:
+            return None
+        hit = self.media.lookup(url, kind)
+        if hit:
+            return QtCore.QUrl.fromLocalFile(hit[0]).toString(), hit[2], hit[3]
+        self._media_waiting.setdefault((media_key(url), kind), set()).add(message_id)
+        self._media_fetch.request(url, kind)
+        return None
+
+    def _media_thumbs_html(self, ui) -> str:
+        imgs = []
+        for a in ui.attachments or []:
+            if a.get("type") != "image":
+                continue
+            src = self._cached_media_src(a.get("url") or "", "thumb", ui.id)
+            if src:
+                imgs.append(f"<img src='{src[0]}' width='{src[1]}' height='{src[2]}'/>")
+        return ("<br>" + " ".join(imgs)) if imgs else ""
+
+    def _prefetch_media(self, uis: List["UiMessage"]):
+        # Thread switch: queue this thread's media newest first, dropping the last thread's backlog
+        items = []
+        for ui in reversed(uis):
+            for a in ui.attachments or []:
+                if a.get("type") == "image" and a.get("url"):
+                    items.append((a["url"], "thumb"))
+            for r in self.bridge.ui_reactions.get(ui.id) or []:
+                if not r.get("emoji") and r.get("url"):
+                    items.append((r["url"], "emoji"))
+        try:
+            self._media_fetch.request_many(items)
+        except Exception:
+            pass
+
+    def _on_media_ready(self, url: str, kind: str):
+        for mid in self._media_waiting.pop((media_key(url), kind), ()):
+            self._msg_html.pop(mid, None)
+            try:
+                self._patch_message_block(mid)
+            except Exception:
+                pass
+
     def _reaction_badges_html(self, message_id: int) -> str:
         """
         Build small inline chips showing reactions for a message.
@@ -3223,11 +3889,11 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 else:
                     # custom emoji (render image if we have a URL)
                     name = (r.get("name") or "emoji")
-                    url = r.get("url") or ""
-                    if url:
+                    src = self._cached_media_src(r.get("url") or "", "emoji", message_id)
+                    if src:
                         chips.append(
                             f"<span style='{chip_css}'>"
-                            f"<img src='{url}' alt='{name}' style='height:1.2em; vertical-align:middle;'/> {count}"
+                            f"<img src='{src[0]}' alt='{name}' style='height:1.2em; vertical-align:middle;'/> {count}"
                             f"</span>"
                         )
                     else:
@@ -3255,81 +3921,51 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 return "DM"
         return tid
 
-    # Launch narbe_keyboard_send.py and return captured text
-    def _keyboard_exec_and_get_text(self, title: str) -> Optional[str]:
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            kb_path = os.path.join(script_dir, "narbe_keyboard_send.py")
-            if not os.path.exists(kb_path):
-                self._speak("Keyboard not found")
-                return None
-
-            out_path = os.path.join(tempfile.gettempdir(), f"narbi_out_{int(time.time())}.json")
-
-            # Stop any ongoing TTS before handing focus away
-            self._tts_stop()
-
-            # Mark keyboard active and let it take focus
-            self._keyboard_active = True
-            if _WIN32_AVAILABLE and self._hwnd:
-                # Drop always-on-top and minimize so the keyboard can appear above
-                self._set_topmost(False)
-                try:
-                    win32gui.ShowWindow(self._hwnd, win32con.SW_MINIMIZE)
-                except Exception:
-                    pass
-
-            # pass --out as required by the script
-            p = subprocess.Popen([sys.executable, kb_path, "--out", out_path], cwd=script_dir)
-
-            # Try to give focus to the keyboard window
-            if _WIN32_AVAILABLE:
-                # small delay to allow the keyboard window to be created, then focus it
-                time.sleep(0.15)
-                self._focus_pid_window(p.pid, timeout_ms=3000)
-
-            # Block until the keyboard closes
-            p.wait()
+    # Show the in-process keyboard; on_done(text) runs on SEND, on_done(None) on CLOSE.
+    # Discord events keep flowing while it is open (nothing blocks the event loop).
+    def _open_keyboard(self, title: str, on_done):
+        if self._keyboard_active:
+            return
+        self._tts_stop()
+        # Drop any half-finished space/enter press from the main scanner
+        self._stop_space_hold()
+        try: self._enter_hold_arm.stop()
+        except Exception: pass
+        self.space_down = False
+        self.enter_down = False
+        self._kb_on_done = on_done
+        self._kb_return_page = self.stacked_widget.currentWidget()
+        self._keyboard_active = True
+        self.reply_kb_page.open(title)
+        self.stacked_widget.setCurrentWidget(self.reply_kb_page)
+        self._speak(title)
+
+    def _on_keyboard_finished(self, text: str):
+        if not self._keyboard_active:
+            return
+        self._keyboard_active = False
+        self.stacked_widget.setCurrentWidget(self._kb_return_page or self.message_view_page)
+        self._kb_return_page = None
+        # The closing Enter release must not also trigger the main scanner
+        now_ms = int(time.time() * 1000)
+        self._space_cooldown_until = self._enter_cooldown_until = now_ms + self._input_cooldown_ms
+        cb, self._kb_on_done = self._kb_on_done, None
+        if cb:
+            cb((text or "").strip() or None)
 
-            # Keyboard closed, restore our window and focus
-            self._keyboard_active = False
-            if _WIN32_AVAILABLE and self._hwnd:
-                try:
-                    win32gui.ShowWindow(self._hwnd, win32con.SW_RESTORE)
-                except Exception:
-                    pass
-                # Restore topmost and focus to our app
-                self._force_focus()
-                # Re-init TTS shortly after focus returns to fix post-keyboard silence
-                QtCore.QTimer.singleShot(150, self._reset_tts_engine)
-                # Do a second delayed reset to handle late audio device handoff
-                QtCore.QTimer.singleShot(800, self._reset_tts_engine)
+    def _open_keyboard_and_send(self):
+        tid = self.current_thread_id
 
-            if not os.path.exists(out_path):
-                return None
-            with open(out_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        def done(txt: Optional[str]):
+            if not txt:
+                self._speak("Canceled")
+                return
             try:
-                os.remove(out_path)
+                self.bridge.send_text(tid, txt)
+                self._speak("Sent")
             except Exception:
-                pass
-            txt = (data or {}).get("text", "")
-            return txt.strip() or None
-        except Exception:
-            # Ensure flag resets if anything failed
-            self._keyboard_active = False
-            return None
-
-    def _open_keyboard_and_send(self):
-        txt = self._keyboard_exec_and_get_text("Send Message")
-        if not txt:
-            self._speak("Canceled")
-            return
-        try:
-            self.bridge.send_text(self.current_thread_id, txt)
-            self._speak("Sent")
-        except Exception:
-            self._speak("Failed to send")
+                self._speak("Failed to send")
+        self._open_keyboard("Send Message", done)
 
     def _on_exit_clicked(self):
         # Launch comm-v10.py before closing
@@ -3353,36 +3989,12 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         # Then close this app
         self.close()
 
-    def _reset_tts_engine(self):
-        """Reinitialize pyttsx3 engine after external focus changes.""" 
-        try:
-            if hasattr(self, "_tts_worker") and self._tts_worker:
-                self._tts_worker.reset.emit()
-        except Exception:
-            pass
-
     def _refresh_threads(self):
-        """Rebuild the Channels & DMs list from the bridge state (unread first).""" 
-        if not hasattr(self, "list_threads"):
+        """Sync the Channels & DMs rows with the bridge (new/removed threads, labels).
+        Rows are inserted, relabelled or removed in place; unread order is kept by the model."""
+        if not hasattr(self, "thread_model"):
             return
 
-        # Preserve current selection by thread id while refreshing
-        preserve_tid = None
-        prev_row = -1
-        try:
-            it = self.list_threads.currentItem()
-            if it:
-                preserve_tid = it.data(Qt.UserRole)
-                prev_row = self.list_threads.currentRow()
-            elif self.scan_mode == "channels" and self.channel_scan_row >= 0:
-                it2 = self.list_threads.item(self.channel_scan_row)
-                if it2:
-                    preserve_tid = it2.data(Qt.UserRole)
-        except Exception:
-            preserve_tid = None
-
-        self.list_threads.clear()
-
         entries = []
 
         # main channel
@@ -3392,16 +4004,7 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 ch_name = f"#{self.bridge.main_channel.name}"
         except Exception:
             pass
-        has_unread_main = any(
-            (m.id in self.unread_ids) and (not m.from_me)
-            for m in self.bridge.ui_messages.get("main", [])
-        )
-        entries.append({
-            "tid": "main",
-            "label": ch_name,
-            "is_main": True,
-            "has_unread": has_unread_main,
-        })
+        entries.append(("main", ch_name))
 
         # DMs
         try:
@@ -3420,54 +4023,29 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 except Exception:
                     pass
 
-                tid = f"dm:{uid_str}"
                 try:
                     uid_int = int(uid_str)
                 except Exception:
                     uid_int = None
                 base = getattr(user, "global_name", None) or getattr(user, "name", "user")
                 label = self.bridge.display_for_user_id(uid_int, base) if uid_int is not None else base
-                has_unread = any(
-                    (m.id in self.unread_ids) and (not m.from_me)
-                    for m in self.bridge.ui_messages.get(tid, [])
-                )
-                entries.append({
-                    "tid": tid,
-                    "label": label,
-                    "is_main": False,
-                    "has_unread": has_unread,
-                })
+                entries.append((f"dm:{uid_str}", label))
         except Exception:
             pass
 
-        # sort: unread first, then keep main channel first among read
-        unread = [e for e in entries if e["has_unread"]]
-        read = [e for e in entries if not e["has_unread"]]
-        read.sort(key=lambda e: 0 if e["is_main"] else 1)
-        ordered = unread + read
-
-        for e in ordered:
-            it = QtWidgets.QListWidgetItem(e["label"])
-            it.setData(Qt.UserRole, e["tid"])
-            it.setData(Qt.UserRole + 1, 1 if e["has_unread"] else 0)
-            self.list_threads.addItem(it)
+        want = {tid for tid, _ in entries}
+        for tid in self.thread_model.tids():
+            if tid not in want:
+                self.thread_model.remove(tid)
+        for tid, label in entries:
+            self.thread_model.upsert(tid, label)
 
-        # Restore selection if we were scanning channels
-        if preserve_tid and self.list_threads.count() > 0:
-            try:
-                for i in range(self.list_threads.count()):
-                    it = self.list_threads.item(i)
-                    if it and it.data(Qt.UserRole) == preserve_tid:
-                        self.list_threads.setCurrentRow(i)
-                        it.setSelected(True)
-                        self.channel_scan_row = i
-                        break
-            except Exception:
-                pass
-        else:
-            # Only clear selection if not in channel scan mode
-            if self.scan_mode != "channels":
-                self.list_threads.setCurrentRow(-1)
+    def _sync_channel_scan_row(self, *args):
+        # The current index follows its row through moves; keep channel_scan_row in step
+        if self.scan_mode == "channels" and self.channel_scan_row >= 0:
+            row = self.list_threads.currentIndex().row()
+            if row >= 0:
+                self.channel_scan_row = row
 
     def _render_thread(self, tid: str):
         """Render all messages for the given thread (one paragraph per message)."""
@@ -3477,68 +4055,141 @@ class BenDiscordUI(QtWidgets.QMainWindow):
         # Optional: backfill a small DM batch on first render
         if tid.startswith("dm:") and bool(S("ENABLE_RENDER_DM_BACKFILL", False)):
             try:
-                have = len(self.bridge.ui_messages.get(tid, []) or [])
-                want = have + int(S("DM_BACKFILL_BATCH", 10))
-                self.bridge.ensure_dm_history(tid, desired=want)
+                self.bridge.load_older(tid, self._backfill_batch(tid))
             except Exception:
                 pass
 
-        # Clear view and block map
-        self.view_msgs.clear()
-        self.block_msg_ids = []
-
-        # Append existing messages in chronological order as large blocks
-        msgs_all = sorted(self.bridge.ui_messages.get(tid, []), key=lambda x: x.ts)
-        # NEW: defensively dedupe by ID before rendering
-        try:
-            uniq = []
-            _seen_local = set()
-            for _m in msgs_all:
-                if _m.id in _seen_local:
-                    continue
-                _seen_local.add(_m.id)
-                uniq.append(_m)
-            msgs_all = uniq
-        except Exception:
-            pass
+        # Replace the rows with the thread's messages in chronological order
+        msgs_all = self._thread_messages(tid)
         limit = int(S("DM_RENDER_LIMIT" if tid.startswith("dm:") else "CHANNEL_RENDER_LIMIT", 25))
         msgs = msgs_all[-limit:] if limit and len(msgs_all) > limit else msgs_all
-        for m in msgs:
-            self._append_message(m)
+        self._prefetch_media(msgs)
+        self._msg_delegate.clear()
+        self.msg_model.set_messages(msgs)
 
         # Scroll to bottom
         try:
+            self.view_msgs.doItemsLayout()
             sb = self.view_msgs.verticalScrollBar()
             sb.setValue(sb.maximum())
         except Exception:
             pass
 
+    def _thread_messages(self, tid: str) -> List["UiMessage"]:
+        # ThreadMessages is already unique and in snowflake (time) order
+        return list(self.bridge.ui_messages.get(tid, []))
+
     def _on_reactions_updated(self, thread_id: str, message_id):
-        # Re-render current thread to refresh inline reaction chips
+        # Patch only that message's inline reaction chips
         if thread_id == self.current_thread_id:
-            self._render_thread(self.current_thread_id)
+            try:
+                self._patch_message_block(int(message_id))
+            except Exception:
+                pass
+
+    def _on_message_reconciled(self, thread_id: str, old_id, new_id):
+        # A local echo got its server id: re-key its row in place (full render only if it moved)
+        self._msg_html.pop(old_id, None)
+        self._msg_delegate.forget(old_id)
+        if thread_id != self.current_thread_id:
+            return
+        if getattr(self, "_act_for_msg_id", None) == old_id:
+            self._act_for_msg_id = new_id
+        if self.msg_model.rekey(old_id, new_id):
+            self._patch_message_block(new_id)
+        elif self.msg_model.row_of(old_id) >= 0:
+            self._render_thread(thread_id)
+
+    def _on_message_removed(self, thread_id: str, message_id):
+        self._msg_html.pop(message_id, None)
+        self._msg_delegate.forget(message_id)
+        if thread_id != self.current_thread_id:
+            return
+        if getattr(self, "_act_for_msg_id", None) == message_id:
+            self._act_for_msg_id = None
+        row = self.msg_model.remove(message_id)
+        if row >= 0:
+            # Rows below moved up by one
+            if self.msg_scan_index > row:
+                self.msg_scan_index -= 1
+            if self._overlay_idx > row:
+                self._overlay_idx -= 1
+
+    def _backfill_batch(self, tid: str) -> int:
+        return max(1, int(S("DM_BACKFILL_BATCH", 10) if tid.startswith("dm:") else S("CHANNEL_BACKFILL_BATCH", 20)))
+
+    def _backfill_older(self):
+        """Show one more batch above the first row: messages already held first, and keep the
+        next page from Discord one batch ahead so it is usually in memory before it is needed."""
+        tid = self.current_thread_id
+        if not bool(S("ENABLE_SCROLL_BACKFILL", True)) or not (tid == "main" or tid.startswith("dm:")):
+            return
+        batch = self._backfill_batch(tid)
+        log = self.bridge.ui_messages.get(tid)
+        first = self.msg_model.ui_at(0)
+        short = True
+        if log is not None and first is not None and log.has(first.id):
+            older = log.older_than(first.id, batch)
+            self._prepend_messages(older)
+            short = len(older) < batch
+            first = self.msg_model.ui_at(0)
+            if len(log.older_than(first.id, batch)) >= batch:
+                return
+        if self.bridge.has_older(tid):
+            if short:
+                # The user asked for more than memory held: show the page when it lands
+                self._backfill_wanted.add(tid)
+            self.bridge.load_older(tid, batch)
+
+    def _at_top(self) -> bool:
+        try:
+            sb = self.view_msgs.verticalScrollBar()
+            return sb.value() <= sb.minimum() + 24
+        except Exception:
+            return False
+
+    def _extend_view(self, tid: str):
+        """Show newly loaded history: newer messages are appended and at most one backfill batch
+        of older ones is prepended, only when the user is at the top or a backfill asked for it (a
+        prefetch lands silently); a message landing between shown blocks falls back to a full render."""
+        wanted = tid in self._backfill_wanted
+        self._backfill_wanted.discard(tid)
+        log = self.bridge.ui_messages.get(tid)
+        first = self.msg_model.ui_at(0)
+        last = self.msg_model.ui_at(self.msg_model.rowCount() - 1)
+        if log is None or first is None or last is None or not (log.has(first.id) and log.has(last.id)):
+            self._render_thread(tid)
+            return
+        if log.rank(last.id) - log.rank(first.id) + 1 != self.msg_model.rowCount():
+            self._render_thread(tid)
+            return
+        if wanted or self._at_top():
+            self._prepend_messages(log.older_than(first.id, self._backfill_batch(tid)))
+        for m in log.newer_than(last.id):
+            self._append_message(m)
 
     def _on_history_extended(self, tid: str):
-        # When older history loads for the visible DM, re-render
+        # When history loads for the visible thread, add just the new blocks
         if tid == self.current_thread_id:
-            self._render_thread(tid)
-        # NEW: each time history is extended (for any DM), recompute offline unreads and refresh list
+            self._extend_view(tid)
+        # NEW: each time history is extended (for any DM), label that thread's offline unreads
         try:
-            self._label_offline_unreads()
+            self._label_offline_unreads(tid)
         except Exception:
             pass
 
     def _on_message_added(self, thread_id: str, ui):
         # During warm-load, don't mark unread; offline unreads are computed after warm completes.
         try:
-            if (not self._during_warmload) and (not ui.from_me) and (ui.id not in self.read_ids):
-                self.unread_ids.add(ui.id)
+            if (not self._during_warmload) and (not ui.from_me) and (not self.read_state.is_read(thread_id, ui.id)):
+                self._add_unread(thread_id, ui.id)
         except Exception:
             pass
         # Speak DMs only after warm-load suppression is lifted
         try:
             if thread_id.startswith("dm:") and not self._suppress_incoming_dm_tts:
-                self._speak(f"DM from {ui.author}: {ui.content}")
+                f = ui.forms
+                self._speak(f"DM from {f.author_tts}: {f.tts}", sanitized=True)
         except Exception:
             pass
         # If the current thread is visible, append immediately
@@ -3547,36 +4198,17 @@ class BenDiscordUI(QtWidgets.QMainWindow):
                 self._append_message(ui)
         except Exception:
             pass
-        # Update channel/DM list highlighting
-        self._refresh_threads()
+        # Channel/DM list highlighting follows the unread counter (row-level update)
 
     # Helper to force selection highlight on a given row
     def _select_list_row(self, row: int):
         try:
-            if row < 0 or row >= self.list_threads.count():
+            if row < 0 or row >= self.thread_model.rowCount():
                 return
-            # Set as current, then explicitly select this item and clear others
-            self.list_threads.setCurrentRow(row)
-            self.list_threads.blockSignals(True)
-            self.list_threads.clearSelection()
-            it = self.list_threads.item(row)
-            if it:
-                it.setSelected(True)
-            self.list_threads.blockSignals(False)
-        except Exception:
-            pass
-
-    def _write_heartbeat(self):
-        try:
-            with open(HEARTBEAT_PATH, "w", encoding="utf-8") as f:
-                f.write(str(time.time()))
-        except Exception:
-            pass
-
-    def _clear_heartbeat(self):
-        try:
-            if os.path.exists(HEARTBEAT_PATH):
-                os.remove(HEARTBEAT_PATH)
+            # Make it current and the only selected row
+            idx = self.thread_model.index(row)
+            self.list_threads.selectionModel().setCurrentIndex(idx, QtCore.QItemSelectionModel.ClearAndSelect)
+            self.list_threads.scrollTo(idx)
         except Exception:
             pass
 
@@ -3645,6 +4277,8 @@ def main():
         get_cfg("dm_bridge_channel_id", "")
     )
     dm_bridge_id = int(dm_bridge_str or 0)
+    hub_port = int(get_cfg("GATEWAY_PORT", str(GATEWAY_PORT)) or GATEWAY_PORT)
+    hub_secret = get_cfg("GATEWAY_SECRET", "").strip()
 
     # Allow dm_bridge_id to be optional
     if not token or not guild_id or not channel_id:
@@ -3652,7 +4286,7 @@ def main():
         sys.exit(1)
 
     app = QtWidgets.QApplication(sys.argv)
-    bridge = DiscordBridge(token, guild_id, channel_id, dm_bridge_id)
+    bridge = DiscordBridge(token, guild_id, channel_id, dm_bridge_id, hub_port, hub_secret=hub_secret)
     ui = BenDiscordUI(bridge)
     ui.show()
     bridge.start()
@@ -0,0 +1,263 @@
+# bridge_replay.py
+# Replays gateway traffic through the real messenger (DiscordBridge + BenDiscordUI from
+# ben_discord_app.py) against fake_discord's world, on Qt's offscreen platform, and reports:
+# - warm-load time (connect -> warm_complete)
+# - throughput and latency of gateway messages until message_added reaches the UI thread
+# - reaction bursts (reactions_updated signals per reaction event)
+# - UI-thread stalls: a 5 ms QTimer probe; any gap past its interval is time the UI could not react
+# - REST calls per endpoint and rate-limit waits (fake_discord.FakeRest)
+# - nothing touches Discord, the gateway daemon (hub_port=0), the speech engine or the app's own
+#   messages.db / name / media / read-state files (all moved to a temp dir)
+# - trace: JSON lines {"t": seconds after warm-load, "op": ..., ...}; threads are "main" or
+#   "dm:<n>" (n-th peer of the synthetic world), authors "bot" or a peer index
+#     message  {"thread", "from", "text"}        gateway MESSAGE_CREATE
+#     react    {"thread", "back", "emoji", "from"} / unreact   (back: 0 = newest message)
+#     open     {"thread"}                         switch the UI to the thread
+#     scroll_top                                  backfill one batch above the first row
+#     send     {"thread", "text"}                 Ben sends (local echo + outbound queue)
+#
+#   python bridge_replay.py --scenario mixed
+#   python bridge_replay.py --scenario storm --latency-ms 150 --rate 5
+#   python bridge_replay.py --scenario mixed --write-trace mixed.jsonl
+#   python bridge_replay.py --trace mixed.jsonl
+
+import os, sys, json, asyncio, random, tempfile, time
+from typing import Any, Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from fake_discord import FakeWorld
+
+STALL_PROBE_MS = 5
+STALL_REPORT_MS = 50       # gaps longer than this are counted as stalls
+SETTLE_SEC = 3.0           # wait for in-flight work after the last trace event
+
+# ---------- synthetic traces ----------
+def _storm(rnd: random.Random, start: float, n: int, rate: float, peers: int) -> List[Dict[str, Any]]:
+    out, t = [], start
+    for i in range(n):
+        t += rnd.expovariate(rate)
+        out.append({"t": round(t, 4), "op": "message", "thread": "main", "from": rnd.randrange(peers),
+                    "text": f"storm {i} https://example.com/{i}" if i % 7 == 0 else f"storm {i}"})
+        if i % 10 == 9:   # a burst of reactions on the newest message
+            for k in range(rnd.randint(3, 12)):
+                out.append({"t": round(t + 0.002 * k, 4), "op": "react", "thread": "main", "back": 0,
+                            "emoji": rnd.choice(["👍", "😂", "❤️"]), "from": rnd.randrange(peers)})
+    return out
+
+def scenario(name: str, peers: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    ev: List[Dict[str, Any]] = []
+    if name == "warm":
+        return ev
+    if name in ("storm", "mixed"):
+        ev += _storm(rnd, 0.5, 300, 100.0, peers)
+    if name in ("backfill", "mixed"):
+        t = ev[-1]["t"] + 0.5 if ev else 0.5
+        ev.append({"t": t, "op": "open", "thread": "main"})
+        for i in range(20):
+            ev.append({"t": round(t + 0.25 * (i + 1), 4), "op": "scroll_top"})
+    if name in ("threads", "mixed"):
+        t = ev[-1]["t"] + 0.5 if ev else 0.5
+        for i in range(min(peers, 10)):
+            th = f"dm:{i}"
+            ev.append({"t": round(t, 4), "op": "open", "thread": th})
+            ev.append({"t": round(t + 0.1, 4), "op": "message", "thread": th, "from": i, "text": f"hi from {i}"})
+            ev.append({"t": round(t + 0.3, 4), "op": "send", "thread": th, "text": f"reply {i}"})
+            t += 0.6
+        ev.append({"t": round(t, 4), "op": "open", "thread": "main"})
+    if not ev and name not in ("storm", "backfill", "threads", "mixed"):
+        raise ValueError(f"unknown scenario {name!r}")
+    return sorted(ev, key=lambda e: e["t"])
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return sorted((json.loads(line) for line in f if line.strip()), key=lambda e: float(e.get("t", 0)))
+
+def _pct(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * (len(xs) - 1)))]
+
+# ---------- replay ----------
+def replay(events: List[Dict[str, Any]], latency_ms: float = 80.0, rate: float = 50.0,
+           dms: int = 20, history: int = 200, timeout: float = 120.0) -> Dict[str, Any]:
+    try:
+        import ben_discord_app as app
+        from PySide6 import QtCore, QtWidgets
+    except Exception as e:
+        print(f"bridge_replay needs PySide6 and discord.py ({e})")
+        sys.exit(1)
+
+    tmp = tempfile.mkdtemp(prefix="bridge_replay_")
+    app.MESSAGE_DB_PATH = os.path.join(tmp, "messages.db")
+    app.NAME_CACHE_PATH = os.path.join(tmp, "name_cache.json")
+    app.MEDIA_CACHE_DIR = os.path.join(tmp, "media_cache")
+    app.pyttsx3 = None
+
+    world = FakeWorld.synthetic(dms=dms, dm_history=history, main_history=history,
+                                latency=latency_ms / 1000.0, rate=rate, burst=max(1, int(rate)))
+    qapp = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    bridge = app.DiscordBridge("fake-token", world.guild.id, world.main.id, 0, hub_port=0,
+                               client_factory=world.client)
+    bridge.dm_index_path = os.path.join(tmp, "dm_index.json")
+    ui = app.BenDiscordUI(bridge)
+    ui._read_save_timer.timeout.disconnect()
+    ui.read_state = app.ReadState(os.path.join(tmp, "read_state.json"))
+    ui._read_save_timer.timeout.connect(ui.read_state.save)
+
+    class Recorder(QtCore.QObject):
+        def __init__(self):
+            super().__init__()
+            self.t0 = time.perf_counter()
+            self.warm_at = None
+            self.added = 0
+            self.latency: List[float] = []
+            self.reaction_signals = 0
+            self.gaps: List[float] = []
+            self._last = None
+
+        @QtCore.Slot()
+        def on_warm(self):
+            if self.warm_at is None:
+                self.warm_at = time.perf_counter() - self.t0
+                schedule_trace()
+
+        @QtCore.Slot(str, object)
+        def on_added(self, _tid, msg):
+            self.added += 1
+            t = world.posted_at.get(getattr(msg, "id", None))
+            if t is not None:
+                self.latency.append(time.perf_counter() - t)
+
+        @QtCore.Slot(str, object)
+        def on_reactions(self, _tid, _mid):
+            self.reaction_signals += 1
+
+        @QtCore.Slot()
+        def probe(self):
+            now = time.perf_counter()
+            if self._last is not None:
+                self.gaps.append(max(0.0, now - self._last - STALL_PROBE_MS / 1000.0))
+            self._last = now
+
+    rec = Recorder()
+    bridge.warm_complete.connect(rec.on_warm)
+    bridge.message_added.connect(rec.on_added)
+    bridge.reactions_updated.connect(rec.on_reactions)
+    probe = QtCore.QTimer()
+    probe.setTimerType(QtCore.Qt.PreciseTimer)
+    probe.setInterval(STALL_PROBE_MS)
+    probe.timeout.connect(rec.probe)
+
+    peers = world.peers
+    injected = {"message": 0, "react": 0}
+
+    def _channel(th: str):
+        return world.main if th == "main" else world.dm_with(peers[int(th.split(":", 1)[1])])
+
+    def _tid(th: str) -> str:
+        return "main" if th == "main" else f"dm:{peers[int(th.split(':', 1)[1])].id}"
+
+    def _author(who):
+        return world.bot if who in (None, "bot") else peers[int(who) % len(peers)]
+
+    def _run(ev: Dict[str, Any]):
+        op = ev.get("op")
+        try:
+            if op == "message":
+                injected["message"] += 1
+                asyncio.run_coroutine_threadsafe(
+                    world.post(_channel(ev["thread"]), _author(ev.get("from")), ev.get("text", "")), bridge.loop)
+            elif op in ("react", "unreact"):
+                ch = _channel(ev["thread"])
+                back = int(ev.get("back", 0))
+                if back < len(ch._messages):
+                    injected["react"] += 1
+                    asyncio.run_coroutine_threadsafe(
+                        world.react(ch._messages[-1 - back], ev.get("emoji", "👍"), _author(ev.get("from")),
+                                    op == "react"), bridge.loop)
+            elif op == "open":
+                ui._select_thread_and_switch(_tid(ev["thread"]))
+            elif op == "scroll_top":
+                ui._backfill_older()
+            elif op == "send":
+                bridge.send_text(_tid(ev["thread"]), ev.get("text", ""))
+        except Exception as e:
+            print(f"[replay] {op} failed: {e}")
+
+    def schedule_trace():
+        for ev in events:
+            QtCore.QTimer.singleShot(int(1000 * float(ev.get("t", 0))), lambda ev=ev: _run(ev))
+        end = int(1000 * float(events[-1].get("t", 0))) if events else 0
+        QtCore.QTimer.singleShot(end + int(1000 * SETTLE_SEC), finish)
+
+    def finish():
+        probe.stop()
+        try:
+            bridge.stop()
+        except Exception:
+            pass
+        qapp.quit()
+
+    QtCore.QTimer.singleShot(int(1000 * timeout), finish)
+    probe.start()
+    bridge.start()
+    qapp.exec()
+
+    span = (time.perf_counter() - rec.t0) - (rec.warm_at or 0.0)
+    stalls = [g for g in rec.gaps if g * 1000 > STALL_REPORT_MS]
+    return {
+        "warm_sec": rec.warm_at,
+        "injected": injected["message"], "delivered": len(rec.latency), "message_added": rec.added,
+        "throughput": len(rec.latency) / span if span > 0 else 0.0,
+        "p50_ms": 1000 * _pct(rec.latency, 0.5), "p95_ms": 1000 * _pct(rec.latency, 0.95),
+        "reactions": injected["react"], "reaction_signals": rec.reaction_signals,
+        "stall_max_ms": 1000 * max(rec.gaps, default=0.0), "stall_p99_ms": 1000 * _pct(rec.gaps, 0.99),
+        "stalls": len(stalls),
+        "rest": dict(world.rest.calls), "rest_total": world.rest.total,
+        "rate_limited": world.rest.rate_limited, "rate_limit_wait_sec": world.rest.waited,
+    }
+
+def report(res: Dict[str, Any]):
+    warm = f"{res['warm_sec']:.2f} s" if res["warm_sec"] is not None else "not reached"
+    print(f"[replay] warm-load: {warm}")
+    print(f"[replay] gateway messages: injected={res['injected']} reached UI={res['delivered']} "
+          f"({res['throughput']:.1f}/s)   latency p50 {res['p50_ms']:.1f} ms  p95 {res['p95_ms']:.1f} ms   "
+          f"message_added total={res['message_added']}")
+    print(f"[replay] reactions: events={res['reactions']} -> reactions_updated={res['reaction_signals']}")
+    print(f"[replay] UI thread: max stall {res['stall_max_ms']:.1f} ms  p99 {res['stall_p99_ms']:.1f} ms  "
+          f"stalls > {STALL_REPORT_MS} ms: {res['stalls']}")
+    calls = "  ".join(f"{k}={v}" for k, v in sorted(res["rest"].items(), key=lambda kv: -kv[1]))
+    print(f"[replay] REST calls: {res['rest_total']}  ({calls})   rate-limit waits={res['rate_limited']} "
+          f"({res['rate_limit_wait_sec']:.2f} s)")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Replay gateway traffic through the messenger against a fake Discord")
+    ap.add_argument("--scenario", default="mixed", help="warm | storm | backfill | threads | mixed")
+    ap.add_argument("--trace", help="JSON-lines trace to replay instead of a scenario")
+    ap.add_argument("--write-trace", help="write the scenario's trace here and exit")
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--rate", type=float, default=50.0, help="REST requests per second before waits")
+    ap.add_argument("--dms", type=int, default=20)
+    ap.add_argument("--history", type=int, default=200, help="seeded messages per thread")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = ap.parse_args()
+    events = load_trace(args.trace) if args.trace else scenario(args.scenario, args.dms, args.seed)
+    if args.write_trace:
+        with open(args.write_trace, "w", encoding="utf-8") as f:
+            for ev in events:
+                f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+        print(f"[replay] wrote {len(events)} events to {args.write_trace}")
+        return
+    res = replay(events, args.latency_ms, args.rate, args.dms, args.history)
+    if args.json:
+        print(json.dumps(res, indent=2))
+    else:
+        report(res)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+# fake_discord.py
+# Local stand-in for the part of discord.py the messenger bridge uses (ben_discord_app.py)
+# - FakeWorld: one guild with a main text channel, DM peers and their histories; it also plays the
+#   gateway (post() / react() dispatch on_message / on_raw_reaction_* to every connected client)
+# - FakeClient: Client surface used by DiscordBridge (event, login/connect/start/close, get_/fetch_
+#   guild/channel/user, private_channels, cached_messages); pass world.client as the bridge's
+#   client_factory
+# - FakeTextChannel / FakeDMChannel subclass discord.TextChannel / discord.DMChannel when
+#   discord.py is installed, so the bridge's isinstance checks hold; history() pages like the API
+#   (100 messages per REST call, before= / after= cursors)
+# - FakeRest: every REST call sleeps `latency` and takes a token from a global bucket; an empty
+#   bucket waits like discord.py waits out a 429, and is counted as a rate-limit wait
+
+import asyncio, datetime, itertools, random, time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import discord
+    _TextBase, _DMBase = discord.TextChannel, discord.DMChannel
+except Exception:
+    discord = None
+    _TextBase = _DMBase = object
+
+DISCORD_EPOCH_MS = 1420070400000
+PAGE = 100   # messages per history request, as the API
+
+_seq = itertools.count(1)
+
+def snowflake(ts: Optional[float] = None) -> int:
+    ms = int((time.time() if ts is None else ts) * 1000)
+    return ((ms - DISCORD_EPOCH_MS) << 22) | (next(_seq) & 0x3FFFFF)
+
+def _cursor_id(x) -> Optional[int]:
+    if x is None:
+        return None
+    if isinstance(x, datetime.datetime):
+        return (int(x.timestamp() * 1000) - DISCORD_EPOCH_MS) << 22
+    return int(getattr(x, "id", x))
+
+class FakeRest:
+    def __init__(self, latency: float = 0.08, rate: float = 50.0, burst: int = 50):
+        self.latency = latency
+        self.rate = rate            # requests per second refilled into the bucket
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self.calls: Counter = Counter()
+        self.rate_limited = 0
+        self.waited = 0.0
+        self.active = self.peak = 0   # calls in flight, and the most at once
+
+    async def call(self, endpoint: str):
+        self.calls[endpoint] += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self._call()
+        finally:
+            self.active -= 1
+
+    async def _call(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                break
+            wait = (1 - self._tokens) / self.rate
+            self.rate_limited += 1
+            self.waited += wait
+            await asyncio.sleep(wait)
+        await asyncio.sleep(self.latency)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+# ---------- objects ----------
+class FakeUser:
+    def __init__(self, world: "FakeWorld", uid: int, name: str, bot: bool = False):
+        self._world = world
+        self.id = uid
+        self.name = name
+        self.global_name = name.title()
+        self.display_name = self.global_name
+        self.bot = bot
+        self.dm_channel: Optional["FakeDMChannel"] = None
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    async def create_dm(self) -> "FakeDMChannel":
+        await self._world.rest.call("create_dm")
+        self.dm_channel = self._world.dm_with(self)
+        return self.dm_channel
+
+    def __str__(self):
+        return self.name
+
+class FakePartialEmoji:
+    def __init__(self, name: str, eid: Optional[int] = None):
+        self.name = name
+        self.id = eid
+
+    def is_unicode_emoji(self) -> bool:
+        return self.id is None
+
+    @property
+    def url(self) -> str:
+        return f"https://cdn.discordapp.com/emojis/{self.id}.png" if self.id else ""
+
+    def __str__(self):
+        return self.name if self.id is None else f"<:{self.name}:{self.id}>"
+
+class FakeReaction:
+    def __init__(self, emoji, count: int = 1, me: bool = False):
+        self.emoji = emoji          # str for unicode, FakePartialEmoji for custom
+        self.count = count
+        self.me = me
+
+class FakeAttachment:
+    def __init__(self, url: str, filename: str, content_type: str = ""):
+        self.url = url
+        self.proxy_url = url
+        self.filename = filename
+        self.content_type = content_type
+
+class FakeRawReaction:
+    def __init__(self, message: "FakeMessage", user: FakeUser, emoji: FakePartialEmoji, added: bool):
+        self.message_id = message.id
+        self.channel_id = message.channel.id
+        guild = getattr(message.channel, "guild", None)
+        self.guild_id = guild.id if guild else None
+        self.user_id = user.id
+        self.member = user if guild else None
+        self.emoji = emoji
+        self.event_type = "REACTION_ADD" if added else "REACTION_REMOVE"
+
+class FakeMessage:
+    def __init__(self, channel, author: FakeUser, content: str, ts: Optional[float] = None,
+                 attachments: Optional[List[FakeAttachment]] = None):
+        ts = time.time() if ts is None else ts
+        self.id = snowflake(ts)
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.created_at = datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc)
+        self.attachments = list(attachments or [])
+        self.embeds: List[Any] = []
+        self.reactions: List[FakeReaction] = []
+        self.mentions: List[FakeUser] = []
+        self.guild = getattr(channel, "guild", None)
+
+    def _reaction(self, emoji) -> Optional[FakeReaction]:
+        key = str(emoji)
+        return next((r for r in self.reactions if str(r.emoji) == key), None)
+
+    async def add_reaction(self, emoji):
+        world = self.channel._world
+        await world.rest.call("add_reaction")
+        await world.react(self, emoji, world.bot, True)
+
+    async def remove_reaction(self, emoji, member):
+        world = self.channel._world
+        await world.rest.call("remove_reaction")
+        await world.react(self, emoji, member, False)
+
+class _History:
+    # Shared by both channel kinds; messages are kept in id order
+    def _init_history(self, world: "FakeWorld"):
+        self._world = world
+        self._messages: List[FakeMessage] = []
+        self._by_id: Dict[int, FakeMessage] = {}
+
+    def _add(self, m: FakeMessage):
+        self._messages.append(m)
+        self._by_id[m.id] = m
+        if len(self._messages) > 1 and self._messages[-2].id > m.id:
+            self._messages.sort(key=lambda x: x.id)
+
+    async def history(self, *, limit: Optional[int] = 100, before=None, after=None, around=None,
+                      oldest_first: Optional[bool] = None):
+        lo, hi = _cursor_id(after), _cursor_id(before)
+        if oldest_first is None:
+            oldest_first = lo is not None
+        sel = [m for m in self._messages if (lo is None or m.id > lo) and (hi is None or m.id < hi)]
+        if limit is not None:
+            sel = sel[:limit] if oldest_first else sel[-limit:]
+        if not oldest_first:
+            sel.reverse()
+        for i in range(0, max(1, len(sel)), PAGE):
+            await self._world.rest.call("history")
+            for m in sel[i:i + PAGE]:
+                yield m
+
+    async def fetch_message(self, mid: int) -> FakeMessage:
+        await self._world.rest.call("fetch_message")
+        m = self._by_id.get(int(mid))
+        if m is None:
+            raise LookupError(f"Unknown Message {mid}")
+        return m
+
+    async def send(self, content: str = None, **_kw) -> FakeMessage:
+        await self._world.rest.call("send")
+        return await self._world.post(self, self._world.bot, content or "", traced=False)
+
+class FakeTextChannel(_History, _TextBase):
+    id = property(lambda self: self._fid)
+    name = property(lambda self: self._fname)
+    guild = property(lambda self: self._fguild)
+
+    def __init__(self, world: "FakeWorld", cid: int, name: str, guild: "FakeGuild"):
+        self._fid, self._fname, self._fguild = cid, name, guild
+        self._init_history(world)
+
+    def __repr__(self):
+        return f"<FakeTextChannel id={self.id} name={self.name!r}>"
+
+class FakeDMChannel(_History, _DMBase):
+    id = property(lambda self: self._fid)
+    recipient = property(lambda self: self._fpeer)
+    recipients = property(lambda self: [self._fpeer])
+    me = property(lambda self: self._world.bot)
+    guild = None
+
+    def __init__(self, world: "FakeWorld", cid: int, peer: FakeUser):
+        self._fid, self._fpeer = cid, peer
+        self._init_history(world)
+
+    def __repr__(self):
+        return f"<FakeDMChannel id={self.id} recipient={self.recipient}>"
+
+class FakeGuild:
+    def __init__(self, world: "FakeWorld", gid: int, name: str):
+        self._world = world
+        self.id = gid
+        self.name = name
+        self.channels: Dict[int, FakeTextChannel] = {}
+        self.members: Dict[int, FakeUser] = {}
+
+    def get_channel(self, cid: int):
+        return self.channels.get(int(cid))
+
+    def get_member(self, uid: int) -> Optional[FakeUser]:
+        return self.members.get(int(uid)) if self._world.member_cache else None
+
+    async def fetch_member(self, uid: int) -> FakeUser:
+        await self._world.rest.call("fetch_member")
+        m = self.members.get(int(uid))
+        if m is None:
+            raise LookupError(f"Unknown Member {uid}")
+        return m
+
+# ---------- client ----------
+class FakeClient:
+    def __init__(self, world: "FakeWorld", intents=None, **_kw):
+        self._world = world
+        self.intents = intents
+        self._handlers: Dict[str, Callable] = {}
+        self._closed = asyncio.Event()
+        self._ready = False
+        self.user: Optional[FakeUser] = None
+
+    def event(self, coro):
+        self._handlers[coro.__name__] = coro
+        return coro
+
+    def dispatch(self, event: str, *args):
+        # discord.py runs every handler as its own task
+        h = self._handlers.get(f"on_{event}")
+        if h is not None and self._ready:
+            asyncio.get_running_loop().create_task(h(*args))
+
+    async def login(self, token: str):
+        await self._world.rest.call("login")
+        self.user = self._world.bot
+
+    async def connect(self, *, reconnect: bool = True):
+        await asyncio.sleep(self._world.rest.latency)   # identify / READY
+        self._ready = True
+        self._world.clients.append(self)
+        self.dispatch("ready")
+        await self._closed.wait()
+
+    async def start(self, token: str, *, reconnect: bool = True):
+        await self.login(token)
+        await self.connect(reconnect=reconnect)
+
+    async def close(self):
+        self._ready = False
+        if self in self._world.clients:
+            self._world.clients.remove(self)
+        self._closed.set()
+
+    def is_closed(self) -> bool:
+        return self._closed.is_set()
+
+    # caches (filled once READY)
+    def get_guild(self, gid: int):
+        g = self._world.guild
+        return g if self._ready and g.id == int(gid) else None
+
+    def get_channel(self, cid: int):
+        return self._world.channels.get(int(cid)) if self._ready else None
+
+    def get_user(self, uid: int):
+        return self._world.users.get(int(uid)) if self._ready else None
+
+    @property
+    def private_channels(self) -> List[FakeDMChannel]:
+        return list(self._world.dms.values()) if self._ready else []
+
+    @property
+    def cached_messages(self) -> List[FakeMessage]:
+        return []
+
+    # REST
+    async def fetch_guild(self, gid: int):
+        await self._world.rest.call("fetch_guild")
+        if self._world.guild.id != int(gid):
+            raise LookupError(f"Unknown Guild {gid}")
+        return self._world.guild
+
+    async def fetch_channel(self, cid: int):
+        await self._world.rest.call("fetch_channel")
+        ch = self._world.channels.get(int(cid))
+        if ch is None:
+            raise LookupError(f"Unknown Channel {cid}")
+        return ch
+
+    async def fetch_user(self, uid: int):
+        await self._world.rest.call("fetch_user")
+        u = self._world.users.get(int(uid))
+        if u is None:
+            raise LookupError(f"Unknown User {uid}")
+        return u
+
+# ---------- world ----------
+class FakeWorld:
+    def __init__(self, latency: float = 0.08, rate: float = 50.0, burst: int = 50, member_cache: bool = False):
+        self.rest = FakeRest(latency, rate, burst)
+        self.member_cache = member_cache   # members intent off in the app: get_member() misses
+        self.users: Dict[int, FakeUser] = {}
+        self.channels: Dict[int, Any] = {}
+        self.dms: Dict[int, FakeDMChannel] = {}   # peer id -> channel
+        self.clients: List[FakeClient] = []
+        self.posted_at: Dict[int, float] = {}     # message id -> perf_counter() when posted
+        self.bot = self.add_user("ben-bot", bot=True)
+        self.guild = FakeGuild(self, snowflake(), "Ben's server")
+        self.main = self.add_text_channel("general")
+
+    def client(self, intents=None, **kw) -> FakeClient:
+        """client_factory for DiscordBridge."""
+        return FakeClient(self, intents, **kw)
+
+    def add_user(self, name: str, bot: bool = False, member: bool = True) -> FakeUser:
+        u = FakeUser(self, snowflake(), name, bot)
+        self.users[u.id] = u
+        if member and not bot and getattr(self, "guild", None):
+            self.guild.members[u.id] = u
+        return u
+
+    def add_text_channel(self, name: str) -> FakeTextChannel:
+        ch = FakeTextChannel(self, snowflake(), name, self.guild)
+        self.channels[ch.id] = self.guild.channels[ch.id] = ch
+        return ch
+
+    def dm_with(self, user: FakeUser) -> FakeDMChannel:
+        ch = self.dms.get(user.id)
+        if ch is None:
+            ch = self.dms[user.id] = FakeDMChannel(self, snowflake(), user)
+            self.channels[ch.id] = ch
+            user.dm_channel = ch
+        return ch
+
+    def seed_history(self, channel, authors: List[FakeUser], n: int, until: Optional[float] = None,
+                     step: float = 60.0, seed: int = 1):
+        """n past messages (no REST, no events), the newest `step` seconds before `until`."""
+        rnd = random.Random(seed)
+        until = time.time() if until is None else until
+        words = ["hey", "ok", "see", "you", "later", "lol", "check", "this", "out", "tomorrow"]
+        for i in range(n, 0, -1):
+            a = authors[rnd.randrange(len(authors))]
+            body = " ".join(rnd.choice(words) for _ in range(rnd.randint(2, 14)))
+            atts = ([FakeAttachment(f"https://cdn.discordapp.com/attachments/{channel.id}/{i}/img.png",
+                                    "img.png", "image/png")] if rnd.random() < 0.05 else [])
+            channel._add(FakeMessage(channel, a, body, until - i * step, atts))
+
+    # gateway
+    async def post(self, channel, author: FakeUser, content: str,
+                   attachments: Optional[List[FakeAttachment]] = None, traced: bool = True) -> FakeMessage:
+        """MESSAGE_CREATE: store the message and dispatch on_message. posted_at times only traced
+        (injected) messages, not the bot's own sends."""
+        m = FakeMessage(channel, author, content, attachments=attachments)
+        channel._add(m)
+        if traced:
+            self.posted_at[m.id] = time.perf_counter()
+        for c in list(self.clients):
+            c.dispatch("message", m)
+        return m
+
+    async def react(self, message: FakeMessage, emoji, user: FakeUser, added: bool = True):
+        """MESSAGE_REACTION_ADD / _REMOVE: update the counts and dispatch the raw event."""
+        pe = emoji if isinstance(emoji, FakePartialEmoji) else FakePartialEmoji(str(emoji))
+        key = pe.name if pe.id is None else pe
+        r = message._reaction(key)
+        if added:
+            if r is None:
+                message.reactions.append(FakeReaction(key, 1, user is self.bot))
+            else:
+                r.count += 1
+                r.me = r.me or user is self.bot
+        else:
+            if r is None:
+                return
+            r.count -= 1
+            if user is self.bot:
+                r.me = False
+            if r.count <= 0:
+                message.reactions.remove(r)
+        payload = FakeRawReaction(message, user, pe, added)
+        for c in list(self.clients):
+            c.dispatch("raw_reaction_add" if added else "raw_reaction_remove", payload)
+
+    @classmethod
+    def synthetic(cls, dms: int = 20, dm_history: int = 200, main_history: int = 200,
+                  members: int = 30, **kw) -> "FakeWorld":
+        w = cls(**kw)
+        people = [w.add_user(f"user{i}") for i in range(max(members, dms))]
+        w.seed_history(w.main, people[:members] + [w.bot], main_history)
+        for i, u in enumerate(people[:dms]):
+            w.seed_history(w.dm_with(u), [u, w.bot], dm_history, seed=i + 2)
+        w.peers = people[:dms]
+        return w
@@ -0,0 +1,302 @@
+# gateway_hub.py
+# Local event hub between the gateway daemon (simple_dm_listener.py) and the messenger UI
+# (ben_discord_app.py), so only one Discord gateway session runs per machine
+# - GatewayHub (daemon side): loopback TCP server, newline-delimited JSON; every attached client
+#   gets every published event; attached() reflects live sockets, so "is the UI open" is known the
+#   moment a client connects or its socket closes (no heartbeat file, no polling)
+# - HubClient (UI side): attaches with a role ("ui"), delivers events on the caller's asyncio
+#   loop and re-attaches in the background if the daemon restarts
+# - handshake: both ends prove they hold the same key (hub_key: config GATEWAY_SECRET, else derived
+#   from the bot token) with an HMAC over the other side's nonce; the key itself never crosses the
+#   socket, so another local process can neither read events nor pose as the daemon
+# - message payload helpers shared by both processes, so rows look the same either way
+#
+# Handshake, one JSON object per line:
+#   daemon -> client  {"op": "challenge", "nonce": <hex>}
+#   client -> daemon  {"op": "hello", "role": "ui", "nonce": <hex>, "proof": hmac(key, "client" + daemon nonce)}
+#   daemon -> client  {"op": "hello", "user_id": <bot id>, "proof": hmac(key, "hub" + client nonce)}
+# A client whose proof does not match is disconnected before it is counted as attached.
+#
+# Events (daemon -> clients), one JSON object per line:
+#   {"op": "message", "thread": "main" | "dm:<uid>", "row": {UiMessage fields}, "reactions": [...],
+#    "peer": {"id": <uid>, "name": "..."} (DMs only)}
+#   {"op": "reactions", "thread": ..., "id": <message id>, "reactions": [...], "spoken": "..." | null}
+
+import asyncio, hashlib, hmac, json, secrets
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+GATEWAY_HOST = "127.0.0.1"
+GATEWAY_PORT = 47651          # config.json GATEWAY_PORT overrides
+HELLO_TIMEOUT_SEC = 5.0
+RETRY_SEC = 2.0               # HubClient re-attach interval after the daemon goes away
+MAX_CLIENT_BUFFER = 1 << 20   # a client this far behind is dropped instead of buffering forever
+
+def _line(event: Dict[str, Any]) -> bytes:
+    return (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def hub_key(token: str, secret: str = "") -> bytes:
+    """Shared handshake key: GATEWAY_SECRET when configured, else derived from the bot token
+    (both processes read it from config.json, and whoever holds it can read the DMs anyway)."""
+    if secret:
+        return hashlib.sha256(secret.encode("utf-8")).digest()
+    return hmac.new(token.encode("utf-8"), b"ben-gateway-hub", hashlib.sha256).digest()
+
+def _proof(key: bytes, side: str, nonce: str) -> str:
+    return hmac.new(key, (side + nonce).encode("utf-8"), hashlib.sha256).hexdigest()
+
+def _proof_ok(key: bytes, side: str, nonce: str, proof: Any) -> bool:
+    return isinstance(proof, str) and hmac.compare_digest(_proof(key, side, nonce), proof)
+
+class GatewayHub:
+    """Create and start() on the daemon's event loop; publish() never awaits."""
+
+    def __init__(self, host: str = GATEWAY_HOST, port: int = GATEWAY_PORT,
+                 on_change: Optional[Callable[[Dict[str, int]], None]] = None, key: bytes = b""):
+        self.host = host
+        self.port = int(port)
+        self.key = key
+        self.on_change = on_change           # called with {role: count} on every attach/detach
+        self.welcome: Dict[str, Any] = {}    # merged into the hello each client receives
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.StreamWriter, str] = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def close(self):
+        for w in list(self._clients):
+            try:
+                w.close()
+            except Exception:
+                pass
+        self._clients.clear()
+        if self._server:
+            self._server.close()
+            try:
+                await self._server.wait_closed()
+            except Exception:
+                pass
+            self._server = None
+
+    def roles(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for role in self._clients.values():
+            out[role] = out.get(role, 0) + 1
+        return out
+
+    def attached(self, role: str = "ui") -> bool:
+        return role in self._clients.values()
+
+    def publish(self, event: Dict[str, Any]):
+        if not self._clients:
+            return
+        data = _line(event)
+        for w in list(self._clients):
+            try:
+                if w.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                    w.close()
+                    continue
+                w.write(data)
+            except Exception:
+                pass
+
+    def _changed(self):
+        if self.on_change:
+            try:
+                self.on_change(self.roles())
+            except Exception:
+                pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        nonce = secrets.token_hex(16)
+        try:
+            writer.write(_line({"op": "challenge", "nonce": nonce}))
+            hello = json.loads(await asyncio.wait_for(reader.readline(), HELLO_TIMEOUT_SEC) or b"{}")
+            if hello.get("op") != "hello" or not _proof_ok(self.key, "client", nonce, hello.get("proof")):
+                raise ValueError("bad handshake")
+            role = str(hello.get("role") or "ui")
+            theirs = str(hello.get("nonce") or "")
+        except Exception:
+            writer.close()
+            return
+        self._clients[writer] = role
+        self._changed()
+        try:
+            writer.write(_line(dict(self.welcome, op="hello", proof=_proof(self.key, "hub", theirs))))
+            # Clients only ever talk once; EOF here means the client is gone
+            while await reader.readline():
+                pass
+        except Exception:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            self._changed()
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+class HubClient:
+    """Create on the consumer's asyncio loop; on_event(event) runs there."""
+
+    def __init__(self, on_event: Callable[[Dict[str, Any]], None], role: str = "ui",
+                 host: str = GATEWAY_HOST, port: int = GATEWAY_PORT, key: bytes = b""):
+        self.on_event = on_event
+        self.role = role
+        self.host = host
+        self.port = int(port)
+        self.key = key
+        self.welcome: Dict[str, Any] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._closing = False
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def connect(self, timeout: float = 1.0) -> bool:
+        """One attempt; True once the daemon answered the hello with a valid proof."""
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+            challenge = json.loads(await asyncio.wait_for(reader.readline(), timeout) or b"{}")
+            if challenge.get("op") != "challenge":
+                raise ValueError("not a gateway hub")
+            nonce = secrets.token_hex(16)
+            writer.write(_line({"op": "hello", "role": self.role, "nonce": nonce,
+                                "proof": _proof(self.key, "client", str(challenge.get("nonce") or ""))}))
+            welcome = json.loads(await asyncio.wait_for(reader.readline(), timeout) or b"{}")
+            if welcome.get("op") != "hello" or not _proof_ok(self.key, "hub", nonce, welcome.pop("proof", None)):
+                raise ValueError("bad handshake")
+        except Exception:
+            if writer is not None:
+                writer.close()
+            return False
+        self.welcome = welcome
+        self._reader, self._writer = reader, writer
+        return True
+
+    async def run(self, on_closed: Optional[Callable[[], Awaitable[None]]] = None,
+                  on_reattached: Optional[Callable[[], Awaitable[None]]] = None):
+        """Deliver events until close(). After each disconnect on_closed() is awaited and the
+        client keeps re-attaching every RETRY_SEC; each later attach awaits on_reattached()."""
+        while not self._closing:
+            if not self.connected:
+                if not await self.connect():
+                    await asyncio.sleep(RETRY_SEC)
+                    continue
+                if on_reattached and not self._closing:
+                    try:
+                        await on_reattached()
+                    except Exception:
+                        pass
+            try:
+                while True:
+                    raw = await self._reader.readline()
+                    if not raw:
+                        break
+                    try:
+                        self.on_event(json.loads(raw))
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+            self._drop()
+            if on_closed and not self._closing:
+                try:
+                    await on_closed()
+                except Exception:
+                    pass
+
+    def _drop(self):
+        try:
+            if self._writer:
+                self._writer.close()
+        except Exception:
+            pass
+        self._reader = self._writer = None
+
+    def close(self):
+        self._closing = True
+        self._drop()
+
+# ---------- message payloads (shared by daemon and UI) ----------
+_IMAGE_EXT = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".avif", ".tif", ".tiff")
+_VIDEO_EXT = (".mp4", ".mov", ".m4v", ".webm", ".avi", ".mkv", ".3gp", ".mpg", ".mpeg")
+_EMOJI_NAMES = {"👍": "thumbs up", "👎": "thumbs down", "❤️": "heart", "😂": "laughing face"}
+
+def emoji_spoken_name(emoji_obj) -> str:
+    try:
+        if isinstance(emoji_obj, str):
+            return _EMOJI_NAMES.get(emoji_obj, "emoji")
+        nm = getattr(emoji_obj, "name", None)
+        return (nm or "emoji").replace("_", " ")
+    except Exception:
+        return "emoji"
+
+def reaction_row(emoji_obj, count: int = 1, me: bool = False) -> Dict[str, Any]:
+    """One UI reaction {emoji, name, url, count, me}; emoji_obj is a str, Emoji or PartialEmoji."""
+    if not isinstance(emoji_obj, str):
+        try:
+            if emoji_obj.is_unicode_emoji():
+                emoji_obj = emoji_obj.name
+        except Exception:
+            pass
+    if isinstance(emoji_obj, str):
+        return {"emoji": emoji_obj, "name": emoji_spoken_name(emoji_obj), "url": None, "count": count, "me": me}
+    try:
+        url = str(getattr(emoji_obj, "url", None) or "") or None
+    except Exception:
+        url = None
+    return {"emoji": None, "name": emoji_spoken_name(emoji_obj), "url": url, "count": count, "me": me}
+
+def reaction_rows(m) -> List[Dict[str, Any]]:
+    """UI reaction list from a discord.Message."""
+    out: List[Dict[str, Any]] = []
+    try:
+        for r in getattr(m, "reactions", []) or []:
+            out.append(reaction_row(r.emoji, int(getattr(r, "count", 1) or 1), bool(getattr(r, "me", False))))
+    except Exception:
+        pass
+    return out
+
+def attachment_rows(m) -> List[Dict[str, Any]]:
+    """Attachments plus image/video embeds as {type, url, filename}."""
+    out: List[Dict[str, Any]] = []
+    try:
+        for a in getattr(m, "attachments", []) or []:
+            url = getattr(a, "url", None) or getattr(a, "proxy_url", None) or ""
+            fn = getattr(a, "filename", "") or ""
+            ctype = (getattr(a, "content_type", None) or "").lower()
+            typ = "other"
+            if ctype.startswith("image/") or fn.lower().endswith(_IMAGE_EXT):
+                typ = "image"
+            elif ctype.startswith("video/") or fn.lower().endswith(_VIDEO_EXT):
+                typ = "video"
+            out.append({"type": typ, "url": url, "filename": fn})
+    except Exception:
+        pass
+    try:
+        for emb in getattr(m, "embeds", []) or []:
+            img_url = None
+            try:
+                if getattr(emb, "image", None):
+                    img_url = getattr(emb.image, "url", None)
+                if not img_url and getattr(emb, "thumbnail", None):
+                    img_url = getattr(emb.thumbnail, "url", None)
+            except Exception:
+                img_url = None
+            if img_url:
+                out.append({"type": "image", "url": img_url, "filename": "embedded-image"})
+            vid_url = None
+            try:
+                if getattr(emb, "video", None):
+                    vid_url = getattr(emb.video, "url", None)
+            except Exception:
+                vid_url = None
+            if vid_url:
+                out.append({"type": "video", "url": vid_url, "filename": "embedded-video"})
+    except Exception:
+        pass
+    return out
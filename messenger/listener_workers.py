@@ -0,0 +1,102 @@
+# listener_workers.py
+# Background workers for simple_dm_listener.py so discord.py's event loop never blocks
+# - SpeechExecutor: one thread owns the pyttsx3 engine (say + runAndWait happen there); pending
+#   lines are keyed by user and coalesce (latest line per user wins), so a burst from many users
+#   still speaks once for each of them
+# - BackgroundWriter: file writes (dm_index.json, name_cache.json, messages.db) run on one writer
+#   thread; writes with the same key coalesce, so a burst of DMs costs one write per file
+
+import threading, time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+class SpeechExecutor:
+    def __init__(self, speak: Callable[[str], None]):
+        self._speak = speak                # blocking; only ever called on the worker thread
+        self._pending: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._cv = threading.Condition()
+        self._stopping = False
+        self.coalesced = 0                 # lines replaced by a newer one from the same user
+        self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, line: str):
+        """Queue `line` for `key` (e.g. a user id); never blocks the caller. One line per key is
+        pending at a time: a newer line replaces it in place, and no other key is ever dropped."""
+        if not line:
+            return
+        with self._cv:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = line
+            self._cv.notify()
+
+    def pending(self) -> int:
+        with self._cv:
+            return len(self._pending)
+
+    def stop(self):
+        with self._cv:
+            self._stopping = True
+            self._pending.clear()
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._pending and not self._stopping:
+                    self._cv.wait()
+                if self._stopping:
+                    return
+                _key, line = self._pending.popitem(last=False)
+            try:
+                self._speak(line)
+            except Exception:
+                pass
+
+class BackgroundWriter:
+    def __init__(self):
+        self._jobs: "OrderedDict[Hashable, Callable[[], None]]" = OrderedDict()
+        self._cv = threading.Condition()
+        self._stopping = False
+        self._busy = False                 # a job popped from _jobs is still running
+        self._thread = threading.Thread(target=self._run, name="writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, job: Callable[[], None]):
+        """Run `job` on the writer thread; a queued job with the same key is replaced."""
+        with self._cv:
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._cv.notify()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every submitted job, including the one running now, has finished."""
+        deadline = time.monotonic() + timeout
+        with self._cv:
+            while (self._jobs or self._busy) and time.monotonic() < deadline:
+                self._cv.wait(0.05)
+            return not (self._jobs or self._busy)
+
+    def stop(self):
+        self.flush()
+        with self._cv:
+            self._stopping = True
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._jobs and not self._stopping:
+                    self._cv.wait()
+                if not self._jobs and self._stopping:
+                    return
+                _key, job = self._jobs.popitem(last=False)
+                self._busy = True
+            try:
+                job()
+            except Exception:
+                pass
+            with self._cv:
+                self._busy = False
+                self._cv.notify_all()
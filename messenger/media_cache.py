@@ -0,0 +1,218 @@
+# media_cache.py
+# Local cache for messenger media (ben_discord_app.py): attachment images and custom emoji
+# - one file per (url, kind) under media_cache/; on Discord's CDN hosts the key ignores the link
+#   signature (?ex=..&is=..&hm=..), so re-signed links still hit the same entry; any other query
+#   (Discord's width/height/format, or another host's) is part of the key
+# - kinds: "orig" (the downloaded file), "thumb" (downscaled once to THUMB_MAX_PX, png),
+#   "emoji" (downscaled to EMOJI_PX); thumb/emoji reuse a cached "orig" instead of downloading
+# - size-bounded LRU over the whole directory (MEDIA_CACHE_MAX_MB); access order survives a
+#   restart through file mtimes
+# - MediaPrefetcher: worker threads fill the cache; a new batch (thread switch) drops the jobs
+#   that have not started, in-flight urls are never fetched twice, on_ready runs on the worker
+# - thumbnails need PySide6 (QImage); without it only "orig" is cached
+
+import os, hashlib, threading, urllib.parse, urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    from PySide6 import QtCore, QtGui
+    _QT_IMAGE = True
+except Exception:
+    _QT_IMAGE = False
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MEDIA_CACHE_DIR = os.path.join(APP_DIR, "media_cache")
+MEDIA_CACHE_MAX_MB = 256
+THUMB_MAX_PX = 480            # longest side of an attachment thumbnail
+EMOJI_PX = 64                 # custom emoji chips
+MEDIA_FETCH_WORKERS = 4
+MEDIA_FETCH_TIMEOUT_SEC = 20
+MEDIA_FETCH_MAX_BYTES = 25 * 1024 * 1024   # Discord's upload limit; anything bigger is skipped
+
+Entry = Tuple[str, int, int, int]   # file path, bytes, width, height (0 when unknown)
+
+DISCORD_CDN_HOSTS = ("cdn.discordapp.com", "media.discordapp.net")
+DISCORD_SIGNATURE_PARAMS = ("ex", "is", "hm")
+
+def media_key(url: str) -> str:
+    p = urllib.parse.urlsplit(url or "")
+    host = p.netloc.lower()
+    query = p.query
+    if host in DISCORD_CDN_HOSTS:
+        kept = [(k, v) for k, v in urllib.parse.parse_qsl(query, keep_blank_values=True)
+                if k not in DISCORD_SIGNATURE_PARAMS]
+        query = urllib.parse.urlencode(sorted(kept))
+    return hashlib.sha1(f"{host}{p.path}?{query}".encode("utf-8")).hexdigest()
+
+def _http_get(url: str) -> bytes:
+    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (ben-messenger)"})
+    with urllib.request.urlopen(req, timeout=MEDIA_FETCH_TIMEOUT_SEC) as resp:
+        data = resp.read(MEDIA_FETCH_MAX_BYTES + 1)
+    if len(data) > MEDIA_FETCH_MAX_BYTES:
+        raise ValueError("media too large")
+    return data
+
+def _scaled_png(data: bytes, max_px: int) -> Optional[Tuple[bytes, int, int]]:
+    if not _QT_IMAGE:
+        return None
+    img = QtGui.QImage.fromData(data)
+    if img.isNull():
+        return None
+    if max(img.width(), img.height()) > max_px:
+        img = img.scaled(max_px, max_px, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+    buf = QtCore.QBuffer()
+    buf.open(QtCore.QIODevice.WriteOnly)
+    img.save(buf, "PNG")
+    return bytes(buf.data()), img.width(), img.height()
+
+class MediaCache:
+    """Thread-safe; lookup() never touches the network, fetch() blocks (call it off the UI thread)."""
+
+    def __init__(self, root: str = MEDIA_CACHE_DIR, max_bytes: int = MEDIA_CACHE_MAX_MB * 1024 * 1024,
+                 get: Callable[[str], bytes] = _http_get):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._get = get
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()   # "<key>.<kind>" -> entry, LRU first
+        self.total = 0
+        self.hits = self.misses = self.downloads = 0
+        try:
+            os.makedirs(root, exist_ok=True)
+        except Exception:
+            pass
+        self._scan()
+
+    def _scan(self):
+        # File name: <key>.<kind>.<w>x<h>
+        found = []
+        try:
+            for de in os.scandir(self.root):
+                parts = de.name.split(".")
+                if len(parts) != 3 or not de.is_file():
+                    continue
+                try:
+                    w, h = (int(x) for x in parts[2].split("x"))
+                    st = de.stat()
+                except Exception:
+                    continue
+                found.append((st.st_mtime, f"{parts[0]}.{parts[1]}", (de.path, st.st_size, w, h)))
+        except Exception:
+            return
+        for _mt, name, entry in sorted(found):
+            self._entries[name] = entry
+            self.total += entry[1]
+        self._evict()
+
+    def lookup(self, url: str, kind: str = "orig") -> Optional[Entry]:
+        if not url:
+            return None
+        name = f"{media_key(url)}.{kind}"
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+        try:
+            os.utime(entry[0])   # keep LRU order across restarts
+        except Exception:
+            pass
+        return entry
+
+    def fetch(self, url: str, kind: str = "orig") -> Optional[Entry]:
+        """Cached entry, downloading / downscaling on a miss; None if the media is unusable."""
+        hit = self.lookup(url, kind)
+        if hit or not url:
+            return hit
+        if kind == "orig":
+            data = self._get(url)
+            self.downloads += 1
+            return self._store(url, kind, data, 0, 0)
+        orig = self.fetch(url, "orig")
+        if orig is None:
+            return None
+        with open(orig[0], "rb") as f:
+            scaled = _scaled_png(f.read(), EMOJI_PX if kind == "emoji" else THUMB_MAX_PX)
+        if scaled is None:
+            return None
+        return self._store(url, kind, *scaled)
+
+    def _store(self, url: str, kind: str, data: bytes, w: int, h: int) -> Entry:
+        name = f"{media_key(url)}.{kind}"
+        path = os.path.join(self.root, f"{name}.{w}x{h}")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        entry = (path, len(data), w, h)
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old:
+                self.total -= old[1]
+            self._entries[name] = entry
+            self.total += entry[1]
+            self._evict()
+        return entry
+
+    def _evict(self):
+        # Caller holds the lock (or is __init__); the newest entry is never evicted
+        while self.total > self.max_bytes and len(self._entries) > 1:
+            _name, (path, size, _w, _h) = self._entries.popitem(last=False)
+            self.total -= size
+            try:
+                os.remove(path)
+            except Exception:
+                pass
+
+class MediaPrefetcher:
+    def __init__(self, cache: MediaCache, on_ready: Callable[[str, str], None],
+                 workers: int = MEDIA_FETCH_WORKERS):
+        self.cache = cache
+        self.on_ready = on_ready   # (url, kind), called on a worker thread
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="media")
+        self._lock = threading.Lock()
+        self._jobs: Dict[Tuple[str, str], Future] = {}
+        self._failed: set = set()   # (key, kind) that failed this session; not retried
+
+    def request(self, url: str, kind: str):
+        self.request_many([(url, kind)], replace=False)
+
+    def request_many(self, items: Iterable[Tuple[str, str]], replace: bool = True):
+        """Queue (url, kind) pairs in order; replace=True first drops queued jobs from the last batch."""
+        with self._lock:
+            if replace:
+                for job, fut in list(self._jobs.items()):
+                    if fut.cancel():
+                        del self._jobs[job]
+            for url, kind in items:
+                job = (media_key(url), kind)
+                if not url or job in self._jobs or job in self._failed:
+                    continue
+                self._jobs[job] = self._pool.submit(self._run, url, kind, job)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def _run(self, url: str, kind: str, job):
+        ok = False
+        try:
+            ok = self.cache.fetch(url, kind) is not None
+        except Exception:
+            ok = False
+        with self._lock:
+            self._jobs.pop(job, None)
+            if not ok:
+                self._failed.add(job)
+        if ok:
+            try:
+                self.on_ready(url, kind)
+            except Exception:
+                pass
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,54 @@
+# message_forms.py
+# Render and speech forms of a messenger message (ben_discord_app.py), computed once at ingest
+# - MessageForms: immutable, __slots__ record with the escaped HTML author/body, the sanitized
+#   TTS author/body (links spoken as "link") and the attachment summary used by the scan header
+# - ingest() builds it in one pass; UiMessage.forms keeps it and only rebuilds when the author,
+#   content or attachment list it was built from changes (a local echo reconciled with the server)
+# - sanitize_tts(): the shared URL / whitespace rules with the regexes compiled once
+
+import re
+from typing import Any, Dict, List, Optional
+
+_URL_RE = re.compile(r'(https?://\S+|www\.\S+|\b[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\S*)')
+_WS_RE = re.compile(r'\s+')
+
+def sanitize_tts(text: str) -> str:
+    if not text:
+        return ""
+    return _WS_RE.sub(" ", _URL_RE.sub(" link ", text)).strip()
+
+def escape_html(text: str) -> str:
+    return (text or "").replace("<", "&lt;").replace(">", "&gt;")
+
+def media_summary(attachments: Optional[List[Dict[str, Any]]]) -> str:
+    """Suffix for the spoken scan header: " with embedded image" etc., or ""."""
+    kinds = {a.get("type") for a in attachments or ()}
+    has_img, has_vid = "image" in kinds, "video" in kinds
+    if has_img and has_vid:
+        return " with embedded media"
+    if has_vid:
+        return " with embedded video"
+    if has_img:
+        return " with embedded image"
+    return ""
+
+class MessageForms:
+    __slots__ = ("author", "content", "attachments", "author_html", "body_html", "author_tts", "tts", "media")
+
+    def __init__(self, author: str, content: str, attachments: Optional[List[Dict[str, Any]]] = None):
+        set_ = object.__setattr__
+        set_(self, "author", author)      # the inputs, so a stale record can be detected
+        set_(self, "content", content)
+        set_(self, "attachments", attachments)
+        set_(self, "author_html", escape_html(author))
+        body = escape_html(content).replace("\n", "<br>")
+        set_(self, "body_html", body if body.strip() else "[no text]")
+        set_(self, "author_tts", sanitize_tts(author))
+        set_(self, "tts", sanitize_tts(content))
+        set_(self, "media", media_summary(attachments))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MessageForms is immutable")
+
+def ingest(author: str, content: str, attachments: Optional[List[Dict[str, Any]]] = None) -> MessageForms:
+    return MessageForms(author or "", content or "", attachments)
@@ -0,0 +1,182 @@
+# message_store.py
+# Local SQLite store for the Discord messenger (ben_discord_app.py)
+# - messages: one row per UiMessage (attachments as JSON), keyed by Discord message id
+# - reactions: latest UI reaction list per message (JSON)
+# - threads: per-thread high-water mark (newest message id fetched) and a display name
+# The UI renders from here at startup; the bridge then asks Discord only for messages
+# after the stored high-water mark.
+#
+#   python message_store.py --dump messages.db        # per-thread counts and high-water marks
+
+import json, sqlite3, threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id          INTEGER PRIMARY KEY,
+    thread      TEXT NOT NULL,
+    author      TEXT NOT NULL,
+    content     TEXT NOT NULL,
+    ts          REAL NOT NULL,
+    from_me     INTEGER NOT NULL DEFAULT 0,
+    attachments TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS messages_thread_ts ON messages(thread, ts);
+CREATE TABLE IF NOT EXISTS reactions (
+    message_id INTEGER PRIMARY KEY,
+    data       TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread     TEXT PRIMARY KEY,
+    high_water INTEGER NOT NULL DEFAULT 0,
+    name       TEXT
+);
+"""
+
+KEEP_PER_THREAD = 500   # rows kept per thread by prune()
+
+class MessageStore:
+    """Thread-safe (one lock, one connection); writes are small batches committed immediately."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        except Exception:
+            pass
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+
+    # ---------- reads (startup) ----------
+    def load_threads(self) -> Dict[str, Tuple[int, Optional[str]]]:
+        """thread id -> (high-water message id, display name)"""
+        with self._lock:
+            rows = self._db.execute("SELECT thread, high_water, name FROM threads").fetchall()
+        return {t: (int(hw or 0), name) for t, hw, name in rows}
+
+    def load_messages(self, thread: str, limit: int = KEEP_PER_THREAD) -> List[Dict[str, Any]]:
+        """Newest `limit` messages of a thread, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, author, content, ts, from_me, attachments FROM messages "
+                "WHERE thread=? ORDER BY ts DESC LIMIT ?", (thread, int(limit))).fetchall()
+        out = []
+        for mid, author, content, ts, from_me, atts in reversed(rows):
+            try:
+                atts = json.loads(atts or "[]")
+            except Exception:
+                atts = []
+            out.append({"id": int(mid), "author": author, "content": content, "ts": float(ts),
+                        "from_me": bool(from_me), "attachments": atts})
+        return out
+
+    def load_reactions(self, message_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+        ids = [int(i) for i in message_ids]
+        out: Dict[int, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i+500]
+                q = "SELECT message_id, data FROM reactions WHERE message_id IN (%s)" % ",".join("?" * len(chunk))
+                for mid, data in self._db.execute(q, chunk).fetchall():
+                    try:
+                        out[int(mid)] = json.loads(data or "[]")
+                    except Exception:
+                        pass
+        return out
+
+    # ---------- writes ----------
+    def put_messages(self, thread: str, rows: Iterable[Dict[str, Any]], advance: bool = True):
+        """Insert/replace messages; with advance=True the thread's high-water moves up to the newest id."""
+        rows = list(rows)
+        if not rows:
+            return
+        data = [(int(r["id"]), thread, r.get("author") or "", r.get("content") or "", float(r.get("ts") or 0.0),
+                 1 if r.get("from_me") else 0, json.dumps(r.get("attachments") or [])) for r in rows]
+        newest = max(int(r["id"]) for r in rows)
+        with self._lock:
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO messages VALUES (?,?,?,?,?,?,?)", data)
+                if advance:
+                    self._db.execute(
+                        "INSERT INTO threads(thread, high_water) VALUES (?, ?) "
+                        "ON CONFLICT(thread) DO UPDATE SET high_water=MAX(high_water, excluded.high_water)",
+                        (thread, newest))
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+
+    def put_reactions(self, reactions: Dict[int, List[Dict[str, Any]]]):
+        """message id -> UI reaction list"""
+        if not reactions:
+            return
+        data = [(int(mid), json.dumps(r or [])) for mid, r in reactions.items()]
+        with self._lock:
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO reactions VALUES (?, ?)", data)
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+
+    def set_high_water(self, thread: str, message_id: int):
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT INTO threads(thread, high_water) VALUES (?, ?) "
+                    "ON CONFLICT(thread) DO UPDATE SET high_water=MAX(high_water, excluded.high_water)",
+                    (thread, int(message_id)))
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+
+    def set_thread_name(self, thread: str, name: str):
+        if not name:
+            return
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT INTO threads(thread, name) VALUES (?, ?) "
+                    "ON CONFLICT(thread) DO UPDATE SET name=excluded.name", (thread, name))
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+
+    def prune(self, thread: str, keep: int = KEEP_PER_THREAD):
+        """Drop all but the newest `keep` messages of a thread (and their reactions)."""
+        with self._lock:
+            try:
+                old = [r[0] for r in self._db.execute(
+                    "SELECT id FROM messages WHERE thread=? ORDER BY ts DESC LIMIT -1 OFFSET ?",
+                    (thread, int(keep))).fetchall()]
+                for i in range(0, len(old), 500):
+                    chunk = old[i:i+500]
+                    marks = ",".join("?" * len(chunk))
+                    self._db.execute(f"DELETE FROM messages WHERE id IN ({marks})", chunk)
+                    self._db.execute(f"DELETE FROM reactions WHERE message_id IN ({marks})", chunk)
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Messenger message store")
+    ap.add_argument("--dump", metavar="DB", help="print per-thread counts and high-water marks")
+    args = ap.parse_args()
+    if not args.dump:
+        ap.print_help(); return
+    st = MessageStore(args.dump)
+    for tid, (hw, name) in sorted(st.load_threads().items()):
+        n = len(st.load_messages(tid))
+        print(f"{tid:28} {name or '':20} messages={n:4d} high_water={hw}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# name_cache.py
+# On-disk display-name cache shared by ben_discord_app.py and simple_dm_listener.py
+# - name_cache.json: {"<user id>": {"name": "...", "fetched_at": <unix time>}}
+# - NameCache is a dict (user id -> display name), so lookups never touch the network; stale
+#   entries are still returned for first render and are refreshed in the background by the caller
+# - save() merges with whatever the other process wrote (newest fetched_at wins) and replaces
+#   the file atomically
+
+import os, json, time, threading
+from typing import Dict, Iterable, List
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+NAME_CACHE_PATH = os.path.join(APP_DIR, "name_cache.json")
+NAME_TTL_SEC = 24 * 3600
+
+def _read(path: str) -> Dict[int, Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        out = {}
+        for k, v in (data or {}).items():
+            if isinstance(v, dict) and v.get("name"):
+                out[int(k)] = {"name": str(v["name"]), "fetched_at": float(v.get("fetched_at") or 0.0)}
+        return out
+    except Exception:
+        return {}
+
+class NameCache(dict):
+    def __init__(self, path: str = NAME_CACHE_PATH, ttl: float = NAME_TTL_SEC):
+        super().__init__()
+        self.path = path
+        self.ttl = float(ttl)
+        self._fetched_at: Dict[int, float] = {}
+        self._dirty: set = set()
+        self._mtime = 0.0
+        self._lock = threading.RLock()   # save() may run on a writer thread
+        self.reload()
+
+    def __setitem__(self, uid, name):
+        uid = int(uid)
+        with self._lock:
+            super().__setitem__(uid, name)
+            self._fetched_at[uid] = time.time()
+            self._dirty.add(uid)
+
+    def _merge(self, disk: Dict[int, Dict]):
+        with self._lock:
+            self._merge_locked(disk)
+
+    def _merge_locked(self, disk: Dict[int, Dict]):
+        for uid, rec in disk.items():
+            if rec["fetched_at"] > self._fetched_at.get(uid, -1.0):
+                super().__setitem__(uid, rec["name"])
+                self._fetched_at[uid] = rec["fetched_at"]
+                self._dirty.discard(uid)
+
+    def reload(self):
+        try:
+            self._mtime = os.path.getmtime(self.path)
+        except Exception:
+            self._mtime = 0.0
+        self._merge(_read(self.path))
+
+    def reload_if_changed(self):
+        """Pick up names the other process saved (one stat() when nothing changed)."""
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.reload()
+        except Exception:
+            pass
+
+    def is_stale(self, uid: int) -> bool:
+        return (time.time() - self._fetched_at.get(int(uid), 0.0)) >= self.ttl
+
+    def needs_fetch(self, uids: Iterable[int]) -> List[int]:
+        """Missing or stale ids, de-duplicated, in the given order."""
+        return [u for u in dict.fromkeys(int(x) for x in uids) if u not in self or self.is_stale(u)]
+
+    def save(self):
+        if not self._dirty:
+            return
+        disk = _read(self.path)
+        with self._lock:
+            self._merge_locked(disk)
+            for uid in list(self._dirty):
+                if uid in self:
+                    disk[uid] = {"name": self[uid], "fetched_at": self._fetched_at.get(uid, 0.0)}
+            saved = set(self._dirty)
+        try:
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({str(k): v for k, v in disk.items()}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            with self._lock:
+                self._dirty -= saved
+            self._mtime = os.path.getmtime(self.path)
+        except Exception:
+            pass
@@ -0,0 +1,94 @@
+# outbound.py
+# Outbound messages for the messenger (ben_discord_app.py)
+# - the UI shows a sent message at once as a local echo ("sending…") with an id from
+#   local_snowflake(), then swaps in the server id when the send (or its gateway echo) lands
+# - OutboundQueue: one FIFO per thread so messages keep their order; transient failures
+#   (network errors, 5xx, anything without an HTTP status) are retried with exponential backoff,
+#   4xx (e.g. the user does not accept DMs) fails at once and the echo is marked "not sent".
+#   discord.py already waits out 429 rate limits itself
+
+import asyncio, time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+OUTBOUND_MAX_ATTEMPTS = 6        # first try + 5 retries (~31 s of backoff in total)
+OUTBOUND_BACKOFF_SEC = 1.0       # doubled after every failed attempt
+OUTBOUND_BACKOFF_MAX_SEC = 16.0
+DISCORD_EPOCH_MS = 1420070400000
+
+def local_snowflake(after: int = 0) -> int:
+    """An id for a local echo: today's snowflake, but always past `after` (the thread's newest id)."""
+    return max((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22, int(after) + 1)
+
+def is_transient(exc: BaseException) -> bool:
+    status = getattr(exc, "status", None)
+    if status is None:
+        return True   # connection reset, timeout, channel not ready yet, ...
+    try:
+        return int(status) >= 500 or int(status) == 429
+    except Exception:
+        return True
+
+@dataclass
+class Outbound:
+    thread: str
+    content: str
+    local_id: int
+    attempts: int = 0
+    error: str = ""
+
+class OutboundQueue:
+    """Create and submit() on one asyncio loop; callbacks run there."""
+
+    def __init__(self, send: Callable[[Outbound], Awaitable[Any]],
+                 on_sent: Callable[[Outbound, Any], None],
+                 on_failed: Callable[[Outbound, BaseException], None],
+                 max_attempts: int = OUTBOUND_MAX_ATTEMPTS,
+                 backoff: float = OUTBOUND_BACKOFF_SEC, backoff_max: float = OUTBOUND_BACKOFF_MAX_SEC):
+        self.send = send
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._queues: Dict[str, Deque[Outbound]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def submit(self, item: Outbound):
+        self._queues.setdefault(item.thread, deque()).append(item)
+        if item.thread not in self._workers:
+            self._workers[item.thread] = asyncio.ensure_future(self._drain(item.thread))
+
+    def pending(self) -> List[Outbound]:
+        return [it for q in self._queues.values() for it in q]
+
+    async def _drain(self, thread: str):
+        q = self._queues[thread]
+        try:
+            while q:
+                item = q[0]
+                item.attempts += 1
+                try:
+                    res = await self.send(item)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    item.error = str(e) or type(e).__name__
+                    if is_transient(e) and item.attempts < self.max_attempts:
+                        await asyncio.sleep(min(self.backoff_max, self.backoff * 2 ** (item.attempts - 1)))
+                        continue
+                    q.popleft()
+                    self._call(self.on_failed, item, e)
+                    continue
+                q.popleft()
+                self._call(self.on_sent, item, res)
+        finally:
+            self._workers.pop(thread, None)
+
+    @staticmethod
+    def _call(cb, *args):
+        try:
+            cb(*args)
+        except Exception:
+            pass
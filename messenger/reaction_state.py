@@ -0,0 +1,101 @@
+# reaction_state.py
+# Local reaction counts for the messenger, kept current from gateway deltas
+# - ReactionState: message id -> UI reaction rows (gateway_hub.reaction_row); a raw add/remove
+#   event is applied in place (emoji, +1/-1, "me" when the bot reacted). apply() returns False
+#   when the delta does not fit (message never seen, removing an emoji we have no count for),
+#   and only then does the caller refetch the message and seed() the real counts
+# - ReactionCoalescer: the first change to a message schedules one flush after a short window;
+#   further changes inside the window ride along, so a burst is one UI update / publish
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from gateway_hub import reaction_row
+
+REACTION_COALESCE_SEC = 0.25   # window for folding a burst of changes into one update
+REACTION_STATE_CAP = 4000      # messages tracked by a ReactionState that owns its dict
+
+def emoji_key(emoji_obj) -> Optional[str]:
+    """Unicode emoji text, or the CDN url for a custom emoji (matches a row's emoji/url)."""
+    row = reaction_row(emoji_obj)
+    return row["emoji"] or row["url"]
+
+def _row_key(row: Dict[str, Any]) -> Optional[str]:
+    return row.get("emoji") or row.get("url")
+
+class ReactionState:
+    """Pass an existing message id -> rows dict to keep it current (the UI's ui_reactions), or
+    let it own a bounded one (the daemon)."""
+
+    def __init__(self, rows: Optional[Dict[int, List[Dict[str, Any]]]] = None, cap: int = REACTION_STATE_CAP):
+        self._own = rows is None
+        self.rows: Dict[int, List[Dict[str, Any]]] = OrderedDict() if rows is None else rows
+        self.cap = cap
+
+    def seed(self, message_id: int, rows: List[Dict[str, Any]]):
+        mid = int(message_id)
+        self.rows[mid] = list(rows or [])
+        if self._own:
+            self.rows.move_to_end(mid)
+            while len(self.rows) > self.cap:
+                self.rows.popitem(last=False)
+
+    def get(self, message_id: int) -> Optional[List[Dict[str, Any]]]:
+        return self.rows.get(int(message_id))
+
+    def apply(self, message_id: int, emoji_obj, delta: int, me: bool = False) -> bool:
+        """Add (+1) / remove (-1) one reaction; False = unknown state, refetch and seed()."""
+        mid = int(message_id)
+        rows = self.rows.get(mid)
+        if rows is None:
+            return False
+        key = emoji_key(emoji_obj)
+        for i, r in enumerate(rows):
+            if _row_key(r) != key:
+                continue
+            n = int(r.get("count") or 0) + delta
+            if n < 0:
+                return False
+            # Rows are replaced, never mutated: a list already handed to the UI/hub stays as it was
+            new = list(rows)
+            if n == 0:
+                del new[i]
+            else:
+                new[i] = dict(r, count=n, me=(delta > 0) if me else bool(r.get("me")))
+            self.rows[mid] = new
+            return True
+        if delta < 0:
+            return False
+        self.rows[mid] = list(rows) + [reaction_row(emoji_obj, 1, me)]
+        return True
+
+class ReactionCoalescer:
+    """Create and touch() on one asyncio loop; flush(message_id, info) runs there after the window."""
+
+    def __init__(self, flush: Callable[[int, Dict[str, Any]], None], window: float = REACTION_COALESCE_SEC):
+        self.flush = flush
+        self.window = window
+        self._due: Dict[int, asyncio.TimerHandle] = {}
+        self._info: Dict[int, Dict[str, Any]] = {}
+
+    def touch(self, message_id: int, **info):
+        """Schedule (or join) this message's flush; non-None info values overwrite earlier ones."""
+        mid = int(message_id)
+        self._info.setdefault(mid, {}).update({k: v for k, v in info.items() if v is not None})
+        if mid not in self._due:
+            self._due[mid] = asyncio.get_running_loop().call_later(self.window, self._fire, mid)
+
+    def _fire(self, mid: int):
+        self._due.pop(mid, None)
+        info = self._info.pop(mid, {})
+        try:
+            self.flush(mid, info)
+        except Exception:
+            pass
+
+    def cancel(self):
+        for h in self._due.values():
+            h.cancel()
+        self._due.clear()
+        self._info.clear()
@@ -0,0 +1,94 @@
+# read_state.py
+# Read state for the messenger UI (ben_discord_app.py), stored in read_state.json
+# - per-thread watermark: every message id <= mark is read (snowflake ids grow with time)
+# - per-thread exceptions: ids above the mark that were read out of order; they fold into the
+#   mark as soon as nothing older in the thread is still unread, and never past the caller's cap
+#   (the newest id with no unfetched history below it), so offline messages still being
+#   caught up are not marked read by a newer message read ahead of them
+# - file size is one entry per thread plus the (small) exception sets, whatever the history length
+# - the old {"read_ids": [...]} file is migrated by dropping the id list: after a clean exit every
+#   id in it is older than last_seen_ts, which already keeps it out of the offline-unread pass
+
+import os, json
+from typing import Dict, Optional, Set
+
+READ_STATE_SAVE_MS = 2000    # UI debounce before a read-state write
+EXTRA_CAP = 500              # exceptions kept per thread (oldest dropped past this)
+
+class ReadState:
+    def __init__(self, path: str):
+        self.path = path
+        self.marks: Dict[str, int] = {}
+        self.extra: Dict[str, Set[int]] = {}
+        self.last_seen_ts = 0.0
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f) or {}
+        except Exception:
+            return
+        try:
+            self.last_seen_ts = float(data.get("last_seen_ts", 0.0) or 0.0)
+        except Exception:
+            self.last_seen_ts = 0.0
+        for tid, mark in (data.get("marks") or {}).items():
+            try:
+                self.marks[str(tid)] = int(mark)
+            except Exception:
+                pass
+        for tid, ids in (data.get("extra") or {}).items():
+            try:
+                self.extra[str(tid)] = {int(i) for i in ids}
+            except Exception:
+                pass
+        # Old format: rewrite without the id list on the next save
+        self.dirty = "read_ids" in data
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {
+            "marks": self.marks,
+            "extra": {tid: sorted(ids) for tid, ids in self.extra.items() if ids},
+            "last_seen_ts": self.last_seen_ts,
+        }
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except Exception:
+            pass
+
+    def is_read(self, tid: str, message_id: int) -> bool:
+        mid = int(message_id)
+        return mid <= self.marks.get(tid, 0) or mid in self.extra.get(tid, ())
+
+    def mark(self, tid: str, message_id: int, oldest_unread: Optional[int] = None,
+             cap: Optional[int] = None) -> bool:
+        """Record one read; oldest_unread is the thread's oldest id still unread after it (None
+        if none), cap the newest id the mark may reach (None: no limit). Returns False when it
+        was already read."""
+        mid = int(message_id)
+        if self.is_read(tid, mid):
+            return False
+        extra = self.extra.setdefault(tid, set())
+        extra.add(mid)
+        below = [i for i in extra if (oldest_unread is None or i < oldest_unread) and (cap is None or i <= cap)]
+        if below:
+            mark = max(self.marks.get(tid, 0), max(below))
+            self.marks[tid] = mark
+            extra.difference_update(i for i in below if i <= mark)
+        if len(extra) > EXTRA_CAP:
+            for i in sorted(extra)[:len(extra) - EXTRA_CAP]:
+                extra.discard(i)
+        self.dirty = True
+        return True
+
+    def set_last_seen(self, ts: float):
+        self.last_seen_ts = float(ts)
+        self.dirty = True
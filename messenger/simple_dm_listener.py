@@ -1,11 +1,16 @@
 # simple_dm_listener.py
-# Background DM listener with heartbeat pause, TTS, dm_index updates, and minimized console
+# Gateway daemon: the one Discord gateway session on this machine. It speaks new DMs while no
+# messenger UI is open, keeps dm_index.json and messages.db current, and publishes DMs, main
+# channel messages and reaction changes to attached UIs over a local socket (gateway_hub.py).
+# ben_discord_app.py attaches to it and only logs in for REST calls; without the daemon the UI
+# falls back to its own gateway session.
 # Requires: pip install discord.py pyttsx3
 # Optional: pywin32 (not required). We use ctypes to minimize the console.
 
 import os
 import json
 import time
+import asyncio
 import re
 import threading
 from datetime import datetime
@@ -13,6 +18,15 @@ from typing import Dict, Any
 
 import discord
 
+# Display-name cache shared with ben_discord_app.py (sibling module)
+from name_cache import NameCache
+# Speech and file writes run on their own threads, never on the gateway loop (sibling module)
+from listener_workers import SpeechExecutor, BackgroundWriter
+# Local socket to the messenger UI, and the message rows both processes store (sibling modules)
+from gateway_hub import GatewayHub, GATEWAY_PORT, hub_key, attachment_rows, reaction_rows, emoji_spoken_name
+from message_store import MessageStore
+from reaction_state import ReactionState, ReactionCoalescer
+
 # TTS
 try:
     import pyttsx3
@@ -21,9 +35,11 @@ except Exception:
 
 # --- Paths and config ---
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_PATH = os.path.join(APP_DIR, "config.json")
-DM_INDEX_PATH = os.path.join(APP_DIR, "dm_index.json")
-HEARTBEAT_PATH = os.path.join(APP_DIR, "ben_app_heartbeat.lock")
+# config.json, dm_index.json and messages.db live here; DM_LISTENER_DIR points elsewhere (bench/bench_listener_workers.py)
+DATA_DIR = os.environ.get("DM_LISTENER_DIR", "").strip() or APP_DIR
+CONFIG_PATH = os.path.join(DATA_DIR, "config.json")
+DM_INDEX_PATH = os.path.join(DATA_DIR, "dm_index.json")
+MESSAGE_DB_PATH = os.path.join(DATA_DIR, "messages.db")
 
 # --- Console minimize on Windows ---
 def _minimize_console_forever():
@@ -57,35 +73,31 @@ def _load_config():
         cfg = json.load(f)
     token = str(cfg.get("DISCORD_TOKEN", "")).strip()
     guild_id = int(cfg.get("GUILD_ID", 0)) if cfg.get("GUILD_ID") else 0
-    dm_bridge_id = 0
+    channel_id = 0
+    try:
+        channel_id = int(str(cfg.get("CHANNEL_ID", "")).strip() or 0)
+    except Exception:
+        channel_id = 0
     try:
-        dm_bridge_id = int(str(cfg.get("DM_BRIDGE_CHANNEL_ID", "")).strip() or 0)
+        port = int(cfg.get("GATEWAY_PORT") or GATEWAY_PORT)
     except Exception:
-        dm_bridge_id = 0
+        port = GATEWAY_PORT
+    secret = str(cfg.get("GATEWAY_SECRET", "") or "").strip()
     if not token:
         raise RuntimeError("DISCORD_TOKEN missing in config.json")
-    return token, guild_id, dm_bridge_id
+    return token, guild_id, channel_id, port, secret
 
-TOKEN, GUILD_ID, DM_BRIDGE_CHANNEL_ID = _load_config()
+TOKEN, GUILD_ID, CHANNEL_ID, HUB_PORT, HUB_SECRET = _load_config()
 
-# --- Heartbeat pause state ---
-PAUSED_BY_APP = False
-HEARTBEAT_STALE_SEC = 5
+# --- Attached UI clients (replaces the heartbeat lock file) ---
+def _on_clients_changed(roles: Dict[str, int]):
+    print(f"[listener] clients attached: {roles or 'none'}")
 
-def _heartbeat_monitor():
-    global PAUSED_BY_APP
-    while True:
-        try:
-            if os.path.exists(HEARTBEAT_PATH):
-                mtime = os.path.getmtime(HEARTBEAT_PATH)
-                PAUSED_BY_APP = (time.time() - mtime) < HEARTBEAT_STALE_SEC
-            else:
-                PAUSED_BY_APP = False
-        except Exception:
-            PAUSED_BY_APP = False
-        time.sleep(2)
+_hub = GatewayHub(port=HUB_PORT, on_change=_on_clients_changed, key=hub_key(TOKEN, HUB_SECRET))
 
-threading.Thread(target=_heartbeat_monitor, daemon=True).start()
+def _ui_attached() -> bool:
+    # Speech is for when nobody is looking at the messenger; known the moment its socket opens/closes
+    return _hub.attached("ui")
 
 # --- TTS engine and rate limiting ---
 TTS_ENABLED = True
@@ -93,7 +105,8 @@ RATE_WINDOW_SEC = 120  # 2 minutes
 _last_tts_by_user: Dict[int, float] = {}  # user_id -> timestamp
 _tts_engine = None
 
-def _tts_say(line: str):
+def _tts_say_blocking(line: str):
+    # Runs on the speech thread only (the engine is created and used there)
     global _tts_engine
     if not TTS_ENABLED or not line or pyttsx3 is None:
         return
@@ -105,6 +118,13 @@ def _tts_say(line: str):
     except Exception:
         pass
 
+_speech = SpeechExecutor(_tts_say_blocking)
+_writer = BackgroundWriter()
+
+def _tts_say(user_id: int, line: str):
+    # Non-blocking: queued per user, newest line wins
+    _speech.submit(int(user_id), line)
+
 _url_re = re.compile(r'(https?://\S+|www\.\S+|\b[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\S*)')
 
 def _sanitize_tts_text(text: str) -> str:
@@ -149,13 +169,40 @@ def _save_dm_index(d: Dict[str, str]):
     except Exception:
         pass
 
+_dm_index_cache: Dict[str, str] = _load_dm_index()
+
+# --- Local message store (same messages.db the UI renders from at startup) ---
+try:
+    _store = MessageStore(MESSAGE_DB_PATH)
+except Exception:
+    _store = None
+
+def _store_message(thread_id: str, row: Dict[str, Any], reactions):
+    # Live rows never advance the thread's high-water mark: the UI moves it after its own
+    # catch-up fetch, so messages missed while the daemon was down are still fetched
+    if not _store:
+        return
+    def _write():
+        _store.put_messages(thread_id, [row], advance=False)
+        _store.put_reactions({row["id"]: reactions})
+    _writer.submit(("message", row["id"]), _write)
+
+def _store_reactions(message_id: int, reactions):
+    if _store:
+        _writer.submit(("reactions", message_id), lambda: _store.put_reactions({message_id: reactions}))
+
+def _store_thread_name(thread_id: str, name: str):
+    if _store and name:
+        _writer.submit(("thread_name", thread_id), lambda: _store.set_thread_name(thread_id, name))
+
 def _remember_dm_user(user_id: int, display_name: str):
+    # In-memory update; the file write happens on the writer thread (coalesced per burst)
     try:
-        idx = _load_dm_index()
         key = str(int(user_id))
-        if idx.get(key) != display_name:
-            idx[key] = display_name
-            _save_dm_index(idx)
+        if _dm_index_cache.get(key) != display_name:
+            _dm_index_cache[key] = display_name
+            snapshot = dict(_dm_index_cache)
+            _writer.submit("dm_index", lambda: _save_dm_index(snapshot))
     except Exception:
         pass
 
@@ -166,8 +213,19 @@ intents.dm_messages = True
 intents.guild_messages = True
 intents.guilds = True
 
-client = discord.Client(intents=intents)
+class _DaemonClient(discord.Client):
+    async def setup_hook(self):
+        # Bind the hub before the gateway connects; a second daemon finds the port taken and exits
+        try:
+            await _hub.start()
+            print(f"[listener] hub listening on {_hub.host}:{_hub.port}")
+        except OSError as e:
+            print(f"[listener] another gateway daemon is running ({e}); exiting")
+            await self.close()
+
+client = _DaemonClient(intents=intents)
 _guild_cache = None  # discord.Guild or None
+_names = NameCache()  # user id -> display name (name_cache.json)
 
 async def _get_guild():
     global _guild_cache
@@ -183,7 +241,7 @@ async def _get_guild():
         _guild_cache = g
     return _guild_cache
 
-async def _guild_display_name(user_id: int, fallback: str) -> str:
+async def _fetch_display_name(user_id: int):
     g = await _get_guild()
     if g:
         mem = g.get_member(user_id)
@@ -193,85 +251,178 @@ async def _guild_display_name(user_id: int, fallback: str) -> str:
             except Exception:
                 mem = None
         if mem and getattr(mem, "display_name", None):
+            _names[user_id] = mem.display_name
+            _writer.submit("names", _names.save)
             return mem.display_name
-    return fallback
+    return None
+
+async def _guild_display_name(user_id: int, fallback: str) -> str:
+    # Cached name answers immediately; a stale one is refreshed in the background
+    _names.reload_if_changed()
+    cached = _names.get(int(user_id))
+    if cached:
+        if _names.is_stale(user_id):
+            asyncio.ensure_future(_fetch_display_name(user_id))
+        return cached
+    return await _fetch_display_name(user_id) or fallback
 
 def _base_username(u: discord.User) -> str:
     return getattr(u, "global_name", None) or getattr(u, "name", "user")
 
-def _bridge_body_from_message(message: discord.Message) -> str:
-    try:
-        parts = []
-        if (message.content or "").strip():
-            parts.append(message.content.strip())
-        for a in getattr(message, "attachments", []) or []:
-            url = getattr(a, "url", None) or ""
-            if url:
-                parts.append(f"[attachment: {url}]")
-        body = " ".join(parts).strip()
-        return body if body else "[no text]"
-    except Exception:
-        return (message.content or "").strip() or "[no text]"
+_mention_re = re.compile(r"<@!?(\d+)>")
 
-async def _forward_dm_to_bridge(author: discord.User, display_name: str, message: discord.Message):
+def _message_text(message: discord.Message) -> str:
+    # Text plus embed title/description, with <@id> mentions shown as @DisplayName
+    parts = [(message.content or "").strip()]
     try:
-        if not DM_BRIDGE_CHANNEL_ID:
-            return
-        g = await _get_guild()
-        if not g:
-            return
-        ch = g.get_channel(DM_BRIDGE_CHANNEL_ID)
-        if ch is None:
-            try:
-                ch = await client.fetch_channel(DM_BRIDGE_CHANNEL_ID)
-            except Exception:
-                ch = None
-        if not isinstance(ch, discord.TextChannel):
-            return
-        body = _bridge_body_from_message(message)
-        await ch.send(f"DM from {display_name} ({author.id}): {body}")
+        for emb in getattr(message, "embeds", []) or []:
+            t = (getattr(emb, "title", None) or "").strip()
+            d = (getattr(emb, "description", None) or "").strip()
+            parts.append(" — ".join(x for x in (t, d) if x))
     except Exception:
-        # Best effort
         pass
-
-# --- DM handling ---
-async def _handle_new_dm(message: discord.Message):
+    text = "\n".join(p for p in parts if p).strip()
+    mentioned = {}
+    for u in getattr(message, "mentions", []) or []:
+        try:
+            mentioned[int(u.id)] = getattr(u, "display_name", None) or _base_username(u)
+        except Exception:
+            pass
+    def _repl(mt):
+        uid = int(mt.group(1))
+        return "@" + (mentioned.get(uid) or _names.get(uid) or "user")
+    return _mention_re.sub(_repl, text)
+
+_dm_peer_by_channel: Dict[int, int] = {}  # DM channel id -> peer user id (raw reactions carry only the channel)
+
+def _thread_id_for_channel(channel) -> str:
+    if isinstance(channel, discord.DMChannel):
+        other = getattr(channel, "recipient", None)
+        if not other:
+            return ""
+        _dm_peer_by_channel[int(channel.id)] = int(other.id)
+        return f"dm:{int(other.id)}"
+    if CHANNEL_ID and getattr(channel, "id", None) == CHANNEL_ID:
+        return "main"
+    return ""
+
+# --- Reaction counts (kept from event deltas, published once per burst) ---
+_reactions = ReactionState()
+
+def _flush_reactions(message_id: int, info: Dict[str, Any]):
+    rows = _reactions.get(message_id) or []
+    _hub.publish({"op": "reactions", "thread": info.get("thread"), "id": message_id,
+                  "reactions": rows, "spoken": info.get("spoken")})
+    _store_reactions(message_id, rows)
+
+_reaction_updates = ReactionCoalescer(_flush_reactions)
+
+# --- Message handling (main channel and DMs) ---
+async def _handle_message(thread_id: str, message: discord.Message):
     author = message.author
-    if author.bot:
-        return
-
+    me = client.user
+    from_me = bool(me and author.id == me.id)
     base = _base_username(author)
-    try:
-        display_name = await _guild_display_name(author.id, base)
-    except Exception:
+    if thread_id == "main":
+        display_name = getattr(author, "display_name", None) or base
+    elif from_me:
         display_name = base
-
+    else:
+        try:
+            display_name = await _guild_display_name(author.id, base)
+        except Exception:
+            display_name = base
+
+    row = {
+        "id": int(message.id),
+        "author": display_name,
+        "content": _message_text(message),
+        "ts": message.created_at.timestamp(),
+        "from_me": from_me,
+        "attachments": attachment_rows(message),
+    }
+    reactions = reaction_rows(message)
+    _reactions.seed(message.id, reactions)
+    event = {"op": "message", "thread": thread_id, "row": row, "reactions": reactions}
+
+    if thread_id.startswith("dm:"):
+        peer_id = int(thread_id.split(":", 1)[1])
+        peer_name = display_name if not from_me else _names.get(peer_id) or _dm_index_cache.get(str(peer_id)) or "user"
+        event["peer"] = {"id": peer_id, "name": peer_name}
+        _store_thread_name(thread_id, peer_name)
+    _hub.publish(event)
+    _store_message(thread_id, row, reactions)
+
+    if not thread_id.startswith("dm:") or from_me or author.bot:
+        return
+    _remember_dm_user(author.id, display_name)
+    # Only speak when no messenger UI is attached
     first10 = _first_n_words(message.content or "", 10)
     tts_line = f"New Message from {display_name}: {first10}".strip()
-
-    # Always update files and mirror
-    _remember_dm_user(author.id, display_name)
-    await _forward_dm_to_bridge(author, display_name, message)
-
-    # Only speak when the app is not active
-    if not PAUSED_BY_APP and _should_tts_for_user(author.id):
-        _tts_say(tts_line)
+    if not _ui_attached() and _should_tts_for_user(author.id):
+        _tts_say(author.id, tts_line)
+
+async def _handle_reaction(payload: discord.RawReactionActionEvent, added: bool):
+    # Counts come from the event itself; the message is only refetched when they don't fit
+    thread_id = ""
+    if CHANNEL_ID and payload.channel_id == CHANNEL_ID:
+        thread_id = "main"
+    elif payload.guild_id is None:
+        uid = _dm_peer_by_channel.get(payload.channel_id)
+        if uid:
+            thread_id = f"dm:{uid}"
+        else:
+            ch = client.get_channel(payload.channel_id) or await client.fetch_channel(payload.channel_id)
+            thread_id = _thread_id_for_channel(ch)
+    if not thread_id:
+        return
+    me = client.user
+    mine = bool(me and payload.user_id == me.id)
+    if not _reactions.apply(payload.message_id, payload.emoji, 1 if added else -1, me=mine):
+        ch = client.get_channel(payload.channel_id) or await client.fetch_channel(payload.channel_id)
+        m = await ch.fetch_message(payload.message_id)
+        _reactions.seed(m.id, reaction_rows(m))
+    spoken = None
+    if added and not mine:
+        member = getattr(payload, "member", None)
+        name = getattr(member, "display_name", None)
+        if not name:
+            u = client.get_user(payload.user_id)
+            name = await _guild_display_name(payload.user_id, _base_username(u) if u else "user")
+        spoken = f"{name} reacted {emoji_spoken_name(payload.emoji.name if payload.emoji.is_unicode_emoji() else payload.emoji)}"
+    _reaction_updates.touch(payload.message_id, thread=thread_id, spoken=spoken)
 
 @client.event
 async def on_message(message: discord.Message):
-    # Only handle direct messages
-    if isinstance(message.channel, discord.DMChannel):
+    # Direct messages and the configured main channel
+    thread_id = _thread_id_for_channel(message.channel)
+    if thread_id:
         try:
-            await _handle_new_dm(message)
+            await _handle_message(thread_id, message)
         except Exception:
             # Keep listener resilient
             pass
 
+@client.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    try:
+        await _handle_reaction(payload, added=True)
+    except Exception:
+        pass
+
+@client.event
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    try:
+        await _handle_reaction(payload, added=False)
+    except Exception:
+        pass
+
 @client.event
 async def on_ready():
     try:
         me = client.user
         print(f"[listener] Logged in as {me} ({getattr(me, 'id', '?')})")
+        _hub.welcome = {"user_id": int(getattr(me, "id", 0) or 0)}
         g = await _get_guild()
         if g:
             print(f"[listener] Guild ready: {g.name} ({g.id})")
@@ -283,7 +434,7 @@ async def on_ready():
 # --- Run ---
 if __name__ == "__main__":
     try:
-        print("[listener] starting. heartbeat guard is enabled.")
+        print("[listener] starting gateway daemon.")
         client.run(TOKEN)
     except discord.errors.PrivilegedIntentsRequired:
         print("[listener] Enable Message Content Intent in the developer portal.")
@@ -291,3 +442,8 @@ if __name__ == "__main__":
         pass
     except Exception as e:
         print(f"[listener] fatal error: {e}")
+    finally:
+        _speech.stop()
+        _writer.stop()
+        if _store:
+            _store.close()
@@ -0,0 +1,52 @@
+# warm_load.py
+# Bounded-concurrency helpers for the Discord messenger warm-load (ben_discord_app.py)
+# - WarmLimiter: one asyncio semaphore shared by every startup REST call (member/user lookups,
+#   DM history) so a burst of threads never floods Discord; discord.py still handles the
+#   per-route 429 buckets, the semaphore just keeps the burst polite
+# - WarmLimiter.once(): concurrent lookups of the same key share one in-flight request
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+WARM_CONCURRENCY = 4   # default in-flight REST calls during warm-load (setting WARM_CONCURRENCY)
+NOT_MEMBER_TTL_SEC = 600.0   # a fetch_member miss is trusted this long (setting NOT_MEMBER_TTL_SEC)
+
+class WarmLimiter:
+    """Create inside the bridge loop's thread; the semaphore binds to the running loop lazily."""
+
+    def __init__(self, limit: int = WARM_CONCURRENCY):
+        self.limit = max(1, int(limit))
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        return self._sem
+
+    def reset(self):
+        # Called from start_client() when the bridge rebuilds its client: shared lookups still in
+        # flight belong to the old client (and its gateway session), so new callers must not join them
+        self._sem = None
+        self._inflight.clear()
+
+    async def run(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        return await self._run(self._semaphore(), factory)
+
+    @staticmethod
+    async def _run(sem: asyncio.Semaphore, factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with sem:
+            return await factory()
+
+    def _forget(self, key: Hashable, fut: asyncio.Future):
+        if self._inflight.get(key) is fut:
+            self._inflight.pop(key, None)
+
+    async def once(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is None:
+            # bind the semaphore now: a reset() before the task starts must not hand it the new one
+            fut = asyncio.ensure_future(self._run(self._semaphore(), factory))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return await asyncio.shield(fut)
@@ -0,0 +1,340 @@
+# narbe_http_search.py
+# Direct HTTP search backend for narbe_scan_browser.py
+# - Fetches provider result pages / JSON endpoints with one pooled requests.Session
+#   (no hidden Chromium, no JS hydration)
+# - Parsers follow the same extraction rules as INJECT_IMAGES / INJECT_VIDEOS and take
+#   plain HTML/JSON text, so they can be run offline against saved pages
+# - The hidden QWebEngineView path in narbe_scan_browser.py stays as the fallback
+#
+# Offline parse of a saved page:
+#   python narbe_http_search.py --parse saved.html --kind images
+
+import re, json
+import urllib.parse as up
+from html.parser import HTMLParser
+from typing import List, Optional
+
+try:
+    import requests
+except Exception:
+    requests = None
+
+UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124 Safari/537.36"
+HTTP_TIMEOUT = 8  # seconds
+IMG_MAX = 80
+VID_MAX = 30
+GOOGLE_PAGES = 3   # ijn=0,1,2
+# Queries naming these handles try Google restricted to these sites first
+SITE_BIAS_HANDLES = ("beaminbenny", "@beaminbenny", "benny")
+GOOGLE_SITE_BIAS = ("instagram.com", "tiktok.com", "youtube.com")
+
+# ---------- Pooled session ----------
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None and requests is not None:
+        s = requests.Session()
+        s.headers.update({"User-Agent": UA, "Accept-Language": "en-US,en;q=0.9"})
+        # Same consent cookies the hidden browser installs
+        s.cookies.set("CONSENT", "YES+cb", domain=".google.com")
+        s.cookies.set("CONSENT", "YES+cb", domain=".youtube.com")
+        s.cookies.set("SOCS", "CAI", domain=".youtube.com")
+        try:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            s.mount("https://", adapter)
+        except Exception:
+            pass
+        _session = s
+    return _session
+
+def _get(url: str, **kw) -> Optional[str]:
+    s = _get_session()
+    if s is None:
+        return None
+    try:
+        r = s.get(url, timeout=HTTP_TIMEOUT, **kw)
+        if r.ok:
+            return r.text
+    except Exception:
+        pass
+    return None
+
+# ---------- Shared rules (mirror INJECT_IMAGES) ----------
+def _is_bad(u: str) -> bool:
+    try:
+        p = up.urlparse(u)
+        h = (p.hostname or "").lower()
+        path = (p.path or "").lower()
+        if re.search(r"encrypted-tbn", h):
+            return True
+        if re.search(r"branding|logo", path):
+            return True
+    except Exception:
+        pass
+    return bool(re.match(r"^data:", str(u or ""), re.I))
+
+def _decode_ddg(u: str, base: str = "") -> str:
+    try:
+        x = up.urlparse(up.urljoin(base, u))
+        if "duckduckgo.com" in (x.hostname or "").lower() and re.search(r"/iu/?", x.path):
+            orig = up.parse_qs(x.query).get("u", [""])[0]
+            if orig:
+                return up.unquote(orig)
+    except Exception:
+        pass
+    return u
+
+def _orig_from_href(href: str, base: str = "") -> str:
+    try:
+        q = up.parse_qs(up.urlparse(up.urljoin(base, href)).query)
+        for k in ("imgurl", "imgrefurl", "mediaurl", "murl", "imgsrc", "u"):
+            v = q.get(k, [""])[0]
+            if v:
+                return _decode_ddg(v, base)
+    except Exception:
+        pass
+    return href
+
+class _ResultHTML(HTMLParser):
+    # Collects the bits the JS collectors look at: anchors (+ first inner <img alt>),
+    # elements carrying Bing's "m" JSON, and plain <img> tags
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors = []   # [href, title, img_alt, text]
+        self.tiles = []     # raw "m" attribute values
+        self.imgs = []      # attr dicts
+        self._open = []     # anchor stack
+
+    def handle_starttag(self, tag, attrs):
+        a = {k: (v or "") for k, v in attrs}
+        if a.get("m"):
+            self.tiles.append(a["m"])
+        if tag == "a":
+            rec = [a.get("href", ""), a.get("title", ""), "", ""]
+            self.anchors.append(rec)
+            self._open.append(rec)
+        elif tag == "img":
+            self.imgs.append(a)
+            if self._open and not self._open[-1][2]:
+                self._open[-1][2] = a.get("alt", "")
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._open:
+            self._open.pop()
+
+    def handle_data(self, data):
+        if self._open:
+            self._open[-1][3] += data
+
+def _scan_html(text: str) -> _ResultHTML:
+    p = _ResultHTML()
+    try:
+        p.feed(text or "")
+        p.close()
+    except Exception:
+        pass
+    return p
+
+# ---------- Parsers (offline-testable) ----------
+def parse_image_results(text: str, base: str = "", limit: int = IMG_MAX) -> List[dict]:
+    """Google /imgres anchors, DDG /iu/ and Bing param anchors, Bing iusc[m] tiles, then large <img>."""
+    out, seen = [], set()
+    doc = _scan_html(text)
+
+    def add(img, title, ref):
+        if not img or _is_bad(img) or img in seen or len(out) >= limit:
+            return
+        seen.add(img)
+        out.append({"img": img, "title": title or "image", "ref": ref or base})
+
+    # Google classic anchors
+    for href, title, alt, _t in doc.anchors:
+        if href.startswith("/imgres?"):
+            img = up.parse_qs(up.urlparse(href).query).get("imgurl", [""])[0]
+            add(img, alt or title, base)
+
+    # DDG/Bing anchor param decodes
+    for href, title, alt, _t in doc.anchors:
+        if any(k in href for k in ("/iu/", "imgurl=", "mediaurl=", "murl=")):
+            add(_decode_ddg(_orig_from_href(href, base), base), alt or title, base)
+
+    # Bing tiles with JSON metadata
+    for m in doc.tiles:
+        try:
+            o = json.loads(m)   # the parser already decoded the attribute's entities
+        except Exception:
+            continue
+        if isinstance(o, dict):
+            add(o.get("murl") or o.get("purl") or "", o.get("t") or o.get("tt"), o.get("purl") or base)
+
+    # Fallback: any <img> with a real URL (no natural size available here)
+    if not out:
+        for a in doc.imgs:
+            big = a.get("data-iurl") or a.get("data-src") or a.get("src") or ""
+            big = _decode_ddg(big, base)
+            if not big.startswith("http"):
+                continue
+            add(big, a.get("alt"), base)
+    return out[:limit]
+
+def parse_ddg_image_json(text: str, limit: int = IMG_MAX) -> List[dict]:
+    """DuckDuckGo i.js payload: {"results": [{"image", "title", "url"}, ...]}."""
+    out, seen = [], set()
+    try:
+        data = json.loads(text or "{}")
+    except Exception:
+        return out
+    for r in (data.get("results") or []) if isinstance(data, dict) else []:
+        img = (r.get("image") or "").strip()
+        if not img or _is_bad(img) or img in seen:
+            continue
+        seen.add(img)
+        out.append({"img": img, "title": r.get("title") or "image", "ref": r.get("url") or ""})
+        if len(out) >= limit:
+            break
+    return out
+
+def _extract_json_var(text: str, name: str):
+    # ytInitialData is assigned inline as: var ytInitialData = {...};</script>
+    m = re.search(r"(?:var\s+|window\[['\"])" + re.escape(name) + r"(?:['\"]\])?\s*=\s*", text or "")
+    if not m:
+        return None
+    try:
+        obj, _end = json.JSONDecoder().raw_decode(text, m.end())
+        return obj
+    except Exception:
+        return None
+
+def parse_video_results(text: str, base: str = "https://www.youtube.com/", limit: int = VID_MAX) -> List[dict]:
+    """Shorts anchors, then ytInitialData deep walk, then /watch?v= anchors."""
+    out, seen = [], set()
+
+    def push(vid, title):
+        if not vid or vid in seen:
+            return
+        seen.add(vid)
+        out.append({"videoId": vid, "title": title or "video"})
+
+    doc = _scan_html(text)
+
+    # Shorts
+    for href, title, _alt, t in doc.anchors:
+        m = re.match(r"^/shorts/([^/?&]+)", href)
+        if m:
+            push(m.group(1), re.sub(r"\s+", " ", (title or t or "short").strip()))
+
+    # ytInitialData deep walk
+    if not out:
+        data = _extract_json_var(text, "ytInitialData")
+        stack = [data]
+        while stack:
+            o = stack.pop()
+            if isinstance(o, list):
+                stack.extend(reversed(o))
+            elif isinstance(o, dict):
+                if o.get("videoId") and not o.get("playlistId"):
+                    t = ""
+                    try:
+                        ti = o.get("title") or {}
+                        if isinstance(ti.get("runs"), list):
+                            t = "".join(r.get("text", "") for r in ti["runs"])
+                        if not t:
+                            t = ti.get("simpleText", "")
+                    except Exception:
+                        pass
+                    push(str(o["videoId"]), t)
+                stack.extend(reversed(list(o.values())))
+
+    # DOM fallback
+    if not out:
+        for href, title, _alt, t in doc.anchors:
+            if "/watch" not in href:
+                continue
+            vid = up.parse_qs(up.urlparse(up.urljoin(base, href)).query).get("v", [""])[0]
+            push(vid, re.sub(r"\s+", " ", (title or t or "video").strip()))
+    return out[:limit]
+
+# ---------- Provider fetchers ----------
+def _q(query: str) -> str:
+    return up.quote(query or "", safe="")
+
+def _ddg_vqd(query: str) -> str:
+    text = _get(f"https://duckduckgo.com/?q={_q(query)}&iar=images&iax=images&ia=images") or ""
+    m = re.search(r"vqd=['\"]?([\d-]+)", text)
+    return m.group(1) if m else ""
+
+def fetch_images_bing(query: str, limit: int = IMG_MAX) -> List[dict]:
+    url = f"https://www.bing.com/images/async?q={_q(query)}&first=0&count={limit}&safeSearch=off&adlt=off"
+    return parse_image_results(_get(url) or "", base="https://www.bing.com/", limit=limit)
+
+def fetch_images_ddg(query: str, limit: int = IMG_MAX) -> List[dict]:
+    vqd = _ddg_vqd(query)
+    if not vqd:
+        return []
+    url = f"https://duckduckgo.com/i.js?l=us-en&o=json&q={_q(query)}&vqd={vqd}&f=,,,&p=-1"
+    return parse_ddg_image_json(_get(url, headers={"Referer": "https://duckduckgo.com/"}) or "", limit=limit)
+
+def fetch_images_google(query: str, limit: int = IMG_MAX) -> List[dict]:
+    """Site-biased pages for known handles, then ijn=0..GOOGLE_PAGES-1, like the browser path."""
+    low = (query or "").lower()
+    queries = [f"site:{s} {query}" for s in GOOGLE_SITE_BIAS] if any(h in low for h in SITE_BIAS_HANDLES) else []
+    pages = [(q, 0) for q in queries] + [(query, i) for i in range(GOOGLE_PAGES)]
+    out, seen = [], set()
+    for q, ijn in pages:
+        url = f"https://www.google.com/search?tbm=isch&hl=en&safe=off&tbs=isz:l,itp:photo&udm=2&ijn={ijn}&q={_q(q)}"
+        for it in parse_image_results(_get(url) or "", base="https://www.google.com/", limit=limit):
+            if it["img"] not in seen:
+                seen.add(it["img"])
+                out.append(it)
+        if len(out) >= limit:
+            break
+    return out[:limit]
+
+# Same order as the hidden browser (narbe_scan_browser.py): Google pages, then DDG, then Bing
+IMAGE_PROVIDERS = [fetch_images_google, fetch_images_ddg, fetch_images_bing]
+
+def search_images(query: str, limit: int = IMG_MAX) -> List[dict]:
+    """Walk providers until `limit` unique images are collected; [] means use the browser path."""
+    out, seen = [], set()
+    for fetch in IMAGE_PROVIDERS:
+        try:
+            items = fetch(query, limit)
+        except Exception:
+            items = []
+        for it in items:
+            if it["img"] not in seen:
+                seen.add(it["img"])
+                out.append(it)
+        if len(out) >= limit:
+            break
+    return out[:limit]
+
+def search_videos(query: str, limit: int = VID_MAX) -> List[dict]:
+    url = f"https://www.youtube.com/results?search_query={_q(query)}&hl=en"
+    return parse_video_results(_get(url) or "", limit=limit)
+
+# ---------- Offline parse ----------
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="NARBE direct HTTP search backend")
+    ap.add_argument("--kind", choices=["images", "videos"], default="images")
+    ap.add_argument("--parse", metavar="FILE", help="parse a saved results page (HTML or DDG i.js JSON) offline")
+    args = ap.parse_args()
+
+    if args.parse:
+        with open(args.parse, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if args.kind == "videos":
+            items = parse_video_results(text)
+        elif text.lstrip().startswith("{"):
+            items = parse_ddg_image_json(text)
+        else:
+            items = parse_image_results(text)
+        print(json.dumps(items, indent=2, ensure_ascii=False))
+        print(f"[parse] {len(items)} {args.kind}")
+        return
+    ap.print_help()
+
+if __name__ == "__main__":
+    main()
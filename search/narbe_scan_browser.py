@@ -23,8 +23,6 @@ except Exception:
 # Add high-DPI env before PySide6 imports
 os.environ.setdefault("QT_ENABLE_HIGHDPI_SCALING", "1")
 os.environ.setdefault("QT_SCALE_FACTOR_ROUNDING_POLICY", "PassThrough")
-from dataclasses import dataclass
-from typing import List, Optional
 
 # HiDPI sane defaults before Qt loads
 os.environ.setdefault("QT_ENABLE_HIGHDPI_SCALING", "1")
@@ -33,9 +31,17 @@ os.environ.setdefault("QT_SCALE_FACTOR_ROUNDING_POLICY", "PassThrough")
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import Qt, QTimer, QUrl
 from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings, QWebEngineProfile
+from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings, QWebEngineProfile, QWebEngineScript
+from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtNetwork import QNetworkCookie
 
+# Direct HTTP search backend (sibling module); the hidden browser stays as fallback
+try:
+    import narbe_http_search
+except Exception:
+    narbe_http_search = None
+SEARCH_BACKEND = os.environ.get("NARBE_SEARCH_BACKEND", "http").strip().lower()  # "http" | "browser"
+
 # ---------------- Async TTS (queue + worker thread) ----------------
 try:
     import pyttsx3
@@ -109,127 +115,10 @@ def _stop_tts():
     except Exception:
         pass
 
-# ---------------- KenLM + local n-gram fallback ----------------
-KENLM_API = os.environ.get("KENLM_API", "https://api.imagineville.org/word/predict")
-KENLM_TIMEOUT = 3  # seconds
-
-DEFAULT_WORDS = ["yes", "no", "help", "the", "you", "to"]
-
-def _parse_kenlm(data):
-    if isinstance(data, list):
-        return [str(x) for x in data]
-    if isinstance(data, dict):
-        for k in ("suggestions", "result", "results", "candidates"):
-            if k in data and isinstance(data[k], list):
-                out = []
-                for item in data[k]:
-                    if isinstance(item, str):
-                        out.append(item)
-                    elif isinstance(item, dict):
-                        tok = item.get("text") or item.get("token") or item.get("word")
-                        if tok: out.append(str(tok))
-                return out
-    return []
-
-def fetch_kenlm(context_words, prefix, limit=6):
-    # POST first
-    try:
-        r = requests.post(
-            KENLM_API,
-            json={"context": context_words or [], "prefix": prefix or "", "limit": limit},
-            timeout=KENLM_TIMEOUT
-        )
-        if r.ok:
-            out = _parse_kenlm(r.json())
-            if out:
-                return out[:limit]
-    except Exception:
-        pass
-    # GET fallback
-    try:
-        params = {"num": str(limit), "sort": "logprob", "safe": "true", "lang": "en"}
-        if prefix:
-            params["prefix"] = prefix.lower()
-        if context_words:
-            params["left"] = " ".join(context_words).lower()
-        r = requests.get(KENLM_API, params=params, timeout=KENLM_TIMEOUT)
-        if r.ok:
-            out = _parse_kenlm(r.json())
-            if out:
-                return out[:limit]
-    except Exception:
-        pass
-    return []
-
-def _load_local_ngrams():
-    try:
-        here = os.path.dirname(__file__)
-        path = os.path.join(here, "predictive_ngrams.json")
-        if not os.path.exists(path):
-            return {}, {}, {}
-        data = json.load(open(path, "r", encoding="utf-8"))
-        fw  = {k.upper():v for k,v in (data.get("frequent_words") or {}).items()}
-        bi  = {k.upper():v for k,v in (data.get("bigrams") or {}).items()}
-        tri = {k.upper():v for k,v in (data.get("trigrams") or {}).items()}
-        return fw, bi, tri
-    except Exception:
-        return {}, {}, {}
-
-_FREQ, _BI, _TRI = _load_local_ngrams()
-
-def _fallback_ngram(raw_text: str, limit=6):
-    txt = (raw_text or "")
-    up_txt = txt.upper().strip()
-    if not up_txt:
-        return DEFAULT_WORDS[:limit]
-    trailing = txt.endswith(" ")
-    parts = up_txt.split()
-    cur = "" if trailing else (parts[-1] if parts else "")
-    left = " ".join(parts[:-1]) if (not trailing and len(parts) > 1) else (" ".join(parts) if trailing else "")
-    scores = {}
-    if left:
-        ctx = left.split()
-        if len(ctx) >= 2:
-            key = " ".join(ctx[-2:]) + " "
-            for k, d in _TRI.items():
-                if k.startswith(key):
-                    nxt = k.split()[-1]
-                    if (not cur) or nxt.startswith(cur):
-                        scores[nxt] = scores.get(nxt, 0) + 10 * float(d.get("count", 0))
-        if len(ctx) >= 1:
-            key = ctx[-1] + " "
-            for k, d in _BI.items():
-                if k.startswith(key):
-                    nxt = k.split()[-1]
-                    if (not cur) or nxt.startswith(cur):
-                        scores[nxt] = scores.get(nxt, 0) + 5 * float(d.get("count", 0))
-    if not scores and cur:
-        for w, d in _Freq.items() if False else _FREQ.items():
-            if w.startswith(cur):
-                scores[w] = scores.get(w, 0) + float(d.get("count", 0))
-    out = [w.lower() for w,_ in sorted(scores.items(), key=lambda kv: -kv[1])]
-    for w in DEFAULT_WORDS:
-        if len(out) >= limit: break
-        if w not in out: out.append(w)
-    return out[:limit]
-
-# ---------------- Legacy local simple suggest (used nowhere directly; kept as extra fallback) ----------------
-def local_suggest(raw_text: str, limit=6):
-    raw = raw_text or ""
-    trailing = raw.endswith(" ")
-    parts = raw.strip().split()
-    if not parts:
-        return DEFAULT_WORDS[:limit]
-    if trailing:
-        seeds = ["is","are","can","will","how","what","where","when","why","because","and","or"]
-        return (seeds + DEFAULT_WORDS)[:limit]
-    cur = parts[-1].lower()
-    vocab = ["and","are","can","cat","cats","dog","dogs","how","what","where","when","why",
-             "music","video","image","photo","photos","pictures","learn","game","funny",
-             "cute","best","top","new","news","guide","tutorial","house","narbe"]
-    out = [w for w in vocab if w.startswith(cur) and w != cur]
-    out += [w for w in DEFAULT_WORDS if w not in out]
-    return out[:limit]
+# ---------------- Shared scan keyboard (utils/scan_keyboard.py) ----------------
+# Scanning, editing actions and predictions (offline LM -> KenLM -> local n-grams) live there
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+from scan_keyboard import ScanKeyboard, ScanRedirect, PredictionBackend, EDIT_CONTROLS, find_local_lm
 
 # ---------------- Robust JS collectors (hidden) ----------------
 CONSENT_JS = r"""(function(){
@@ -411,17 +300,204 @@ INJECT_VIDEOS = r"""
   return JSON.stringify(out.slice(0,30));
 })();"""
 
+# Event-driven collector: same extraction rules as INJECT_IMAGES/INJECT_VIDEOS, but it
+# only scans nodes the page adds (MutationObserver) and pushes *new* items to Python
+# through the QWebChannel object "narbe". Returns "ok", or "nochannel" so Python can
+# fall back to polling the collectors above.
+BG_COLLECTOR_JS = r"""
+(function(task, gen){
+  var prev = window.__narbeCollector;
+  if (prev && prev.gen === gen) return 'ok';
+  if (prev) { try { prev.stop(); } catch(e){} }
+  if (typeof QWebChannel === 'undefined' || !window.qt || !qt.webChannelTransport) return 'nochannel';
+
+  var MAX = (task === 'videos') ? 30 : 80;
+  var IDLE_MS = 1500, SCAN_MS = 120;
+  var seen = {}, sent = 0, pending = [], api = null, obs = null;
+  var queue = [], scanT = 0, idleT = 0, stopped = false, nudges = 0;
+
+  function isBad(u){
+    try{
+      var url = new URL(u, location.href);
+      var h = (url.hostname||'').toLowerCase();
+      var p = (url.pathname||'').toLowerCase();
+      if (/encrypted\-tbn/i.test(h)) return true;
+      if (/branding|logo/.test(p)) return true;
+    }catch(e){}
+    return /^data:/i.test(String(u||""));
+  }
+  function decodeDDG(u){
+    try{
+      var x = new URL(u, location.href);
+      if ((x.hostname||'').toLowerCase().indexOf('duckduckgo.com') !== -1 && /\/iu\/?/.test(x.pathname)){
+        var orig = x.searchParams.get('u') || '';
+        if (orig) return decodeURIComponent(orig);
+      }
+    }catch(e){}
+    return u;
+  }
+  function getOrigFromHref(href){
+    try{
+      var u = new URL(href, location.href);
+      var cand = u.searchParams.get('imgurl') || u.searchParams.get('imgrefurl') ||
+                 u.searchParams.get('mediaurl') || u.searchParams.get('murl') ||
+                 u.searchParams.get('imgsrc') || u.searchParams.get('u') || '';
+      if (cand) return decodeDDG(cand);
+    }catch(e){}
+    return href;
+  }
+  function qsa(root, sel){
+    var out = [];
+    try { if (root.matches && root.matches(sel)) out.push(root); } catch(e){}
+    try { if (root.querySelectorAll) out.push.apply(out, root.querySelectorAll(sel)); } catch(e){}
+    return out;
+  }
+  function full(){ return sent + pending.length >= MAX; }
+  function add(key, item){
+    if (!key || seen[key] || full()) return;
+    seen[key] = 1; pending.push(item);
+  }
+  function altOf(a, dflt){
+    try { var im = a.querySelector('img'); return (im && im.getAttribute('alt')) || a.getAttribute('title') || dflt; } catch(e){}
+    return dflt;
+  }
+
+  function scanImages(root){
+    var i, href, img;
+    var ga = qsa(root, 'a[href^="/imgres?"]');
+    for (i=0;i<ga.length && !full();i++){
+      href = ga[i].getAttribute('href') || ga[i].href || '';
+      try { img = new URL(href, location.href).searchParams.get('imgurl') || ''; } catch(e){ img = ''; }
+      if (img && !isBad(img)) add(img, {img: img, title: altOf(ga[i], 'image') || 'image', ref: location.href});
+    }
+    var an = qsa(root, 'a[href*="/iu/"], a[href*="imgurl="], a[href*="mediaurl="], a[href*="murl="]');
+    for (i=0;i<an.length && !full();i++){
+      href = an[i].href || an[i].getAttribute('href') || '';
+      if (!href) continue;
+      img = decodeDDG(getOrigFromHref(href));
+      if (img && !isBad(img)) add(img, {img: img, title: altOf(an[i], 'image') || 'image', ref: location.href});
+    }
+    var tiles = qsa(root, '.iusc,[m]');
+    for (i=0;i<tiles.length && !full();i++){
+      var m = tiles[i].getAttribute('m') || '';
+      if (!m) continue;
+      try{
+        var o = JSON.parse(m);
+        img = o.murl || o.purl || '';
+        if (img && !isBad(img)) add(img, {img: img, title: (o.t || o.tt || 'image'), ref: (o.purl || location.href)});
+      }catch(e){}
+    }
+  }
+  // Same "any large-ish <img>" last resort as INJECT_IMAGES; only used when a page went idle empty
+  function scanLooseImages(){
+    var imgs = qsa(document, 'img[data-iurl], img[data-src], img[src^="http"], img');
+    for (var i=0;i<imgs.length && !full();i++){
+      var el = imgs[i]; var big = decodeDDG(el.getAttribute('data-iurl') || el.getAttribute('data-src') || el.currentSrc || el.src || '');
+      if (!big || isBad(big)) continue;
+      try { var w = el.naturalWidth||0, h=el.naturalHeight||0; if (w && h && (w<300 || h<200)) continue; }catch(e){}
+      add(big, {img: big, title: el.getAttribute('alt') || 'image', ref: location.href});
+    }
+  }
+
+  function pushVideo(id, title){ add(id, {videoId: id, title: (title || 'video')}); }
+  function scanVideos(root){
+    var i, a;
+    var sh = qsa(root, 'a[href^="/shorts/"]');
+    for (i=0;i<sh.length && !full();i++){
+      a = sh[i]; var m = (a.pathname||'').match(/\/shorts\/([^\/\?\&]+)/);
+      if (m && m[1]) pushVideo(m[1], (a.getAttribute('title') || a.textContent || 'short').trim().replace(/\s+/g,' '));
+    }
+    var w = qsa(root, 'a#thumbnail[href*="/watch"], a#video-title[href*="/watch"], a.yt-simple-endpoint[href*="/watch"], a[href^="/watch?"]');
+    for (i=0;i<w.length && !full();i++){
+      a = w[i]; var href = a.href || a.getAttribute('href') || '';
+      try{
+        var id = new URL(href, location.href).searchParams.get('v') || '';
+        if (!id) continue;
+        var t = a.getAttribute('title') || (a.querySelector('#video-title') && a.querySelector('#video-title').textContent) || a.textContent || 'video';
+        pushVideo(id, (t||'video').trim().replace(/\s+/g,' '));
+      }catch(e){}
+    }
+  }
+  // ytInitialData is static for the page load: walk it once instead of on every tick
+  function walkInitialData(){
+    try{
+      (function walk(o){
+        if (!o || full()) return;
+        if (Array.isArray(o)){ for (var i=0;i<o.length;i++) walk(o[i]); return; }
+        if (typeof o === 'object'){
+          if (o.videoId && !o.playlistId){
+            var t='';
+            try {
+              if (o.title && Array.isArray(o.title.runs)) t = o.title.runs.map(function(r){return r.text||'';}).join('');
+              if (!t && o.title && o.title.simpleText) t = o.title.simpleText;
+            }catch(e){}
+            pushVideo(o.videoId, t||'video');
+          }
+          for (var k in o){ if (Object.prototype.hasOwnProperty.call(o,k)) walk(o[k]); }
+        }
+      })(window.ytInitialData);
+    }catch(e){}
+  }
+
+  function scan(root){ if (task === 'videos') scanVideos(root); else scanImages(root); }
+  function flush(){
+    if (!api || !pending.length || stopped) return;
+    var batch = pending; pending = []; sent += batch.length;
+    try { api.push(gen, task, JSON.stringify(batch)); } catch(e){}
+    if (full()) stop();
+  }
+  function armIdle(){
+    clearTimeout(idleT);
+    idleT = setTimeout(function(){
+      if (stopped) return;
+      if (task === 'images' && !sent && !pending.length){ scanLooseImages(); flush(); }
+      if (api) { try { api.idle(gen, task, sent); } catch(e){} }
+    }, IDLE_MS);
+  }
+  function drain(){
+    scanT = 0;
+    var roots = queue; queue = [];
+    for (var i=0;i<roots.length && !full();i++) scan(roots[i]);
+    if (pending.length) { flush(); armIdle(); }
+  }
+  function nudge(){
+    // Scroll a few times so lazy result grids hydrate; mutations do the rest
+    if (stopped || nudges++ >= 4) return;
+    try { window.scrollBy(0, Math.max(1400, document.body.scrollHeight/1.5)); setTimeout(function(){ window.scrollTo(0,0); }, 180); } catch(e){}
+    setTimeout(nudge, 700);
+  }
+  function stop(){
+    stopped = true;
+    try { if (obs) obs.disconnect(); } catch(e){}
+    clearTimeout(scanT); clearTimeout(idleT);
+  }
+
+  window.__narbeCollector = {gen: gen, stop: stop};
+  obs = new MutationObserver(function(muts){
+    for (var i=0;i<muts.length;i++){
+      var mu = muts[i];
+      if (mu.type === 'attributes') { queue.push(mu.target); continue; }
+      for (var j=0;j<mu.addedNodes.length;j++){ if (mu.addedNodes[j].nodeType === 1) queue.push(mu.addedNodes[j]); }
+    }
+    if (queue.length && !scanT) scanT = setTimeout(drain, SCAN_MS);
+  });
+  obs.observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['href', 'm']});
+
+  new QWebChannel(qt.webChannelTransport, function(ch){
+    api = ch.objects.narbe;
+    if (task === 'videos') walkInitialData();
+    scan(document);
+    flush();
+    armIdle();
+    nudge();
+  });
+  return 'ok';
+})("__TASK__", __GEN__);"""
+
 # ---------------- UI scaffolding ----------------
 # Replace background-color with background so it overrides gradients
 FOCUS_STYLE = "border: 3px solid #FFD64D; background: rgba(255,214,77,0.10);"
 
-@dataclass
-class RowDef:
-    wrap: QtWidgets.QFrame
-    widgets: list
-    id: str
-    label: str
-
 class Narbe(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
@@ -432,89 +508,66 @@ class Narbe(QtWidgets.QMainWindow):
         # Fullscreen now, and keep it
         self.showFullScreen()
 
-        # Scan state
-        self.mode = "ROWS"      # ROWS | KEYS
-        self.row_idx = 0
-        self.key_idx = 0
-
         # Overlay state (slideshows)
-        self.overlay_open = False
+        self._overlay_open = False
         self._overlay_idx = 0
         self.image_show = None
         self.video_show = None
 
-        # ADD: one-shot suppression for row label TTS (used when jumping to predictive row)
-        self._suppress_row_label_once = False
-
         # Loading overlay
         self._loading_overlay = None
         self._loading_timer = None
         self._loading_base = "Loading"
         self._loading_dots = 0
 
-        # Timers for scanning
-        self.SHORT_MIN = 250
-        self.SHORT_MAX = 3000
-        self.SCAN_BACK_MS = 2500  # was 1500; scan backwards every 2s while holding space
-        self.space_down = False
-        self.space_at = 0.0
-        self.space_scanned = False
-        self.space_timer = QTimer(self); self.space_timer.setInterval(self.SCAN_BACK_MS)
-        self.space_timer.timeout.connect(self._space_prev)
-        self.enter_down = False
-        self.enter_at = 0.0
-        # ADD: Enter long-hold (3s) handling
-        self.ENTER_HOLD_MS = 3000
-        self.enter_long_fired = False
-        self.enter_timer = QTimer(self)
-        self.enter_timer.setSingleShot(True)
-        self.enter_timer.setInterval(self.ENTER_HOLD_MS)
-        self.enter_timer.timeout.connect(self._on_enter_hold)
-        # ADD: 0.5s cooldown between actionable releases
-        self.INPUT_COOLDOWN_MS = 500
-        self._cooldown_until_ms = 0
-
-        # Predictions
-        self._pred_current = [""]*6
-
         # Hidden browser (results loader)
         self._init_bg_browser()
         self.bg_task = None           # "images" | "videos" | None
         self.bg_query = ""
         self.bg_provider = "google"   # images: google -> ddg -> bing -> brave
         self.bg_deadline_ms = 0
+        self._bg_gen = 0              # bumped per navigation; stale pushes are ignored
+        self._bg_legacy_poll = False  # True when the page has no QWebChannel (poll INJECT_* instead)
+        # Watchdog only: provider fallbacks on deadline. Results arrive via _on_bg_items.
         self.bg_timer = QTimer(self); self.bg_timer.setInterval(550)
         self.bg_timer.timeout.connect(self._bg_tick)
 
+        # Video accumulation (pushed incrementally by the collector)
+        self.VID_MAX = 30
+        self._vid_accum = []
+
+        # Direct HTTP search (tried before the hidden browser)
+        self._http_gen = 0
+        self._http_thread = None
+        self._http_worker = None
+
+        # Bootstrap the video player off the critical path so searches reuse it
+        if VIDEO_WARM:
+            QTimer.singleShot(1500, self._warm_video_player)
+
         # Image crawl state
         self.IMG_MAX = 50
         self._img_queue = []      # list[str] of URLs to visit
         self._img_accum = []      # list[dict] accumulating {img,title,ref}
         self._img_seen = set()    # de-dupe by final image URL
 
-        # Build UI and focus/highlight
+        # Build UI (the scan keyboard captures space/enter app-wide)
         self._make_ui()
-        self._highlight_rows()
-
-        # --- prediction thread + debounce ---
-        self.pred_req_id = 0
-        self.pred_timer = QTimer(self); self.pred_timer.setSingleShot(True); self.pred_timer.setInterval(120)
-        self.pred_timer.timeout.connect(self._refresh_predictions_async)
-        self.pred_thread = QtCore.QThread(self)
-        self.pred_worker = PredictWorker()
-        self.pred_worker.moveToThread(self.pred_thread)
-        self.pred_worker.request.connect(self.pred_worker._on_request)
-        self.pred_worker.ready.connect(self._on_predictions_ready)
-        self.pred_thread.start()
+        self._overlay_scan = ScanRedirect(self._overlay_focus_next, self._overlay_focus_prev, self._overlay_activate)
 
         # Keep focus & dismiss Start/Widgets on Windows
         if sys.platform.startswith("win"):
             self._install_force_focus()
 
-        # Event filter to catch space/enter globally
-        app = QtWidgets.QApplication.instance()
-        if app:
-            app.installEventFilter(self)
+    # While a slideshow is open, scan input drives its buttons instead of the keyboard
+    @property
+    def overlay_open(self) -> bool:
+        return self._overlay_open
+
+    @overlay_open.setter
+    def overlay_open(self, value: bool):
+        self._overlay_open = bool(value)
+        self.keyboard.set_redirect(self._overlay_scan if self._overlay_open else None)
 
     # ---------- Hidden QWebEngineView
     def _init_bg_browser(self):
@@ -539,9 +592,34 @@ class Narbe(QtWidgets.QMainWindow):
         except Exception:
             pass
         self.bg.page().loadFinished.connect(self._on_bg_loaded)
+        self._install_bg_channel()
         # Ensure SafeSearch is off via cookies where engines support it
         self._install_search_cookies()
 
+    def _install_bg_channel(self):
+        # Expose "narbe" to page JS and preload qwebchannel.js so BG_COLLECTOR_JS can push results
+        self._bg_bridge = _BgResultsBridge(self)
+        self._bg_bridge.items.connect(self._on_bg_items)
+        self._bg_bridge.settled.connect(self._on_bg_idle)
+        try:
+            self._bg_channel = QWebChannel(self.bg.page())
+            self._bg_channel.registerObject("narbe", self._bg_bridge)
+            self.bg.page().setWebChannel(self._bg_channel)
+            f = QtCore.QFile(":/qtwebchannel/qwebchannel.js")
+            if f.open(QtCore.QIODevice.ReadOnly):
+                src = bytes(f.readAll()).decode("utf-8")
+                f.close()
+                script = QWebEngineScript()
+                script.setName("narbe-qwebchannel")
+                script.setSourceCode(src)
+                script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+                script.setWorldId(QWebEngineScript.MainWorld)
+                script.setRunsOnSubFrames(False)
+                self.bg.page().scripts().insert(script)
+        except Exception:
+            # Without a channel the collector reports "nochannel" and _bg_tick polls instead
+            pass
+
     def _set_cookie(self, domain: str, name: str, value: str, path: str = "/", secure: bool = False):
         try:
             c = QNetworkCookie(name.encode("utf-8"), value.encode("utf-8"))
@@ -588,113 +666,24 @@ class Narbe(QtWidgets.QMainWindow):
         top.addWidget(title); top.addStretch(1); top.addWidget(self.status)
         v.addLayout(top)
 
-        # Scope style to only this frame so children can highlight
-        pill = QtWidgets.QFrame()
-        pill.setObjectName("pill")
-        pill.setStyleSheet("#pill{background:#0f1521; border:1px solid rgba(255,255,255,0.10); border-radius:12px;}")
-        pill.setAttribute(Qt.WA_StyledBackground, True)
-        pv = QtWidgets.QVBoxLayout(pill); pv.setContentsMargins(8,8,8,8); pv.setSpacing(8)
-        v.addWidget(pill)
-
-        # Text row
-        text_wrap = QtWidgets.QFrame(); text_wrap.setStyleSheet("QFrame{border-radius:12px;}"); text_wrap.setAttribute(Qt.WA_StyledBackground, True)
-        twv = QtWidgets.QVBoxLayout(text_wrap); twv.setContentsMargins(6,6,6,6)
-        self.text = QtWidgets.QLineEdit(); self.text.setPlaceholderText("Type…")
-        self.text.setFocusPolicy(Qt.NoFocus)           # already there
-        self.text.setAttribute(Qt.WA_InputMethodEnabled, False)  # extra safeguard
-        self.text.setAlignment(Qt.AlignCenter)
-        self.text.setStyleSheet("""
-QLineEdit{
-  background-color:#ADD8E6;
-  border:2px solid #000;
-  border-radius:12px;
-  padding:24px;
-  font-size:60px;
-  font-weight:800;
-  color:#000;
-  text-transform: uppercase;   /* FORCE UPPERCASE */
-}""")
-
-        self.text.setMinimumHeight(100)
-        self.text.setReadOnly(True)                 # scan-only input
-        self.text.setFocusPolicy(Qt.NoFocus)
-        self.text.setContextMenuPolicy(Qt.NoContextMenu)
-        # swapped to new debounced predictions
-        self.text.textChanged.connect(self._schedule_predictions)
-        twv.addWidget(self.text)
-        pv.addWidget(text_wrap)
-
-        # Modes row
-        modes_wrap = QtWidgets.QFrame()
-        # ADD: ensure background/border from stylesheet are painted so highlight is visible
-        modes_wrap.setAttribute(Qt.WA_StyledBackground, True)
-        modes_wrap.setStyleSheet("QFrame{border-radius:12px;}")
-        mv = QtWidgets.QGridLayout(modes_wrap); mv.setContentsMargins(6,6,6,6); mv.setHorizontalSpacing(12)
-        self.btn_vid = self._btn("VIDEO SEARCH", action="search_video", primary=True)
-        self.btn_img = self._btn("IMAGE SEARCH", action="search_images", primary=True)
-        mv.addWidget(self.btn_vid, 0, 0); mv.addWidget(self.btn_img, 0, 1)
-        pv.addWidget(modes_wrap)
-
-        # Controls
-        controls_wrap = QtWidgets.QFrame()
-        controls_wrap.setStyleSheet("QFrame{border-radius:12px;}")
-        controls_wrap.setAttribute(Qt.WA_StyledBackground, True)
-        cw = QtWidgets.QHBoxLayout(controls_wrap); cw.setContentsMargins(6,6,6,6); cw.setSpacing(8)
-        self.btn_space = self._btn("SPACE", action="space_char")
-        self.btn_dl = self._btn("DEL LETTER", action="del_letter")
-        self.btn_dw = self._btn("DEL WORD", action="del_word")
-        self.btn_cl = self._btn("CLEAR", action="clear")
-        self.btn_ex = self._btn("EXIT", action="exit", warn=True)
-        for b in (self.btn_space,self.btn_dl,self.btn_dw,self.btn_cl,self.btn_ex): cw.addWidget(b)
-        v.addWidget(controls_wrap)
-
-        # Alpha rows
-        self.row_frames = []; self.row_buttons = []
-        def add_alpha(chars, label):
-            fr = QtWidgets.QFrame()
-            fr.setStyleSheet("QFrame{border-radius:12px;}")
-            fr.setAttribute(Qt.WA_StyledBackground, True)
-            lay = QtWidgets.QHBoxLayout(fr); lay.setContentsMargins(6,6,6,6); lay.setSpacing(8)
-            btns=[]
-            for ch in chars:
-                b = self._btn(ch, char=ch); lay.addWidget(b); btns.append(b)
-            v.addWidget(fr)
-            self.row_frames.append((fr,label))
-            self.row_buttons.append(btns)
-        add_alpha("ABCDEF","a to f")
-        add_alpha("GHIJKL","g to l")
-        add_alpha("MNOPQR","m to r")
-        add_alpha("STUVWX","s to x")
-        add_alpha("YZ0123","y to 3")
-        add_alpha("456789","4 to 9")
-
-        # Predictions
-        pred_wrap = QtWidgets.QFrame()
-        pred_wrap.setStyleSheet("QFrame{border-radius:12px;}")
-        pred_wrap.setAttribute(Qt.WA_StyledBackground, True)
-        pl = QtWidgets.QHBoxLayout(pred_wrap); pl.setContentsMargins(6,6,6,6); pl.setSpacing(8)
-        self.pred_btns = [self._btn("", pred=True) for _ in range(6)]
-        for b in self.pred_btns: pl.addWidget(b)
-        v.addWidget(pred_wrap)
-
-        # Register scan rows
-        self.rows: List[RowDef] = []
-        self.rows.append(RowDef(text_wrap, [self.text], "row_text", "text"))
-        self.rows.append(RowDef(modes_wrap, [self.btn_vid,self.btn_img], "row_modes", "search"))
-        self.rows.append(RowDef(controls_wrap, [self.btn_space,self.btn_dl,self.btn_dw,self.btn_cl,self.btn_ex], "row_controls", "controls"))
-        ids = ["row1","row2","row3","row4","row5","row6"]
-        for idx,(fr,label) in enumerate(self.row_frames):
-            self.rows.append(RowDef(fr, self.row_buttons[idx], ids[idx], label))
-        self.rows.append(RowDef(pred_wrap, self.pred_btns, "predRow", "predictive text"))
-        for rd in self.rows:
-            rd.wrap.setObjectName(rd.id)
-        # ADD: mark all row frames for property-based styling
-        for rd in self.rows:
-            try:
-                rd.wrap.setProperty("scanRow", True)
-                rd.wrap.style().unpolish(rd.wrap); rd.wrap.style().polish(rd.wrap); rd.wrap.update()
-            except Exception:
-                pass
+        here = os.path.dirname(os.path.abspath(__file__))
+        self.keyboard = ScanKeyboard(
+            speak=speak,
+            backend=PredictionBackend(
+                ngrams_path=os.path.join(here, "predictive_ngrams.json"),
+                lm_path=find_local_lm(here),
+                inject={"n": "narbe", "b": "beaminbenny"},
+            ),
+            extra_rows=[("row_modes", "search", (("VIDEO SEARCH", "search_video", "primary"),
+                                                 ("IMAGE SEARCH", "search_images", "primary")))],
+            controls=EDIT_CONTROLS + (("EXIT", "exit", "warn"),),
+            handlers={"exit": self._exit_to_comm,
+                      "search_images": self._search_images,
+                      "search_video": self._search_video},
+            speak_text_row=False,
+        )
+        self.keyboard.SCAN_BACK_STEP_MS = self.keyboard.SCAN_BACK_FIRST_MS  # keep the browser's even back-scan
+        v.addWidget(self.keyboard)
 
         # Loading overlay (center card)
         self._loading_overlay = QtWidgets.QFrame(self)
@@ -714,362 +703,27 @@ QLineEdit{
         self._loading_timer = QTimer(self); self._loading_timer.setInterval(380); self._loading_timer.timeout.connect(self._tick_loading)
 
         self.setCentralWidget(kb)
-
-    def _btn(self, text, action: Optional[str]=None, char: Optional[str]=None, pred: bool=False, primary: bool=False, warn: bool=False):
-        b = QtWidgets.QPushButton(text)
-        if primary:
-            b.setProperty("variant", "primary")
-        if warn:
-            b.setProperty("variant", "warn")
-        b.setProperty("action", action)
-        b.setProperty("char", char)
-        b.setProperty("pred", pred)
-        b.setProperty("scanKey", True)
-        b.clicked.connect(lambda _=False, btn=b: self._perform(btn))
-        b.setMinimumHeight(52)
-        return b
-
-    # ---------- scanning visuals (property-based) ----------
-    def _highlight_rows(self):
-        # clear any key focus across all rows
-        for rd in self.rows:
-            for w in rd.widgets:
-                if isinstance(w, QtWidgets.QPushButton):
-                    w.setProperty("focused", False)
-                    w.style().unpolish(w); w.style().polish(w); w.update()
-            rd.wrap.setProperty("focused", False)
-            rd.wrap.style().unpolish(rd.wrap); rd.wrap.style().polish(rd.wrap); rd.wrap.update()
-
-        # focus current row only in ROWS mode (and when no overlay)
-        if self.mode == "ROWS" and not self.overlay_open:
-            rd = self.rows[self.row_idx]
-            rd.wrap.setProperty("focused", True)
-            rd.wrap.style().unpolish(rd.wrap); rd.wrap.style().polish(rd.wrap); rd.wrap.update()
-
-        # ADD: allow a one-time suppression of row label TTS (used for predictive row jump)
-        if self._suppress_row_label_once:
-            self._suppress_row_label_once = False
-            return
-
-        self._speak_row_label()
-
-    def _highlight_keys(self):
-        # clear all row highlights
-        for rd in self.rows:
-            rd.wrap.setProperty("focused", False)
-            rd.wrap.style().unpolish(rd.wrap); rd.wrap.style().polish(rd.wrap); rd.wrap.update()
-
-        # mark only current key as focused
-        cur = self.rows[self.row_idx]
-        for i, w in enumerate(cur.widgets):
-            if isinstance(w, QtWidgets.QPushButton):
-                w.setProperty("focused", i == self.key_idx)
-                w.style().unpolish(w); w.style().polish(w); w.update()
-
-        self._speak_key_label()
-
-    # ---------- event filter (capture space/enter globally)
-    def eventFilter(self, obj, ev):
-        try:
-            if ev.type() == QtCore.QEvent.KeyPress and isinstance(ev, QtGui.QKeyEvent):
-                if ev.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
-                    self.keyPressEvent(ev); return True
-            if ev.type() == QtCore.QEvent.KeyRelease and isinstance(ev, QtGui.QKeyEvent):
-                if ev.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
-                    self.keyReleaseEvent(ev); return True
-        except Exception:
-            pass
-        return super().eventFilter(obj, ev)
-
-    def keyPressEvent(self, e: QtGui.QKeyEvent):
-        if e.isAutoRepeat(): return
-        if e.key() == Qt.Key_Space:
-            e.accept()
-            if not self.space_down:
-                self.space_down = True
-                self.space_at = time.time()
-                self.space_scanned = False
-                self.space_timer.start()
-        elif e.key() in (Qt.Key_Return, Qt.Key_Enter):
-            e.accept()
-            if not self.enter_down:
-                self.enter_down = True
-                self.enter_at = time.time()
-                # ADD: start long-hold timer (ignore when overlay is open)
-                if not self.overlay_open:
-                    try: self.enter_timer.start()
-                    except Exception: pass
-        else:
-            super().keyPressEvent(e)
-
-    def keyReleaseEvent(self, e: QtGui.QKeyEvent):
-        if e.isAutoRepeat(): return
-        # Overlay scanning (prev/next/close)
-        if self.overlay_open and e.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
-            if e.key() == Qt.Key_Space:
-                if not self.space_down: return
-                held = (time.time() - self.space_at)*1000.0
-                self.space_down = False; self.space_timer.stop()
-                if self._in_cooldown(): return
-                if self.SHORT_MIN <= held < self.SHORT_MAX:
-                    self._overlay_focus_next()
-                    self._arm_cooldown()
-            else:
-                if not self.enter_down: return
-                self.enter_down = False
-                if self._in_cooldown(): return
-                self._overlay_activate()
-                self._arm_cooldown()
-            return
-
-        if e.key() == Qt.Key_Space:
-            e.accept()
-            if not self.space_down: return
-            held = (time.time() - self.space_at)*1000.0
-            self.space_down = False; self.space_timer.stop()
-            if self._in_cooldown(): return
-            if self.SHORT_MIN <= held < self.SHORT_MAX and not self.space_scanned:
-                if self.mode == "ROWS":
-                    self._scan_rows_next()
-                else:
-                    self._scan_keys_next()
-                self._arm_cooldown()
-            return
-        elif e.key() in (Qt.Key_Return, Qt.Key_Enter):
-            e.accept()
-            if not self.enter_down: return
-            self.enter_down = False
-            # ADD: stop hold timer and swallow if long-hold already acted
-            try:
-                if self.enter_timer.isActive():
-                    self.enter_timer.stop()
-            except Exception:
-                pass
-            if self.enter_long_fired:
-                self.enter_long_fired = False
-                return
-            if self._in_cooldown(): return
-            # ...existing short-press enter behavior...
-            if self.mode == "KEYS":
-                self._activate_key()
-                self.mode = "ROWS"
-                self._highlight_rows()
-            else:
-                self._enter_row()
-            self._arm_cooldown()
-        else:
-            super().keyReleaseEvent(e)
-
-    def _space_prev(self):
-        self.space_scanned = True
-        if self.overlay_open:
-            # When an overlay is up, long-hold space should scan the overlay controls backward
-            self._overlay_focus_prev()
-            return
-        if self.mode == "ROWS":
-            self._scan_rows_prev()
-        else:
-            self._scan_keys_prev()
-
-    def _scan_rows_next(self):
-        self.row_idx = (self.row_idx + 1) % len(self.rows)
-        self._highlight_rows()
-    def _scan_rows_prev(self):
-        self.row_idx = (self.row_idx - 1 + len(self.rows)) % len(self.rows)
-        self._highlight_rows()
-    def _enter_row(self):
-        rd = self.rows[self.row_idx]
-
-        # If it's the text row, just speak the text instead of entering key mode
-        if rd.id == "row_text":
-            v = self.text.text().strip()
-            if v:
-                speak(v)
-            else:
-                speak("empty")
-            return
-
-        # Otherwise, go into KEYS mode
-        for r in self.rows:
-            r.wrap.setProperty("focused", False)
-            r.wrap.style().unpolish(r.wrap); r.wrap.style().polish(r.wrap); r.wrap.update()
-        self.mode = "KEYS"
-        self.key_idx = 0
-        self._highlight_keys()
-    def _scan_keys_next(self):
-        rd = self.rows[self.row_idx]
-        self.key_idx = (self.key_idx + 1) % len(rd.widgets)
-        self._highlight_keys()
-    def _scan_keys_prev(self):
-        rd = self.rows[self.row_idx]
-        self.key_idx = (self.key_idx - 1 + len(rd.widgets)) % len(rd.widgets)
-        self._highlight_keys()
-    def _activate_key(self):
-        # before leaving KEYS, clear key focus
-        cur = self.rows[self.row_idx]
-        for w in cur.widgets:
-            if isinstance(w, QtWidgets.QPushButton):
-                w.setProperty("focused", False)
-                w.style().unpolish(w); w.style().polish(w); w.update()
-        # perform
-        rd = self.rows[self.row_idx]
-        w = rd.widgets[self.key_idx]
-        if isinstance(w, QtWidgets.QPushButton):
-            self._perform(w)
-
-    # ADD: Enter 3s hold handler
-    def _on_enter_hold(self):
-        if not self.enter_down or self.overlay_open:
-            return
-        try:
-            if self.mode == "KEYS":
-                # revert to row select mode
-                self.mode = "ROWS"
-                self._highlight_rows()
-                speak("rows")
-                self.enter_long_fired = True
-                return
-            if self.mode == "ROWS":
-                # jump to predictive row and read each word
-                pred_idx = next((i for i, rd in enumerate(self.rows) if rd.id == "predRow"), None)
-                if pred_idx is not None:
-                    self.row_idx = pred_idx
-                    # ADD: suppress the "predictive text" label once; only speak the words
-                    self._suppress_row_label_once = True
-                    self._highlight_rows()  # will not speak row label due to suppression
-                    self._read_pred_row()
-                    self.enter_long_fired = True
-        except Exception:
-            pass
-
-    # ADD: speak each prediction with small delays to avoid TTS queue coalescing
-    def _read_pred_row(self):
-        try:
-            words = [b.text().strip() for b in getattr(self, "pred_btns", []) if (b.text() or "").strip()]
-            delay = 200
-            step = 900
-            for i, w in enumerate(words):
-                QtCore.QTimer.singleShot(delay + i * step, lambda ww=w: speak(ww))
-        except Exception:
-            pass
-
-    # ADD: cooldown helpers
-    def _now_ms(self) -> int:
-        return int(time.time() * 1000)
-
-    def _in_cooldown(self) -> bool:
-        return self._now_ms() < self._cooldown_until_ms
-
-    def _arm_cooldown(self):
-        self._cooldown_until_ms = self._now_ms() + self.INPUT_COOLDOWN_MS
-
-    # ---------- actions
-    def _perform(self, btn: QtWidgets.QPushButton):
-        action = btn.property("action")
-        ch = btn.property("char")
-        is_pred = bool(btn.property("pred"))
-
-        if ch:
-            self.text.setText((self.text.text() + ch).upper())
-            speak(ch)
-            self._schedule_predictions()
-            return
-        if is_pred:
-            v = self.text.text()
-            has_sp = v.endswith(" ")
-            trimmed = v.rstrip()
-            parts = trimmed.split() if trimmed else []
-            current = parts[-1] if parts else ""
-            before = " ".join(parts[:-1]) if len(parts)>1 else ""
-            pred = btn.text()
-            if has_sp or current=="":
-                newv = (trimmed + " " + pred + " ")
-            elif pred.lower().startswith(current.lower()):
-                newv = ((before + " " if before else "") + pred + " ")
-            else:
-                newv = (trimmed + " " + pred + " ")
-            normalized = " ".join(newv.split())
-            if not normalized.endswith(" "): normalized += " "
-            self.text.setText(normalized)
-            speak(pred)
-            self._schedule_predictions()
-            return
-
-        if action == "space_char":
-            self.text.setText(self.text.text() + " ")
-            speak("space")
-            self._schedule_predictions(); return
-        if action == "del_letter":
-            speak("delete letter")
-            self.text.setText(self.text.text()[:-1])
-            self._schedule_predictions(); return
-        if action == "del_word":
-            speak("delete word")
-            v = self.text.text()
-            trimmed = v.rstrip()
-            if not trimmed:
-                self.text.setText("")
-            else:
-                idx = trimmed.rfind(" ")
-                if idx == -1:
-                    # only one word present -> clear all
-                    self.text.setText("")
-                else:
-                    # keep previous words and exactly one trailing space
-                    self.text.setText(trimmed[:idx+1])
-            self._schedule_predictions(); return
-        if action == "clear":
-            speak("clear")
-            self.text.setText("")
-            self._schedule_predictions(); return
-        if action == "exit":
-            speak("exit")
-            self._launch_comm_v10()  # launch Comm-v10.py in root
-            QtCore.QTimer.singleShot(0, QtWidgets.QApplication.quit)
-            return
-
-        if action == "search_images":
-            q = (self.text.text() or "").strip()
-            if not q: return
-            speak("search images")
-            self._show_loading("images")
-            self._start_images(q)
-            return
-
-        if action == "search_video":
-            q = (self.text.text() or "").strip()
-            if not q: return
-            speak("search video")
-            self._show_loading("videos")
-            self._start_videos(q)
-            return
-
-    # ---- predictions (new: debounced + threaded KenLM) ----
-    def _apply_predictions(self):
-        # compatibility shim for any stray callers; just schedule the async path
-        self._schedule_predictions()
-
-    def _schedule_predictions(self):
-        self.pred_timer.start()
-
-    def _refresh_predictions_async(self):
-        self.pred_req_id += 1
-        rid = self.pred_req_id
-        txt = self.text.text()
-        try:
-            self.pred_worker.request.emit(rid, txt)
-        except Exception:
-            # synchronous last resort
-            self._on_predictions_ready(rid, txt, _fallback_ngram(txt, 6))
-
-    @QtCore.Slot(int, str, list)
-    def _on_predictions_ready(self, rid: int, text: str, words: list):
-        if rid != self.pred_req_id:
-            return  # stale
-        arr = (words or [])[:6]
-        for i, b in enumerate(self.pred_btns):
-            b.setText(arr[i].upper() if i < len(arr) else "")
-        self._pred_current = arr
+        self.keyboard.reset()
+
+    # ---------- keyboard action handlers
+    def _exit_to_comm(self):
+        speak("exit")
+        self._launch_comm_v10()  # launch Comm-v10.py in root
+        QtCore.QTimer.singleShot(0, QtWidgets.QApplication.quit)
+
+    def _search_images(self):
+        q = (self.keyboard.text() or "").strip()
+        if not q: return
+        speak("search images")
+        self._show_loading("images")
+        self._start_images(q)
+
+    def _search_video(self):
+        q = (self.keyboard.text() or "").strip()
+        if not q: return
+        speak("search video")
+        self._show_loading("videos")
+        self._start_videos(q)
 
     def _launch_comm_v10(self):
         # Start Comm-v10.py in the project root folder
@@ -1121,8 +775,50 @@ QLineEdit{
         except Exception:
             pass
 
-    # ---------- Searches (hidden)
-    def _start_images(self, query: str):
+    # ---------- Searches (direct HTTP first)
+    def _use_http_search(self) -> bool:
+        return narbe_http_search is not None and SEARCH_BACKEND == "http"
+
+    def _start_http_search(self, task: str, query: str):
+        self._http_gen += 1
+        self._http_thread = QtCore.QThread(self)
+        self._http_worker = _HttpSearchWorker(self._http_gen, task, query,
+                                              self.IMG_MAX if task == "images" else self.VID_MAX)
+        self._http_worker.moveToThread(self._http_thread)
+        self._http_thread.started.connect(self._http_worker.run)
+        self._http_worker.finished.connect(self._on_http_results)
+        self._http_worker.finished.connect(self._http_thread.quit)
+        self._http_worker.finished.connect(self._http_worker.deleteLater)
+        self._http_thread.finished.connect(self._http_thread.deleteLater)
+        self._http_thread.start()
+
+    def _on_http_results(self, gen: int, task: str, query: str, items: list):
+        self._http_thread = None
+        self._http_worker = None
+        if gen != self._http_gen:
+            return
+        if task == "images":
+            if items:
+                self.bg_task = "images"
+                self._img_accum = list(items)
+                self._img_seen = {it.get("img") for it in items}
+                self._prefetch_images(self._img_accum[:self.IMG_MAX])
+            else:
+                self._start_images(query, http=False)
+        elif task == "videos":
+            if items:
+                self.bg_task = "videos"
+                self._vid_accum = list(items)
+                self._bg_open_videos()
+            else:
+                self._start_videos(query, http=False)
+
+    # ---------- Searches (hidden browser fallback)
+    def _start_images(self, query: str, http: bool = True):
+        if http and self._use_http_search():
+            self._bg_finish()
+            self._start_http_search("images", query)
+            return
         self.bg_task = "images"
         self.bg_query = query
         self.bg_provider = "google"
@@ -1158,22 +854,54 @@ QLineEdit{
 
         # Kick off
         if self._img_queue:
-            self.bg.setUrl(QUrl(self._img_queue.pop(0)))
+            self._bg_navigate(self._img_queue.pop(0))
         if not self.bg_timer.isActive():
             self.bg_timer.start()
 
-    def _start_videos(self, query: str):
+    def _start_videos(self, query: str, http: bool = True):
+        if http and self._use_http_search():
+            self._bg_finish()
+            self._start_http_search("videos", query)
+            return
         self.bg_task = "videos"
         self.bg_query = query
         self.bg_deadline_ms = QtCore.QDateTime.currentMSecsSinceEpoch() + 25000
+        self._vid_accum = []
         url = f"https://www.youtube.com/results?search_query={QtCore.QUrl.toPercentEncoding(query).data().decode()}&hl=en"
-        self.bg.setUrl(QUrl(url))
+        self._bg_navigate(url)
         if not self.bg_timer.isActive():
             self.bg_timer.start()
 
+    def _bg_navigate(self, url: str):
+        # New generation per page so late pushes from the previous page are dropped
+        self._bg_gen += 1
+        self._bg_legacy_poll = False
+        self.bg.setUrl(QUrl(url))
+
+    def _bg_finish(self):
+        self.bg_timer.stop()
+        self._bg_gen += 1
+        self._bg_legacy_poll = False
+
     def _on_bg_loaded(self, ok: bool):
-        # no-op; polling handles extraction & fallbacks
-        pass
+        if not self.bg_task or not self.bg_timer.isActive():
+            return
+        try:
+            self.bg.page().runJavaScript(CONSENT_JS)
+        except Exception:
+            pass
+        js = BG_COLLECTOR_JS.replace("__TASK__", self.bg_task).replace("__GEN__", str(self._bg_gen))
+        gen = self._bg_gen
+        try:
+            self.bg.page().runJavaScript(js, lambda res, g=gen: self._on_collector_installed(g, res))
+        except Exception:
+            self._bg_legacy_poll = True
+
+    def _on_collector_installed(self, gen: int, res):
+        if gen != self._bg_gen:
+            return
+        if res != "ok":
+            self._bg_legacy_poll = True
 
     def _bg_tick(self):
         now = QtCore.QDateTime.currentMSecsSinceEpoch()
@@ -1184,28 +912,35 @@ QLineEdit{
                     # Fallback to DuckDuckGo Images (kp=-2 disables safe search)
                     self.bg_provider = "ddg"
                     u = f"https://duckduckgo.com/?q={QtCore.QUrl.toPercentEncoding(self.bg_query).data().decode()}&iar=images&iax=images&ia=images&kp=-2"
-                    self.bg.setUrl(QUrl(u))
+                    self._bg_navigate(u)
                     self.bg_deadline_ms = now + 22000
                     return
                 elif self.bg_provider == "ddg":
                     # Fallback to Bing images with safesearch off
                     self.bg_provider = "bing"
                     u = f"https://www.bing.com/images/search?q={QtCore.QUrl.toPercentEncoding(self.bg_query).data().decode()}&FORM=HDRSC2&safeSearch=off&adlt=off"
-                    self.bg.setUrl(QUrl(u))
+                    self._bg_navigate(u)
                     self.bg_deadline_ms = now + 22000
                     return
                 elif self.bg_provider == "bing":
                     # Fallback to Brave images (explicitly permissive)
                     self.bg_provider = "brave"
                     u = f"https://search.brave.com/images?q={QtCore.QUrl.toPercentEncoding(self.bg_query).data().decode()}&source=web&spellcheck=1&safesearch=off"
-                    self.bg.setUrl(QUrl(u))
+                    self._bg_navigate(u)
                     self.bg_deadline_ms = now + 22000
                     return
+            if self.bg_task == "videos" and self._vid_accum:
+                self._bg_open_videos()
+                return
             # Out of options
-            self.bg_timer.stop()
+            self._bg_finish()
             self._hide_loading()
             return
 
+        # Results are pushed by BG_COLLECTOR_JS; only poll when the channel is unavailable
+        if not self._bg_legacy_poll:
+            return
+
         # Nudge hydration and accept consent
         try:
             self.bg.page().runJavaScript(CONSENT_JS)
@@ -1223,14 +958,35 @@ QLineEdit{
         elif self.bg_task == "videos":
             self.bg.page().runJavaScript(INJECT_VIDEOS, self._bg_handle_videos)
 
-    def _bg_handle_images(self, json_str):
+    # ---------- Pushed results (QWebChannel)
+    def _on_bg_items(self, gen: int, task: str, payload: str):
+        if gen != self._bg_gen or task != self.bg_task:
+            return
         try:
-            items = json.loads(json_str or "[]")
+            items = json.loads(payload or "[]")
         except Exception:
             items = []
-
-        # De-dupe and accumulate up to IMG_MAX
-        for it in items:
+        if task == "images":
+            if self._bg_accept_images(items):
+                self._bg_finish()
+                self._prefetch_images(self._img_accum[:self.IMG_MAX])
+        elif task == "videos":
+            self._vid_accum.extend(it for it in items if (it.get("videoId") or "").strip())
+            if len(self._vid_accum) >= self.VID_MAX:
+                self._bg_open_videos()
+
+    def _on_bg_idle(self, gen: int, task: str):
+        # The page stopped producing new results
+        if gen != self._bg_gen or task != self.bg_task:
+            return
+        if task == "images":
+            self._bg_next_image_source()
+        elif task == "videos" and self._vid_accum:
+            self._bg_open_videos()
+
+    def _bg_accept_images(self, items) -> bool:
+        # De-dupe and accumulate up to IMG_MAX; True when enough were collected
+        for it in items or []:
             u = (it.get("img") or "").strip()
             if not u or u in self._img_seen:
                 continue
@@ -1238,24 +994,52 @@ QLineEdit{
             self._img_accum.append(it)
             if len(self._img_accum) >= self.IMG_MAX:
                 break
+        return len(self._img_accum) >= self.IMG_MAX
 
-        # Enough collected: prefetch and stop
-        if len(self._img_accum) >= self.IMG_MAX:
-            self.bg_timer.stop()
-            self._prefetch_images(self._img_accum[:self.IMG_MAX])
-            return
-
-        # Otherwise move to next queued URL to broaden coverage
+    def _bg_next_image_source(self):
+        # Move to next queued URL to broaden coverage
         if self._img_queue:
-            self.bg.setUrl(QUrl(self._img_queue.pop(0)))
+            self._bg_navigate(self._img_queue.pop(0))
             now = QtCore.QDateTime.currentMSecsSinceEpoch()
             self.bg_deadline_ms = now + 22000
         else:
-            # No more sources; if we have some, use them; else keep polling until deadline fallback
+            # No more sources; if we have some, use them; else wait for the deadline fallback
             if self._img_accum:
-                self.bg_timer.stop()
+                self._bg_finish()
                 self._prefetch_images(self._img_accum)
-            # else: keep polling; _bg_tick deadline will hide loading when timeouts occur
+
+    def _warm_video_player(self):
+        try:
+            if self.video_show is None:
+                self.video_show = _VideoSlideshow(self)
+        except Exception:
+            pass
+
+    def _bg_open_videos(self):
+        vids = self._vid_accum[:self.VID_MAX]
+        self._vid_accum = []
+        self._bg_finish()
+        if self.video_show is None:
+            self.video_show = _VideoSlideshow(self)
+        self.video_show.open_list(vids)
+        self._hide_loading()
+        self.overlay_open = True
+        self._overlay_idx = 0
+        self._overlay_apply()
+
+    # ---------- Polled results (fallback when QWebChannel is unavailable)
+    def _bg_handle_images(self, json_str):
+        try:
+            items = json.loads(json_str or "[]")
+        except Exception:
+            items = []
+
+        # Enough collected: prefetch and stop
+        if self._bg_accept_images(items):
+            self._bg_finish()
+            self._prefetch_images(self._img_accum[:self.IMG_MAX])
+            return
+        self._bg_next_image_source()
 
     def _bg_handle_videos(self, json_str):
         try:
@@ -1263,14 +1047,8 @@ QLineEdit{
         except Exception:
             vids = []
         if vids:
-            self.bg_timer.stop()
-            if self.video_show is None:
-                self.video_show = _VideoSlideshow(self)
-            self.video_show.open_list(vids[:30])
-            self._hide_loading()
-            self.overlay_open = True
-            self._overlay_idx = 0
-            self._overlay_apply()
+            self._vid_accum = list(vids)
+            self._bg_open_videos()
         else:
             # keep polling; YouTube can be slow to hydrate
             pass
@@ -1352,6 +1130,11 @@ QLineEdit{
         try:
             cur = btns[self._overlay_idx]
             lbl = (cur.text() or "").strip() or "button"
+            # Video prev/next: announce the prefetched title of where it would go
+            act = cur.property("action") or ""
+            if act in ("vd_prev", "vd_next") and self.video_show:
+                t = self.video_show.title_at(-1 if act == "vd_prev" else 1)
+                if t: lbl = f"{lbl}, {t}"
             speak(lbl)
         except Exception:
             pass
@@ -1382,9 +1165,9 @@ QLineEdit{
             if act == "img_close" and self.image_show and self.image_show.isVisible():
                 self.image_show.close(); speak("close"); return
             if act == "vd_prev"  and self.video_show and self.video_show.isVisible():
-                self.video_show.prev(); speak("previous"); return
+                self.video_show.prev(); speak(self.video_show.title_at(0) or "previous"); return
             if act == "vd_next"  and self.video_show and self.video_show.isVisible():
-                self.video_show.next(); speak("next"); return
+                self.video_show.next(); speak(self.video_show.title_at(0) or "next"); return
             if act == "vd_close" and self.video_show and self.video_show.isVisible():
                 self.video_show.close(); speak("close"); return
             btn.click()
@@ -1393,35 +1176,6 @@ QLineEdit{
             try: btn.click()
             except Exception: pass
 
-    # ---------- Row/key speech helpers ----------
-    def _speak_row_label(self):
-        rd = self.rows[self.row_idx]
-        if rd.id == "row_text":
-            return
-        if rd.id in ("row1","row2","row3","row4","row5","row6"):
-            row_names = {
-                "row1": "a b c d e f",
-                "row2": "g h i j k l",
-                "row3": "m n o p q r",
-                "row4": "s t u v w x",
-                "row5": "y z zero one two three",
-                "row6": "four five six seven eight nine",
-            }
-            speak(row_names.get(rd.id, rd.label)); return
-        if rd.id == "row_modes": speak("search")
-        elif rd.id == "row_controls": speak("controls")
-        elif rd.id == "predRow": speak("predictive text")
-
-    def _speak_key_label(self):
-        cur = self.rows[self.row_idx]
-        try:
-            w = cur.widgets[self.key_idx]
-            if isinstance(w, QtWidgets.QPushButton):
-                label = (w.text() or "").strip()
-                if label: speak(label)
-        except Exception:
-            pass
-
     # ---------- Windows kiosk helpers (force focus + close Start/Widgets)
     def _install_force_focus(self):
         self.setWindowFlag(Qt.WindowStaysOnTopHint, True)
@@ -1499,8 +1253,11 @@ QLineEdit{
                 self._img_fetch_thread.quit(); self._img_fetch_thread.wait(1000)
         except Exception: pass
         try:
-            if self.pred_thread and self.pred_thread.isRunning():
-                self.pred_thread.quit(); self.pred_thread.wait(1000)
+            if self._http_thread and self._http_thread.isRunning():
+                self._http_thread.quit(); self._http_thread.wait(1000)
+        except Exception: pass
+        try:
+            self.keyboard.shutdown()
         except Exception: pass
         # REPLACED: stop TTS cleanly
         try:
@@ -1509,58 +1266,36 @@ QLineEdit{
             pass
         self._cleanup_img_temp_dir()
 
-# ---------- Predict worker (KenLM + fallback) ----------
-class PredictWorker(QtCore.QObject):
-    request = QtCore.Signal(int, str)       # (id, text)
-    ready   = QtCore.Signal(int, str, list) # (id, text, predictions)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.request.connect(self._on_request)
-
-    @QtCore.Slot(int, str)
-    def _on_request(self, req_id: int, text: str):
-        raw = text or ""
-        ends_space = raw.endswith(" ")
-        words = raw.strip().split()
-        if ends_space:
-            context, prefix = words[-2:], ""
-        else:
-            prefix = (words[-1] if words else "")
-            context = words[:-1][-2:]
-        try:
-            preds = fetch_kenlm(context, prefix, limit=6)
-            if not preds:
-                preds = _fallback_ngram(raw, limit=6)
-            preds = [p.lower() for p in preds if p]
-        except Exception:
-            try:
-                preds = _fallback_ngram(raw, limit=6)
-            except Exception:
-                preds = local_suggest(raw, 6)
-
-        # ADD: hardcoded injections before KenLM suggestions when prefix is exactly 'n' or 'b'
+# ---------- Hidden-browser result channel ----------
+class _BgResultsBridge(QtCore.QObject):
+    # Registered on the hidden page's QWebChannel as "narbe"; BG_COLLECTOR_JS calls these
+    items   = QtCore.Signal(int, str, str)  # (generation, task, JSON list of new items)
+    settled = QtCore.Signal(int, str)       # (generation, task) page stopped producing items
+
+    @QtCore.Slot(int, str, str)
+    def push(self, gen: int, task: str, payload: str):
+        self.items.emit(int(gen), str(task), str(payload or "[]"))
+
+    @QtCore.Slot(int, str, int)
+    def idle(self, gen: int, task: str, sent: int):
+        self.settled.emit(int(gen), str(task))
+
+# ---------- Direct HTTP search worker ----------
+class _HttpSearchWorker(QtCore.QObject):
+    finished = QtCore.Signal(int, str, str, list)  # (generation, task, query, items)
+    def __init__(self, gen, task, query, limit):
+        super().__init__(); self.gen = gen; self.task = task; self.query = query; self.limit = limit
+    @QtCore.Slot()
+    def run(self):
+        items = []
         try:
-            inj = []
-            pl = (prefix or "").strip().lower()
-            if pl == "n":
-                inj.append("narbe")
-            elif pl == "b":
-                inj.append("beaminbenny")
-            if inj:
-                seen = set()
-                final = []
-                for w in inj + preds:
-                    wl = (w or "").lower()
-                    if not wl or wl in seen:
-                        continue
-                    seen.add(wl)
-                    final.append(w)
-                preds = final[:6]
+            if self.task == "images":
+                items = narbe_http_search.search_images(self.query, self.limit)
+            elif self.task == "videos":
+                items = narbe_http_search.search_videos(self.query, self.limit)
         except Exception:
-            pass
-
-        self.ready.emit(req_id, text, preds)
+            items = []
+        self.finished.emit(self.gen, self.task, self.query, items or [])
 
 # ---------- Image prefetch worker ----------
 class _ImageFetchWorker(QtCore.QObject):
@@ -1705,49 +1440,75 @@ class _ImageSlideshow(QtWidgets.QDialog):
             super().keyReleaseEvent(e)
 
 # ---------- Video slideshow ----------
-class _VideoSlideshow(QtWidgets.QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent, QtCore.Qt.FramelessWindowHint)
-        self.setModal(True); self.setWindowModality(Qt.ApplicationModal)
-        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
-        self.items = []; self.idx = 0
-        v = QtWidgets.QVBoxLayout(self); v.setContentsMargins(24,24,24,24); v.setSpacing(8)
-        bg = QtWidgets.QFrame(); bg.setStyleSheet("QFrame{background:rgba(0,0,0,0.94); border-radius:14px;}")
-        gl = QtWidgets.QVBoxLayout(bg); gl.setContentsMargins(12,12,12,12); gl.setSpacing(8)
-        self.web = QWebEngineView()
-        self.web.setStyleSheet("QWebEngineView{background:#000; border-radius:8px;}"); self.web.setMinimumSize(480,320)
+# ---------- Video metadata worker ----------
+class _VideoMetaWorker(QtCore.QObject):
+    finished = QtCore.Signal(list)  # [{"videoId", "title", "thumb": bytes}]
+    def __init__(self, ids, need_title, refresh_api=False):
+        super().__init__(); self.ids = list(ids or []); self.need_title = set(need_title or []); self.refresh_api = refresh_api
+    @QtCore.Slot()
+    def run(self):
+        out = []
         try:
-            self.web.settings().setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False)
-            self.web.settings().setAutoplayPolicy(QWebEngineSettings.AutoplayPolicy.NoUserGestureRequired)
-        except Exception: pass
-        gl.addWidget(self.web, 1)
-        bar = QtWidgets.QFrame(); bl = QtWidgets.QHBoxLayout(bar); bl.setContentsMargins(6,6,6,6); bl.setSpacing(8)
-        def mk(txt, act):
-            b = QtWidgets.QPushButton(txt)
-            b.setProperty("action", act)
-            b.setProperty("scanKey", True)
-            return b
-        self.btn_prev   = mk("previous","vd_prev")
-        self.btn_next   = mk("next","vd_next")
-        self.btn_close  = mk("close","vd_close")
-        self.buttons = [self.btn_prev, self.btn_next, self.btn_close]
-        for b in self.buttons: bl.addWidget(b)
-        gl.addWidget(bar, 0); v.addWidget(bg, 1)
-        self.btn_prev.clicked.connect(self.prev); self.btn_next.clicked.connect(self.next); self.btn_close.clicked.connect(self.close)
+            s = requests.Session()
+            s.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124 Safari/537.36"
+            if self.refresh_api:
+                _refresh_iframe_api(s)
+            for vid in self.ids:
+                row = {"videoId": vid, "title": "", "thumb": b""}
+                try:
+                    r = s.get(f"https://i.ytimg.com/vi/{vid}/mqdefault.jpg", timeout=6)
+                    if r.ok: row["thumb"] = r.content or b""
+                except Exception: pass
+                if vid in self.need_title:
+                    try:
+                        r = s.get("https://www.youtube.com/oembed",
+                                  params={"url": f"https://www.youtube.com/watch?v={vid}", "format": "json"}, timeout=6)
+                        if r.ok: row["title"] = str((r.json() or {}).get("title") or "")
+                    except Exception: pass
+                out.append(row)
+        except Exception:
+            pass
+        self.finished.emit(out)
 
-    def open_list(self, items):
-        self.items = items or []; self.idx = 0
-        self._build_player_html()
-        try:
-            p = self.parent(); self.resize(p.size()); self.move(p.pos())
-        except Exception: pass
-        self.show()
+class _PlayerPage(QWebEnginePage):
+    # Forwards "narbe:*" console lines from the player page; everything else stays quiet
+    console = QtCore.Signal(str)
+    def javaScriptConsoleMessage(self, level, message, line_number, source_id):
+        if (message or "").startswith("narbe:"):
+            self.console.emit(message)
+
+# ---------- Video player (kept warm across searches) ----------
+# NARBE_VIDEO_WARM=0 restores the old rebuild-per-search player (for time-to-first-frame comparisons)
+VIDEO_WARM = os.environ.get("NARBE_VIDEO_WARM", "1").strip() != "0"
+YT_IFRAME_API = "https://www.youtube.com/iframe_api"
+YT_API_CACHE = os.path.join(tempfile.gettempdir(), "narbe_cache", "iframe_api.js")
+YT_API_MAX_AGE = 24 * 3600  # seconds
+
+def _cached_iframe_api():
+    # Returns (source, stale). Empty source means nothing cached yet.
+    try:
+        age = time.time() - os.path.getmtime(YT_API_CACHE)
+        with open(YT_API_CACHE, "r", encoding="utf-8") as f:
+            return f.read(), age > YT_API_MAX_AGE
+    except Exception:
+        return "", True
+
+def _refresh_iframe_api(session=None):
+    try:
+        r = (session or requests).get(YT_IFRAME_API, timeout=8)
+        if r.ok and "YT" in r.text:
+            os.makedirs(os.path.dirname(YT_API_CACHE), exist_ok=True)
+            tmp = YT_API_CACHE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(r.text)
+            os.replace(tmp, YT_API_CACHE)
+    except Exception:
+        pass
 
-    def _build_player_html(self):
-        ids = [str(x.get("videoId") or "").strip() for x in (self.items or []) if (x.get("videoId") or "").strip()]
-        import json as _json
-        ids_js = _json.dumps(ids)
-        tpl = """<!doctype html><html><head><meta charset="utf-8" />
+# Player page: built once, playlists arrive through narbePlayerApi.setPlaylist(ids).
+# Logs "narbe:ttff <ms> <cold|warm>" when the first video of a playlist starts playing, and
+# "narbe:idx <i>" whenever it loads a video (also when it skips on its own after an end or error).
+VIDEO_PLAYER_HTML = """<!doctype html><html><head><meta charset="utf-8" />
 <meta name="viewport" content="width=device-width,initial-scale=1" />
 <style>
   html,body{margin:0;height:100%;background:#000;}
@@ -1758,51 +1519,224 @@ class _VideoSlideshow(QtWidgets.QDialog):
 <div id="wrap"><div id="player"></div></div>
 <script>
 (function(){
-  var tag = document.createElement('script');
-  tag.src = "https://www.youtube.com/iframe_api"; tag.async = true;
-  document.head.appendChild(tag);
-  var player, idx = 0, playlist = PLAYLIST_IDS;
-  function loadIdx(i){ if (!playlist.length) return; idx = ( (i % playlist.length) + playlist.length ) % playlist.length; try { player.loadVideoById(playlist[idx]); } catch(e){} }
+  var player = null, ready = false, idx = 0, playlist = PLAYLIST_IDS;
+  var t0 = 0, mode = 'cold', reported = true;
+  function mark(){ t0 = performance.now(); reported = false; mode = ready ? 'warm' : 'cold'; }
+  function report(){
+    if (reported) return; reported = true;
+    try { console.log('narbe:ttff ' + Math.round(performance.now() - t0) + ' ' + mode); } catch(e){}
+  }
+  function loadIdx(i){
+    if (!playlist.length || !ready) return;
+    idx = ( (i % playlist.length) + playlist.length ) % playlist.length;
+    try { console.log('narbe:idx ' + idx); } catch(e){}
+    try { player.loadVideoById(playlist[idx]); } catch(e){}
+  }
   function ensureLoud(){ try{ player.unMute(); player.setVolume(85); }catch(e){} }
   window.onYouTubeIframeAPIReady = function(){
     player = new YT.Player('player', {
       host: 'https://www.youtube-nocookie.com',
-      videoId: (playlist[0]||''),
       playerVars: { autoplay: 1, controls: 0, rel: 0, modestbranding: 1, playsinline: 1, fs: 0, enablejsapi: 1 },
       events: {
-        onReady: function(){ try { ensureLoud(); player.playVideo(); } catch (e) {} ; setTimeout(ensureLoud, 300); },
+        onReady: function(){ ready = true; ensureLoud(); loadIdx(idx); setTimeout(ensureLoud, 300); },
         onError: function(){ try { loadIdx(idx+1); } catch(e){} },
         onStateChange: function(ev){
           try{
+            if (!playlist.length) return;
             if (ev && (ev.data === YT.PlayerState.UNSTARTED || ev.data === YT.PlayerState.CUED || ev.data === YT.PlayerState.PAUSED)) { ensureLoud(); player.playVideo(); }
             else if (ev && ev.data === YT.PlayerState.ENDED) { loadIdx(idx+1); }
-            else if (ev && ev.data === YT.PlayerState.PLAYING) { ensureLoud(); }
+            else if (ev && ev.data === YT.PlayerState.PLAYING) { ensureLoud(); report(); }
           }catch(e){}
         }
       }
     });
   };
   window.narbePlayerApi = {
+    setPlaylist: function(ids){ playlist = ids || []; idx = 0; mark(); loadIdx(0); },
     next: function(){ loadIdx(idx+1); },
     prev: function(){ loadIdx(idx-1); },
     pause: function(){ try{ player.pauseVideo(); }catch(e){} },
-    stop: function(){ try{ player.stopVideo && player.stopVideo(); }catch(e){} }
+    stop: function(){ playlist = []; try{ player.stopVideo && player.stopVideo(); }catch(e){} }
   };
+  if (playlist.length) mark();
 })();
 </script>
+IFRAME_API_SCRIPT
 </body></html>"""
-        html = tpl.replace("PLAYLIST_IDS", ids_js)
+
+class _VideoSlideshow(QtWidgets.QDialog):
+    META_AHEAD = 3  # prefetch title/thumbnail for this many upcoming videos
+
+    def __init__(self, parent=None):
+        super().__init__(parent, QtCore.Qt.FramelessWindowHint)
+        self.setModal(True); self.setWindowModality(Qt.ApplicationModal)
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self.items = []; self.idx = 0
+        self._page_loaded = False
+        self._pending_ids = None
+        self._meta = {}              # videoId -> {"title": str, "thumb": QPixmap | None}
+        self._meta_thread = None
+        self._meta_worker = None
+        v = QtWidgets.QVBoxLayout(self); v.setContentsMargins(24,24,24,24); v.setSpacing(8)
+        bg = QtWidgets.QFrame(); bg.setStyleSheet("QFrame{background:rgba(0,0,0,0.94); border-radius:14px;}")
+        gl = QtWidgets.QVBoxLayout(bg); gl.setContentsMargins(12,12,12,12); gl.setSpacing(8)
+        self.web = QWebEngineView()
+        self.web.setPage(_PlayerPage(self.web))
+        self.web.page().console.connect(self._on_player_console)
+        self.web.loadFinished.connect(self._on_player_loaded)
+        self.web.setStyleSheet("QWebEngineView{background:#000; border-radius:8px;}"); self.web.setMinimumSize(480,320)
+        try:
+            self.web.settings().setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False)
+            self.web.settings().setAutoplayPolicy(QWebEngineSettings.AutoplayPolicy.NoUserGestureRequired)
+        except Exception: pass
+        gl.addWidget(self.web, 1)
+        bar = QtWidgets.QFrame(); bl = QtWidgets.QHBoxLayout(bar); bl.setContentsMargins(6,6,6,6); bl.setSpacing(8)
+        def mk(txt, act):
+            b = QtWidgets.QPushButton(txt)
+            b.setProperty("action", act)
+            b.setProperty("scanKey", True)
+            b.setIconSize(QtCore.QSize(96, 54))
+            return b
+        self.btn_prev   = mk("previous","vd_prev")
+        self.btn_next   = mk("next","vd_next")
+        self.btn_close  = mk("close","vd_close")
+        self.buttons = [self.btn_prev, self.btn_next, self.btn_close]
+        for b in self.buttons: bl.addWidget(b)
+        gl.addWidget(bar, 0); v.addWidget(bg, 1)
+        self.btn_prev.clicked.connect(self.prev); self.btn_next.clicked.connect(self.next); self.btn_close.clicked.connect(self.close)
+        if VIDEO_WARM:
+            # Bootstrap the player now so the first search only has to push a playlist
+            self._build_player_html()
+
+    def _ids(self):
+        return [str(x.get("videoId") or "").strip() for x in (self.items or []) if (x.get("videoId") or "").strip()]
+
+    def open_list(self, items):
+        self.items = [x for x in (items or []) if (x.get("videoId") or "").strip()]; self.idx = 0
+        for it in self.items:
+            vid = str(it.get("videoId")).strip()
+            t = (it.get("title") or "").strip()
+            if t and t.lower() not in ("video", "short"):
+                self._meta.setdefault(vid, {"title": t, "thumb": None})
+        if VIDEO_WARM:
+            self._push_playlist(self._ids())
+        else:
+            self._build_player_html(self._ids())
+        self._prefetch_meta()
+        self._refresh_nav()
+        try:
+            p = self.parent(); self.resize(p.size()); self.move(p.pos())
+        except Exception: pass
+        self.show()
+
+    def _build_player_html(self, ids=None):
+        self._page_loaded = False
+        self._pending_ids = None
+        api_src, stale = _cached_iframe_api()
+        if api_src:
+            # Cached loader inline; "</" escaped so it cannot close the script tag
+            api_tag = "<script>" + api_src.replace("</", "<\\/") + "</script>"
+        else:
+            api_tag = f'<script src="{YT_IFRAME_API}" async></script>'
+        if stale:
+            self._prefetch_meta(refresh_api=True)
+        html = VIDEO_PLAYER_HTML.replace("PLAYLIST_IDS", json.dumps(ids or [])).replace("IFRAME_API_SCRIPT", api_tag)
         self.web.setHtml(html, QUrl("https://www.youtube.com"))
 
+    def _push_playlist(self, ids):
+        if not self._page_loaded:
+            self._pending_ids = list(ids)
+            return
+        self.exec_js(f"narbePlayerApi && narbePlayerApi.setPlaylist({json.dumps(list(ids))});")
+
+    def _on_player_loaded(self, ok: bool):
+        self._page_loaded = bool(ok)
+        if ok and self._pending_ids is not None:
+            ids, self._pending_ids = self._pending_ids, None
+            self._push_playlist(ids)
+
+    def _on_player_console(self, msg: str):
+        parts = (msg or "").split()
+        if len(parts) >= 3 and parts[0] == "narbe:ttff":
+            print(f"[video] time-to-first-frame {parts[1]} ms ({parts[2]})")
+        elif len(parts) >= 2 and parts[0] == "narbe:idx":
+            # The player moves on by itself when a video ends or fails; follow it
+            try:
+                i = int(parts[1])
+            except ValueError:
+                return
+            if 0 <= i < len(self.items) and i != self.idx:
+                self.idx = i
+                self._prefetch_meta(); self._refresh_nav()
+
+    # ---------- Upcoming video metadata (titles + thumbnails)
+    def _upcoming_ids(self):
+        ids = self._ids()
+        if not ids: return []
+        n = min(len(ids), self.META_AHEAD + 1)
+        return [ids[(self.idx + k) % len(ids)] for k in range(-1, n)]
+
+    def _prefetch_meta(self, refresh_api: bool = False):
+        if self._meta_thread is not None:
+            return
+        want = [vid for vid in self._upcoming_ids() if (self._meta.get(vid) or {}).get("thumb") is None]
+        want = list(dict.fromkeys(want))
+        if not want and not refresh_api:
+            return
+        need_title = [vid for vid in want if not (self._meta.get(vid) or {}).get("title")]
+        self._meta_thread = QtCore.QThread(self)
+        self._meta_worker = _VideoMetaWorker(want, need_title, refresh_api)
+        self._meta_worker.moveToThread(self._meta_thread)
+        self._meta_thread.started.connect(self._meta_worker.run)
+        self._meta_worker.finished.connect(self._on_meta_ready)
+        self._meta_worker.finished.connect(self._meta_thread.quit)
+        self._meta_worker.finished.connect(self._meta_worker.deleteLater)
+        self._meta_thread.finished.connect(self._meta_thread.deleteLater)
+        self._meta_thread.start()
+
+    def _on_meta_ready(self, rows):
+        self._meta_thread = None
+        self._meta_worker = None
+        for row in rows or []:
+            vid = row.get("videoId")
+            m = self._meta.setdefault(vid, {"title": "", "thumb": None})
+            if row.get("title") and not m.get("title"):
+                m["title"] = row["title"]
+            pm = QtGui.QPixmap()
+            if row.get("thumb") and pm.loadFromData(row["thumb"]):
+                m["thumb"] = pm
+            elif m.get("thumb") is None:
+                m["thumb"] = QtGui.QPixmap()  # tried; don't refetch
+        self._refresh_nav()
+        # Navigation may have moved on while this batch was loading
+        self._prefetch_meta()
+
+    def title_at(self, offset: int = 0) -> str:
+        ids = self._ids()
+        if not ids: return ""
+        vid = ids[(self.idx + offset) % len(ids)]
+        return ((self._meta.get(vid) or {}).get("title") or "").strip()
+
+    def _refresh_nav(self):
+        ids = self._ids()
+        for b, off in ((self.btn_prev, -1), (self.btn_next, 1)):
+            pm = None
+            if ids:
+                pm = (self._meta.get(ids[(self.idx + off) % len(ids)]) or {}).get("thumb")
+            try: b.setIcon(QtGui.QIcon(pm) if pm is not None and not pm.isNull() else QtGui.QIcon())
+            except Exception: pass
+
     def prev(self):
         if not self.items: return
         self.idx = (self.idx - 1 + len(self.items)) % len(self.items)
         self.exec_js("narbePlayerApi && narbePlayerApi.prev();")
+        self._prefetch_meta(); self._refresh_nav()
 
     def next(self):
         if not self.items: return
         self.idx = (self.idx + 1) % len(self.items)
         self.exec_js("narbePlayerApi && narbePlayerApi.next();")
+        self._prefetch_meta(); self._refresh_nav()
 
     def exec_js(self, code: str):
         try: self.web.page().runJavaScript(code)
@@ -1811,10 +1745,14 @@ class _VideoSlideshow(QtWidgets.QDialog):
     def shutdown(self):
         try: self.exec_js("narbePlayerApi && (narbePlayerApi.stop && narbePlayerApi.stop(), narbePlayerApi.pause && narbePlayerApi.pause());")
         except Exception: pass
+        if VIDEO_WARM:
+            # Keep the page and player alive for the next search
+            return
         try: self.web.page().triggerAction(QWebEnginePage.Stop)
         except Exception: pass
         try: self.web.setUrl(QUrl("about:blank"))
         except Exception: pass
+        self._page_loaded = False
 
     def closeEvent(self, e: QtGui.QCloseEvent):
         try: self.shutdown()
@@ -1847,9 +1785,6 @@ def main():
     QFrame[scanRow="true"] {{
       background:#0f1521; border:1px solid rgba(255,255,255,0.10); border-radius:12px;
     }}
-    QFrame[scanRow="true"][focused="true"] {{
-      {FOCUS_STYLE}
-    }}
     /* Button base */
     QPushButton[scanKey="true"] {{
       border:1px solid rgba(124,203,255,0.35);
@@ -1866,7 +1801,7 @@ def main():
       background: qlineargradient(x1:0,y1:0,x2:0,y2:1, stop:0 #3a1d0a, stop:1 #2a1407);
       color:#ffd79a;
     }}
-    /* Focused button highlight */
+    /* Focused button highlight (slideshow buttons; keyboard scan uses ScanFocusFrame) */
     QPushButton[scanKey="true"][focused="true"] {{
       {FOCUS_STYLE}
     }}
@@ -0,0 +1,13 @@
+# Modules in this repo import their siblings by plain name (they are run as scripts from
+# their own folder), so put those folders on sys.path for the tests
+import os, sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")   # Qt widgets without a display
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for sub in ("messenger", "utils", "search"):
+    path = os.path.join(ROOT, sub)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
@@ -0,0 +1,91 @@
+# DiscordBridge startup history against fake_discord: nothing between the stored high-water
+# mark and the newest message may be skipped
+import asyncio, threading
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("discord")
+
+import ben_discord_app as app
+from fake_discord import FakeMessage, FakeWorld
+from message_store import MessageStore
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "MESSAGE_DB_PATH", str(tmp_path / "messages.db"))
+    monkeypatch.setattr(app, "NAME_CACHE_PATH", str(tmp_path / "name_cache.json"))
+    return tmp_path
+
+
+def _run(world, tmp_path, until=None, timeout=20.0):
+    """Start a bridge on `world`, wait for warm-load (and `until(bridge)`), stop it."""
+    bridge = app.DiscordBridge("fake-token", world.guild.id, world.main.id, 0, hub_port=0,
+                               client_factory=world.client)
+    bridge.dm_index_path = str(tmp_path / "dm_index.json")
+    warm = threading.Event()
+    bridge.warm_complete.connect(warm.set, app.Qt.DirectConnection)
+    bridge.start()
+    try:
+        assert warm.wait(timeout), "warm-load did not complete"
+        if until is not None:
+            done = threading.Event()
+
+            async def _poll():
+                while not until(bridge):
+                    await asyncio.sleep(0.01)
+                done.set()
+            asyncio.run_coroutine_threadsafe(_poll(), bridge.loop)
+            assert done.wait(timeout), "condition not reached"
+    finally:
+        bridge.stop()
+    return bridge
+
+
+def _offline(world, n):
+    peer = next(iter(world.guild.members.values()))
+    out = []
+    for i in range(n):
+        out.append(FakeMessage(world.main, peer, f"offline {i}"))
+        world.main._add(out[-1])
+    return out
+
+
+def test_offline_messages_after_the_mark_are_all_stored(paths):
+    world = FakeWorld.synthetic(dms=2, dm_history=5, main_history=40, latency=0.0)
+    _run(world, paths)
+    missed = _offline(world, 80)   # more than CHANNEL_INITIAL_LIMIT arrive while closed
+
+    bridge = _run(world, paths)
+    held = {m.id for m in bridge.ui_messages["main"]}
+    assert {m.id for m in missed} <= held
+    store = MessageStore(app.MESSAGE_DB_PATH)
+    assert {m.id for m in missed} <= {r["id"] for r in store.load_messages("main")}
+    assert store.load_threads()["main"][0] == missed[-1].id
+    assert "main" in bridge._caught_up
+
+
+def test_backlog_past_the_cap_is_caught_up_in_the_background(paths, monkeypatch):
+    monkeypatch.setattr(app, "KEEP_PER_THREAD", 30)
+    monkeypatch.setattr(app, "CATCHUP_PAGE", 10)
+    world = FakeWorld.synthetic(dms=2, dm_history=5, main_history=40, latency=0.0)
+    _run(world, paths)
+    missed = _offline(world, 95)
+
+    caps = []
+    catch_up = app.DiscordBridge._catch_up
+
+    async def _recording(self, chan, thread_id):
+        caps.append(self.read_cap(thread_id))
+        await catch_up(self, chan, thread_id)
+    monkeypatch.setattr(app.DiscordBridge, "_catch_up", _recording)
+
+    bridge = _run(world, paths, until=lambda b: "main" in b._caught_up)
+    assert caps and caps[0] < missed[-1].id   # no read watermark over the gap while it fills
+    assert bridge.read_cap("main") is None
+    held = {m.id for m in bridge.ui_messages["main"]}
+    assert {m.id for m in missed} <= held
+    assert MessageStore(app.MESSAGE_DB_PATH).load_threads()["main"][0] == missed[-1].id
+    log = bridge.ui_messages["main"]
+    assert [m.id for m in log] == sorted(m.id for m in log)
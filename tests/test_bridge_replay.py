@@ -0,0 +1,36 @@
+# bridge_replay end to end on a small recorded trace: DiscordBridge + BenDiscordUI against fake_discord
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("discord")
+
+import ben_discord_app as app
+import bridge_replay
+
+from conftest import FIXTURES
+
+
+def test_recorded_trace_reaches_the_ui(monkeypatch):
+    # replay() points these at its temp dir; put them back afterwards
+    for name in ("MESSAGE_DB_PATH", "NAME_CACHE_PATH", "MEDIA_CACHE_DIR", "pyttsx3"):
+        monkeypatch.setattr(app, name, getattr(app, name))
+    monkeypatch.setattr(bridge_replay, "SETTLE_SEC", 1.0)
+    events = bridge_replay.load_trace(os.path.join(FIXTURES, "replay_small.jsonl"))
+    assert [e["t"] for e in events] == sorted(e["t"] for e in events)
+
+    res = bridge_replay.replay(events, latency_ms=5.0, dms=3, history=30, timeout=60.0)
+    assert res["warm_sec"] is not None
+    # Every injected gateway message reached the UI thread; Ben's own send is not counted
+    assert res["injected"] == 4 and res["delivered"] == 4
+    assert res["reactions"] == 3 and 1 <= res["reaction_signals"] <= 3
+    assert res["rest"].get("send") == 1
+
+
+def test_scenarios_are_ordered_traces():
+    for name in ("warm", "storm", "backfill", "threads", "mixed"):
+        ev = bridge_replay.scenario(name, peers=4)
+        assert [e["t"] for e in ev] == sorted(e["t"] for e in ev)
+    with pytest.raises(ValueError):
+        bridge_replay.scenario("nope", peers=4)
@@ -0,0 +1,124 @@
+import asyncio, socket, threading, time
+
+import pytest
+
+import gateway_hub
+from gateway_hub import GatewayHub, HubClient, hub_key
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _settle(pred, timeout=5.0):
+    t0 = time.monotonic()
+    while not pred() and time.monotonic() - t0 < timeout:
+        await asyncio.sleep(0.01)
+    return pred()
+
+
+def test_handshake_needs_the_same_key():
+    port = _free_port()
+
+    async def go():
+        hub = GatewayHub(port=port, key=hub_key("token"))
+        hub.welcome = {"user_id": 42}
+        await hub.start()
+        stranger = HubClient(lambda ev: None, port=port, key=hub_key("other token"))
+        assert not await stranger.connect()
+        assert not hub.attached("ui")
+        ui = HubClient(lambda ev: None, port=port, key=hub_key("token"))
+        assert await ui.connect()
+        assert ui.welcome.get("user_id") == 42 and "proof" not in ui.welcome
+        assert await _settle(lambda: hub.attached("ui"))
+        ui.close()
+        await hub.close()
+
+    asyncio.run(go())
+
+
+def test_client_refuses_an_impostor_hub():
+    port = _free_port()
+
+    async def go():
+        # Listens on the daemon's port and answers like a hub, without the key
+        async def handle(reader, writer):
+            writer.write(b'{"op":"challenge","nonce":"00"}\n')
+            await reader.readline()
+            writer.write(b'{"op":"hello","user_id":1,"proof":"forged"}\n')
+            await reader.read()
+        server = await asyncio.start_server(handle, "127.0.0.1", port)
+        c = HubClient(lambda ev: None, port=port, key=hub_key("token"))
+        assert not await c.connect()
+        assert not c.connected
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(go())
+
+
+def test_secret_overrides_the_token():
+    assert hub_key("token", "s3cret") == hub_key("other token", "s3cret")
+    assert hub_key("token") != hub_key("token", "s3cret")
+
+
+class _HubThread:
+    """A GatewayHub on its own loop, as the daemon runs it."""
+
+    def __init__(self, port, key):
+        self.port, self.key = port, key
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.hub = None
+
+    def call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(5)
+
+    def start(self):
+        self.hub = GatewayHub(port=self.port, key=self.key)
+        self.call(self.hub.start())
+
+    def close(self):
+        self.call(self.hub.close())
+
+
+def _wait(pred, timeout=10.0):
+    t0 = time.monotonic()
+    while not pred() and time.monotonic() - t0 < timeout:
+        time.sleep(0.02)
+    return pred()
+
+
+def test_bridge_hands_live_events_back_to_a_returning_daemon(tmp_path, monkeypatch):
+    pytest.importorskip("PySide6")
+    pytest.importorskip("discord")
+    import ben_discord_app as app
+    from fake_discord import FakeWorld
+
+    monkeypatch.setattr(app, "MESSAGE_DB_PATH", str(tmp_path / "messages.db"))
+    monkeypatch.setattr(app, "NAME_CACHE_PATH", str(tmp_path / "name_cache.json"))
+    monkeypatch.setattr(gateway_hub, "RETRY_SEC", 0.05)
+    world = FakeWorld.synthetic(dms=1, dm_history=3, main_history=3, latency=0.0)
+    daemon = _HubThread(_free_port(), hub_key("fake-token"))
+    daemon.start()
+    bridge = app.DiscordBridge("fake-token", world.guild.id, world.main.id, 0, hub_port=daemon.port,
+                               client_factory=world.client)
+    bridge.dm_index_path = str(tmp_path / "dm_index.json")
+    bridge.start()
+    try:
+        # Attached: REST-only, no gateway session of its own
+        assert _wait(lambda: bridge._via_hub and daemon.hub.attached("ui"))
+        assert world.clients == []
+        # Daemon gone: the bridge opens its own session
+        daemon.close()
+        assert _wait(lambda: not bridge._via_hub and len(world.clients) == 1)
+        first = world.clients[0]
+        # Daemon back: the bridge re-attaches and closes that session
+        daemon.start()
+        assert _wait(lambda: bridge._via_hub and daemon.hub.attached("ui") and world.clients == [])
+        assert first.is_closed() and bridge.client is not first
+    finally:
+        bridge.stop()
+        daemon.close()
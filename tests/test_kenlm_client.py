@@ -0,0 +1,127 @@
+import contextlib, threading, time
+
+import pytest
+
+import kenlm_client
+from kenlm_client import SHAPES, KenLMClient, _stand_in
+
+
+class SlowClient(KenLMClient):
+    """fetch() stands in for a slow server: it records the key and answers after `delay`."""
+
+    def __init__(self, delay, **kw):
+        super().__init__(api="http://127.0.0.1:9/word/predict", **kw)
+        self.delay = delay
+        self.calls = []
+        self._calls_lock = threading.Lock()
+
+    def fetch(self, context_words, prefix, limit=6):
+        with self._calls_lock:
+            self.calls.append(prefix)
+        time.sleep(self.delay)
+        out = [prefix + "x"]
+        self._store(self._key(context_words, prefix, limit), out)
+        return out
+
+
+@contextlib.contextmanager
+def stand_in(delay=0.0, shape="get"):
+    """The module's own stand-in server on a free port; yields (server, api url)."""
+    srv = _stand_in(0, delay, shape, quiet=True)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield srv, f"http://127.0.0.1:{srv.server_address[1]}/word/predict"
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_superseded_keystrokes_are_not_fetched(monkeypatch):
+    monkeypatch.setattr(kenlm_client, "KENLM_FAIL_LIMIT", 100)
+    c = SlowClient(0.2, budget_ms=0)
+    for pfx in ("h", "he", "hel", "hell", "hello"):
+        c.suggest(["say"], pfx, fallback=lambda: ["local"])
+    time.sleep(0.5)
+    # Two workers: the first two lookups were already running, the rest but the newest were dropped
+    assert c.calls[-1] == "hello"
+    assert len(c.calls) <= 3
+    assert c.cached(["say"], "hello") == ["hellox"]
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_learns_the_shape_the_server_accepts(shape):
+    with stand_in(shape=shape) as (srv, api):
+        c = KenLMClient(api=api, budget_ms=2000)
+        assert c.suggest(["i"], "ho", fallback=lambda: ["local"]) == ["home", "how", "house"]
+        assert c.shape == shape
+        probes = len(srv.seen)
+        assert probes == SHAPES.index(shape) + 1
+        # Learned: the next lookup is one request in that shape
+        assert c.suggest(["i"], "he", fallback=lambda: ["local"]) == ["hello", "help", "here"]
+        assert len(srv.seen) == probes + 1
+
+
+def test_reprobes_after_the_learned_shape_is_refused():
+    with stand_in(shape="get") as (srv, api):
+        c = KenLMClient(api=api)
+        assert c.fetch([], "ha") == ["have", "happy"]
+        assert c.shape == "get"
+        srv.shape = "post_context"
+        # 4xx on the learned shape: forget it; the next lookup probes every shape again
+        assert c.fetch([], "hi") == [] and c.shape is None
+        assert c.fetch([], "ho") == ["home", "how", "house"]
+        assert c.shape == "post_context"
+        assert c.available()
+
+
+def test_one_session_and_connection_for_every_lookup():
+    with stand_in(shape="post_left") as (srv, api):
+        c = KenLMClient(api=api)
+        sess = c._get_session()
+        for pfx in ("h", "he", "ho", "ha"):
+            assert c.fetch(["i"], pfx)
+        assert c._get_session() is sess
+        assert len({port for _, port in srv.seen}) == 1   # kept alive, not reconnected
+
+
+def test_slow_server_answers_within_budget_and_late_words_arrive():
+    # Server slower than the budget, keystrokes faster than the server: every keystroke is
+    # answered locally on time, the breaker stays closed and each answer is handed back late
+    with stand_in(delay=0.4, shape="post_left") as (srv, api):
+        c = KenLMClient(api=api, budget_ms=300)
+        late = []
+        for pfx in ("h", "he", "ho", "ha"):
+            t0 = time.monotonic()
+            out = c.suggest(["i"], pfx, fallback=lambda: ["local"], on_late=late.append)
+            assert time.monotonic() - t0 < 0.4
+            assert out == ["local"]
+            assert c.available()
+        time.sleep(0.6)
+        assert late and late[-1] == ["have", "happy"]
+        assert c.available() and c._failures == 0
+        # The late answer is in the cache for the same prefix
+        t0 = time.monotonic()
+        assert c.suggest(["i"], "ha", fallback=lambda: ["local"]) == ["have", "happy"]
+        assert time.monotonic() - t0 < 0.05
+
+
+def test_breaker_opens_on_timeouts_and_closes_on_an_answer(monkeypatch):
+    monkeypatch.setattr(kenlm_client, "KENLM_BACKOFF_SEC", 0.3)
+    with stand_in(delay=0.5, shape="post_left") as (srv, api):
+        c = KenLMClient(api=api, timeout=(1, 0.1), budget_ms=300)
+        for pfx in ("a", "b"):
+            assert c.suggest([], pfx, fallback=lambda: ["local"]) == ["local"]
+        assert not c.available()
+        n = len(srv.seen)
+        t0 = time.monotonic()
+        assert c.suggest([], "c", fallback=lambda: ["local"]) == ["local"]
+        assert time.monotonic() - t0 < 0.01
+        time.sleep(0.1)
+        assert len(srv.seen) == n
+
+        time.sleep(0.3)
+        assert c.available()
+        srv.delay = 0.0
+        assert c.suggest([], "h", fallback=lambda: ["local"], budget_ms=1000)[:2] == ["hello", "help"]
+        assert c.available() and c._failures == 0
@@ -0,0 +1,45 @@
+import threading, time
+
+from listener_workers import BackgroundWriter, SpeechExecutor
+
+
+def test_speech_keeps_one_line_per_user_and_drops_nobody():
+    started, release = threading.Event(), threading.Event()
+    spoken = []
+
+    def say(line):
+        spoken.append(line)
+        started.set()
+        release.wait(5)
+
+    sp = SpeechExecutor(say)
+    sp.submit("first", "first line")
+    assert started.wait(5)           # the worker is busy speaking; the rest queue up
+    for burst in range(3):
+        for u in range(20):
+            sp.submit(u, f"user{u} message {burst}")
+    assert sp.pending() == 20 and sp.coalesced == 40
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(spoken) < 21 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sp.stop()
+    assert spoken == ["first line"] + [f"user{u} message 2" for u in range(20)]
+
+
+def test_flush_waits_for_the_running_job():
+    started, release = threading.Event(), threading.Event()
+    done = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        done.append("slow")
+
+    w = BackgroundWriter()
+    w.submit("a", slow)
+    assert started.wait(5)           # popped from the queue, still running
+    threading.Timer(0.1, release.set).start()
+    assert w.flush(5)
+    assert done == ["slow"]
+    w.stop()
@@ -0,0 +1,19 @@
+from media_cache import media_key
+
+
+def test_discord_signature_is_ignored():
+    a = "https://cdn.discordapp.com/attachments/1/2/img.png?ex=65a&is=659&hm=abc&"
+    b = "https://CDN.discordapp.com/attachments/1/2/img.png?hm=def&ex=66b&is=660"
+    assert media_key(a) == media_key(b) == media_key("https://cdn.discordapp.com/attachments/1/2/img.png")
+
+
+def test_discord_size_params_are_kept():
+    base = "https://media.discordapp.net/attachments/1/2/img.png?ex=1&is=2&hm=3"
+    assert media_key(base + "&width=400&height=300") != media_key(base + "&width=800&height=600")
+    assert media_key(base + "&width=400&height=300") == media_key(
+        "https://media.discordapp.net/attachments/1/2/img.png?height=300&width=400&hm=9")
+
+
+def test_other_hosts_keep_the_whole_query():
+    assert media_key("https://example.com/render?id=1") != media_key("https://example.com/render?id=2")
+    assert media_key("https://example.com/a.png") != media_key("https://example.com/a.png?v=2")
@@ -0,0 +1,47 @@
+from message_store import MessageStore
+
+
+def _row(mid, ts, text="x", **kw):
+    return dict({"id": mid, "author": "a", "content": text, "ts": float(ts), "from_me": False,
+                 "attachments": []}, **kw)
+
+
+def test_messages_roundtrip_oldest_first(tmp_path):
+    st = MessageStore(str(tmp_path / "m.db"))
+    st.put_messages("dm:1", [_row(3, 3), _row(1, 1, attachments=[{"type": "image", "url": "u", "filename": "f"}]),
+                             _row(2, 2, from_me=True)])
+    rows = st.load_messages("dm:1")
+    assert [r["id"] for r in rows] == [1, 2, 3]
+    assert rows[0]["attachments"][0]["url"] == "u" and rows[1]["from_me"] is True
+    assert [r["id"] for r in st.load_messages("dm:1", limit=2)] == [2, 3]
+    st.put_messages("dm:1", [_row(2, 2, "edited")])
+    assert st.load_messages("dm:1")[1]["content"] == "edited"
+    st.close()
+
+
+def test_high_water_only_moves_up_and_only_when_asked(tmp_path):
+    st = MessageStore(str(tmp_path / "m.db"))
+    st.put_messages("main", [_row(10, 1)])
+    st.put_messages("main", [_row(20, 2)], advance=False)     # a live row past a gap
+    assert st.load_threads()["main"][0] == 10
+    st.set_high_water("main", 5)
+    assert st.load_threads()["main"][0] == 10
+    st.set_high_water("main", 20)
+    st.set_thread_name("main", "#general")
+    st.set_thread_name("main", "")
+    assert st.load_threads()["main"] == (20, "#general")
+    st.close()
+
+
+def test_reactions_and_prune(tmp_path):
+    path = str(tmp_path / "m.db")
+    st = MessageStore(path)
+    st.put_messages("dm:1", [_row(i, i) for i in range(1, 8)])
+    st.put_reactions({i: [{"emoji": "👍", "count": i}] for i in range(1, 8)})
+    st.prune("dm:1", keep=3)
+    assert [r["id"] for r in st.load_messages("dm:1")] == [5, 6, 7]
+    assert sorted(st.load_reactions(range(1, 8))) == [5, 6, 7]
+    st.close()
+    again = MessageStore(path)
+    assert again.load_reactions([7])[7][0]["count"] == 7
+    again.close()
@@ -0,0 +1,106 @@
+# BenDiscordUI._extend_view: older history is shown only when the user scrolled for it
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("discord")
+
+import ben_discord_app as app
+
+
+class View:
+    """Just the state _extend_view touches; the view's own helpers are recorded."""
+
+    def __init__(self, log, shown, at_top=False):
+        self.bridge = type("Bridge", (), {})()
+        self.bridge.ui_messages = {"dm:1": log}
+        self.msg_model = app.MessageListModel()
+        self.msg_model.set_messages(shown)
+        self._backfill_wanted = set()
+        self.top = at_top
+        self.rendered = 0
+
+    def _at_top(self):
+        return self.top
+
+    def _backfill_batch(self, tid):
+        return 3
+
+    def _prepend_messages(self, uis):
+        self.msg_model.prepend(uis)
+
+    def _append_message(self, ui):
+        self.msg_model.append(ui)
+
+    def _render_thread(self, tid):
+        self.rendered += 1
+
+
+def _log(n):
+    return app.ThreadMessages(app.UiMessage(i, "a", f"m{i}", float(i)) for i in range(1, n + 1))
+
+
+def _extend(view):
+    app.BenDiscordUI._extend_view(view, "dm:1")
+    return [u.id for u in view.msg_model._uis]
+
+
+def test_prefetched_page_is_not_shown_until_asked():
+    log = _log(10)
+    view = View(log, list(log)[5:])
+    assert _extend(view) == [6, 7, 8, 9, 10]
+    assert view.rendered == 0
+
+
+def test_backfill_request_or_top_shows_one_batch():
+    log = _log(10)
+    view = View(log, list(log)[5:])
+    view._backfill_wanted.add("dm:1")
+    assert _extend(view) == [3, 4, 5, 6, 7, 8, 9, 10]
+    assert not view._backfill_wanted
+    view.top = True
+    assert _extend(view) == list(range(1, 11))
+
+
+def _list_view(n):
+    from PySide6 import QtWidgets
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    view = QtWidgets.QListView()
+    view.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+    model = app.MessageListModel()
+    model.set_messages([app.UiMessage(i, "a", ("word " * (i % 40)).strip(), float(i)) for i in range(1, n + 1)])
+    delegate = app.MessageDelegate(lambda ui: ui.content, view)
+    view.setItemDelegate(delegate)
+    view.setModel(model)
+    view.resize(900, 700)
+    return view, model, delegate
+
+
+def _settle(view):
+    from PySide6 import QtWidgets
+    view.show()
+    for _ in range(5):
+        QtWidgets.QApplication.processEvents()
+
+
+def test_only_painted_rows_are_laid_out():
+    view, model, delegate = _list_view(2000)
+    _settle(view)
+    assert 0 < len(delegate._docs) < 40
+    # Painted rows carry their real height
+    idx = model.index(0, 0)
+    ui = model.ui_at(0)
+    assert view.visualRect(idx).height() == delegate.row_height(ui, view.viewport().width())
+
+
+def test_tail_is_laid_out_before_scrolling_to_the_bottom():
+    view, model, delegate = _list_view(2000)
+    _settle(view)
+    vp = view.viewport()
+    assert delegate.lay_out_tail(model, vp.width(), vp.height())
+    view.doItemsLayout()
+    view.scrollToBottom()
+    _settle(view)
+    last = model.index(model.rowCount() - 1, 0)
+    assert view.visualRect(last).bottom() <= vp.height()
+    assert view.visualRect(last).height() == delegate.row_height(model.ui_at(model.rowCount() - 1), vp.width())
+    assert len(delegate._docs) < 80
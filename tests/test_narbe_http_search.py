@@ -0,0 +1,83 @@
+import os, re
+
+import narbe_http_search as hs
+from conftest import FIXTURES
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_bing_tiles_and_mediaurl_anchors():
+    items = hs.parse_image_results(_read("bing_images_async.html"), base="https://www.bing.com/")
+    assert [it["img"] for it in items] == [
+        "https://zoo.example.org/img/red-panda-1.jpg",
+        "https://blog.example.com/media/panda2.png",
+    ]
+    assert items[0]["title"] == "Red panda at the zoo"
+    assert items[1]["title"] == "Sleeping red panda"
+    assert items[1]["ref"] == "https://blog.example.com/pandas"
+
+
+def test_google_imgres_anchors_skip_thumbnails_and_duplicates():
+    items = hs.parse_image_results(_read("google_images_basic.html"), base="https://www.google.com/")
+    assert [it["img"] for it in items] == [
+        "https://photos.example.com/lighthouse.jpg",
+        "https://travel.example.org/p/cape.jpg",
+    ]
+    assert items[0]["title"] == "Lighthouse at dusk"
+
+
+def test_image_limit():
+    items = hs.parse_image_results(_read("bing_images_async.html"), limit=1)
+    assert len(items) == 1
+
+
+def test_ddg_json():
+    items = hs.parse_ddg_image_json(_read("ddg_images.json"))
+    assert items == [
+        {"img": "https://sea.example.com/boats/sail1.jpg", "title": "Sailboat on the bay",
+         "ref": "https://sea.example.com/boats"},
+        {"img": "https://harbor.example.org/img/sail2.png", "title": "image",
+         "ref": "https://harbor.example.org/"},
+    ]
+    assert hs.parse_ddg_image_json("<html>not json</html>") == []
+
+
+def test_youtube_initial_data_skips_playlists():
+    items = hs.parse_video_results(_read("youtube_results.html"))
+    assert items == [
+        {"videoId": "aaaaaaaaaa1", "title": "Cat plays the piano"},
+        {"videoId": "bbbbbbbbbb2", "title": "Piano cat compilation"},
+    ]
+
+
+def test_youtube_shorts_before_watch_links():
+    items = hs.parse_video_results(_read("youtube_shorts.html"))
+    assert items == [
+        {"videoId": "sh0rt00001", "title": "Tiny cat, tiny piano"},
+        {"videoId": "sh0rt00002", "title": "Cat duet"},
+    ]
+
+
+def test_bing_tile_title_keeps_a_literal_entity():
+    # The title text is `say &quot;hi&quot;`; encoded once more inside the m attribute
+    page = ('<a class="iusc" m="{&quot;murl&quot;:&quot;https://a.example.com/x.jpg&quot;,'
+            '&quot;t&quot;:&quot;say &amp;quot;hi&amp;quot;&quot;}" href="#"></a>')
+    items = hs.parse_image_results(page, base="https://www.bing.com/")
+    assert [(it["img"], it["title"]) for it in items] == [("https://a.example.com/x.jpg", "say &quot;hi&quot;")]
+
+
+def test_providers_follow_the_browser_order(monkeypatch):
+    urls = []
+    monkeypatch.setattr(hs, "_get", lambda url, **kw: urls.append(url) or "")
+    assert hs.search_images("red panda") == []
+    hosts = [" ".join([url.split("/")[2]] + re.findall(r"ijn=\d+", url)) for url in urls]
+    assert hosts == ["www.google.com ijn=0", "www.google.com ijn=1", "www.google.com ijn=2",
+                     "duckduckgo.com", "www.bing.com"]
+
+    urls.clear()
+    hs.search_images("beaminbenny dance")
+    assert "site%3Ainstagram.com" in urls[0] and "ijn=0" in urls[0]
+    assert len([u for u in urls if "www.google.com" in u]) == len(hs.GOOGLE_SITE_BIAS) + hs.GOOGLE_PAGES
@@ -0,0 +1,51 @@
+import random
+
+import ngram_lm
+from ngram_lm import NgramLM, _read_arpa, compile_arpa, write_synthetic_arpa
+
+
+def _score(grams, order, context, w):
+    """Back-off log10 P(w | context), straight from the ARPA tables."""
+    ctx = [x.lower() for x in context if x] or ["<s>"]
+    hist = []
+    for x in ctx[-(order - 1):] if order > 1 else []:
+        hist = hist + [x] if (x,) in grams[1] else []   # unknown word resets the history
+    acc = 0.0
+    for k in range(len(hist), 0, -1):
+        h = tuple(hist[-k:])
+        if h + (w,) in grams.get(k + 1, {}):
+            return acc + grams[k + 1][h + (w,)][0]
+        acc += grams[k].get(h, (0.0, 0.0))[1]
+    return acc + grams[1][(w,)][0]
+
+
+def _ranked(grams, order, context, words, limit=None):
+    return sorted((round(_score(grams, order, context, w), 4) for w in words), reverse=True)[:limit]
+
+
+def test_complete_matches_brute_force(tmp_path, monkeypatch):
+    # Small top lists so plenty of contexts are ranked through them
+    monkeypatch.setattr(ngram_lm, "TOP_N", 4)
+    monkeypatch.setattr(ngram_lm, "TOP_WHEN", 8)
+    arpa = str(tmp_path / "synth.arpa")
+    write_synthetic_arpa(arpa, vocab=400, bigrams=12000, trigrams=8000)
+    compile_arpa(arpa, str(tmp_path / "synth.nglm"))
+    order, grams = _read_arpa(arpa)
+    lm = NgramLM(str(tmp_path / "synth.nglm"))
+    words = [w for (w,) in grams[1] if w not in ngram_lm.SKIP_WORDS]
+    # Contexts whose successors were cut to a top list
+    busy = sorted({g[:-1] for g in grams[2]}, key=lambda h: -sum(1 for g in grams[2] if g[:-1] == h))[:20]
+    rnd = random.Random(3)
+    cases = [(list(h), "") for h in busy]
+    for _ in range(300):
+        ctx = [rnd.choice(words) for _ in range(rnd.randint(0, 3))]
+        pfx = rnd.choice(words)[:rnd.randint(0, 2)]
+        cases.append((ctx, pfx))
+    try:
+        for ctx, pfx in cases:
+            got = lm.complete(ctx, pfx, 6)
+            want = _ranked(grams, order, ctx, [w for w in words if w.startswith(pfx)], 6)
+            assert _ranked(grams, order, ctx, got) == want, (ctx, pfx, got)
+    finally:
+        lm.close()
+
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from outbound import Outbound, OutboundQueue, is_transient, local_snowflake
+
+
+class _Err(Exception):
+    def __init__(self, status=None):
+        super().__init__(f"status {status}")
+        self.status = status
+
+
+def test_transient_statuses():
+    assert is_transient(_Err()) and is_transient(_Err(503)) and is_transient(_Err(429))
+    assert not is_transient(_Err(403))
+
+
+def test_local_snowflake_sorts_after_the_newest():
+    assert local_snowflake(1 << 62) == (1 << 62) + 1
+    assert local_snowflake(0) > 0
+
+
+def test_queue_keeps_order_retries_and_fails_4xx():
+    attempts = {}
+
+    async def send(item):
+        attempts[item.content] = attempts.get(item.content, 0) + 1
+        if item.content == "flaky" and attempts["flaky"] < 3:
+            raise _Err(502)
+        if item.content == "refused":
+            raise _Err(403)
+        return item.content
+
+    async def go():
+        sent, failed = [], []
+        q = OutboundQueue(send, lambda it, r: sent.append(r), lambda it, e: failed.append(it.content),
+                          backoff=0.001, backoff_max=0.002)
+        for i, text in enumerate(["first", "flaky", "refused", "last"]):
+            q.submit(Outbound("dm:1", text, i + 1))
+        while q.pending():
+            await asyncio.sleep(0.005)
+        return sent, failed
+
+    sent, failed = asyncio.run(go())
+    assert sent == ["first", "flaky", "last"] and failed == ["refused"]
+    assert attempts == {"first": 1, "flaky": 3, "refused": 1, "last": 1}
+
+
+def test_queue_gives_up_after_max_attempts():
+    async def send(item):
+        raise ConnectionResetError()
+
+    async def go():
+        failed = []
+        q = OutboundQueue(send, lambda it, r: None, lambda it, e: failed.append(it.attempts),
+                          max_attempts=3, backoff=0.001)
+        q.submit(Outbound("main", "x", 1))
+        while q.pending():
+            await asyncio.sleep(0.005)
+        return failed
+
+    assert asyncio.run(go()) == [3]
+
+
+@pytest.fixture
+def bridge(tmp_path, monkeypatch):
+    pytest.importorskip("PySide6")
+    pytest.importorskip("discord")
+    import ben_discord_app as app
+    monkeypatch.setattr(app, "MESSAGE_DB_PATH", str(tmp_path / "messages.db"))
+    monkeypatch.setattr(app, "NAME_CACHE_PATH", str(tmp_path / "name_cache.json"))
+    b = app.DiscordBridge("fake-token", 1, 2, 0, hub_port=0)
+    b._name_cache[7] = "Sam"
+    yield app, b
+    if b.store:
+        b.store.close()
+
+
+def _echo(app, b, tid, text):
+    log = b._thread(tid)
+    ui = app.UiMessage(id=local_snowflake(log[-1].id if log else 0), author="me", content=text,
+                       ts=0.0, from_me=True, state="sending")
+    log.append(ui)
+    b._outbound[ui.id] = Outbound(tid, text, ui.id)
+    return ui.id
+
+
+def test_gateway_echo_matches_the_sent_text_as_displayed(bridge):
+    app, b = bridge
+    local = _echo(app, b, "dm:7", "  hi <@7>  see you ")
+    real = local + 10
+    b._accept_ui("dm:7", app.UiMessage(id=real, author="me", content="hi @Sam see you", ts=1.0, from_me=True), [])
+    log = b._thread("dm:7")
+    assert [m.id for m in log] == [real] and log.get(real).state == ""
+    assert not b._outbound
+
+
+def test_send_result_drops_an_echo_whose_server_copy_is_already_held(bridge):
+    app, b = bridge
+    removed = []
+    b.message_removed.connect(lambda tid, mid: removed.append((tid, mid)), app.Qt.DirectConnection)
+    local = _echo(app, b, "main", "look at this")
+    real = local + 10
+    # The gateway copy arrived first with different text (e.g. embed text added): not matched
+    b._accept_ui("main", app.UiMessage(id=real, author="me", content="look at this\nA title", ts=1.0,
+                                       from_me=True), [])
+    assert b._thread("main").has(local)
+    # Then the send result lands
+    assert b._reconcile_outbound("main", local, app.UiMessage(id=real, author="me", content="look at this",
+                                                              ts=1.0, from_me=True), [])
+    assert [m.id for m in b._thread("main")] == [real]
+    assert removed == [("main", local)]
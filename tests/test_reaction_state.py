@@ -0,0 +1,51 @@
+import asyncio
+
+from reaction_state import ReactionCoalescer, ReactionState
+
+
+def test_deltas_update_counts_without_mutating_handed_out_rows():
+    st = ReactionState()
+    st.seed(1, [])
+    assert st.apply(1, "👍", +1)
+    shown = st.get(1)
+    assert st.apply(1, "👍", +1, me=True)
+    assert shown[0]["count"] == 1                       # the list the UI holds is unchanged
+    assert st.get(1)[0]["count"] == 2 and st.get(1)[0]["me"]
+    assert st.apply(1, "👍", -1, me=True)
+    assert (st.get(1)[0]["count"], st.get(1)[0]["me"]) == (1, False)
+    assert st.apply(1, "👍", -1)
+    assert st.get(1) == []
+
+
+def test_unknown_state_asks_for_a_refetch():
+    st = ReactionState()
+    assert not st.apply(9, "👍", +1)                    # message never seen
+    st.seed(9, [])
+    assert not st.apply(9, "😂", -1)                    # removing what we have no count for
+
+
+def test_shared_dict_and_own_cap():
+    shared = {}
+    ReactionState(shared).seed(5, [])
+    assert 5 in shared
+    st = ReactionState(cap=3)
+    for mid in range(1, 6):
+        st.seed(mid, [])
+    assert list(st.rows) == [3, 4, 5]
+
+
+def test_coalescer_folds_a_burst_into_one_flush():
+    flushed = []
+
+    async def go():
+        co = ReactionCoalescer(lambda mid, info: flushed.append((mid, info)), window=0.02)
+        co.touch(1, thread="main", spoken=None)
+        co.touch(1, thread="main", spoken="Sam reacted heart")
+        co.touch(2, thread="dm:3")
+        await asyncio.sleep(0.06)
+        co.touch(1, thread="main")
+        co.cancel()
+        await asyncio.sleep(0.04)
+
+    asyncio.run(go())
+    assert sorted(flushed) == [(1, {"thread": "main", "spoken": "Sam reacted heart"}), (2, {"thread": "dm:3"})]
@@ -0,0 +1,59 @@
+import json
+
+from read_state import EXTRA_CAP, ReadState
+
+
+def test_in_order_reads_fold_into_the_mark(tmp_path):
+    st = ReadState(str(tmp_path / "read_state.json"))
+    for mid in (10, 20, 30):
+        assert st.mark("dm:1", mid)
+    assert st.marks["dm:1"] == 30 and not st.extra["dm:1"]
+    assert st.is_read("dm:1", 5) and not st.is_read("dm:1", 31)
+    assert not st.mark("dm:1", 20)
+
+
+def test_mark_waits_for_older_unread(tmp_path):
+    st = ReadState(str(tmp_path / "read_state.json"))
+    st.mark("dm:1", 10)
+    st.mark("dm:1", 30, oldest_unread=20)     # 20 still unread: 30 is an exception
+    assert st.marks["dm:1"] == 10 and st.extra["dm:1"] == {30}
+    assert not st.is_read("dm:1", 20)
+    st.mark("dm:1", 20)                        # nothing older unread now: both fold
+    assert st.marks["dm:1"] == 30 and not st.extra["dm:1"]
+
+
+def test_mark_never_passes_the_cap(tmp_path):
+    # 40 is loaded and read while 20..39 are still being caught up (high-water mark 15)
+    st = ReadState(str(tmp_path / "read_state.json"))
+    st.mark("dm:1", 10)
+    st.mark("dm:1", 40, cap=15)
+    assert st.marks["dm:1"] == 10 and st.extra["dm:1"] == {40}
+    assert not st.is_read("dm:1", 25) and st.is_read("dm:1", 40)
+    # Caught up (no cap): the next read folds both
+    st.mark("dm:1", 25)
+    assert st.marks["dm:1"] == 40 and not st.extra["dm:1"]
+
+
+def test_save_load_and_old_format(tmp_path):
+    path = tmp_path / "read_state.json"
+    st = ReadState(str(path))
+    st.mark("main", 10)
+    st.mark("main", 30, oldest_unread=20)
+    st.set_last_seen(123.0)
+    st.save()
+    again = ReadState(str(path))
+    assert again.marks == {"main": 10} and again.extra == {"main": {30}} and again.last_seen_ts == 123.0
+
+    path.write_text(json.dumps({"read_ids": [1, 2, 3], "last_seen_ts": 5.0}))
+    old = ReadState(str(path))
+    assert old.dirty and old.last_seen_ts == 5.0 and not old.marks
+    old.save()
+    assert "read_ids" not in json.loads(path.read_text())
+
+
+def test_exceptions_are_capped(tmp_path):
+    st = ReadState(str(tmp_path / "read_state.json"))
+    for mid in range(2, EXTRA_CAP + 12):
+        st.mark("dm:1", mid, oldest_unread=1)
+    assert len(st.extra["dm:1"]) == EXTRA_CAP
+    assert min(st.extra["dm:1"]) == 12
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("discord")
+
+from ben_discord_app import SeenIds, ThreadMessages, UiMessage
+
+
+def _ui(mid):
+    return UiMessage(mid, "a", f"m{mid}", float(mid))
+
+
+def test_ordered_insert_and_dedupe():
+    log = ThreadMessages(_ui(i) for i in (5, 1, 3))
+    assert [m.id for m in log] == [1, 3, 5]
+    assert log.append(_ui(4)) and not log.append(_ui(3))
+    assert [m.id for m in log] == [1, 3, 4, 5]
+    assert log.has(4) and log.get(4).content == "m4" and log.rank(4) == 2
+
+
+def test_windows_around_an_id():
+    log = ThreadMessages(_ui(i) for i in range(1, 11))
+    assert [m.id for m in log.older_than(6, 3)] == [3, 4, 5]
+    assert [m.id for m in log.older_than(2, 3)] == [1]
+    assert [m.id for m in log.newer_than(8)] == [9, 10]
+
+
+def test_rekey_and_remove_keep_the_index():
+    log = ThreadMessages(_ui(i) for i in (10, 20, 30))
+    assert log.rekey(15, 99) is None
+    log.rekey(10, 25)
+    assert [m.id for m in log] == [20, 25, 30] and not log.has(10) and log.get(25).content == "m10"
+    assert log.remove(20).content == "m20" and log.remove(20) is None
+    assert [m.id for m in log] == [25, 30] and log.rank(30) == 1
+
+
+def test_seen_ids_evict_oldest_first():
+    seen = SeenIds(cap=3)
+    seen.update([1, 2, 3])
+    seen.add(2)
+    seen.add(4)
+    assert 1 not in seen and all(i in seen for i in (2, 3, 4)) and len(seen) == 3
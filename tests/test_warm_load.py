@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from warm_load import WarmLimiter
+
+
+def test_once_shares_one_call_per_key():
+    calls = []
+
+    async def fetch(k):
+        calls.append(k)
+        await asyncio.sleep(0.01)
+        return k * 2
+
+    async def go():
+        lim = WarmLimiter(2)
+        return await asyncio.gather(*(lim.once(("member", k), lambda k=k: fetch(k)) for k in (1, 1, 2, 1)))
+
+    assert asyncio.run(go()) == [2, 2, 4, 2]
+    assert sorted(calls) == [1, 2]
+
+
+def test_reset_drops_inflight_lookups():
+    async def go():
+        lim = WarmLimiter(1)
+        gate = asyncio.Event()
+
+        async def old():
+            await gate.wait()
+            return "old client"
+        first = asyncio.ensure_future(lim.once("user", old))
+        await asyncio.sleep(0)
+        lim.reset()
+
+        async def new():
+            return "new client"
+        got = await lim.once("user", new)
+        gate.set()
+        return got, await first
+
+    assert asyncio.run(go()) == ("new client", "old client")
+
+
+def test_member_miss_expires(monkeypatch):
+    pytest.importorskip("PySide6")
+    pytest.importorskip("discord")
+    import ben_discord_app as app
+
+    class Guild:
+        def __init__(self):
+            self.fetches = 0
+            self.member = None
+
+        def get_member(self, uid):
+            return None
+
+        async def fetch_member(self, uid):
+            self.fetches += 1
+            if self.member is None:
+                raise RuntimeError("403 Forbidden")
+            return self.member
+
+    bridge = app.DiscordBridge.__new__(app.DiscordBridge)
+    bridge._limiter = WarmLimiter(2)
+    bridge._not_member = {}
+    g = Guild()
+
+    async def go():
+        assert await bridge._guild_member(g, 7) is None
+        assert await bridge._guild_member(g, 7) is None     # remembered
+        assert g.fetches == 1
+        monkeypatch.setitem(app.SETTINGS, "NOT_MEMBER_TTL_SEC", 0.0)
+        g.member = "member 7"
+        assert await bridge._guild_member(g, 7) == "member 7"
+        assert g.fetches == 2 and 7 not in bridge._not_member
+
+    asyncio.run(go())
@@ -0,0 +1,345 @@
+# kenlm_client.py
+# Shared KenLM prediction client for the scan keyboards
+# (search/narbe_scan_browser.py, messenger/narbe_keyboard_send.py)
+# - One pooled keep-alive requests.Session per process
+# - Learns which request shape the server accepts (POST left/prefix/num, POST context/prefix/limit,
+#   GET query) and sticks with it instead of trying every shape on every keystroke
+# - LRU cache keyed by (context, prefix, limit)
+# - suggest() races the network against a local fallback: it always returns within budget_ms;
+#   a late network answer still lands in the cache and is handed to on_late, so the caller can
+#   show it if the user has not typed on
+# - a new keystroke drops queued lookups for older prefixes (only the one already on the wire
+#   finishes), so a slow server never builds a backlog
+# - circuit breaker: after KENLM_FAIL_LIMIT network errors / timeouts in a row the client
+#   answers from the local model without asking the server, for a backoff that doubles from
+#   KENLM_BACKOFF_SEC to KENLM_BACKOFF_MAX_SEC; then one keystroke probes the server again.
+#   A slow answer is not a failure: any HTTP response closes the breaker
+#
+# Local stand-in server for timeout testing:
+#   python kenlm_client.py --serve --port 8765 --delay 2.5 --shape get
+#   python kenlm_client.py --probe http://127.0.0.1:8765/word/predict --budget 300
+
+import os, time, json, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as _FutTimeout
+from typing import Callable, List, Optional
+
+try:
+    import requests as _requests
+except Exception:
+    _requests = None
+
+KENLM_API = os.environ.get("KENLM_API", "https://api.imagineville.org/word/predict")
+KENLM_TIMEOUT = (2, 3)   # (connect, read) seconds per network attempt
+KENLM_BUDGET_MS = 350    # suggest() answers within this, falling back locally
+KENLM_FAIL_LIMIT = 2      # consecutive failures before the breaker opens
+KENLM_BACKOFF_SEC = 5.0
+KENLM_BACKOFF_MAX_SEC = 60.0
+DEFAULT_WORDS = ["yes", "no", "help", "the", "you", "to"]
+
+# Request shapes, in probe order
+SHAPES = ("post_left", "post_context", "get")
+
+def _norm_api_url(url: str) -> str:
+    if not url:
+        return ""
+    u = url.strip()
+    if not (u.startswith("http://") or u.startswith("https://")):
+        u = "http://" + u
+    return u.rstrip("/")
+
+def parse_kenlm(data) -> List[str]:
+    # Accept a wide variety of payloads
+    if data is None:
+        return []
+    # Raw text body
+    if isinstance(data, (str, bytes)):
+        try:
+            s = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
+        except Exception:
+            s = str(data)
+        return [ln.strip() for ln in s.splitlines() if ln.strip()]
+    # List of strings/dicts
+    if isinstance(data, list):
+        out = []
+        for item in data:
+            if isinstance(item, str):
+                out.append(item)
+            elif isinstance(item, dict):
+                tok = item.get("text") or item.get("token") or item.get("word") or item.get("completion")
+                if tok:
+                    out.append(str(tok))
+        return out
+    # Dict with various common fields
+    if isinstance(data, dict):
+        for k in ("suggestions", "result", "results", "candidates", "predictions", "completions", "words", "choices", "tokens"):
+            if k in data and isinstance(data[k], (list, str)):
+                return parse_kenlm(data[k])
+        # Some APIs wrap under "data"
+        if "data" in data:
+            return parse_kenlm(data["data"])
+    return []
+
+class KenLMClient:
+    def __init__(self, api: str = KENLM_API, timeout=KENLM_TIMEOUT, budget_ms: int = KENLM_BUDGET_MS,
+                 cache_size: int = 512):
+        self.api = _norm_api_url(api)
+        self.timeout = timeout
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self.shape: Optional[str] = None     # learned request shape
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._session = None
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kenlm")
+        # Circuit breaker
+        self._failures = 0
+        self._backoff = KENLM_BACKOFF_SEC
+        self._open_until = 0.0
+
+    # ---------- session
+    def _get_session(self):
+        if _requests is None:
+            return None
+        if self._session is None:
+            try:
+                s = _requests.Session()
+                s.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+                s.mount("http://", _requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                s.mount("https://", _requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                self._session = s
+            except Exception:
+                self._session = None
+        return self._session
+
+    # ---------- cache
+    @staticmethod
+    def _key(context_words, prefix, limit):
+        ctx = tuple(str(w).lower() for w in (context_words or []))[-3:]
+        return ctx, (prefix or "").lower(), int(limit or 6)
+
+    def cached(self, context_words, prefix, limit=6) -> Optional[List[str]]:
+        key = self._key(context_words, prefix, limit)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+        return None
+
+    def _store(self, key, words):
+        with self._lock:
+            self._cache[key] = list(words)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ---------- circuit breaker
+    def available(self) -> bool:
+        """False while the breaker is open (the server failed recently)."""
+        return time.monotonic() >= self._open_until
+
+    def _note_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= KENLM_FAIL_LIMIT:
+                self._open_until = time.monotonic() + self._backoff
+                self._backoff = min(KENLM_BACKOFF_MAX_SEC, self._backoff * 2)
+                self._failures = 0
+
+    def _note_success(self):
+        with self._lock:
+            self._failures = 0
+            self._backoff = KENLM_BACKOFF_SEC
+            self._open_until = 0.0
+
+    # ---------- network
+    def _request(self, sess, shape, ctx, pfx, lim):
+        if shape == "post_left":
+            return sess.post(self.api, json={"left": " ".join(ctx), "prefix": pfx, "num": lim}, timeout=self.timeout)
+        if shape == "post_context":
+            return sess.post(self.api, json={"context": list(ctx), "prefix": pfx, "limit": lim}, timeout=self.timeout)
+        params = {"num": str(lim), "sort": "logprob", "safe": "true", "lang": "en"}
+        if pfx:
+            params["prefix"] = pfx
+        if ctx:
+            params["left"] = " ".join(ctx)
+        return sess.get(self.api, params=params, timeout=self.timeout)
+
+    def fetch(self, context_words, prefix, limit=6) -> List[str]:
+        """Blocking network lookup (learned shape first, cached). [] on failure."""
+        key = self._key(context_words, prefix, limit)
+        hit = self.cached(*key)
+        if hit is not None:
+            return hit
+        sess = self._get_session()
+        if not self.api or sess is None:
+            return []
+        ctx, pfx, lim = key
+        shapes = (self.shape,) if self.shape else SHAPES
+        for shape in shapes:
+            try:
+                r = self._request(sess, shape, ctx, pfx, lim)
+            except Exception:
+                # Timeout / connection error: the server is unreachable, not the shape wrong
+                self._note_failure()
+                return []
+            self._note_success()
+            if not r.ok:
+                if shape == self.shape and r.status_code in (400, 404, 405, 415, 422):
+                    # Server stopped accepting the learned shape; re-probe next time
+                    self.shape = None
+                continue
+            try:
+                out = parse_kenlm(r.json())
+            except Exception:
+                out = parse_kenlm(r.text)
+            if out:
+                self.shape = shape
+                out = out[:lim]
+                self._store(key, out)
+                return out
+        return []
+
+    def _fetch_shared(self, key):
+        # One network call per key even when several keystrokes ask for it; lookups for
+        # other keys that have not started yet are superseded by this keystroke
+        with self._lock:
+            for k, f in list(self._inflight.items()):
+                if k != key and f.cancel():
+                    self._inflight.pop(k, None)
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._pool.submit(self.fetch, *key)
+                self._inflight[key] = fut
+                fut.add_done_callback(lambda _f, k=key: self._inflight.pop(k, None))
+        return fut
+
+    def suggest(self, context_words, prefix, limit=6, fallback: Optional[Callable[[], List[str]]] = None,
+                budget_ms: Optional[int] = None, on_late: Optional[Callable[[List[str]], None]] = None) -> List[str]:
+        """Cache, then network raced against `fallback`; always returns within the budget.
+
+        When the network misses the budget, `on_late(words)` runs on a worker thread once it answers.
+        """
+        key = self._key(context_words, prefix, limit)
+        hit = self.cached(*key)
+        if hit:
+            return hit
+        t0 = time.monotonic()
+        fut = self._fetch_shared(key) if self.available() else None
+        try:
+            local = list(fallback() if fallback else DEFAULT_WORDS)[:key[2]]
+        except Exception:
+            local = DEFAULT_WORDS[:key[2]]
+        if fut is None:
+            return local
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        try:
+            out = fut.result(timeout=max(0.0, budget - (time.monotonic() - t0)))
+        except _FutTimeout:
+            # Still on the wire; fetch() counts real failures itself
+            if on_late is not None:
+                fut.add_done_callback(lambda f: self._late(f, on_late))
+            out = []
+        except Exception:
+            out = []
+        return out or local
+
+    @staticmethod
+    def _late(fut, on_late):
+        try:
+            out = [] if fut.cancelled() else fut.result()
+            if out:
+                on_late(out)
+        except Exception:
+            pass
+
+_default_client = None
+
+def get_client() -> KenLMClient:
+    global _default_client
+    if _default_client is None:
+        _default_client = KenLMClient()
+    return _default_client
+
+# ---------- Local stand-in server / probe ----------
+def _stand_in(port: int, delay: float, shape: str, quiet: bool = False):
+    """Stand-in KenLM server (not started); delay and shape can be changed on it while it runs."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import urllib.parse as up
+    words = ["hello", "help", "home", "how", "have", "here", "happy", "house"]
+
+    class H(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real server
+
+        def _answer(self, prefix):
+            time.sleep(self.server.delay)
+            out = [w for w in words if w.startswith(prefix or "")] or words
+            body = json.dumps({"suggestions": out}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.server.seen.append(("GET", self.client_address[1]))
+            if self.server.shape != "get":
+                self.send_error(405); return
+            q = up.parse_qs(up.urlparse(self.path).query)
+            self._answer(q.get("prefix", [""])[0])
+
+        def do_POST(self):
+            self.server.seen.append(("POST", self.client_address[1]))
+            n = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(n) or b"{}")
+            except Exception:
+                body = {}
+            want = {"post_left": "left", "post_context": "context"}.get(self.server.shape)
+            if not want or want not in body:
+                self.send_error(422); return
+            self._answer(body.get("prefix", ""))
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                print("[stand-in]", fmt % args)
+
+    srv = ThreadingHTTPServer(("127.0.0.1", port), H)
+    srv.delay, srv.shape, srv.seen = delay, shape, []
+    return srv
+
+def _serve(port: int, delay: float, shape: str):
+    print(f"[stand-in] KenLM on http://127.0.0.1:{port}/word/predict (shape={shape}, delay={delay}s)")
+    _stand_in(port, delay, shape).serve_forever()
+
+def _probe(api: str, budget_ms: int):
+    c = KenLMClient(api=api, budget_ms=budget_ms)
+    local = lambda: ["(local)"]
+    for ctx, pfx in ((["i"], "h"), (["i"], "h"), (["you"], "ho"), (["we"], ""), (["you"], "ho"),
+                     (["we"], "h"), (["we"], "ha")):
+        t0 = time.perf_counter()
+        out = c.suggest(ctx, pfx, 6, fallback=local)
+        print(f"{' '.join(ctx)!r:8} {pfx!r:5} {1000*(time.perf_counter()-t0):7.1f} ms  shape={c.shape}  "
+              f"server={'up' if c.available() else 'backing off'}  {out}")
+        time.sleep(0.2)
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Shared KenLM client")
+    ap.add_argument("--serve", action="store_true", help="run a local stand-in KenLM server")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--delay", type=float, default=0.0, help="stand-in response delay (seconds)")
+    ap.add_argument("--shape", choices=SHAPES, default="get", help="request shape the stand-in accepts")
+    ap.add_argument("--probe", metavar="URL", help="time suggest() against URL")
+    ap.add_argument("--budget", type=int, default=KENLM_BUDGET_MS, help="latency budget (ms)")
+    args = ap.parse_args()
+    if args.serve:
+        _serve(args.port, args.delay, args.shape)
+    elif args.probe:
+        _probe(args.probe, args.budget)
+    else:
+        ap.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# ngram_lm.py
+# Offline n-gram language model for prefix completion (KenLM-style ARPA models)
+# - open("model.arpa" | "model.arpa.gz") compiles once to "model.nglm" next to it;
+#   open("model.nglm") memory-maps the compiled file directly (no parsing at start-up)
+# - complete(context, prefix) ranks every word starting with `prefix` by its back-off
+#   log10 probability P(w | context), the same scoring KenLM uses for ARPA models
+# - without a prefix, contexts with many successors are ranked from their precomputed top list;
+#   the other successors of that context are kept out of the lower orders, and when one of them
+#   could still place, the query is re-run over the full successor lists
+# - KenLM's own .binary/.trie format is not readable here; build an ARPA with lmplz
+#   (or export one with build_binary's inverse) and point NARBE_LM_PATH at it
+#
+# Synthetic model for timing (bench/bench_ngram_lm.py) when no real ARPA is at hand:
+#   python ngram_lm.py --synthetic /tmp/synth.arpa --vocab 60000
+
+import os, io, gzip, mmap, struct, heapq, random
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b"NGLM0001"
+SKIP_WORDS = ("<s>", "</s>", "<unk>")
+TOP_N = 32            # precomputed best successors per context...
+TOP_WHEN = 256        # ...for contexts with more successors than this
+_SUCC = struct.Struct("<If")   # (word id, log10 prob)
+
+# ---------- ARPA -> .nglm compiler ----------
+def _read_arpa(path: str):
+    """Returns (order, grams) with grams[n] = {tuple(words): (logprob, backoff)}."""
+    opener = gzip.open if path.endswith(".gz") else open
+    grams: Dict[int, dict] = {}
+    n = 0
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("\\data\\") or line.startswith("ngram "):
+                continue
+            if line.startswith("\\") and line.endswith("-grams:"):
+                n = int(line[1:line.index("-")])
+                grams[n] = {}
+                continue
+            if line == "\\end\\":
+                break
+            if not n:
+                continue
+            parts = line.split()
+            if len(parts) < n + 1:
+                continue
+            try:
+                lp = float(parts[0])
+                words = tuple(w.lower() for w in parts[1:n + 1])
+                bo = float(parts[n + 1]) if len(parts) > n + 1 else 0.0
+            except ValueError:
+                continue
+            prev = grams[n].get(words)
+            if prev is None or lp > prev[0]:
+                grams[n][words] = (lp, bo)
+    return (max(grams) if grams else 0), grams
+
+def compile_arpa(arpa_path: str, out_path: str):
+    order, grams = _read_arpa(arpa_path)
+    if order < 1:
+        raise ValueError(f"no n-grams in {arpa_path}")
+    vocab = sorted({w for g in grams[1] for w in g})
+    wid = {w: i for i, w in enumerate(vocab)}
+    V = len(vocab)
+
+    blob = io.BytesIO()
+    offs = [0]
+    for w in vocab:
+        blob.write(w.encode("utf-8")); offs.append(blob.tell())
+    uni_lp = [-99.0] * V
+    uni_bo = [0.0] * V
+    for (w,), (lp, bo) in grams[1].items():
+        uni_lp[wid[w]] = lp; uni_bo[wid[w]] = bo
+    uni_top = heapq.nlargest(TOP_N, (i for i in range(V) if vocab[i] not in SKIP_WORDS), key=lambda i: uni_lp[i])
+
+    sections = []  # per order n >= 2: (ctx_bytes, succ_bytes, top_bytes, n_ctx)
+    for n in range(2, order + 1):
+        by_ctx: Dict[Tuple[int, ...], list] = {}
+        for g, (lp, _bo) in grams.get(n, {}).items():
+            try:
+                ids = tuple(wid[w] for w in g)
+            except KeyError:
+                continue
+            by_ctx.setdefault(ids[:-1], []).append((ids[-1], lp))
+        # Contexts that only carry a back-off weight still matter for scoring
+        for g, (_lp, bo) in grams.get(n - 1, {}).items():
+            if bo and n - 1 >= 1:
+                try:
+                    ids = tuple(wid[w] for w in g)
+                except KeyError:
+                    continue
+                by_ctx.setdefault(ids, [])
+        ctx_rec = struct.Struct("<" + "I" * (n - 1) + "fIIII")
+        cb, sb, tb = io.BytesIO(), io.BytesIO(), io.BytesIO()
+        s_i = t_i = 0
+        for ctx in sorted(by_ctx):
+            succ = sorted(by_ctx[ctx])
+            if len(ctx) == 1:
+                bo = uni_bo[ctx[0]]
+            else:
+                bo = grams[n - 1].get(tuple(vocab[i] for i in ctx), (0.0, 0.0))[1]
+            top = []
+            if len(succ) > TOP_WHEN:
+                top = heapq.nlargest(TOP_N, (s for s in succ if vocab[s[0]] not in SKIP_WORDS), key=lambda s: s[1])
+            cb.write(ctx_rec.pack(*ctx, bo, s_i, len(succ), t_i, len(top)))
+            for s in succ:
+                sb.write(_SUCC.pack(*s))
+            for s in top:
+                tb.write(_SUCC.pack(*s))
+            s_i += len(succ); t_i += len(top)
+        sections.append((cb.getvalue(), sb.getvalue(), tb.getvalue(), len(by_ctx)))
+
+    # Layout: header | offsets table | sections (each 8-byte aligned)
+    parts = [struct.pack(f"<{V + 1}I", *offs), blob.getvalue(),
+             struct.pack(f"<{V}f", *uni_lp), struct.pack(f"<{V}f", *uni_bo),
+             struct.pack(f"<{len(uni_top)}I", *uni_top)]
+    for cb, sb, tb, _n in sections:
+        parts += [cb, sb, tb]
+    head_len = 8 + 4 * 4 + 8 * len(parts) + 4 * len(sections)
+    pos = (head_len + 7) & ~7
+    table = []
+    for p in parts:
+        table.append(pos)
+        pos = (pos + len(p) + 7) & ~7
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<IIII", order, V, len(uni_top), len(parts)))
+        f.write(struct.pack(f"<{len(parts)}Q", *table))
+        f.write(struct.pack(f"<{len(sections)}I", *[s[3] for s in sections]))
+        for off, p in zip(table, parts):
+            f.write(b"\0" * (off - f.tell()))
+            f.write(p)
+    os.replace(tmp, out_path)
+
+# ---------- Memory-mapped model ----------
+class NgramLM:
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mm)
+        if bytes(mv[:8]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled n-gram model")
+        self.order, self.V, n_top, n_parts = struct.unpack_from("<IIII", mv, 8)
+        table = struct.unpack_from(f"<{n_parts}Q", mv, 24)
+        n_sec = self.order - 1
+        n_ctx = struct.unpack_from(f"<{n_sec}I", mv, 24 + 8 * n_parts)
+        self._mv = mv
+        self._offs = mv[table[0]:table[0] + 4 * (self.V + 1)].cast("I")
+        self._blob = table[1]
+        self._uni_lp = mv[table[2]:table[2] + 4 * self.V].cast("f")
+        self._uni_bo = mv[table[3]:table[3] + 4 * self.V].cast("f")
+        self._uni_top = mv[table[4]:table[4] + 4 * n_top].cast("I")
+        self._sec = {}
+        for k in range(n_sec):
+            n = k + 2
+            rec = struct.Struct("<" + "I" * (n - 1) + "fIIII")
+            self._sec[n] = (rec, table[5 + 3 * k], n_ctx[k], table[6 + 3 * k], table[7 + 3 * k])
+        self._skip = {i for i in (self._id(w) for w in SKIP_WORDS) if i is not None}
+
+    @classmethod
+    def open(cls, path: str) -> "NgramLM":
+        """Open a compiled .nglm, compiling an ARPA (.arpa / .arpa.gz) first when needed."""
+        if not path.endswith(".nglm"):
+            out = (path[:-3] if path.endswith(".gz") else path)
+            out = os.path.splitext(out)[0] + ".nglm"
+            if not os.path.exists(out) or os.path.getmtime(out) < os.path.getmtime(path):
+                compile_arpa(path, out)
+            path = out
+        return cls(path)
+
+    def close(self):
+        try:
+            self._mv.release()
+        except Exception:
+            pass
+        try:
+            self._mm.close(); self._f.close()
+        except Exception:
+            pass
+
+    # ---------- vocabulary
+    def word(self, i: int) -> str:
+        a, b = self._offs[i], self._offs[i + 1]
+        return bytes(self._mv[self._blob + a:self._blob + b]).decode("utf-8")
+
+    def _lower_bound(self, s: str) -> int:
+        lo, hi = 0, self.V
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < s:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _id(self, w: str) -> Optional[int]:
+        i = self._lower_bound(w)
+        return i if i < self.V and self.word(i) == w else None
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        if not prefix:
+            return 0, self.V
+        return self._lower_bound(prefix), self._lower_bound(prefix + "\U0010ffff")
+
+    # ---------- contexts
+    def _find_ctx(self, ids: Tuple[int, ...]):
+        rec, base, count, _s, _t = self._sec[len(ids) + 1]
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = rec.unpack_from(self._mv, base + mid * rec.size)[:len(ids)]
+            if key < ids:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < count:
+            r = rec.unpack_from(self._mv, base + lo * rec.size)
+            if r[:len(ids)] == ids:
+                return r[len(ids):]  # (backoff, succ_off, succ_cnt, top_off, top_cnt)
+        return None
+
+    def _successors(self, n: int, off: int, cnt: int, lo: int, hi: int):
+        # Successors are sorted by word id, so a vocab prefix range is one slice
+        sbase = self._sec[n][3] + off * _SUCC.size
+        ids = self._mv[sbase:sbase + cnt * _SUCC.size].cast("B").cast("I")
+        a = bisect_left(ids[0::2], lo) if lo else 0
+        b = bisect_left(ids[0::2], hi) if hi < self.V else cnt
+        return _SUCC.iter_unpack(self._mv[sbase + a * _SUCC.size:sbase + b * _SUCC.size])
+
+    def _has_successor(self, n: int, off: int, cnt: int, w: int) -> bool:
+        sbase = self._sec[n][3] + off * _SUCC.size
+        ids = self._mv[sbase:sbase + cnt * _SUCC.size].cast("B").cast("I")[0::2]
+        i = bisect_left(ids, w)
+        return i < cnt and ids[i] == w
+
+    def complete(self, context_words: List[str], prefix: str = "", limit: int = 6) -> List[str]:
+        """Top `limit` words starting with `prefix`, ranked by back-off log10 P(w | context)."""
+        pfx = (prefix or "").lower()
+        lo, hi = self._prefix_range(pfx)
+        if lo >= hi:
+            return []
+        ctx_words = [w.lower() for w in (context_words or []) if w]
+        if not ctx_words:
+            ctx_words = ["<s>"]
+        ids = []
+        for w in ctx_words[-(self.order - 1):] if self.order > 1 else []:
+            i = self._id(w)
+            ids = [] if i is None else ids + [i]  # unknown word resets the history
+        ids = tuple(ids)
+        best = self._rank(ids, lo, hi, bool(pfx), limit, use_top=True)
+        if best is None:
+            # A word left out of some top list could still place: rank from the full lists
+            best = self._rank(ids, lo, hi, bool(pfx), limit, use_top=False)
+        return [self.word(w) for w, _s in best]
+
+    def _rank(self, ids: Tuple[int, ...], lo: int, hi: int, has_pfx: bool, limit: int, use_top: bool):
+        """[(word id, score)] best first, or None when the top lists cannot settle the ranking."""
+        scores: Dict[int, float] = {}
+        acc = 0.0  # accumulated back-off weight
+        cut = []   # (n, off, cnt): contexts only scored through their top list
+        bound = float("-inf")  # no unscored successor of a cut context scores above this
+        for k in range(len(ids), 0, -1):
+            h = ids[-k:]
+            r = self._find_ctx(h)
+            if r is None:
+                # Unseen history: back off with weight 0 (log10 1)
+                continue
+            bo, off, cnt, toff, tcnt = r
+            n = k + 1
+            if use_top and tcnt and not has_pfx:
+                tb = self._sec[n][4] + toff * _SUCC.size
+                cand = list(_SUCC.iter_unpack(self._mv[tb:tb + tcnt * _SUCC.size]))
+            else:
+                cand = self._successors(n, off, cnt, lo, hi)
+            for w, lp in cand:
+                if w not in scores and w not in self._skip and not self._in_cut(cut, w):
+                    scores[w] = acc + lp
+            if use_top and tcnt and not has_pfx:
+                # Successors outside the top list score at most its last entry here, and must
+                # not be re-scored by back-off at the lower orders
+                cut.append((n, off, cnt))
+                bound = max(bound, acc + cand[-1][1])
+            acc += bo
+            if len(scores) >= limit:
+                # Anything left to find is scored below acc + its (<=0) lower-order prob
+                best = heapq.nlargest(limit, scores.values())
+                if best[-1] >= acc:
+                    break
+        # Unigram level
+        if len(scores) < limit or heapq.nlargest(limit, scores.values())[-1] < acc:
+            if use_top and not has_pfx and len(self._uni_top):
+                cand = ((i, self._uni_lp[i]) for i in self._uni_top)
+                bound = max(bound, acc + self._uni_lp[self._uni_top[-1]])
+            else:
+                # Only the best (limit + already scored + skipped) unigrams can still place
+                k = limit + len(scores) + len(self._skip)
+                cand = ((i, self._uni_lp[i]) for i in heapq.nlargest(k, range(lo, hi), key=self._uni_lp.__getitem__))
+            for w, lp in cand:
+                if w not in scores and w not in self._skip and not self._in_cut(cut, w):
+                    scores[w] = acc + lp
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+        if use_top and bound > float("-inf") and (len(best) < limit or best[-1][1] < bound):
+            return None
+        return best
+
+    def _in_cut(self, cut, w: int) -> bool:
+        return any(self._has_successor(n, off, cnt, w) for n, off, cnt in cut)
+
+# ---------- Synthetic model ----------
+def write_synthetic_arpa(path: str, vocab: int = 50000, bigrams: int = 400000, trigrams: int = 400000, seed: int = 7):
+    """Zipf-ish random model, only for timing when no real ARPA is at hand."""
+    rnd = random.Random(seed)
+    letters = "etaoinshrdlucmfwypvbgkjqxz"
+    words = set()
+    while len(words) < vocab:
+        words.add("".join(rnd.choice(letters[:rnd.randint(6, 26)]) for _ in range(rnd.randint(2, 9))))
+    words = ["<s>", "</s>", "<unk>"] + sorted(words)
+    pick = lambda: words[min(len(words) - 1, int(rnd.paretovariate(1.1)) + 2)] if rnd.random() < 0.5 else words[rnd.randrange(3, len(words))]
+    bi = {(pick(), pick()) for _ in range(bigrams)}
+    tri = {(a, b, pick()) for (a, b) in rnd.sample(sorted(bi), min(len(bi), trigrams // 4)) for _ in range(4)}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"\\data\\\nngram 1={len(words)}\nngram 2={len(bi)}\nngram 3={len(tri)}\n\n\\1-grams:\n")
+        for i, w in enumerate(words):
+            f.write(f"{-1.0 - 4.0 * i / len(words):.4f}\t{w}\t{-0.3 * rnd.random():.4f}\n")
+        f.write("\n\\2-grams:\n")
+        for a, b in bi:
+            f.write(f"{-3.0 * rnd.random():.4f}\t{a} {b}\t{-0.3 * rnd.random():.4f}\n")
+        f.write("\n\\3-grams:\n")
+        for a, b, c in tri:
+            f.write(f"{-2.0 * rnd.random():.4f}\t{a} {b} {c}\n")
+        f.write("\n\\end\\\n")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Offline n-gram LM (ARPA / compiled .nglm)")
+    ap.add_argument("--synthetic", metavar="OUT.arpa", help="write a synthetic ARPA for benchmarking")
+    ap.add_argument("--vocab", type=int, default=50000)
+    ap.add_argument("--complete", nargs="+", metavar=("MODEL", "TEXT"), help="complete TEXT (last word = prefix)")
+    args = ap.parse_args()
+    if args.synthetic:
+        write_synthetic_arpa(args.synthetic, vocab=args.vocab)
+        print(f"[synthetic] wrote {args.synthetic}")
+    if args.complete:
+        lm = NgramLM.open(args.complete[0])
+        text = " ".join(args.complete[1:])
+        parts = text.split()
+        trailing = text.endswith(" ") or not parts
+        print(lm.complete(parts if trailing else parts[:-1], "" if trailing else parts[-1]))
+    if not (args.synthetic or args.complete):
+        ap.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# scan_highlight.py
+# Cheap scan highlight for the Qt scan keyboards (search/narbe_scan_browser.py,
+# messenger/narbe_keyboard_send.py)
+# - One overlay outline is moved over the focused row/key with setGeometry; the rows and keys
+#   themselves are never restyled, so a scan step does no stylesheet unpolish/polish work
+# - NARBE_FRAME_STATS=1 prints how long each scan step takes until the outline is painted
+
+import os, time
+from typing import Optional
+
+from PySide6 import QtCore, QtGui, QtWidgets
+from PySide6.QtCore import Qt
+
+FOCUS_COLOR = "#FFD64D"
+FRAME_STATS = os.environ.get("NARBE_FRAME_STATS", "").strip() not in ("", "0")
+FRAME_BUDGET_MS = 1000.0 / 60.0
+
+class ScanFocusFrame(QtWidgets.QWidget):
+    def __init__(self, host: QtWidgets.QWidget, color: str = FOCUS_COLOR, width: int = 3, radius: int = 12):
+        super().__init__(host)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        self.setFocusPolicy(Qt.NoFocus)
+        self._host = host
+        self._pen = QtGui.QPen(QtGui.QColor(color), width)
+        fill = QtGui.QColor(color); fill.setAlphaF(0.20)
+        self._fill = fill
+        self._radius = radius
+        self._target = None
+        self._filled = False
+        self._t0 = 0.0
+        self._samples = []
+        host.installEventFilter(self)
+        self.hide()
+
+    def focus(self, w: Optional[QtWidgets.QWidget], fill: bool = False):
+        """Outline `w` (tinted when fill=True); None hides the outline."""
+        if FRAME_STATS:
+            self._t0 = time.perf_counter()
+        if self._target is not None and self._target is not w:
+            try: self._target.removeEventFilter(self)
+            except Exception: pass
+        self._target = w
+        self._filled = fill
+        if w is None:
+            self.hide()
+            return
+        try: w.installEventFilter(self)  # re-installing just moves it to the front
+        except Exception: pass
+        self._place()
+        self.raise_()
+        self.show()
+        self.update()
+
+    def _place(self):
+        w = self._target
+        if w is None:
+            return
+        try:
+            top_left = w.mapTo(self._host, QtCore.QPoint(0, 0))
+            self.setGeometry(QtCore.QRect(top_left, w.size()))
+        except Exception:
+            pass
+
+    def eventFilter(self, obj, ev):
+        # Follow the target when it or the host is moved/resized by layouts
+        if ev.type() in (QtCore.QEvent.Move, QtCore.QEvent.Resize, QtCore.QEvent.LayoutRequest):
+            if obj is self._target or obj is self._host:
+                QtCore.QTimer.singleShot(0, self._place)
+        elif ev.type() == QtCore.QEvent.Hide and obj is self._target:
+            self.hide()
+        return super().eventFilter(obj, ev)
+
+    def paintEvent(self, e: QtGui.QPaintEvent):
+        p = QtGui.QPainter(self)
+        p.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        half = self._pen.widthF() / 2.0
+        r = QtCore.QRectF(self.rect()).adjusted(half, half, -half, -half)
+        if self._filled:
+            p.setPen(Qt.NoPen); p.setBrush(self._fill)
+            p.drawRoundedRect(r, self._radius, self._radius)
+        p.setPen(self._pen); p.setBrush(Qt.NoBrush)
+        p.drawRoundedRect(r, self._radius, self._radius)
+        p.end()
+        if FRAME_STATS and self._t0:
+            self._record((time.perf_counter() - self._t0) * 1000.0)
+            self._t0 = 0.0
+
+    def _record(self, ms: float):
+        self._samples.append(ms)
+        if len(self._samples) >= 20:
+            s = sorted(self._samples)
+            print(f"[scan] step->paint n={len(s)} median={s[len(s)//2]:.2f} ms max={s[-1]:.2f} ms "
+                  f"(frame budget {FRAME_BUDGET_MS:.1f} ms)")
+            self._samples = []
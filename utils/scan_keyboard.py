@@ -0,0 +1,983 @@
+# scan_keyboard.py
+# Shared NARBE scan keyboard (PySide6) for search/narbe_scan_browser.py and messenger/narbe_keyboard_send.py
+# - ScanKeyboard: text row, optional extra rows, controls, A-9 rows and a predictive row,
+#   scanned with space (tap = next, hold = back) and enter (tap = select, 3 s hold = predictions / rows)
+# - Editing actions (letters, predictions, space, delete, clear) are built in; any other action is
+#   looked up in the `handlers` dict, else emitted as actionTriggered(action)
+# - PredictionBackend: offline LM -> KenLM raced against the local n-grams, run on a worker thread
+# - It is a plain QWidget, so a host can keep one instance around and show it in-process
+
+import os, time, json, threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PySide6 import QtCore, QtGui, QtWidgets
+from PySide6.QtCore import Qt, QTimer
+
+from kenlm_client import get_client as _kenlm_client, DEFAULT_WORDS
+from ngram_lm import NgramLM
+from scan_highlight import ScanFocusFrame
+
+# (chars, spoken row label)
+ALPHA_ROWS = (
+    ("ABCDEF", "a b c d e f"),
+    ("GHIJKL", "g h i j k l"),
+    ("MNOPQR", "m n o p q r"),
+    ("STUVWX", "s t u v w x"),
+    ("YZ0123", "y z zero one two three"),
+    ("456789", "four five six seven eight nine"),
+)
+# (label, action, variant)
+EDIT_CONTROLS = (
+    ("SPACE", "space_char", ""),
+    ("DEL LETTER", "del_letter", ""),
+    ("DEL WORD", "del_word", ""),
+    ("CLEAR", "clear", ""),
+)
+PRED_COUNT = 6
+
+# Window style for the full-screen "fit" keyboards (send / reply); set it on the host widget
+LARGE_KEYS_STYLE = """
+background:#0b0f14; color:#e9eef5;
+
+/* Base button shape and weight */
+QPushButton{
+    border:2px solid #000;
+    border-radius:12px;
+    padding:18px 22px;
+    font-weight:900;
+}
+
+/* Big fonts by role */
+QPushButton[role="control"]{ font-size: 30pt; }
+QPushButton[role="alpha"]  { font-size: 36pt; }
+QPushButton[role="pred"]   { font-size: 24pt; }
+
+/* Scan focus is drawn by ScanFocusFrame (utils/scan_highlight.py) */
+
+/* Text inputs */
+QLineEdit, QTextEdit{
+    border:1px solid rgba(255,255,255,0.15);
+    border-radius:8px;
+    padding:10px 12px;
+    font-size:24pt;
+}
+
+/* Primary */
+QPushButton[variant="primary"]{
+    background:#2a7; color:#000; font-weight:900;
+}
+"""
+
+# NARBE_LM_PATH may point at an .arpa, .arpa.gz or compiled .nglm; default is <app dir>/lm/narbe.*
+LOCAL_LM_PATH = os.environ.get("NARBE_LM_PATH", "").strip()
+
+def find_local_lm(app_dir: str) -> str:
+    if LOCAL_LM_PATH:
+        return LOCAL_LM_PATH if os.path.exists(LOCAL_LM_PATH) else ""
+    here = os.path.join(app_dir, "lm")
+    for name in ("narbe.nglm", "narbe.arpa", "narbe.arpa.gz"):
+        path = os.path.join(here, name)
+        if os.path.exists(path):
+            return path
+    return ""
+
+def load_ngrams(path: str):
+    try:
+        if not path or not os.path.exists(path):
+            return {}, {}, {}
+        data = json.load(open(path, "r", encoding="utf-8"))
+        fw  = {k.upper():v for k,v in (data.get("frequent_words") or {}).items()}
+        bi  = {k.upper():v for k,v in (data.get("bigrams") or {}).items()}
+        tri = {k.upper():v for k,v in (data.get("trigrams") or {}).items()}
+        return fw, bi, tri
+    except Exception:
+        return {}, {}, {}
+
+@dataclass
+class RowDef:
+    wrap: QtWidgets.QFrame
+    widgets: list
+    id: str
+    label: str
+
+# ---------- Prediction backend ----------
+class PredictionBackend:
+    """Offline LM, then KenLM raced against the local n-grams. predict() blocks; call it off the UI thread."""
+
+    def __init__(self, ngrams_path: str = "", lm_path: str = "", inject: Optional[Dict[str, str]] = None,
+                 limit: int = PRED_COUNT):
+        self.limit = limit
+        self.lm_path = lm_path
+        # prefix -> word pushed to the front when the current word is exactly that prefix
+        self.inject = {k.lower(): v for k, v in (inject or {}).items()}
+        self._freq, self._bi, self._tri = load_ngrams(ngrams_path)
+        self._lm = None
+        self._lm_tried = False
+        self._lm_lock = threading.Lock()
+
+    def _local_lm(self):
+        # Opened on first use; an ARPA file is compiled to .nglm the first time
+        with self._lm_lock:
+            if not self._lm_tried:
+                self._lm_tried = True
+                try:
+                    if self.lm_path:
+                        self._lm = NgramLM.open(self.lm_path)
+                except Exception:
+                    self._lm = None
+        return self._lm
+
+    def fallback(self, raw_text: str, limit: Optional[int] = None) -> List[str]:
+        limit = limit or self.limit
+        txt = (raw_text or "")
+        up_txt = txt.upper().strip()
+        if not up_txt:
+            return DEFAULT_WORDS[:limit]
+        trailing = txt.endswith(" ")
+        parts = up_txt.split()
+        cur = "" if trailing else (parts[-1] if parts else "")
+        left = " ".join(parts[:-1]) if (not trailing and len(parts) > 1) else (" ".join(parts) if trailing else "")
+        scores = {}
+        if left:
+            ctx = left.split()
+            if len(ctx) >= 2:
+                key = " ".join(ctx[-2:]) + " "
+                for k, d in self._tri.items():
+                    if k.startswith(key):
+                        nxt = k.split()[-1]
+                        if (not cur) or nxt.startswith(cur):
+                            scores[nxt] = scores.get(nxt, 0) + 10 * float(d.get("count", 0))
+            if len(ctx) >= 1:
+                key = ctx[-1] + " "
+                for k, d in self._bi.items():
+                    if k.startswith(key):
+                        nxt = k.split()[-1]
+                        if (not cur) or nxt.startswith(cur):
+                            scores[nxt] = scores.get(nxt, 0) + 5 * float(d.get("count", 0))
+        if not scores and cur:
+            for w, d in self._freq.items():
+                if w.startswith(cur):
+                    scores[w] = scores.get(w, 0) + float(d.get("count", 0))
+        out = [w.lower() for w,_ in sorted(scores.items(), key=lambda kv: -kv[1])]
+        for w in DEFAULT_WORDS:
+            if len(out) >= limit: break
+            if w not in out: out.append(w)
+        return out[:limit]
+
+    def predict(self, text: str, on_late: Optional[Callable[[], None]] = None) -> List[str]:
+        """on_late() runs when KenLM answers after the budget; the same text then hits the client cache."""
+        raw = text or ""
+        limit = self.limit
+        ends_space = raw.endswith(" ")
+        words = raw.strip().split()
+        if ends_space:
+            context, prefix = words[-2:], ""
+        else:
+            prefix = (words[-1] if words else "")
+            context = words[:-1][-2:]
+        # First tier: offline LM (full history; it keeps what its order can use)
+        lm_preds = []
+        try:
+            lm = self._local_lm()
+            if lm is not None:
+                lm_preds = lm.complete(words if ends_space else words[:-1], prefix, limit)
+        except Exception:
+            lm_preds = []
+        try:
+            if len(lm_preds) >= limit:
+                preds = lm_preds
+            else:
+                # Network raced against the local n-grams; answers within the client's latency budget
+                preds = _kenlm_client().suggest(context, prefix, limit, fallback=lambda: self.fallback(raw, limit),
+                                                on_late=(lambda _words: on_late()) if on_late else None)
+                preds = list(dict.fromkeys(lm_preds + [p.lower() for p in preds if p]))[:limit]
+            preds = [p.lower() for p in preds if p]
+        except Exception:
+            preds = self.fallback(raw, limit)
+
+        inj = self.inject.get((prefix or "").strip().lower())
+        if inj:
+            seen = set()
+            final = []
+            for w in [inj] + preds:
+                wl = (w or "").lower()
+                if not wl or wl in seen:
+                    continue
+                seen.add(wl)
+                final.append(w)
+            preds = final[:limit]
+        return preds
+
+class PredictWorker(QtCore.QObject):
+    request = QtCore.Signal(int, str)       # (id, text)
+    ready   = QtCore.Signal(int, str, list) # (id, text, predictions)
+
+    def __init__(self, backend: PredictionBackend, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+
+    @QtCore.Slot(int, str)
+    def _on_request(self, req_id: int, text: str):
+        # A late KenLM answer queues the same request again; the keyboard drops it if the
+        # text has changed since (request ids are per keystroke)
+        try:
+            words = self.backend.predict(text, on_late=lambda: self.request.emit(req_id, text))
+        except Exception:
+            words = DEFAULT_WORDS[:self.backend.limit]
+        self.ready.emit(req_id, text, words)
+
+# ---------- Scan redirect (e.g. slideshow buttons over the keyboard) ----------
+class ScanRedirect:
+    """While installed with ScanKeyboard.set_redirect(), space/enter drive these callables instead."""
+    __slots__ = ("scan_next", "scan_prev", "activate")
+
+    def __init__(self, scan_next: Callable[[], None], scan_prev: Callable[[], None], activate: Callable[[], None]):
+        self.scan_next = scan_next
+        self.scan_prev = scan_prev
+        self.activate = activate
+
+def fixed_row_heights(n_rows: int, header_height: int = 30) -> Tuple[int, int]:
+    """(row_height, text_row_height) that fit n_rows scan rows on the primary screen."""
+    screen = QtWidgets.QApplication.primaryScreen().availableGeometry()
+    avail_height = screen.height() - header_height - 20  # leave small buffer
+    # The text row is taller to fit two lines
+    row_height = max(60, (avail_height - 80) // max(1, n_rows - 1))
+    text_row_height = max(100, int(row_height * 1.3))
+    return row_height, text_row_height
+
+# ---------- Scan keyboard ----------
+class ScanKeyboard(QtWidgets.QWidget):
+    actionTriggered = QtCore.Signal(str)  # actions without a handler
+    textChanged = QtCore.Signal(str)
+
+    # Scan timing (hosts may override per instance before showing)
+    SHORT_MIN = 250
+    SHORT_MAX = 3000
+    SCAN_BACK_FIRST_MS = int(os.environ.get("SCAN_BACK_FIRST_MS", "2500"))
+    SCAN_BACK_STEP_MS  = int(os.environ.get("SCAN_BACK_STEP_MS", "2000"))
+    ENTER_HOLD_MS = 3000
+    INPUT_COOLDOWN_MS = 500
+    PRED_DEBOUNCE_MS = 120
+
+    def __init__(self, parent=None, *, speak: Optional[Callable[[str], None]] = None,
+                 backend: Optional[PredictionBackend] = None,
+                 controls: Sequence[Tuple[str, str, str]] = EDIT_CONTROLS,
+                 extra_rows: Sequence[Tuple[str, str, Sequence[Tuple[str, str, str]]]] = (),
+                 handlers: Optional[Dict[str, Callable[[], None]]] = None,
+                 text_mode: str = "line", row_height: int = 0, text_row_height: int = 0,
+                 row_style: str = "QFrame{border-radius:12px;}", speak_text_row: bool = True,
+                 capture_keys: bool = True):
+        """
+        controls / extra rows are (label, action, variant) triples; extra_rows are (id, spoken label, keys)
+        and sit between the text row and the controls. text_mode "line" is a one-line QLineEdit,
+        "fit" a QTextEdit that shrinks to two lines. row_height > 0 fixes every row's height.
+        """
+        super().__init__(parent)
+        self._speak = speak or (lambda _t: None)
+        self.backend = backend or PredictionBackend()
+        self.handlers: Dict[str, Callable[[], None]] = dict(handlers or {})
+        self.text_mode = text_mode
+        self.row_height = int(row_height or 0)
+        self.text_row_height = int(text_row_height or 0)
+        self.row_style = row_style
+        self.speak_text_row = speak_text_row
+
+        # Scan state
+        self.mode = "ROWS"      # ROWS | KEYS
+        self.row_idx = 0
+        self.key_idx = 0
+        self._redirect: Optional[ScanRedirect] = None
+        self._suppress_row_label_once = False
+
+        self.space_down = False
+        self.space_at = 0.0
+        self.space_scanned = False
+        self.space_timer = QTimer(self); self.space_timer.setSingleShot(True)
+        self.space_timer.timeout.connect(self._space_prev)
+        self.enter_down = False
+        self.enter_at = 0.0
+        self.enter_long_fired = False
+        self.enter_timer = QTimer(self); self.enter_timer.setSingleShot(True)
+        self.enter_timer.timeout.connect(self._on_enter_hold)
+        self._cooldown_until_ms = 0
+
+        # Text auto-fit bounds ("fit" mode)
+        self.TEXT_MIN_PT = int(os.environ.get("TEXT_MIN_PT", "36"))
+        self.ONE_LINE_PT = int(os.environ.get("ONE_LINE_PT", "80"))
+        if self.text_row_height:
+            self.ONE_LINE_PT = max(40, int(self.text_row_height * 0.55))
+        self.TWO_LINE_PT = max(self.TEXT_MIN_PT, self.ONE_LINE_PT // 2)
+
+        self._build(controls, extra_rows)
+        self._focus_frame = ScanFocusFrame(self)
+
+        # Prediction thread + debounce
+        self.pred_req_id = 0
+        self._pred_current = [""]*PRED_COUNT
+        self.pred_timer = QTimer(self); self.pred_timer.setSingleShot(True); self.pred_timer.setInterval(self.PRED_DEBOUNCE_MS)
+        self.pred_timer.timeout.connect(self._refresh_predictions_async)
+        self.pred_thread = QtCore.QThread(self)
+        self.pred_worker = PredictWorker(self.backend)
+        self.pred_worker.moveToThread(self.pred_thread)
+        self.pred_worker.request.connect(self.pred_worker._on_request)
+        self.pred_worker.ready.connect(self._on_predictions_ready)
+        self.pred_thread.start()
+        self._schedule_predictions()
+
+        # Space/enter are captured application-wide while the keyboard is visible
+        self._captures = False
+        if capture_keys:
+            app = QtWidgets.QApplication.instance()
+            if app:
+                app.installEventFilter(self)
+                self._captures = True
+
+    # ---------- UI build ----------
+    def _build(self, controls, extra_rows):
+        v = QtWidgets.QVBoxLayout(self)
+        v.setContentsMargins(0,0,0,0)
+        v.setSpacing(4 if self.row_height else 12)
+        self.rows: List[RowDef] = []
+
+        text_wrap = self._build_text_row()
+        v.addWidget(text_wrap)
+        self.rows.append(RowDef(text_wrap, [self.text_edit], "row_text", "text"))
+
+        self.buttons: Dict[str, QtWidgets.QPushButton] = {}
+        for row_id, label, keys in extra_rows:
+            fr, lay = self._row_frame()
+            btns = [self._btn(t, action=a, variant=var, role="control") for t, a, var in keys]
+            for b in btns: lay.addWidget(b)
+            v.addWidget(fr)
+            self.rows.append(RowDef(fr, btns, row_id, label))
+
+        fr, lay = self._row_frame()
+        btns = [self._btn(t, action=a, variant=var, role="control") for t, a, var in controls]
+        for b in btns: lay.addWidget(b)
+        v.addWidget(fr)
+        self.rows.append(RowDef(fr, btns, "row_controls", "controls"))
+
+        for idx, (chars, label) in enumerate(ALPHA_ROWS):
+            fr, lay = self._row_frame()
+            btns = [self._btn(ch, char=ch, role="alpha") for ch in chars]
+            for b in btns: lay.addWidget(b)
+            v.addWidget(fr)
+            self.rows.append(RowDef(fr, btns, f"row{idx+1}", label))
+
+        fr, lay = self._row_frame()
+        self.pred_btns = [self._btn("", pred=True, role="pred") for _ in range(PRED_COUNT)]
+        for b in self.pred_btns: lay.addWidget(b)
+        v.addWidget(fr)
+        self.rows.append(RowDef(fr, self.pred_btns, "predRow", "predictive text"))
+        if self.row_height:
+            QtCore.QTimer.singleShot(0, self._fit_pred_fonts)
+
+        for rd in self.rows:
+            rd.wrap.setObjectName(rd.id)
+            rd.wrap.setProperty("scanRow", True)
+
+    def _row_frame(self):
+        fr = QtWidgets.QFrame()
+        fr.setAttribute(Qt.WA_StyledBackground, True)
+        fr.setStyleSheet(self.row_style)
+        if self.row_height:
+            fr.setFixedHeight(self.row_height)
+        lay = QtWidgets.QHBoxLayout(fr)
+        if self.row_height:
+            lay.setContentsMargins(4,4,4,4); lay.setSpacing(4)
+        else:
+            lay.setContentsMargins(6,6,6,6); lay.setSpacing(8)
+        return fr, lay
+
+    def _btn(self, text, action: Optional[str]=None, char: Optional[str]=None, pred: bool=False,
+             variant: str="", role: str="alpha"):
+        b = QtWidgets.QPushButton(text)
+        if variant:
+            b.setProperty("variant", variant)
+        b.setProperty("action", action)
+        b.setProperty("char", char)
+        b.setProperty("pred", pred)
+        b.setProperty("role", role)  # control | alpha | pred
+        b.setProperty("scanKey", True)
+        b.setFocusPolicy(Qt.NoFocus)
+        if self.row_height:
+            height = self.row_height - 12
+            b.setFixedHeight(height)
+            b.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+            # Safety net font for platforms ignoring QSS
+            f = QtGui.QFont()
+            f.setPointSize(max(30, min(48, int(height * 0.55))))
+            f.setWeight(QtGui.QFont.Black)
+            b.setFont(f)
+        else:
+            b.setMinimumHeight(52)
+        b.clicked.connect(lambda _=False, btn=b: self.perform(btn))
+        if action:
+            self.buttons[action] = b
+        return b
+
+    def _build_text_row(self):
+        text_wrap = QtWidgets.QFrame()
+        text_wrap.setAttribute(Qt.WA_StyledBackground, True)
+        if self.text_mode == "fit":
+            text_wrap.setStyleSheet("""
+QFrame {
+  background-color:#ADD8E6;
+  border:2px solid #000;
+  border-radius:12px;
+}""")
+            if self.text_row_height:
+                text_wrap.setFixedHeight(self.text_row_height)
+            twv = QtWidgets.QVBoxLayout(text_wrap); twv.setContentsMargins(1,1,1,1)
+            self.text_edit = self._build_fit_text()
+        else:
+            text_wrap.setStyleSheet("QFrame{border-radius:12px;}")
+            twv = QtWidgets.QVBoxLayout(text_wrap); twv.setContentsMargins(6,6,6,6)
+            self.text_edit = QtWidgets.QLineEdit(); self.text_edit.setPlaceholderText("Type…")
+            self.text_edit.setAttribute(Qt.WA_InputMethodEnabled, False)
+            self.text_edit.setAlignment(Qt.AlignCenter)
+            self.text_edit.setStyleSheet("""
+QLineEdit{
+  background-color:#ADD8E6;
+  border:2px solid #000;
+  border-radius:12px;
+  padding:24px;
+  font-size:60px;
+  font-weight:800;
+  color:#000;
+}""")
+            self.text_edit.setMinimumHeight(100)
+            self.text_edit.setReadOnly(True)                 # scan-only input
+            self.text_edit.setContextMenuPolicy(Qt.NoContextMenu)
+        self.text_edit.setFocusPolicy(Qt.NoFocus)
+        twv.addWidget(self.text_edit)
+        return text_wrap
+
+    def _build_fit_text(self):
+        te = QtWidgets.QTextEdit()
+        te.setReadOnly(True)  # scan-only input
+        te.setAcceptRichText(False)
+        te.setWordWrapMode(QtGui.QTextOption.WrapAtWordBoundaryOrAnywhere)
+        te.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        te.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        te.setLineWrapMode(QtWidgets.QTextEdit.WidgetWidth)
+        te.setStyleSheet("""
+QTextEdit{
+  background:transparent;
+  border:none;
+  padding:2px 12px;  /* Small vertical padding, good horizontal */
+  /* font-size removed - controlled programmatically */
+  font-weight:800;
+  color:black !important;  /* force black text */
+  line-height: 1.1;  /* Tighter line spacing for 2 lines */
+}""")
+        black = QtGui.QColor(0, 0, 0, 255)
+        pal = te.palette()
+        for role in (QtGui.QPalette.ColorRole.Text, QtGui.QPalette.ColorRole.WindowText,
+                     QtGui.QPalette.ColorRole.HighlightedText, QtGui.QPalette.ColorRole.PlaceholderText,
+                     QtGui.QPalette.ColorRole.ButtonText):
+            pal.setColor(role, black)
+        pal.setColor(QtGui.QPalette.ColorRole.Base, QtGui.QColor("transparent"))
+        pal.setColor(QtGui.QPalette.ColorRole.AlternateBase, QtGui.QColor("transparent"))
+        te.setPalette(pal)
+        te.setTextColor(black)
+        opt = QtGui.QTextOption()
+        opt.setAlignment(Qt.AlignCenter)
+        te.document().setDefaultTextOption(opt)
+        te.document().setDefaultFont(QtGui.QFont("Arial", 48, QtGui.QFont.Bold))
+
+        # Blinking end-of-text cursor drawn as a separate widget over the viewport
+        self.cursor_widget = QtWidgets.QLabel("", te.viewport())
+        self.cursor_widget.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self.cursor_widget.setStyleSheet("QLabel{background:black; border:none; padding:0px;}")
+        self.cursor_widget.hide()
+        self._cursor_visible = True
+        self._cursor_timer = QTimer(self)
+        self._cursor_timer.setInterval(500)
+        self._cursor_timer.timeout.connect(self._toggle_cursor)
+        self._cursor_timer.start()
+
+        te.document().contentsChanged.connect(self._update_cursor_position)
+        QtCore.QTimer.singleShot(0, self._auto_fit_text_font)
+        return te
+
+    # ---------- text ----------
+    def text(self) -> str:
+        try:
+            if isinstance(self.text_edit, QtWidgets.QTextEdit):
+                return self.text_edit.toPlainText()
+            return self.text_edit.text()
+        except Exception:
+            return ""
+
+    def set_text(self, s: str):
+        s2 = (s or "").upper()
+        if isinstance(self.text_edit, QtWidgets.QTextEdit):
+            te = self.text_edit
+            te.blockSignals(True)
+            te.setPlainText(s2)
+            te.selectAll()
+            te.setTextColor(QtGui.QColor(0, 0, 0, 255))
+            cursor = te.textCursor(); cursor.clearSelection(); te.setTextCursor(cursor)
+            te.blockSignals(False)
+            te.setAlignment(Qt.AlignCenter)
+            self._auto_fit_text_font()
+            self._update_cursor_position()
+        else:
+            self.text_edit.setText(s2)
+        self._schedule_predictions()
+        self.textChanged.emit(s2)
+
+    def reset(self, text: str = ""):
+        """Back to the text row in row mode with `text` (silent; used when a host re-shows the keyboard)."""
+        self._clear_key_state()
+        self.mode = "ROWS"
+        self.row_idx = 0
+        self.key_idx = 0
+        self._suppress_row_label_once = True
+        self.set_text(text)
+        self._highlight_rows()
+
+    def _toggle_cursor(self):
+        if not self.text():
+            self.cursor_widget.hide()
+            self._cursor_visible = False
+            return
+        self._cursor_visible = not self._cursor_visible
+        self.cursor_widget.setVisible(self._cursor_visible)
+
+    def _update_cursor_position(self):
+        # Park the cursor widget at the end of the text (hidden when empty)
+        try:
+            if not isinstance(self.text_edit, QtWidgets.QTextEdit):
+                return
+            if not self.text():
+                self.cursor_widget.hide()
+                return
+            cursor = self.text_edit.textCursor()
+            cursor.movePosition(QtGui.QTextCursor.End)
+            rect = self.text_edit.cursorRect(cursor)
+            f = self.cursor_widget.font()
+            f.setPointSize(self.text_edit.font().pointSize())
+            self.cursor_widget.move(rect.x(), rect.y())
+            self.cursor_widget.resize(3, QtGui.QFontMetrics(f).height())
+            self.cursor_widget.setVisible(self._cursor_visible)
+        except Exception:
+            pass
+
+    def _auto_fit_text_font(self):
+        # One large line if it fits, else about half size over at most two lines
+        try:
+            if not isinstance(self.text_edit, QtWidgets.QTextEdit):
+                return
+            te = self.text_edit
+            txt = self.text()
+            vp = te.viewport()
+            avail_w = max(10, vp.width() - 24)   # leave a bit for padding/cursor
+            avail_h = max(10, vp.height() - 2)
+
+            def doc_height_for(pt: int) -> tuple:
+                f = te.font()
+                f.setPointSize(pt)
+                f.setBold(True)
+                doc = QtGui.QTextDocument()
+                doc.setDefaultFont(f)
+                opt = QtGui.QTextOption()
+                opt.setAlignment(Qt.AlignCenter)
+                opt.setWrapMode(QtGui.QTextOption.WrapAtWordBoundaryOrAnywhere)
+                doc.setDefaultTextOption(opt)
+                doc.setTextWidth(avail_w)
+                doc.setPlainText(txt)
+                doc.adjustSize()
+                return doc.size().height(), f
+
+            f_large = te.font()
+            f_large.setPointSize(self.ONE_LINE_PT)
+            f_large.setBold(True)
+            fm_large = QtGui.QFontMetricsF(f_large)
+            if (fm_large.horizontalAdvance(txt) if txt else 0.0) <= avail_w and fm_large.height() <= avail_h:
+                te.setFont(f_large)
+                te.setAlignment(Qt.AlignCenter)
+                return
+
+            h_small, f_small = doc_height_for(self.TWO_LINE_PT)
+            max_two_lines_h = (2.0 * QtGui.QFontMetricsF(f_small).lineSpacing()) + 4.0  # tiny tolerance
+            if h_small <= max_two_lines_h and h_small <= avail_h:
+                te.setFont(f_small)
+                te.setAlignment(Qt.AlignCenter)
+                return
+
+            # Still too tall: largest size that fits two lines
+            lo, hi, best_f = self.TEXT_MIN_PT, self.TWO_LINE_PT, f_small
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                h_mid, f_mid = doc_height_for(mid)
+                max_h_mid = (2.0 * QtGui.QFontMetricsF(f_mid).lineSpacing()) + 4.0
+                if h_mid <= max_h_mid and h_mid <= avail_h:
+                    best_f = f_mid
+                    lo = mid + 1
+                else:
+                    hi = mid - 1
+            te.setFont(best_f)
+            te.setAlignment(Qt.AlignCenter)
+        except Exception:
+            pass
+
+    # ---------- scanning visuals (one overlay outline, no re-polish) ----------
+    def set_redirect(self, redirect: Optional[ScanRedirect]):
+        """Route space/enter to `redirect` (None gives scanning back to the keyboard)."""
+        self._redirect = redirect
+        self._clear_key_state()
+        if redirect is not None:
+            self._focus_frame.focus(None)
+        elif self.mode == "ROWS":
+            self._focus_frame.focus(self.rows[self.row_idx].wrap)
+        else:
+            self._highlight_keys(speak=False)
+
+    def _highlight_rows(self):
+        if self.mode == "ROWS" and self._redirect is None:
+            self._focus_frame.focus(self.rows[self.row_idx].wrap)
+        else:
+            self._focus_frame.focus(None)
+
+        if self._suppress_row_label_once:
+            self._suppress_row_label_once = False
+            return
+        self._speak_row_label()
+
+    def _highlight_keys(self, speak: bool = True):
+        # Outline (and tint) only the current key
+        cur = self.rows[self.row_idx]
+        w = cur.widgets[self.key_idx] if 0 <= self.key_idx < len(cur.widgets) else None
+        self._focus_frame.focus(w, fill=isinstance(w, QtWidgets.QPushButton))
+        if speak:
+            self._speak_key_label()
+
+    def _speak_text_row(self):
+        txt = (self.text() or "").strip()
+        self._speak(txt if txt else "empty")
+
+    def _speak_row_label(self):
+        try:
+            rd = self.rows[self.row_idx]
+            if rd.id == "row_text":
+                if self.speak_text_row:
+                    self._speak_text_row()
+            else:
+                self._speak(rd.label)
+        except Exception:
+            pass
+
+    def _speak_key_label(self):
+        try:
+            rd = self.rows[self.row_idx]
+            w = rd.widgets[self.key_idx]
+            if isinstance(w, QtWidgets.QPushButton):
+                lbl = (w.text() or "").strip()
+                if lbl: self._speak(lbl)
+        except Exception:
+            pass
+
+    # ---------- key capture ----------
+    def eventFilter(self, obj, ev):
+        try:
+            if ev.type() in (QtCore.QEvent.KeyPress, QtCore.QEvent.KeyRelease) and isinstance(ev, QtGui.QKeyEvent):
+                if ev.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter) and self.isVisible() and self.isEnabled():
+                    if ev.type() == QtCore.QEvent.KeyPress:
+                        self.keyPressEvent(ev)
+                    else:
+                        self.keyReleaseEvent(ev)
+                    return True
+        except Exception:
+            pass
+        return super().eventFilter(obj, ev)
+
+    def keyPressEvent(self, e: QtGui.QKeyEvent):
+        if e.isAutoRepeat(): return
+        if e.key() == Qt.Key_Space:
+            e.accept()
+            if not self.space_down:
+                self.space_down = True
+                self.space_at = time.time()
+                self.space_scanned = False
+                # First backward step after FIRST_MS, then every STEP_MS while held
+                self.space_timer.setInterval(self.SCAN_BACK_FIRST_MS)
+                self.space_timer.start()
+        elif e.key() in (Qt.Key_Return, Qt.Key_Enter):
+            e.accept()
+            if not self.enter_down:
+                self.enter_down = True
+                self.enter_at = time.time()
+                if self._redirect is None:
+                    self.enter_timer.setInterval(self.ENTER_HOLD_MS)
+                    self.enter_timer.start()
+        else:
+            super().keyPressEvent(e)
+
+    def keyReleaseEvent(self, e: QtGui.QKeyEvent):
+        if e.isAutoRepeat(): return
+        if e.key() == Qt.Key_Space:
+            e.accept()
+            if not self.space_down: return
+            held = (time.time() - self.space_at) * 1000.0
+            self.space_down = False
+            self.space_timer.stop()
+            if self._in_cooldown(): return
+            # Short tap advances forward, unless a long-hold backward scan already ran
+            if self.SHORT_MIN <= held < self.SHORT_MAX and not self.space_scanned:
+                if self._redirect is not None: self._redirect.scan_next()
+                elif self.mode == "ROWS": self._scan_rows_next()
+                else: self._scan_keys_next()
+                self._arm_cooldown()
+        elif e.key() in (Qt.Key_Return, Qt.Key_Enter):
+            e.accept()
+            if not self.enter_down: return
+            self.enter_down = False
+            if self.enter_timer.isActive(): self.enter_timer.stop()
+            if self.enter_long_fired:
+                self.enter_long_fired = False
+                return
+            if self._in_cooldown(): return
+            if self._redirect is not None:
+                self._redirect.activate()
+            elif self.mode == "KEYS":
+                self._activate_key()
+                self.mode = "ROWS"
+                if self.isVisible():  # a handler (send / close) may have hidden the keyboard
+                    self._highlight_rows()
+            else:
+                self._enter_row()
+            self._arm_cooldown()
+        else:
+            super().keyReleaseEvent(e)
+
+    def _clear_key_state(self):
+        self.space_down = False
+        self.enter_down = False
+        self.enter_long_fired = False
+        self.space_timer.stop()
+        self.enter_timer.stop()
+
+    def _space_prev(self):
+        self.space_scanned = True
+        if self._redirect is not None:
+            self._redirect.scan_prev()
+        elif self.mode == "ROWS":
+            self._scan_rows_prev()
+        else:
+            self._scan_keys_prev()
+        # keep repeating while the key is held
+        if self.space_down:
+            self.space_timer.setInterval(self.SCAN_BACK_STEP_MS)
+            self.space_timer.start()
+
+    def _scan_rows_next(self):
+        self.row_idx = (self.row_idx + 1) % len(self.rows)
+        self._highlight_rows()
+
+    def _scan_rows_prev(self):
+        self.row_idx = (self.row_idx - 1 + len(self.rows)) % len(self.rows)
+        self._highlight_rows()
+
+    def _scan_keys_next(self):
+        rd = self.rows[self.row_idx]
+        self.key_idx = (self.key_idx + 1) % len(rd.widgets)
+        self._highlight_keys()
+
+    def _scan_keys_prev(self):
+        rd = self.rows[self.row_idx]
+        self.key_idx = (self.key_idx - 1 + len(rd.widgets)) % len(rd.widgets)
+        self._highlight_keys()
+
+    def _enter_row(self):
+        rd = self.rows[self.row_idx]
+        # The text row is read out instead of entering key mode
+        if rd.id == "row_text":
+            self._speak_text_row()
+            return
+        self.mode = "KEYS"
+        self.key_idx = 0
+        self._highlight_keys()
+
+    def _activate_key(self):
+        self._focus_frame.focus(None)
+        rd = self.rows[self.row_idx]
+        if not rd.widgets: return
+        w = rd.widgets[self.key_idx]
+        if isinstance(w, QtWidgets.QPushButton):
+            self.perform(w)
+
+    def _on_enter_hold(self):
+        # 3 s hold: KEYS -> back to rows; ROWS -> jump to predictions and read them
+        if not self.enter_down or self._redirect is not None:
+            return
+        try:
+            if self.mode == "KEYS":
+                self.mode = "ROWS"
+                self._highlight_rows()
+                self._speak("rows")
+                self.enter_long_fired = True
+                return
+            pred_idx = next((i for i, rd in enumerate(self.rows) if rd.id == "predRow"), None)
+            if pred_idx is not None:
+                self.row_idx = pred_idx
+                self._suppress_row_label_once = True  # only speak the words
+                self._highlight_rows()
+                self._read_pred_row()
+                self.enter_long_fired = True
+        except Exception:
+            pass
+
+    def _read_pred_row(self):
+        # Small delays so the TTS queue does not coalesce the words
+        words = [b.text().strip() for b in self.pred_btns if (b.text() or "").strip()]
+        delay = 200
+        step = 900
+        for i, w in enumerate(words):
+            QtCore.QTimer.singleShot(delay + i * step, lambda ww=w: self._speak(ww))
+
+    def _in_cooldown(self) -> bool:
+        return int(time.time()*1000) < self._cooldown_until_ms
+
+    def _arm_cooldown(self):
+        self._cooldown_until_ms = int(time.time()*1000) + self.INPUT_COOLDOWN_MS
+
+    # ---------- actions ----------
+    def perform(self, btn: QtWidgets.QPushButton):
+        action = btn.property("action")
+        ch = btn.property("char")
+        is_pred = bool(btn.property("pred"))
+
+        if ch:
+            self.set_text(self.text() + ch)
+            self._speak(ch)
+            return
+        if is_pred:
+            pred = btn.text()
+            if not pred: return
+            v = self.text()
+            has_sp = v.endswith(" ")
+            trimmed = v.rstrip()
+            parts = trimmed.split() if trimmed else []
+            current = parts[-1] if parts else ""
+            before = " ".join(parts[:-1]) if len(parts) > 1 else ""
+            if has_sp or current == "":
+                newv = (trimmed + " " + pred + " ")
+            elif pred.lower().startswith(current.lower()):
+                newv = ((before + " " if before else "") + pred + " ")
+            else:
+                newv = (trimmed + " " + pred + " ")
+            normalized = " ".join(newv.split())
+            if not normalized.endswith(" "): normalized += " "
+            self.set_text(normalized)
+            self._speak(pred)
+            return
+
+        if action == "space_char":
+            self.set_text(self.text() + " ")
+            self._speak("space")
+            return
+        if action == "del_letter":
+            self._speak("delete letter")
+            self.set_text(self.text()[:-1])
+            return
+        if action == "del_word":
+            self._speak("delete word")
+            trimmed = self.text().rstrip()
+            idx = trimmed.rfind(" ")
+            # keep previous words and exactly one trailing space; a single word clears all
+            self.set_text("" if idx == -1 else trimmed[:idx+1])
+            return
+        if action == "clear":
+            self._speak("clear")
+            self.set_text("")
+            return
+        if action:
+            handler = self.handlers.get(action)
+            if handler is not None:
+                handler()
+            else:
+                self.actionTriggered.emit(action)
+
+    # ---------- predictions: debounced + threaded ----------
+    def _schedule_predictions(self):
+        self.pred_timer.start()
+
+    def _refresh_predictions_async(self):
+        self.pred_req_id += 1
+        rid = self.pred_req_id
+        txt = self.text()
+        try:
+            self.pred_worker.request.emit(rid, txt)
+        except Exception:
+            # synchronous last resort
+            self._on_predictions_ready(rid, txt, self.backend.fallback(txt))
+
+    @QtCore.Slot(int, str, list)
+    def _on_predictions_ready(self, rid: int, text: str, words: list):
+        if rid != self.pred_req_id:
+            return  # stale
+        arr = (words or [])[:PRED_COUNT]
+        for i, b in enumerate(self.pred_btns):
+            b.setText(arr[i].upper() if i < len(arr) else "")
+        self._pred_current = arr
+        if self.row_height:
+            QtCore.QTimer.singleShot(0, self._fit_pred_fonts)
+
+    def _fit_pred_fonts(self):
+        # Shrink predictive button text to fit the fixed button width
+        try:
+            for b in self.pred_btns:
+                txt = (b.text() or "").strip()
+                max_pt = max(10, int(b.height() * 0.45))
+                min_pt = 9
+                avail_w = max(10, b.width() - 24)
+                f = b.font()
+                f.setBold(True)
+                if not txt:
+                    f.setPointSize(max_pt)
+                    b.setFont(f)
+                    continue
+                lo, hi, best = min_pt, max_pt, min_pt
+                while lo <= hi:
+                    mid = (lo + hi) // 2
+                    f.setPointSize(mid)
+                    if QtGui.QFontMetrics(f).horizontalAdvance(txt) <= avail_w:
+                        best = mid
+                        lo = mid + 1
+                    else:
+                        hi = mid - 1
+                f.setPointSize(best)
+                b.setFont(f)
+        except Exception:
+            pass
+
+    # ---------- lifecycle ----------
+    def resizeEvent(self, e: QtGui.QResizeEvent):
+        super().resizeEvent(e)
+        self._auto_fit_text_font()
+        self._update_cursor_position()
+        if self.row_height:
+            self._fit_pred_fonts()
+
+    def hideEvent(self, e: QtGui.QHideEvent):
+        # A half-finished press must not leak into the next time the keyboard is shown
+        self._clear_key_state()
+        super().hideEvent(e)
+
+    def shutdown(self):
+        if self._captures:
+            app = QtWidgets.QApplication.instance()
+            if app:
+                app.removeEventFilter(self)
+            self._captures = False
+        for t in (self.pred_timer, getattr(self, "_cursor_timer", None)):
+            try:
+                if t and t.isActive(): t.stop()
+            except Exception: pass
+        try:
+            if self.pred_thread.isRunning():
+                self.pred_thread.quit(); self.pred_thread.wait(1000)
+        except Exception: pass